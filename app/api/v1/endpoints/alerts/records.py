@@ -11,7 +11,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.api import deps
-from app.common.pagination import PaginationParams, get_pagination_query
+from app.common.pagination import (
+    PaginationParams,
+    apply_keyset_pagination,
+    get_pagination_query,
+)
 from app.core import security
 from app.models.alert import (
     AlertRecord,
@@ -21,16 +25,19 @@ from app.schemas.alert import (
     AlertRecordHandle,
     AlertRecordResponse,
 )
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import CursorPaginatedResponse
 from app.common.query_filters import apply_pagination
 from app.utils.db_helpers import get_or_404
 
 router = APIRouter(tags=["records"])
 
+# 预警列表游标分页排序键（触发时间倒序，id 保证唯一）
+ALERT_LIST_ORDER_BY = (AlertRecord.triggered_at.desc(), AlertRecord.id.desc())
+
 # ==================== 路由定义 ====================
 # 共 6 个路由
 
-@router.get("/alerts", response_model=PaginatedResponse, status_code=status.HTTP_200_OK)
+@router.get("/alerts", response_model=CursorPaginatedResponse, status_code=status.HTTP_200_OK)
 def read_alert_records(
     db: Session = Depends(deps.get_db),
     pagination: PaginationParams = Depends(get_pagination_query),
@@ -79,15 +86,21 @@ def read_alert_records(
         query = query.filter(AlertRecord.triggered_at <= datetime.combine(date_to_value, datetime.max.time()))
 
     # 计算总数
-    total = query.count()
+    total = pagination.count(query)
 
     # 分页 - 使用 eager loading 避免 N+1 查询
     alerts_query = query.options(
         joinedload(AlertRecord.rule),
         joinedload(AlertRecord.project),
         joinedload(AlertRecord.machine)
-    ).order_by(AlertRecord.triggered_at.desc())
-    alerts = apply_pagination(alerts_query, pagination.offset, pagination.limit).all()
+    )
+    if pagination.is_keyset:
+        alerts = apply_keyset_pagination(
+            alerts_query, ALERT_LIST_ORDER_BY, pagination.cursor, pagination.limit
+        ).all()
+    else:
+        alerts_query = alerts_query.order_by(AlertRecord.triggered_at.desc())
+        alerts = apply_pagination(alerts_query, pagination.offset, pagination.limit).all()
 
     # 批量获取处理人信息（避免循环查询）
     handler_ids = [alert.handler_id for alert in alerts if alert.handler_id]
@@ -119,7 +132,7 @@ def read_alert_records(
             "handler_name": handler_name
         })
 
-    return pagination.to_response(items, total)
+    return pagination.to_response(items, total, ALERT_LIST_ORDER_BY)
 
 
 @router.get("/alerts/{alert_id:int}", response_model=AlertRecordResponse, status_code=status.HTTP_200_OK)
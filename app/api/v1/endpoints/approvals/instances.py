@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.common.pagination import PaginationParams, get_pagination_query
+from app.common.pagination import PaginationParams, apply_keyset_pagination, get_pagination_query
 from app.common.query_filters import apply_keyword_filter
 from app.core import security
 from app.models.approval import ApprovalActionLog, ApprovalInstance, ApprovalTask
@@ -34,6 +34,9 @@ from app.utils.db_helpers import get_or_404
 
 router = APIRouter()
 
+# 审批实例列表游标分页排序键
+INSTANCE_LIST_ORDER_BY = (ApprovalInstance.id.desc(),)
+
 
 @router.post("/submit", response_model=ApprovalInstanceResponse)
 def submit_approval(
@@ -102,7 +105,7 @@ def list_instances(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(security.require_permission("approval:view")),
 ):
-    """获取审批实例列表（按参与关系过滤可见性）"""
+    """获取审批实例列表（按参与关系过滤可见性，支持游标分页）"""
     query = db.query(ApprovalInstance)
 
     # 参与者可见性过滤（fail-closed）
@@ -118,19 +121,25 @@ def list_instances(
         query = query.filter(ApprovalInstance.entity_id == entity_id)
     query = apply_keyword_filter(query, ApprovalInstance, keyword, ["title", "instance_no"])
 
-    total = query.count()
-    items = (
-        query.order_by(ApprovalInstance.id.desc())
-        .offset(pagination.offset)
-        .limit(pagination.limit)
-        .all()
-    )
+    total = pagination.count(query)
+    if pagination.is_keyset:
+        items = apply_keyset_pagination(
+            query, INSTANCE_LIST_ORDER_BY, pagination.cursor, pagination.limit
+        ).all()
+    else:
+        items = (
+            query.order_by(ApprovalInstance.id.desc())
+            .offset(pagination.offset)
+            .limit(pagination.limit)
+            .all()
+        )
 
     return ApprovalInstanceListResponse(
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        items=[ApprovalInstanceResponse.model_validate(i) for i in items],
+        **pagination.to_response(
+            [ApprovalInstanceResponse.model_validate(i) for i in items],
+            total,
+            INSTANCE_LIST_ORDER_BY,
+        )
     )
 
 
@@ -11,15 +11,22 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.common.pagination import PaginationParams, get_pagination_query
+from app.common.pagination import (
+    PaginationParams,
+    apply_keyset_pagination,
+    get_pagination_query,
+)
 from app.common.query_filters import apply_pagination
 from app.core import security
 from app.models.user import PermissionAudit, User
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import CursorPaginatedResponse
 from app.utils.db_helpers import get_or_404
 
 router = APIRouter()
 
+# 审计日志游标分页排序键（创建时间倒序，id 保证唯一）
+AUDIT_LIST_ORDER_BY = (PermissionAudit.created_at.desc(), PermissionAudit.id.desc())
+
 
 class PermissionAuditResponse(BaseModel):
     """权限审计响应"""
@@ -39,7 +46,7 @@ class PermissionAuditResponse(BaseModel):
         from_attributes = True
 
 
-class PermissionAuditListResponse(PaginatedResponse):
+class PermissionAuditListResponse(CursorPaginatedResponse):
     """权限审计列表响应"""
 
     items: List[PermissionAuditResponse]
@@ -68,6 +75,7 @@ def read_audits(
     - **action**: 操作类型筛选
     - **start_date**: 开始日期
     - **end_date**: 结束日期
+    - **cursor** / **count_mode**: 游标分页与总数统计方式
     """
     query = db.query(PermissionAudit)
 
@@ -94,12 +102,17 @@ def read_audits(
         query = query.filter(PermissionAudit.created_at <= end_date)
 
     # 计算总数
-    total = query.count()
+    total = pagination.count(query)
 
     # 分页
-    audits = apply_pagination(
-        query.order_by(PermissionAudit.created_at.desc()), pagination.offset, pagination.limit
-    ).all()
+    if pagination.is_keyset:
+        audits = apply_keyset_pagination(
+            query, AUDIT_LIST_ORDER_BY, pagination.cursor, pagination.limit
+        ).all()
+    else:
+        audits = apply_pagination(
+            query.order_by(PermissionAudit.created_at.desc()), pagination.offset, pagination.limit
+        ).all()
 
     # 构建响应数据
     items = []
@@ -124,11 +137,7 @@ def read_audits(
         )
 
     return PermissionAuditListResponse(
-        items=items,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        pages=pagination.pages_for_total(total),
+        **pagination.to_response(items, total, AUDIT_LIST_ORDER_BY)
     )
 
 
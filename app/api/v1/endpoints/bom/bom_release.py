@@ -17,6 +17,7 @@ from app.models.project import Project
 from app.models.user import User
 from app.models.vendor import Vendor
 from app.schemas.material import BomResponse
+from app.services.material_where_used_service import MaterialWhereUsedService
 from app.utils.db_helpers import get_or_404
 
 logger = logging.getLogger(__name__)
@@ -61,6 +62,10 @@ def release_bom(
 
     db.add(bom)
 
+    # 按发布版本重建物料反查索引，纠正绕过 ORM 写入的明细
+    if MaterialWhereUsedService.is_available(db):
+        MaterialWhereUsedService.sync_boms(db, [bom_id])
+
     # BOM发布时自动归集材料成本
     try:
         from app.services.cost_collection_service import CostCollectionService
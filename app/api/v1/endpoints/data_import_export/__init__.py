@@ -9,6 +9,7 @@ from .export_projects import router as export_projects_router
 from .export_tasks import router as export_tasks_router
 from .export_timesheet import router as export_timesheet_router
 from .export_workload import router as export_workload_router
+from .import_jobs import router as import_jobs_router
 from .import_preview import router as import_preview_router
 from .import_upload import router as import_upload_router
 from .import_validate import router as import_validate_router
@@ -20,6 +21,7 @@ router.include_router(templates_router, tags=["templates"])
 router.include_router(import_preview_router, tags=["import"])
 router.include_router(import_validate_router, tags=["import"])
 router.include_router(import_upload_router, tags=["import"])
+router.include_router(import_jobs_router, tags=["import"])
 router.include_router(export_projects_router, tags=["export"])
 router.include_router(export_tasks_router, tags=["export"])
 router.include_router(export_timesheet_router, tags=["export"])
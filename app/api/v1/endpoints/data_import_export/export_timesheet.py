@@ -3,7 +3,6 @@
 工时数据导出 routes
 """
 
-import io
 from typing import Any
 
 from fastapi import APIRouter, Depends
@@ -16,10 +15,14 @@ from app.core import security
 from app.models.timesheet import Timesheet
 from app.models.user import User
 from app.schemas.data_import_export import ExportTimesheetRequest
+from app.services.excel_export_service import create_excel_response
 from app.services.import_export_engine import ExcelExportEngine
 
 router = APIRouter()
 
+# 服务端游标每批拉取行数
+EXPORT_BATCH_SIZE = 2000
+
 
 @router.post("/export/timesheet", response_class=StreamingResponse)
 def export_timesheet(
@@ -38,7 +41,11 @@ def export_timesheet(
         )
     )
 
-    filters = export_in.filters or {}
+    filters = {
+        "user_id": export_in.user_id,
+        "project_id": export_in.project_id,
+        **(export_in.filters or {}),
+    }
     if filters.get("user_id"):
         query = query.filter(Timesheet.user_id == filters["user_id"])
     if filters.get("project_id"):
@@ -48,7 +55,26 @@ def export_timesheet(
     if filters.get("status"):
         query = query.filter(Timesheet.status == filters["status"])
 
-    timesheets = query.order_by(Timesheet.work_date, Timesheet.user_id).all()
+    # 只取导出列，服务端游标分批拉取，不构建 ORM 对象
+    rows = query.with_entities(
+        Timesheet.work_date,
+        Timesheet.user_name,
+        Timesheet.department_name,
+        Timesheet.project_code,
+        Timesheet.project_name,
+        Timesheet.task_name,
+        Timesheet.hours,
+        Timesheet.overtime_type,
+        Timesheet.work_content,
+        Timesheet.work_result,
+        Timesheet.progress_before,
+        Timesheet.progress_after,
+        Timesheet.status,
+        Timesheet.submit_time,
+        Timesheet.approver_name,
+        Timesheet.approve_time,
+        Timesheet.approve_comment,
+    ).order_by(Timesheet.work_date, Timesheet.user_id).yield_per(EXPORT_BATCH_SIZE)
 
     status_names = {
         "DRAFT": "草稿",
@@ -65,10 +91,9 @@ def export_timesheet(
         "HOLIDAY": "节假日加班",
     }
 
-    data = []
-    for ts in timesheets:
-        data.append(
-            {
+    def iter_data():
+        for ts in rows:
+            yield {
                 "工作日期": ts.work_date.strftime("%Y-%m-%d") if ts.work_date else "",
                 "人员姓名": ts.user_name or "",
                 "部门": ts.department_name or "",
@@ -91,7 +116,6 @@ def export_timesheet(
                 ),
                 "审核意见": ts.approve_comment or "",
             }
-        )
 
     labels = [
         "工作日期",
@@ -136,8 +160,8 @@ def export_timesheet(
         40,
     ]
     columns = ExcelExportEngine.build_columns(labels, widths=widths)
-    output = ExcelExportEngine.export_table(
-        data=data,
+    chunks = ExcelExportEngine.stream_table(
+        rows=iter_data(),
         columns=columns,
         sheet_name="工时数据",
         title=None,
@@ -145,8 +169,4 @@ def export_timesheet(
 
     filename = f"工时数据_{export_in.start_date.strftime('%Y%m%d')}_{export_in.end_date.strftime('%Y%m%d')}.xlsx"
 
-    return StreamingResponse(
-        io.BytesIO(output.read()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
-    )
+    return create_excel_response(chunks, filename)
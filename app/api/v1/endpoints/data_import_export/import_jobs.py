@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+流式导入任务 routes
+
+上传文件先落盘，再由后台任务按块读取、校验并提交；前端轮询任务状态获取进度。
+"""
+
+import os
+import shutil
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.models.report_center import DataImportTask
+from app.models.user import User
+from app.schemas.data_import_export import ImportJobResponse
+from app.services.unified_import import ImportJobService, UnifiedImporter
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_import_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    template_type: str = Query(..., description="模板类型"),
+    update_existing: bool = Query(False, description="是否更新已存在的数据"),
+    current_user: User = Depends(security.require_permission("data_import_export:manage")),
+) -> Any:
+    """
+    创建流式导入任务（适用于大文件，支持 .xlsx/.xls/.csv）
+
+    文件按块导入并逐块提交，内存占用与文件大小无关；
+    通过 GET /jobs/{task_id} 轮询进度。
+    """
+    filename = file.filename or ""
+    if not filename.lower().endswith((".xlsx", ".xls", ".csv")):
+        raise HTTPException(status_code=400, detail="只支持Excel或CSV文件(.xlsx, .xls, .csv)")
+    if template_type.upper() not in UnifiedImporter.SUPPORTED_TYPES:
+        raise HTTPException(status_code=400, detail=f"不支持的模板类型: {template_type}")
+
+    job = ImportJobService.create(db, template_type, filename, current_user.id)
+
+    # 分块拷贝到暂存目录，不把整个文件读入内存
+    import_dir = os.path.join(settings.UPLOAD_DIR, "imports")
+    os.makedirs(import_dir, exist_ok=True)
+    file_path = os.path.join(import_dir, job.task_no + os.path.splitext(filename)[1].lower())
+    with open(file_path, "wb") as out:
+        shutil.copyfileobj(file.file, out)
+    job.file_path = file_path
+    job.file_size = os.path.getsize(file_path)
+    db.commit()
+
+    background_tasks.add_task(ImportJobService.run, job.id, update_existing)
+    return ImportJobService.to_status(job)
+
+
+@router.get("/jobs/{task_id}", response_model=ImportJobResponse)
+def get_import_job(
+    task_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(security.require_permission("data_import_export:manage")),
+) -> Any:
+    """查询导入任务状态和进度（仅导入人或超级管理员可查看）"""
+    job = db.get(DataImportTask, task_id)
+    if job is None or (job.imported_by != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="导入任务不存在")
+    return ImportJobService.to_status(job)
@@ -3,7 +3,6 @@
 数据导入上传 routes
 """
 
-from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
@@ -11,10 +10,10 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core import security
-from app.models.report_center import DataImportTask
 from app.models.user import User
 from app.schemas.data_import_export import ImportUploadResponse
 from app.services.import_export_engine import ImportExportEngine
+from app.services.unified_import import ImportJobService
 
 router = APIRouter()
 
@@ -53,22 +52,19 @@ def upload_and_import_data(
 
         db.commit()
 
-        task_code = f"IMP-{datetime.now().strftime('%y%m%d%H%M%S')}"
-        import_task = DataImportTask(
-            task_code=task_code,
-            template_type=template_type,
-            file_url=file.filename,
-            status="COMPLETED" if result.get("failed_count", 0) == 0 else "PARTIAL",
-            requested_by=current_user.id,
-            import_options={"update_existing": update_existing},
-        )
-        db.add(import_task)
-        db.commit()
-
         imported = result.get("imported_count", 0)
         updated = result.get("updated_count", 0)
         failed = result.get("failed_count", 0)
 
+        import_task = ImportJobService.create(
+            db, template_type, file.filename, current_user.id, file_size=len(file_content)
+        )
+        import_task.success_rows = imported + updated
+        import_task.failed_rows = failed
+        import_task.validation_errors = result.get("failed_rows", [])
+        ImportJobService.finish(import_task)
+        db.commit()
+
         message = f"导入完成：成功导入 {imported} 条"
         if updated > 0:
             message += f"，更新 {updated} 条"
@@ -77,8 +73,8 @@ def upload_and_import_data(
 
         return ImportUploadResponse(
             task_id=import_task.id,
-            task_code=import_task.task_code,
-            status="COMPLETED" if failed == 0 else "PARTIAL",
+            task_code=import_task.task_no,
+            status=import_task.status,
             message=message,
         )
 
@@ -40,7 +40,8 @@ class KitRateDashboardEndpoint(BaseDashboardEndpoint):
                 project_id_list = [int(id.strip()) for id in project_ids.split(",") if id.strip()]
 
             service = KitRateService(db)
-            return service.get_dashboard(project_id_list)
+            # 全部活跃项目走定时刷新的快照，指定项目时实时计算
+            return service.get_dashboard(project_id_list, use_snapshot=True)
 
         self.router.add_api_route(
             "/kit-rate/dashboard", dashboard_endpoint, methods=["GET"], summary="获取齐套看板数据"
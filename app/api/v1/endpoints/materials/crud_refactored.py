@@ -15,12 +15,11 @@ from app.api.v1.endpoints.base_crud_router_sync import create_crud_router_sync
 from app.common.pagination import PaginationParams, get_pagination_query
 from app.core import security
 from app.core.schemas.response import (
-    PaginatedResponse,
     SuccessResponse,
-    paginated_response,
     success_response,
 )
 from app.models.user import User
+from app.schemas.common import CursorPaginatedResponse
 from app.schemas.material import (
     MaterialCreate,
     MaterialResponse,
@@ -59,9 +58,9 @@ router.include_router(crud_router)
 
 @router.get(
     "/",
-    response_model=PaginatedResponse[MaterialResponse],
+    response_model=CursorPaginatedResponse[MaterialResponse],
     summary="物料列表",
-    description="分页查询物料列表，支持筛选、搜索、排序",
+    description="分页查询物料列表，支持筛选、搜索、排序、游标分页",
 )
 def list_materials(
     db: Session = Depends(deps.get_db),
@@ -72,7 +71,7 @@ def list_materials(
     is_key_material: Optional[bool] = Query(None, description="是否关键物料"),
     is_active: Optional[bool] = Query(None, description="是否启用"),
     current_user: User = Depends(security.require_permission("procurement:read")),
-) -> PaginatedResponse[MaterialResponse]:
+) -> CursorPaginatedResponse[MaterialResponse]:
     """
     获取物料列表（支持分页、搜索、筛选）
 
@@ -81,6 +80,7 @@ def list_materials(
     - **material_type**: 物料类型筛选
     - **is_key_material**: 是否关键物料
     - **is_active**: 是否启用
+    - **cursor** / **count_mode**: 游标分页与总数统计方式
     """
     service = MaterialService(db)
     result = service.list_materials(
@@ -91,13 +91,10 @@ def list_materials(
         material_type=material_type,
         is_key_material=is_key_material,
         is_active=is_active,
+        cursor=pagination.cursor,
+        count_mode=pagination.count_mode,
     )
-    return paginated_response(
-        items=result["items"],
-        total=result["total"],
-        page=result["page"],
-        page_size=result["page_size"],
-    )
+    return CursorPaginatedResponse[MaterialResponse](**result)
 
 
 # ========== 覆盖创建端点（支持自动生成编码） ==========
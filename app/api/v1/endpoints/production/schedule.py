@@ -41,6 +41,7 @@ async def generate_schedule(
     支持的算法:
     - GREEDY: 贪心算法，快速生成
     - HEURISTIC: 启发式算法，效果更优
+    - SEARCH: 多策略并行搜索，预算内返回帕累托最优方案
     - GENETIC: 遗传算法(未实现)
 
     优化目标:
@@ -13,10 +13,10 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.common.pagination import PaginationParams, get_pagination_query
+from app.common.pagination import COUNT_EXACT, PaginationParams, get_pagination_query
 from app.core import security
 from app.models.user import User
-from app.schemas.common import PaginatedResponse, ResponseModel
+from app.schemas.common import CursorPaginatedResponse, PaginatedResponse, ResponseModel
 from app.schemas.project import (
     ProjectCreate,
     ProjectDetailResponse,
@@ -72,7 +72,7 @@ def read_my_projects(
         pages=pagination.pages_for_total(total)
     )
 
-@router.get("/", response_model=PaginatedResponse[ProjectListResponse])
+@router.get("/", response_model=CursorPaginatedResponse[ProjectListResponse])
 def read_projects(
     db: Session = Depends(deps.get_db),
     pagination: PaginationParams = Depends(get_pagination_query),
@@ -95,13 +95,15 @@ def read_projects(
     current_user: User = Depends(security.get_current_active_user),
 ) -> Any:
     """
-    获取项目列表（支持分页、搜索、筛选、成本展示）
+    获取项目列表（支持分页、游标分页、搜索、筛选、成本展示）
     """
     service = ProjectCrudService(db)
 
-    # 判断是否使用缓存
+    # 判断是否使用缓存（缓存仅覆盖页码分页 + 精确计数）
     use_cache = (
-        not keyword 
+        not pagination.is_keyset
+        and pagination.count_mode == COUNT_EXACT
+        and not keyword 
         and not any([customer_id, stage, status, health, project_type, pm_id, min_progress, max_progress])
         and not include_cost
         and not overrun_only
@@ -120,7 +122,7 @@ def read_projects(
             }
             cached_data = cache_service.get_project_list(**cache_key_params)
             if cached_data:
-                return PaginatedResponse(**cached_data)
+                return CursorPaginatedResponse(**cached_data)
         except Exception:
             logger.debug("项目列表缓存读取失败，继续查询数据库", exc_info=True)
 
@@ -155,9 +157,6 @@ def read_projects(
             project_ids, include_breakdown=True
         )
 
-    # 计算分页
-    pages = pagination.pages_for_total(total)
-
     # 转换为响应对象
     project_items = []
     for p in projects:
@@ -177,12 +176,10 @@ def read_projects(
         }
         project_items.append(ProjectListResponse(**item_dict))
 
-    result = PaginatedResponse(
-        items=project_items,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        pages=pages
+    result = CursorPaginatedResponse(
+        **pagination.to_response(
+            project_items, total, service.keyset_order_by(sort), rows=projects
+        )
     )
 
     # 存入缓存（仅在不包含成本数据时）
@@ -16,7 +16,7 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.api.v1.core.project_crud_base import create_project_crud_router
-from app.common.pagination import get_pagination_query
+from app.common.pagination import apply_keyset_pagination, get_pagination_query
 from app.common.query_filters import apply_pagination
 from app.core import security
 from app.models.project import Project
@@ -28,6 +28,7 @@ from app.schemas.timesheet import (
     TimesheetResponse,
     TimesheetUpdate,
 )
+from app.services.timesheet_records.service import TIMESHEET_LIST_ORDER_BY
 from app.utils.db_helpers import get_or_404
 from app.utils.permission_helpers import check_project_access_or_raise
 
@@ -148,20 +149,21 @@ def list_project_timesheets(
     if status:
         query = query.filter(Timesheet.status == status)
 
-    total = query.count()
-    query = query.order_by(desc(Timesheet.work_date), desc(Timesheet.created_at))
-    query = apply_pagination(query, pagination.offset, pagination.limit)
+    total = pagination.count(query)
+    if pagination.is_keyset:
+        query = apply_keyset_pagination(
+            query, TIMESHEET_LIST_ORDER_BY, pagination.cursor, pagination.limit
+        )
+    else:
+        query = query.order_by(desc(Timesheet.work_date), desc(Timesheet.created_at))
+        query = apply_pagination(query, pagination.offset, pagination.limit)
     timesheets = query.all()
 
     # 填充用户信息和任务名称
     items = [enrich_timesheet_response(ts, db, project) for ts in timesheets]
 
     return TimesheetListResponse(
-        items=items,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        pages=pagination.pages_for_total(total),
+        **pagination.to_response(items, total, TIMESHEET_LIST_ORDER_BY)
     )
 
 
@@ -5,12 +5,10 @@
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
-from app.common.query_filters import apply_like_filter
 from app.models.purchase import (
     GoodsReceipt,
     PurchaseOrder,
@@ -18,6 +16,7 @@ from app.models.purchase import (
     PurchaseRequest,
     PurchaseRequestItem,
 )
+from app.utils.number_generator import allocate_sequence
 
 
 def decimal_value(value: Any, default: str = "0") -> Decimal:
@@ -32,71 +31,44 @@ def decimal_value(value: Any, default: str = "0") -> Decimal:
 
 def generate_order_no(db: Session, prefix: str = "PO") -> str:
     """生成采购订单编号"""
-    today = datetime.now().strftime("%Y%m%d")
-    like_pattern = f"{prefix}-{today}-%"
-    max_no_query = db.query(PurchaseOrder.order_no)
-    max_no_query = apply_like_filter(
-        max_no_query,
+    return generate_order_nos(db, 1, prefix)[0]
+
+
+def generate_order_nos(db: Session, count: int, prefix: str = "PO") -> List[str]:
+    """批量生成采购订单编号（一次预分配 count 个连续序号）"""
+    pattern_prefix = f"{prefix}-{datetime.now().strftime('%Y%m%d')}-"
+    first = allocate_sequence(
+        db,
         PurchaseOrder,
-        like_pattern,
         "order_no",
-        use_ilike=False,
+        pattern_prefix,
+        count=count,
+        parse_seq=_last_segment_seq,
     )
-    max_no = max_no_query.order_by(desc(PurchaseOrder.order_no)).first()
-    if max_no and max_no[0]:
-        try:
-            seq = int(max_no[0].split("-")[-1]) + 1
-        except Exception:
-            seq = 1
-    else:
-        seq = 1
-    return f"{prefix}-{today}-{seq:03d}"
+    return [f"{pattern_prefix}{seq:03d}" for seq in range(first, first + count)]
 
 
 def generate_request_no(db: Session) -> str:
     """生成采购申请编号"""
-    today = datetime.now().strftime("%Y%m%d")
-    like_pattern = f"PR-{today}-%"
-    max_no_query = db.query(PurchaseRequest.request_no)
-    max_no_query = apply_like_filter(
-        max_no_query,
-        PurchaseRequest,
-        like_pattern,
-        "request_no",
-        use_ilike=False,
+    pattern_prefix = f"PR-{datetime.now().strftime('%Y%m%d')}-"
+    seq = allocate_sequence(
+        db, PurchaseRequest, "request_no", pattern_prefix, parse_seq=_last_segment_seq
     )
-    max_no = max_no_query.order_by(desc(PurchaseRequest.request_no)).first()
-    if max_no and max_no[0]:
-        try:
-            seq = int(max_no[0].split("-")[-1]) + 1
-        except Exception:
-            seq = 1
-    else:
-        seq = 1
-    return f"PR-{today}-{seq:03d}"
+    return f"{pattern_prefix}{seq:03d}"
 
 
 def generate_receipt_no(db: Session) -> str:
     """生成收货单编号"""
-    today = datetime.now().strftime("%Y%m%d")
-    like_pattern = f"GR-{today}-%"
-    max_no_query = db.query(GoodsReceipt.receipt_no)
-    max_no_query = apply_like_filter(
-        max_no_query,
-        GoodsReceipt,
-        like_pattern,
-        "receipt_no",
-        use_ilike=False,
+    pattern_prefix = f"GR-{datetime.now().strftime('%Y%m%d')}-"
+    seq = allocate_sequence(
+        db, GoodsReceipt, "receipt_no", pattern_prefix, parse_seq=_last_segment_seq
     )
-    max_no = max_no_query.order_by(desc(GoodsReceipt.receipt_no)).first()
-    if max_no and max_no[0]:
-        try:
-            seq = int(max_no[0].split("-")[-1]) + 1
-        except Exception:
-            seq = 1
-    else:
-        seq = 1
-    return f"GR-{today}-{seq:03d}"
+    return f"{pattern_prefix}{seq:03d}"
+
+
+def _last_segment_seq(no: str) -> int:
+    """编号最后一段为序号：PO-20250115-001 -> 1"""
+    return int(no.split("-")[-1])
 
 
 def serialize_order_item(item: PurchaseOrderItem) -> Dict[str, Any]:
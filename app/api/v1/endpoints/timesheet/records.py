@@ -26,6 +26,7 @@ from app.schemas.timesheet import (
     TimesheetUpdate,
 )
 from app.services.timesheet_records import TimesheetRecordsService
+from app.services.timesheet_records.service import TIMESHEET_LIST_ORDER_BY
 
 router = APIRouter(prefix="/records", tags=["records"])
 
@@ -47,7 +48,7 @@ def list_timesheets(
     current_user: User = Depends(security.require_permission("timesheet:read")),
 ) -> Any:
     """
-    工时记录列表（分页+筛选）
+    工时记录列表（分页+筛选，支持游标分页）
     """
     service = TimesheetRecordsService(db)
     items, total = service.list_timesheets(
@@ -59,14 +60,11 @@ def list_timesheets(
         start_date=start_date,
         end_date=end_date,
         status=status,
+        pagination=pagination,
     )
 
     return TimesheetListResponse(
-        items=items,
-        total=total,
-        page=pagination.page,
-        page_size=pagination.page_size,
-        pages=pagination.pages_for_total(total),
+        **pagination.to_response(items, total, TIMESHEET_LIST_ORDER_BY)
     )
 
 
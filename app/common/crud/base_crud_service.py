@@ -24,8 +24,10 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.common.crud.exceptions import raise_already_exists, raise_not_found
+from app.common.crud.sync_filters import SyncQueryBuilder
 from app.common.crud.sync_repository import SyncBaseRepository
 from app.common.crud.types import PaginatedResult, QueryParams, SortOrder
+from app.common.pagination import COUNT_EXACT, PaginationParams
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -114,8 +116,14 @@ class BaseCRUDService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Res
             order_by=order_by,
             order_direction=order_direction,
             load_relationships=params.load_relationships,
+            cursor=params.cursor,
+            count_mode=params.count_mode,
         )
 
+        # 游标分页多取一条用于判断是否还有下一页
+        rows = items
+        if params.cursor is not None and params.limit > 0:
+            items = items[: params.limit]
         response_items = [self._to_response(item) for item in items]
         result = PaginatedResult(
             items=response_items,
@@ -123,6 +131,21 @@ class BaseCRUDService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Res
             page=params.page,
             page_size=params.page_size,
         )
+        if params.cursor is not None or params.count_mode != COUNT_EXACT:
+            pagination = PaginationParams(
+                page=params.page,
+                page_size=params.page_size,
+                offset=params.skip,
+                limit=params.limit,
+                cursor=params.cursor,
+                count_mode=params.count_mode,
+            )
+            if pagination.is_keyset:
+                result.next_cursor = pagination.next_cursor(
+                    rows, SyncQueryBuilder.keyset_order_by(self.model, order_by, order_direction)
+                )
+                result.has_more = result.next_cursor is not None
+            result.total_estimated = pagination.total_estimated(total)
         return self._after_list(result, params)
 
     def count(self, *, filters: Optional[Dict[str, Any]] = None) -> int:
@@ -10,6 +10,12 @@ from sqlalchemy import Select, and_, asc, desc, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.crud.types import SortOrder
+from app.common.pagination import (
+    COUNT_ESTIMATE,
+    COUNT_EXACT,
+    COUNT_NONE,
+    apply_keyset_pagination,
+)
 from app.common.query_filters import build_keyword_conditions
 
 ModelType = TypeVar("ModelType")
@@ -30,6 +36,8 @@ class QueryBuilder:
         keyword_fields: Optional[List[str]] = None,
         order_by: Optional[str] = None,
         order_direction: Union[str, SortOrder] = "asc",
+        cursor: Optional[str] = None,
+        count_mode: str = COUNT_EXACT,
     ) -> tuple[Select, Select]:
         """
         构建列表查询
@@ -49,9 +57,11 @@ class QueryBuilder:
             keyword_fields: 关键词搜索的字段列表
             order_by: 排序字段
             order_direction: 排序方向 (asc/desc)
+            cursor: 游标（不为 None 时按 排序字段 + id 游标分页，忽略 skip）
+            count_mode: 计数模式 exact / estimate / none
 
         Returns:
-            (查询对象, 计数查询对象)
+            (查询对象, 计数查询对象)；count_mode=none 时计数查询对象为 None
         """
         from sqlalchemy import select
 
@@ -82,28 +92,81 @@ class QueryBuilder:
             count_query = count_query.where(where_clause)
 
         # 应用排序
-        direction = (
+        sort_clauses = QueryBuilder.build_order_by(model, order_by, order_direction)
+
+        if cursor is not None:
+            # 游标分页：排序字段 + id 作为唯一排序键
+            query = apply_keyset_pagination(
+                query,
+                sort_clauses + [QueryBuilder.id_order(model, order_direction)],
+                cursor,
+                limit,
+            )
+        else:
+            if sort_clauses:
+                query = query.order_by(*sort_clauses)
+
+            # 应用分页
+            if skip > 0:
+                query = query.offset(skip)
+            if limit > 0:
+                query = query.limit(limit)
+
+        # 计数模式
+        if count_mode == COUNT_NONE:
+            count_query = None
+        elif count_mode == COUNT_ESTIMATE:
+            from app.core.config import settings
+
+            capped = select(model.id)
+            if conditions:
+                capped = capped.where(and_(*conditions))
+            count_query = select(func.count()).select_from(
+                capped.limit(settings.PAGINATION_COUNT_ESTIMATE_CAP).subquery()
+            )
+
+        return query, count_query
+
+    @staticmethod
+    def build_order_by(
+        model: Type[ModelType],
+        order_by: Optional[str],
+        order_direction: Union[str, SortOrder] = "asc",
+    ) -> List:
+        """构建排序子句（排序字段不存在时返回空列表）"""
+        order_field = getattr(model, order_by, None) if order_by else None
+        if order_field is None:
+            return []
+        if QueryBuilder._direction(order_direction) == "desc":
+            return [desc(order_field)]
+        return [asc(order_field)]
+
+    @staticmethod
+    def id_order(model: Type[ModelType], order_direction: Union[str, SortOrder] = "asc"):
+        """游标分页的 id 排序子句（与主排序方向一致）"""
+        if QueryBuilder._direction(order_direction) == "desc":
+            return desc(model.id)
+        return asc(model.id)
+
+    @staticmethod
+    def keyset_order_by(
+        model: Type[ModelType],
+        order_by: Optional[str],
+        order_direction: Union[str, SortOrder] = "asc",
+    ) -> List:
+        """游标分页使用的完整排序键（用于生成 next_cursor）"""
+        return QueryBuilder.build_order_by(model, order_by, order_direction) + [
+            QueryBuilder.id_order(model, order_direction)
+        ]
+
+    @staticmethod
+    def _direction(order_direction: Union[str, SortOrder]) -> str:
+        return (
             order_direction.value
             if isinstance(order_direction, SortOrder)
             else str(order_direction or "asc").lower()
         )
 
-        if order_by:
-            order_field = getattr(model, order_by, None)
-            if order_field:
-                if direction == "desc":
-                    query = query.order_by(desc(order_field))
-                else:
-                    query = query.order_by(asc(order_field))
-
-        # 应用分页
-        if skip > 0:
-            query = query.offset(skip)
-        if limit > 0:
-            query = query.limit(limit)
-
-        return query, count_query
-
     @staticmethod
     def _build_filter_conditions(model: Type[ModelType], filters: Dict[str, Any]) -> List:
         """构建筛选条件"""
@@ -170,17 +233,19 @@ class QueryBuilder:
 
     @staticmethod
     async def execute_list_query(
-        query: Select, count_query: Select, db: AsyncSession
-    ) -> tuple[List[ModelType], int]:
+        query: Select, count_query: Optional[Select], db: AsyncSession
+    ) -> tuple[List[ModelType], Optional[int]]:
         """
         执行列表查询
 
         Returns:
-            (结果列表, 总数)
+            (结果列表, 总数)；不计数时总数为 None
         """
         # 执行计数查询
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+        total = None
+        if count_query is not None:
+            total_result = await db.execute(count_query)
+            total = total_result.scalar() or 0
 
         # 执行数据查询
         result = await db.execute(query)
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session, joinedload
 
 from app.common.crud.sync_filters import SyncQueryBuilder
+from app.common.pagination import COUNT_EXACT
 from app.common.crud.types import SortOrder
 
 ModelType = TypeVar("ModelType")
@@ -91,10 +92,17 @@ class SyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
         order_by: Optional[str] = None,
         order_direction: Union[str, SortOrder] = "asc",
         load_relationships: Optional[List[str]] = None,
-    ) -> tuple[List[ModelType], int]:
+        cursor: Optional[str] = None,
+        count_mode: str = COUNT_EXACT,
+    ) -> tuple[List[ModelType], Optional[int]]:
         """
         列表查询（支持筛选、搜索、排序、分页）
 
+        cursor 不为 None 时按 排序字段 + id 游标分页（忽略 skip），下一页游标可由
+        PaginationParams.next_cursor 配合 SyncQueryBuilder.keyset_order_by 生成，
+        此时结果多返回一条（limit + 1）用于判断是否还有下一页；
+        count_mode 为 none 时不执行计数，总数返回 None。
+
         Returns:
             (结果列表, 总数)
         """
@@ -109,6 +117,8 @@ class SyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType])
             keyword_fields=keyword_fields,
             order_by=order_by,
             order_direction=order_direction,
+            cursor=cursor,
+            count_mode=count_mode,
         )
 
         # 预加载关系
@@ -48,6 +48,15 @@ class QueryParams(BaseModel):
         default=False,
         description="Whether to include soft-deleted records where supported",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Keyset cursor; empty string starts cursor pagination, None keeps page-based",
+    )
+    count_mode: str = Field(
+        default="exact",
+        pattern="^(exact|estimate|none)$",
+        description="Total count strategy: exact / estimate (capped) / none (skipped)",
+    )
 
     @property
     def skip(self) -> int:
@@ -91,23 +100,35 @@ class PaginatedResult(BaseModel, Generic[T]):
     """Generic pagination container returned by services."""
 
     items: List[T] = Field(default_factory=list)
-    total: int = Field(default=0, ge=0)
+    total: Optional[int] = Field(default=0, ge=0)
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1)
+    next_cursor: Optional[str] = Field(default=None)
+    has_more: Optional[bool] = Field(default=None)
+    total_estimated: bool = Field(default=False)
 
     @property
-    def pages(self) -> int:
-        """Total number of pages."""
+    def pages(self) -> Optional[int]:
+        """Total number of pages (None when the count was skipped)."""
+        if self.total is None:
+            return None
         if self.page_size <= 0:
             return 0
         return int(ceil(self.total / self.page_size))
 
     def to_dict(self) -> Dict[str, Any]:
         """Drop-in helper for legacy dict responses."""
-        return {
+        data = {
             "items": self.items,
             "total": self.total,
             "page": self.page,
             "page_size": self.page_size,
             "pages": self.pages,
         }
+        if self.has_more is not None or self.total is None or self.total_estimated:
+            data.update(
+                next_cursor=self.next_cursor,
+                has_more=self.has_more,
+                total_estimated=self.total_estimated,
+            )
+        return data
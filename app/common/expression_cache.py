@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+条件表达式编译缓存
+
+审批条件、预警规则表达式数量有限但评估次数巨大（一次预警扫描对成千上万个目标
+评估同一批规则）。表达式按文本编译一次（Jinja2 模板、解析后的 JSON 条件、
+SQL-like 条件结构、simpleeval AST），编译结果进程内共享复用。
+
+编译结果只取决于表达式文本和编译器类型，规则修改后文本变化即为新键，旧条目按 LRU 淘汰。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+# 缓存条目上限
+EXPRESSION_CACHE_SIZE = 2048
+
+
+class CompiledExpressionCache:
+    """编译结果缓存（有界 LRU，线程安全）"""
+
+    def __init__(self, max_size: int = EXPRESSION_CACHE_SIZE):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compile(self, key: Hashable, compile_func: Callable[[], Any]) -> Any:
+        """
+        返回缓存的编译结果，未命中时调用 compile_func 编译并缓存
+
+        编译抛出的异常原样抛出，失败结果不缓存。
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # 编译在锁外执行；并发编译同一表达式时结果等价，后写入者覆盖
+        compiled = compile_func()
+        with self._lock:
+            self._data[key] = compiled
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+# 进程内共享实例
+compiled_expressions = CompiledExpressionCache()
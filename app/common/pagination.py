@@ -4,13 +4,33 @@
 
 统一分页参数解析、offset/limit 计算与响应格式，替代各处手写
 offset = (page - 1) * page_size 的重复代码。
+
+除页码分页外支持两项可选能力：
+- 游标分页（keyset）：按 排序键 + 主键 定位下一页，深翻页无需 OFFSET 扫描；
+  游标为不透明字符串，首页传空字符串，之后传上一页返回的 next_cursor
+- 计数模式：exact（精确 COUNT）/ estimate（计数到上限即停止）/ none（跳过计数）
 """
 
+import base64
+import json
 from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
 from math import ceil
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, false, or_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 
-from fastapi import Query
+# 计数模式
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+INVALID_CURSOR_DETAIL = "无效的分页游标"
 
 
 @dataclass(frozen=True)
@@ -19,28 +39,100 @@ class PaginationParams:
     分页参数
 
     由 page / page_size 计算得到 offset / limit，供查询与响应使用。
+    cursor 不为 None 时为游标分页（空字符串表示首页），此时忽略 offset。
     """
 
     page: int
     page_size: int
     offset: int
     limit: int
+    cursor: Optional[str] = None
+    count_mode: str = COUNT_EXACT
+
+    @property
+    def is_keyset(self) -> bool:
+        """是否为游标分页"""
+        return self.cursor is not None
 
-    def pages_for_total(self, total: int) -> int:
-        """根据总条数计算总页数。"""
+    def pages_for_total(self, total: Optional[int]) -> Optional[int]:
+        """根据总条数计算总页数（未计数时返回 None）。"""
+        if total is None:
+            return None
         if self.page_size <= 0:
             return 0
         return max(0, int(ceil(total / self.page_size)))
 
-    def to_response(self, items: List[Any], total: int) -> Dict[str, Any]:
-        """构造列表接口常用的分页响应体。"""
-        return {
+    def count(self, query) -> Optional[int]:
+        """
+        按计数模式统计查询总数
+
+        - exact: query.count()
+        - estimate: 只计数到 PAGINATION_COUNT_ESTIMATE_CAP 条
+        - none: 不计数，返回 None
+        """
+        if self.count_mode == COUNT_NONE:
+            return None
+        if self.count_mode == COUNT_ESTIMATE:
+            from app.core.config import settings
+
+            return query.order_by(None).limit(settings.PAGINATION_COUNT_ESTIMATE_CAP).count()
+        return query.count()
+
+    def total_estimated(self, total: Optional[int]) -> bool:
+        """总数是否为估算值（estimate 模式下计数达到上限）"""
+        if self.count_mode != COUNT_ESTIMATE or total is None:
+            return False
+        from app.core.config import settings
+
+        return total >= settings.PAGINATION_COUNT_ESTIMATE_CAP
+
+    def next_cursor(self, items: Sequence[Any], order_by: Sequence[Any]) -> Optional[str]:
+        """
+        由本页最后一条记录生成下一页游标
+
+        items 为 apply_keyset_pagination 多取一条后的结果：超过 limit 条才有下一页，
+        否则返回 None。items 可以是 ORM 对象、Pydantic 对象或 dict，需包含各排序键字段。
+        """
+        if not self.is_keyset or self.limit <= 0 or len(items) <= self.limit:
+            return None
+        last = items[self.limit - 1]
+        values = []
+        for key, _ in _sort_keys(order_by):
+            values.append(last[key] if isinstance(last, Mapping) else getattr(last, key))
+        return encode_cursor([key for key, _ in _sort_keys(order_by)], values)
+
+    def to_response(
+        self,
+        items: List[Any],
+        total: Optional[int],
+        order_by: Optional[Sequence[Any]] = None,
+        rows: Optional[Sequence[Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        构造列表接口常用的分页响应体。
+
+        游标分页或非精确计数时额外返回 next_cursor / has_more / total_estimated。
+        游标分页时 items / rows 为多取一条的查询结果，响应只返回前 limit 条，
+        下一页游标取自 rows（默认为 items）的第 limit 条，响应项不含排序键时传入原始记录。
+        """
+        rows = items if rows is None else rows
+        if self.is_keyset and self.limit > 0:
+            items = items[: self.limit]
+        response = {
             "items": items,
             "total": total,
             "page": self.page,
             "page_size": self.page_size,
             "pages": self.pages_for_total(total),
         }
+        if self.is_keyset or self.count_mode != COUNT_EXACT:
+            next_cursor = self.next_cursor(rows, order_by) if order_by is not None else None
+            response.update(
+                next_cursor=next_cursor,
+                has_more=next_cursor is not None if self.is_keyset else None,
+                total_estimated=self.total_estimated(total),
+            )
+        return response
 
 
 def get_pagination_params(
@@ -48,6 +140,8 @@ def get_pagination_params(
     page_size: Optional[int] = None,
     default_page_size: Optional[int] = None,
     max_page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count_mode: str = COUNT_EXACT,
 ) -> PaginationParams:
     """
     根据 page / page_size 计算分页参数。
@@ -57,6 +151,8 @@ def get_pagination_params(
         page_size: 每页条数；未传时使用 default_page_size。
         default_page_size: 默认每页条数；未传时从 settings 读取。
         max_page_size: 每页条数上限；未传时从 settings 读取。
+        cursor: 游标；None 为页码分页，空字符串为游标分页首页。
+        count_mode: 计数模式 exact / estimate / none。
 
     Returns:
         PaginationParams: 包含 page, page_size, offset, limit。
@@ -69,8 +165,14 @@ def get_pagination_params(
     page = max(1, page)
     size = default if page_size is None or page_size < 1 else min(page_size, maximum)
     offset = (page - 1) * size
+    if cursor is not None:
+        page, offset = 1, 0
+    if count_mode not in COUNT_MODES:
+        count_mode = COUNT_EXACT
 
-    return PaginationParams(page=page, page_size=size, offset=offset, limit=size)
+    return PaginationParams(
+        page=page, page_size=size, offset=offset, limit=size, cursor=cursor, count_mode=count_mode
+    )
 
 
 def paginate_list(
@@ -105,6 +207,155 @@ def paginate_list(
     return items[start:end], total, params
 
 
+# ------------------------------ 游标分页 ------------------------------
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(keys: Sequence[str], values: Sequence[Any]) -> str:
+    """将排序键名与取值编码为不透明游标"""
+    payload = json.dumps(
+        {"k": list(keys), "v": [_encode_value(v) for v in values]},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[List[str], List[Any]]]:
+    """
+    解码游标
+
+    Returns:
+        (排序键名列表, 取值列表)；空游标（首页）返回 None
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        keys, values = payload["k"], payload["v"]
+        if not isinstance(keys, list) or not isinstance(values, list) or len(keys) != len(values):
+            raise ValueError("cursor keys/values mismatch")
+        return keys, [_decode_value(v) for v in values]
+    except (KeyError, TypeError, ValueError) as e:
+        # binascii.Error / JSONDecodeError / UnicodeDecodeError 均为 ValueError 子类
+        raise ValueError(f"invalid cursor: {e}") from e
+
+
+def _sort_keys(order_by: Sequence[Any]) -> List[Tuple[str, bool]]:
+    """排序表达式 -> [(字段名, 是否降序)]"""
+    keys = []
+    for expr in order_by:
+        descending = False
+        if isinstance(expr, UnaryExpression) and expr.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            descending = expr.modifier is operators.desc_op
+            expr = expr.element
+        key = getattr(expr, "key", None)
+        if not key:
+            raise ValueError("游标分页的排序键必须是列")
+        keys.append((key, descending))
+    return keys
+
+
+def _sort_columns(order_by: Sequence[Any]) -> List[Tuple[Any, bool]]:
+    columns = []
+    for expr in order_by:
+        if isinstance(expr, UnaryExpression) and expr.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            columns.append((expr.element, expr.modifier is operators.desc_op))
+        else:
+            columns.append((expr, False))
+    return columns
+
+
+def _after(column, value, descending: bool):
+    """排序在游标值之后的条件（按 MySQL/SQLite 语义，NULL 视为最小值）"""
+    if descending:
+        return false() if value is None else or_(column < value, column.is_(None))
+    return column.isnot(None) if value is None else column > value
+
+
+def keyset_condition(order_by: Sequence[Any], cursor: str):
+    """
+    构造"排在游标之后"的 WHERE 条件
+
+    Args:
+        order_by: 排序表达式列表（列或 列.desc()），最后一项须为唯一键（通常为 id）
+        cursor: 上一页返回的游标
+
+    Returns:
+        SQL 条件表达式；首页（空游标）返回 None
+
+    Raises:
+        ValueError: 游标无效或与当前排序不一致
+    """
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        return None
+    keys, values = decoded
+    if keys != [key for key, _ in _sort_keys(order_by)]:
+        raise ValueError("cursor does not match sort order")
+
+    columns = _sort_columns(order_by)
+    branches = []
+    for i, (column, descending) in enumerate(columns):
+        equals = [
+            prev.is_(None) if value is None else prev == value
+            for (prev, _), value in zip(columns[:i], values[:i])
+        ]
+        branches.append(and_(*equals, _after(column, values[i], descending)))
+    return or_(*branches)
+
+
+def apply_keyset_pagination(query, order_by: Sequence[Any], cursor: str, limit: int):
+    """
+    在 Query / Select 上应用游标分页：排序 + 游标条件 + LIMIT
+
+    多取一条（limit + 1）用于判断是否还有下一页，结果整体交给
+    PaginationParams.to_response，由其截取前 limit 条。
+    调用方不应再对 query 设置 order_by / offset。游标无效时抛出 400。
+    """
+    try:
+        condition = keyset_condition(order_by, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+    if condition is not None:
+        query = query.filter(condition)
+    query = query.order_by(*order_by)
+    if limit > 0:
+        query = query.limit(limit + 1)
+    return query
+
+
 # ------------------------------ FastAPI 依赖 ------------------------------
 
 
@@ -115,6 +366,15 @@ def get_pagination_query(
         ge=1,
         description="每页条数，不传则使用默认值",
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="游标分页：首页传空字符串，之后传上一页的 next_cursor；不传则按页码分页",
+    ),
+    count_mode: str = Query(
+        COUNT_EXACT,
+        pattern="^(exact|estimate|none)$",
+        description="总数统计：exact 精确 / estimate 计数到上限 / none 不统计",
+    ),
 ) -> PaginationParams:
     """
     FastAPI 依赖：从 Query 解析分页参数。
@@ -123,10 +383,29 @@ def get_pagination_query(
         @router.get("/list")
         def list_items(
             pagination: PaginationParams = Depends(get_pagination_query),
-            db: Session = Depends(get_db),
+            db: Session = Depends(deps.get_db),
         ):
             q = apply_pagination(db.query(Model), pagination.offset, pagination.limit)
             total = db.query(func.count(Model.id)).scalar() or 0
             return pagination.to_response(q.all(), total)
+
+    支持游标分页的接口:
+            order_by = [Model.created_at.desc(), Model.id.desc()]
+            total = pagination.count(q)
+            if pagination.is_keyset:
+                q = apply_keyset_pagination(q, order_by, pagination.cursor, pagination.limit)
+            else:
+                q = apply_pagination(q.order_by(*order_by), pagination.offset, pagination.limit)
+            return pagination.to_response(q.all(), total, order_by)
     """
-    return get_pagination_params(page=page, page_size=page_size)
+    # 直接调用（非 FastAPI 注入）时未传参数的默认值为 Query 对象
+    cursor = cursor if isinstance(cursor, str) else None
+    count_mode = count_mode if isinstance(count_mode, str) else COUNT_EXACT
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=INVALID_CURSOR_DETAIL)
+    return get_pagination_params(
+        page=page, page_size=page_size, cursor=cursor, count_mode=count_mode
+    )
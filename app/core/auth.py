@@ -9,7 +9,7 @@ from datetime import datetime, timedelta, timezone
 from threading import Lock
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -19,6 +19,7 @@ from ..dependencies import get_db  # Moved to break circular import
 from ..common.context import set_audit_context
 from ..models.user import User
 from ..utils.redis_client import get_redis_client
+from .auth_principal import AuthPrincipal, get_principal_cache, snapshot_user, user_from_snapshot
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -332,6 +333,7 @@ def revoke_token_jti(jti: Optional[str], ttl_seconds: Optional[int] = None) -> b
 
     ttl = max(int(ttl_seconds or settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60), 60)
     redis_key = f"jwt:blacklist:{jti}"
+    get_principal_cache().invalidate_jti(jti)
 
     redis_client = get_redis_client()
     if redis_client:
@@ -357,6 +359,8 @@ def revoke_token(token: Optional[str]) -> None:
     if not token:
         return
 
+    get_principal_cache().invalidate_token(token)
+
     try:
         # 尝试从token中提取JTI和过期时间
         payload = jwt.decode(
@@ -414,27 +418,7 @@ def is_token_revoked(token: Optional[str]) -> bool:
         )
         jti = payload.get("jti")
 
-        if not jti:
-            # 如果没有JTI，使用整个token的哈希值
-            import hashlib
-
-            jti = hashlib.sha256(token.encode()).hexdigest()
-
-        # 优先检查Redis
-        redis_client = get_redis_client()
-        if redis_client:
-            try:
-                if redis_client.exists(f"jwt:blacklist:{jti}"):
-                    return True
-            except Exception as e:
-                logger.warning(f"Redis查询失败，降级到内存检查: {e}")
-
-        # 降级到内存检查（同时兼容按token和按jti的撤销）
-        with _token_blacklist_lock:
-            return (
-                token in _token_blacklist
-                or _memory_blacklist_jti_key(jti) in _token_blacklist
-            )
+        return _is_jti_revoked(token, jti)
     except JWTError:
         # token可能本身就是jti（例如内部调用误传jti）
         redis_client = get_redis_client()
@@ -454,6 +438,31 @@ def is_token_revoked(token: Optional[str]) -> bool:
             )
 
 
+def _is_jti_revoked(token: str, jti: Optional[str]) -> bool:
+    """按已解码的JTI检查撤销状态（Redis优先，内存兜底）"""
+    if not jti:
+        # 如果没有JTI，使用整个token的哈希值
+        import hashlib
+
+        jti = hashlib.sha256(token.encode()).hexdigest()
+
+    # 优先检查Redis
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            if redis_client.exists(f"jwt:blacklist:{jti}"):
+                return True
+        except Exception as e:
+            logger.warning(f"Redis查询失败，降级到内存检查: {e}")
+
+    # 降级到内存检查（同时兼容按token和按jti的撤销）
+    with _token_blacklist_lock:
+        return (
+            token in _token_blacklist
+            or _memory_blacklist_jti_key(jti) in _token_blacklist
+        )
+
+
 def _ensure_access_session_active(db: Session, token_jti: Optional[str]) -> None:
     """
     校验access token对应会话是否仍处于活跃状态。
@@ -481,6 +490,75 @@ def _ensure_access_session_active(db: Session, token_jti: Optional[str]) -> None
         logger.warning(f"会话状态校验失败，降级放行: {e}")
 
 
+def _get_cached_user(token: Optional[str], db: Session) -> Optional[User]:
+    """
+    命中认证主体缓存时返回游离态用户（不解码Token、不查用户表）
+
+    撤销状态超过复核间隔时重新检查黑名单与会话状态，
+    已撤销则失效缓存并返回 None，交由完整校验流程给出具体错误。
+    """
+    if not settings.AUTH_PRINCIPAL_CACHE_ENABLED or not token:
+        return None
+
+    cache = get_principal_cache()
+    entry = cache.get(token)
+    if entry is None:
+        return None
+
+    if cache.revocation_check_due(entry):
+        try:
+            if _is_jti_revoked(token, entry.principal.jti):
+                cache.invalidate_token(token)
+                return None
+            _ensure_access_session_active(db, entry.principal.jti)
+        except HTTPException:
+            cache.invalidate_token(token)
+            return None
+        cache.mark_revocation_checked(token)
+
+    return user_from_snapshot(entry.snapshot)
+
+
+def _cache_principal(token: str, payload: dict, user: User) -> None:
+    """完整校验通过后写入认证主体缓存"""
+    if not settings.AUTH_PRINCIPAL_CACHE_ENABLED or not isinstance(user, User):
+        return
+
+    try:
+        principal = AuthPrincipal(
+            token=token,
+            user_id=user.id,
+            tenant_id=user.tenant_id,
+            jti=payload.get("jti"),
+            expires_at=payload.get("exp"),
+        )
+        get_principal_cache().put(principal, snapshot_user(user))
+    except Exception as e:
+        logger.warning(f"写入认证主体缓存失败: {e}")
+
+
+def _get_request_principal_user(request: Optional[Request], token: str) -> Optional[User]:
+    """获取中间件已为同一Token验证过的用户（request.state.auth_principal）"""
+    state = getattr(request, "state", None)
+    principal = getattr(state, "auth_principal", None)
+    user = getattr(state, "user", None)
+    if (
+        isinstance(principal, AuthPrincipal)
+        and principal.token == token
+        and isinstance(user, User)
+        and user.id == principal.user_id
+    ):
+        return user
+    return None
+
+
+def _attach_user(db: Session, user: User) -> User:
+    """将游离态用户无查询地挂载到当前会话，并设置审计上下文"""
+    user = db.merge(user, load=False)
+    set_audit_context(operator_id=user.id, tenant_id=user.tenant_id)
+    return user
+
+
 async def verify_token_and_get_user(token: str, db: Session) -> User:
     """
     验证Token并获取用户（供中间件使用，不使用Depends）
@@ -502,7 +580,12 @@ async def verify_token_and_get_user(token: str, db: Session) -> User:
     )
 
     logger.debug(f"中间件验证token，长度: {len(token) if token else 0}")
-    
+
+    cached_user = _get_cached_user(token, db)
+    if cached_user is not None:
+        set_audit_context(operator_id=cached_user.id, tenant_id=cached_user.tenant_id)
+        return cached_user
+
     if is_token_revoked(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -537,7 +620,8 @@ async def verify_token_and_get_user(token: str, db: Session) -> User:
 
         # 设置审计上下文
         set_audit_context(operator_id=user.id, tenant_id=user.tenant_id)
-        
+        _cache_principal(token, payload, user)
+
         logger.debug(f"中间件认证成功: user_id={user.id}, username={user.username}")
         return user
         
@@ -549,9 +633,24 @@ async def verify_token_and_get_user(token: str, db: Session) -> User:
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    request: Request = None,
 ) -> User:
-    """获取当前用户"""
+    """
+    获取当前用户
+
+    优先复用 GlobalAuthMiddleware 已验证的主体（request.state.auth_principal），
+    其次复用认证主体缓存，均未命中时完整校验Token并查询用户。
+    """
+    state_user = _get_request_principal_user(request, token)
+    if state_user is not None:
+        return _attach_user(db, state_user)
+
+    cached_user = _get_cached_user(token, db)
+    if cached_user is not None:
+        return _attach_user(db, cached_user)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无效的认证凭据",
@@ -592,6 +691,7 @@ async def get_current_user(
 
         # 将操作人ID和租户ID设置到上下文中，用于审计日志和数据隔离
         set_audit_context(operator_id=user.id, tenant_id=user.tenant_id)
+        _cache_principal(token, payload, user)
 
         return user
     except Exception as e:
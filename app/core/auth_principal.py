@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+认证主体缓存 - 单请求单次解码 + 短TTL用户快照
+
+一次请求只验证一次Token：
+1. GlobalAuthMiddleware 验证后把 AuthPrincipal 存入 request.state.auth_principal
+2. get_current_user 发现同一Token的主体时直接复用，不再解码/查库
+
+跨请求复用（进程内，按Token索引）：
+- 用户快照：users 表列值，TTL 较短（默认30秒）
+- 撤销状态：黑名单与会话状态，复核间隔更短（默认5秒）
+
+失效时机：
+- 撤销Token/JTI、会话下线时按 JTI 失效
+- User 行 UPDATE/DELETE 时按用户失效（ORM 事件）
+- 角色/权限缓存失效时按用户或租户失效
+
+按用户/租户/JTI 的失效经缓存失效广播（local_cache.CacheInvalidationBus）同步到其他 worker。
+未配置 Redis 或关闭 CACHE_L1_ENABLED 时没有广播，其他 worker 上的快照最长在
+AUTH_PRINCIPAL_CACHE_TTL 秒后过期。
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from ..models.user import User
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "AuthPrincipal",
+    "PrincipalCache",
+    "get_principal_cache",
+    "snapshot_user",
+    "user_from_snapshot",
+]
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """已验证的认证主体（一次请求内复用）"""
+
+    token: str
+    user_id: int
+    tenant_id: Optional[int] = None
+    jti: Optional[str] = None
+    expires_at: Optional[float] = None
+
+
+@dataclass
+class _PrincipalEntry:
+    """缓存条目：认证主体 + 用户快照 + 时间戳"""
+
+    principal: AuthPrincipal
+    snapshot: Dict[str, Any]
+    cached_at: float = field(default_factory=time.monotonic)
+    revocation_checked_at: float = field(default_factory=time.monotonic)
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    """提取用户列值快照（不包含关系）"""
+    return {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+
+
+def user_from_snapshot(snapshot: Dict[str, Any]) -> User:
+    """
+    由快照重建游离态（detached）User
+
+    返回对象可直接作为 request.state.user 使用，
+    或通过 db.merge(user, load=False) 无查询地挂载到请求会话。
+    """
+    user = User()
+    for key, value in snapshot.items():
+        setattr(user, key, value)
+    make_transient_to_detached(user)
+    return user
+
+
+class PrincipalCache:
+    """
+    按Token索引的认证主体LRU缓存（线程安全，进程内）
+
+    条目记录 user_id / tenant_id / jti，支持按 Token、JTI、用户、租户失效。
+    """
+
+    def __init__(self, max_size: int, ttl: int, revocation_ttl: int):
+        self.max_size = max(int(max_size), 1)
+        self.ttl = ttl
+        self.revocation_ttl = revocation_ttl
+        self._entries: "OrderedDict[str, _PrincipalEntry]" = OrderedDict()
+        self._lock = Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        # 跨进程失效广播：publish(kind, value)，由 get_principal_cache 绑定
+        self._publish: Optional[Callable[[str, Any], None]] = None
+
+    def bind_publisher(self, publish: Optional[Callable[[str, Any], None]]) -> None:
+        """绑定跨进程失效广播"""
+        self._publish = publish
+
+    def _broadcast(self, kind: str, value: Any) -> None:
+        if self._publish is not None:
+            try:
+                self._publish(kind, value)
+            except Exception:
+                logger.debug("广播认证快照失效失败，已忽略", exc_info=True)
+
+    def apply_remote(self, kind: str, value: Any) -> int:
+        """应用其他 worker 广播的失效（不再转发）"""
+        if kind == "jti":
+            return self._invalidate_where(lambda p: p.jti == value)
+        if kind == "user":
+            return self._invalidate_where(lambda p: p.user_id == value)
+        if kind == "tenant":
+            return self._invalidate_where(lambda p: p.tenant_id == value)
+        if kind == "clear":
+            return self._clear()
+        return 0
+
+    def get(self, token: str) -> Optional[_PrincipalEntry]:
+        """获取未过期的缓存条目"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            expires_at = entry.principal.expires_at
+            if now - entry.cached_at > self.ttl or (expires_at and time.time() >= expires_at):
+                del self._entries[token]
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, principal: AuthPrincipal, snapshot: Dict[str, Any]) -> None:
+        """写入缓存条目，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[principal.token] = _PrincipalEntry(principal=principal, snapshot=snapshot)
+            self._entries.move_to_end(principal.token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def revocation_check_due(self, entry: _PrincipalEntry) -> bool:
+        """撤销状态是否需要复核"""
+        return time.monotonic() - entry.revocation_checked_at > self.revocation_ttl
+
+    def mark_revocation_checked(self, token: str) -> None:
+        """记录撤销状态已复核"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                entry.revocation_checked_at = time.monotonic()
+
+    def invalidate_token(self, token: Optional[str]) -> int:
+        """按Token失效（仅本进程；Token 不经广播传输，其他 worker 由 JTI 失效和撤销复核覆盖）"""
+        if not token:
+            return 0
+        with self._lock:
+            removed = 1 if self._entries.pop(token, None) is not None else 0
+            self._stats["invalidations"] += removed
+            return removed
+
+    def invalidate_jti(self, jti: Optional[str]) -> int:
+        """按JTI失效"""
+        if not jti:
+            return 0
+        self._broadcast("jti", jti)
+        return self._invalidate_where(lambda p: p.jti == jti)
+
+    def invalidate_user(self, user_id: Optional[int]) -> int:
+        """按用户失效（该用户所有Token）"""
+        if user_id is None:
+            return 0
+        self._broadcast("user", user_id)
+        return self._invalidate_where(lambda p: p.user_id == user_id)
+
+    def invalidate_tenant(self, tenant_id: Optional[int]) -> int:
+        """按租户失效"""
+        self._broadcast("tenant", tenant_id)
+        return self._invalidate_where(lambda p: p.tenant_id == tenant_id)
+
+    def clear(self) -> int:
+        """清空缓存"""
+        self._broadcast("clear", None)
+        return self._clear()
+
+    def _clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._stats["invalidations"] += count
+            return count
+
+    def _invalidate_where(self, predicate) -> int:
+        with self._lock:
+            tokens = [t for t, e in self._entries.items() if predicate(e.principal)]
+            for token in tokens:
+                del self._entries[token]
+            self._stats["invalidations"] += len(tokens)
+            return len(tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "revocation_ttl": self.revocation_ttl,
+                "hit_rate": round(self._stats["hits"] / total * 100, 2) if total else 0,
+            }
+
+
+_principal_cache: Optional[PrincipalCache] = None
+_principal_cache_lock = Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """获取认证主体缓存单例"""
+    global _principal_cache
+    if _principal_cache is None:
+        with _principal_cache_lock:
+            if _principal_cache is None:
+                cache = PrincipalCache(
+                    max_size=settings.AUTH_PRINCIPAL_CACHE_MAX_SIZE,
+                    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+                    revocation_ttl=settings.AUTH_REVOCATION_CACHE_TTL,
+                )
+                _bind_invalidation_bus(cache)
+                _principal_cache = cache
+    return _principal_cache
+
+
+def _bind_invalidation_bus(cache: PrincipalCache) -> None:
+    """接入缓存失效广播（同时订阅其他 worker 的失效消息），不可用时仅进程内失效"""
+    try:
+        from app.services.local_cache import get_local_tier
+        from app.utils.redis_client import get_redis_client
+
+        tier = get_local_tier(get_redis_client())
+    except Exception:
+        logger.debug("缓存失效广播不可用，认证快照仅在进程内失效", exc_info=True)
+        return
+    if tier is not None:
+        cache.bind_publisher(lambda kind, value: tier.bus.publish("principal", [kind, value]))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_principals(mapper, connection, target) -> None:
+    """用户行变更后立即失效该用户的快照"""
+    user_id = getattr(target, "id", None)
+    if user_id is not None and get_principal_cache().invalidate_user(user_id):
+        logger.debug(f"用户变更，认证快照已失效: user_id={user_id}")
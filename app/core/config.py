@@ -7,7 +7,7 @@ import os
 import secrets
 import warnings
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -47,6 +47,10 @@ class Settings(BaseSettings):
     REDIS_CACHE_DEFAULT_TTL: int = 300  # 默认缓存过期时间（秒），5分钟
     REDIS_CACHE_PROJECT_DETAIL_TTL: int = 600  # 项目详情缓存过期时间（秒），10分钟
     REDIS_CACHE_PROJECT_LIST_TTL: int = 300  # 项目列表缓存过期时间（秒），5分钟
+    CACHE_L1_ENABLED: bool = True  # 是否在 Redis 前启用进程内一级缓存
+    CACHE_L1_MAX_SIZE: int = 5000  # 一级缓存最大条目数（LRU 淘汰）
+    CACHE_L1_TTL: int = 30  # 一级缓存最长存活（秒），兜底失效消息丢失
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"  # 跨进程缓存失效 pub/sub 频道
 
     # JWT配置
     # 生产环境必须从环境变量设置 SECRET_KEY
@@ -58,6 +62,38 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24小时
 
+    # 认证主体缓存（进程内，按Token索引）
+    AUTH_PRINCIPAL_CACHE_ENABLED: bool = True  # 是否启用认证主体缓存
+    AUTH_PRINCIPAL_CACHE_TTL: int = 30  # 用户快照缓存时间（秒，无广播时的跨进程最长滞后）
+    AUTH_REVOCATION_CACHE_TTL: int = 5  # 撤销状态复核间隔（秒）
+    AUTH_PRINCIPAL_CACHE_MAX_SIZE: int = 10000  # 最大缓存条目数
+
+    # 数据权限范围索引（user_project_scopes）
+    DATA_SCOPE_INDEX_ENABLED: bool = True  # 是否启用物化权限索引
+    DATA_SCOPE_INDEX_MAX_AGE: int = 3600  # 索引最大存活时间（秒），超时视为过期
+
+    # 角色权限索引（role_closures + 权限位图）
+    PERMISSION_INDEX_ENABLED: bool = True  # 是否用预计算位图替代递归角色继承查询
+
+    # 工时汇总表（timesheet_daily_rollups / timesheet_monthly_rollups）
+    TIMESHEET_ROLLUP_ENABLED: bool = True  # 是否增量维护工时汇总表并供报表读取
+
+    # 项目进度汇总表（project_progress_rollups）
+    PROGRESS_ROLLUP_ENABLED: bool = True  # 是否按增量维护项目进度运行总计
+    PROGRESS_ROLLUP_DEBOUNCE_SECONDS: int = 30  # 合并窗口：项目无新变更满该秒数后统一重算进度与健康度，0 表示每次更新即时检查健康度
+
+    # 物料反查索引（material_where_used）
+    MATERIAL_WHERE_USED_ENABLED: bool = True  # 是否在BOM明细保存时维护物料反查索引
+
+    # 文本相似度索引（ECN相似查找、知识检索）
+    TEXT_INDEX_ENABLED: bool = True  # 是否使用进程内 TF-IDF/MinHash 索引
+    TEXT_INDEX_REBUILD_SECONDS: int = 3600  # 超过该秒数在后台全量重建一次（处理删除），其余时候增量同步
+    KNOWLEDGE_SEARCH_MAX_CANDIDATES: int = 2000  # 知识关键词检索走索引的最大命中数，超过时降级为 ILIKE
+
+    # 人员匹配员工特征矩阵
+    STAFF_FEATURE_MATRIX_ENABLED: bool = True  # 是否使用进程内员工×标签评估矩阵向量化打分
+    STAFF_FEATURE_MATRIX_REBUILD_SECONDS: int = 3600  # 超过该秒数全量重建，其余时候按评估/绩效更新时间增量刷新
+
     # 密钥管理配置
     SECRET_KEY_MIN_LENGTH: int = 32  # 密钥最小长度（字符数）
     SECRET_KEY_ROTATION_DAYS: int = 90  # 推荐的密钥轮转周期（天）
@@ -148,6 +184,7 @@ class Settings(BaseSettings):
     # 分页配置
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 1000
+    PAGINATION_COUNT_ESTIMATE_CAP: int = 10000  # count_mode=estimate 时计数上限，超过即返回上限值
 
     # Notification channels
     EMAIL_ENABLED: bool = False
@@ -169,6 +206,21 @@ class Settings(BaseSettings):
     SMS_MAX_PER_DAY: int = 100  # 每天最多发送短信数
     SMS_MAX_PER_HOUR: int = 20  # 每小时最多发送短信数
 
+    # 异步通知投递（需配置 REDIS_URL）
+    NOTIFICATION_ASYNC_ENABLED: bool = True  # 是否只入队、由后台消费者批量投递
+    NOTIFICATION_WORKER_THREADS: int = 8  # 消费者投递线程数
+    NOTIFICATION_WORKER_BATCH_SIZE: int = 200  # 每次从队列取出的最大通知数
+    NOTIFICATION_CHANNEL_BATCH_SIZE: int = 100  # 单次渠道调用的最大接收人数
+    NOTIFICATION_CHANNEL_CONCURRENCY: Dict[str, int] = {
+        "system": 4,
+        "email": 2,
+        "wechat": 2,
+        "sms": 1,
+        "webhook": 1,
+    }  # 各渠道同时进行的投递批次上限
+    NOTIFICATION_MAX_ATTEMPTS: int = 4  # 单条通知最多投递次数，超过后进入死信列表
+    NOTIFICATION_RETRY_BACKOFF_SECONDS: List[int] = [30, 120, 600]  # 第 N 次失败后的重试间隔
+
     WECHAT_WEBHOOK_URL: Optional[str] = None
     WECHAT_ENABLED: bool = False
 
@@ -193,6 +245,20 @@ class Settings(BaseSettings):
     ]  # 合同到期提醒时间点（天）
     SALES_APPROVAL_TIMEOUT_HOURS: int = 24  # 审批超时提醒阈值（小时），默认24小时
 
+    # 生产排程多策略搜索（algorithm=SEARCH）
+    SCHEDULE_SEARCH_BUDGET_SECONDS: float = 5.0  # 搜索墙钟预算（秒）
+    SCHEDULE_SEARCH_MAX_WORKERS: int = 4  # 进程池大小，<=1 时在当前进程顺序执行
+    SCHEDULE_SEARCH_RANDOM_RESTARTS: int = 4  # 随机顺序重启次数
+
+    # 报表框架
+    REPORT_DATA_SOURCE_MAX_WORKERS: int = 4  # 相互独立的数据源并发解析线程数，<=1 时顺序执行
+
+    # 数据导入
+    IMPORT_STREAM_CHUNK_SIZE: int = 1000  # 流式导入每块行数（每块校验后单独提交）
+
+    # 齐套率
+    KIT_RATE_DASHBOARD_SNAPSHOT_TTL: int = 900  # 齐套看板快照缓存时间（秒），定时任务每10分钟刷新
+
     # Kimi AI 配置
     KIMI_API_KEY: Optional[str] = None  # Kimi API Key
     KIMI_API_BASE: str = "https://api.moonshot.cn/v1"  # Kimi API 基础URL
@@ -95,7 +95,8 @@ class TenantQuery(Query):
             return self
 
         model = self.column_descriptions[0].get("type")
-        if model is None:
+        if not isinstance(model, type):
+            # 列查询（如 db.query(Model.id)）的 type 为列的 SQL 类型而非模型类
             logger.debug("No model type found, skipping tenant filter")
             return self
 
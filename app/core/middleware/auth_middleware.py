@@ -5,7 +5,7 @@
 实现"先关门后开窗"的安全策略：
 1. 默认所有API都需要认证
 2. 白名单中的路径可以公开访问
-3. 验证通过后将用户信息存入 request.state
+3. 验证通过后将用户信息和认证主体存入 request.state
 """
 
 import logging
@@ -92,6 +92,7 @@ class GlobalAuthMiddleware(BaseHTTPMiddleware):
         # 获取数据库会话
         # Delayed import to avoid circular dependency
         from app.core.auth import verify_token_and_get_user
+        from app.core.auth_principal import AuthPrincipal
         from app.models.base import get_session
 
         db = get_session()
@@ -102,6 +103,12 @@ class GlobalAuthMiddleware(BaseHTTPMiddleware):
                 # 将用户信息存入request.state供后续使用
                 request.state.user = user
                 request.state.user_id = user.id
+                # 已验证主体，get_current_user 据此复用，避免重复解码和查库
+                request.state.auth_principal = AuthPrincipal(
+                    token=token,
+                    user_id=user.id,
+                    tenant_id=getattr(user, "tenant_id", None),
+                )
 
                 # 记录访问日志（可选）
                 logger.debug(
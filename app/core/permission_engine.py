@@ -6,7 +6,7 @@
 
 职责（仅限数据层）：
 1. 缓存读取（带租户隔离）
-2. 数据库查询（递归角色继承 + 多租户过滤）
+2. 数据库查询（角色权限位图索引；索引未就绪时递归角色继承 + 多租户过滤）
 3. 缓存回写
 
 不负责：超管/管理员快速放行（由各调用方自行判断，保持原有语义差异）。
@@ -18,6 +18,8 @@ from typing import List, Optional, Set
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from .permission_index import RolePermissionIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,9 +38,20 @@ def _load_permissions_from_db(
     - tenant_id 不为 None 时：系统级权限(tenant_id IS NULL) + 该租户权限
     - tenant_id 为 None（超管场景）：仅系统级权限
 
+    优先读取角色权限位图索引（用户角色位图按位或）；
+    索引不可用或有角色尚未建索引时执行递归 CTE。
+
     Returns:
         权限编码集合
     """
+    try:
+        indexed = RolePermissionIndex.load_user_permissions(db, user_id, tenant_id)
+    except Exception as e:
+        logger.warning("PermEngine index read failed, fallback to CTE: %s", e)
+        indexed = None
+    if indexed is not None:
+        return indexed
+
     if tenant_id is not None:
         tenant_filter = "AND (ap.tenant_id IS NULL OR ap.tenant_id = :tenant_id)"
         params = {"user_id": user_id, "tenant_id": tenant_id}
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""
+角色权限索引（闭包表 + 权限位图）
+
+- role_closures：角色 → 有效继承的祖先角色（沿 inherit_permissions=1 的链向上，含自身）
+- permission_bits：perm_code → 稳定位序（只追加）
+- role_permission_masks：角色有效权限位图（自身 + 继承），按权限所属租户分行
+
+读：用户权限 = 其角色位图的按位或，一次普通连接查询，不再执行递归 CTE
+写：角色父级/继承标志、角色权限分配、权限启用状态变更时，
+    在事务提交前只重算变更角色的子树（闭包表中的后代）
+任一角色尚未建索引时调用方降级为递归 CTE，结果一致。
+"""
+
+import logging
+import weakref
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, delete, event, func, insert, inspect as sa_inspect, or_, select, true
+from sqlalchemy.orm import Session
+
+from ..models.permission_index import PermissionBit, RoleClosure, RolePermissionMask
+from ..models.user import ApiPermission, Role, RoleApiPermission, UserRole
+from ..utils.db_helpers import tables_exist
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RolePermissionIndex"]
+
+# 按引擎缓存位序 → 权限编码（位序只追加，已知位序永不改变）
+_bit_codes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_PENDING_KEY = "_perm_index_pending"
+_BITS_ASSIGNED_KEY = "_perm_index_bits_assigned"
+
+
+def _engine_of(db: Session):
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def _encode(mask: int) -> bytes:
+    return mask.to_bytes(max(1, (mask.bit_length() + 7) // 8), "little")
+
+
+def _decode(raw: Optional[bytes]) -> int:
+    return int.from_bytes(raw, "little") if raw else 0
+
+
+class RolePermissionIndex:
+    """角色权限索引服务"""
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """索引表是否存在"""
+        return tables_exist(
+            db, *(model.__tablename__ for model in (RoleClosure, PermissionBit, RolePermissionMask))
+        )
+
+    # ==================== 读 ====================
+
+    @staticmethod
+    def load_user_permissions(
+        db: Session, user_id: int, tenant_id: Optional[int] = None
+    ) -> Optional[Set[str]]:
+        """
+        由索引加载用户权限（多租户规则与递归 CTE 一致）
+
+        Returns:
+            权限编码集合；索引不可用或用户有角色尚未建索引时返回 None
+        """
+        if not settings.PERMISSION_INDEX_ENABLED or not RolePermissionIndex.is_available(db):
+            return None
+
+        if tenant_id is None:
+            tenant_cond = RolePermissionMask.perm_tenant_id.is_(None)
+        else:
+            tenant_cond = or_(
+                RolePermissionMask.perm_tenant_id.is_(None),
+                RolePermissionMask.perm_tenant_id == tenant_id,
+            )
+        rows = db.execute(
+            select(
+                UserRole.role_id,
+                RolePermissionMask.role_id,
+                RolePermissionMask.perm_tenant_id,
+                RolePermissionMask.mask,
+            )
+            .select_from(UserRole)
+            .outerjoin(
+                RolePermissionMask,
+                and_(RolePermissionMask.role_id == UserRole.role_id, tenant_cond),
+            )
+            .where(UserRole.user_id == user_id)
+        ).all()
+
+        role_ids: Set[int] = set()
+        indexed: Set[int] = set()
+        combined = 0
+        for role_id, mask_role_id, perm_tenant_id, raw in rows:
+            role_ids.add(role_id)
+            if mask_role_id is None:
+                return None
+            if perm_tenant_id is None:
+                indexed.add(role_id)
+            combined |= _decode(raw)
+        if role_ids - indexed:
+            return None
+        return RolePermissionIndex._codes_of(db, combined)
+
+    @staticmethod
+    def _codes_of(db: Session, mask: int) -> Set[str]:
+        """位图 → 权限编码集合"""
+        if not mask:
+            return set()
+        try:
+            engine = _engine_of(db)
+            codes = _bit_codes.get(engine)
+        except TypeError:
+            engine, codes = None, None
+
+        if codes is None or mask.bit_length() > len(codes):
+            rows = db.execute(select(PermissionBit.bit_index, PermissionBit.perm_code)).all()
+            codes = [None] * (max((r[0] for r in rows), default=-1) + 1)
+            for bit_index, perm_code in rows:
+                codes[bit_index] = perm_code
+            # 本事务新分配的位序尚未提交，不写入进程缓存
+            if engine is not None and not db.info.get(_BITS_ASSIGNED_KEY):
+                _bit_codes[engine] = codes
+
+        result = set()
+        while mask:
+            low = mask & -mask
+            bit_index = low.bit_length() - 1
+            if bit_index < len(codes) and codes[bit_index]:
+                result.add(codes[bit_index])
+            mask ^= low
+        return result
+
+    # ==================== 写 ====================
+
+    @staticmethod
+    def _ensure_bits(db: Session, perm_codes: Set[str]) -> Dict[str, int]:
+        """返回权限编码的位序，未分配的按编码顺序追加"""
+        if not perm_codes:
+            return {}
+        bits = dict(
+            db.execute(
+                select(PermissionBit.perm_code, PermissionBit.bit_index).where(
+                    PermissionBit.perm_code.in_(perm_codes)
+                )
+            ).all()
+        )
+        missing = sorted(perm_codes - bits.keys())
+        if missing:
+            max_bit = db.execute(select(func.max(PermissionBit.bit_index))).scalar()
+            next_bit = 0 if max_bit is None else max_bit + 1
+            rows = [
+                {"perm_code": code, "bit_index": next_bit + i} for i, code in enumerate(missing)
+            ]
+            db.execute(insert(PermissionBit), rows)
+            db.info[_BITS_ASSIGNED_KEY] = True
+            bits.update((row["perm_code"], row["bit_index"]) for row in rows)
+        return bits
+
+    @staticmethod
+    def rebuild_roles(db: Session, role_ids: Iterable[int]) -> int:
+        """
+        重算角色及其子树的闭包与位图（不提交，由调用方提交）
+
+        Returns:
+            重建的角色数
+        """
+        changed = {rid for rid in role_ids if rid is not None}
+        if not changed:
+            return 0
+
+        # 角色表规模小，一次读入父级与继承标志
+        roles = {
+            rid: (parent_id, bool(inherit))
+            for rid, parent_id, inherit in db.execute(
+                select(Role.id, Role.parent_id, Role.inherit_permissions)
+            ).all()
+        }
+        # 子树 = 变更角色 + 闭包表中的后代（后代关系只取决于子树内部的继承链）
+        affected = set(changed)
+        affected.update(
+            db.execute(
+                select(RoleClosure.descendant_id).where(RoleClosure.ancestor_id.in_(changed))
+            ).scalars()
+        )
+        existing = sorted(affected & roles.keys())
+
+        chains: Dict[int, List[int]] = {}
+        for rid in existing:
+            chain = [rid]
+            parent_id, inherit = roles[rid]
+            while inherit and parent_id in roles and parent_id not in chain:
+                chain.append(parent_id)
+                parent_id, inherit = roles[parent_id]
+            chains[rid] = chain
+
+        ancestors = {aid for chain in chains.values() for aid in chain}
+        grants = (
+            db.execute(
+                select(RoleApiPermission.role_id, ApiPermission.tenant_id, ApiPermission.perm_code)
+                .join(ApiPermission, ApiPermission.id == RoleApiPermission.permission_id)
+                .where(
+                    RoleApiPermission.role_id.in_(ancestors),
+                    ApiPermission.is_active.is_(True),
+                )
+            ).all()
+            if ancestors
+            else []
+        )
+        bits = RolePermissionIndex._ensure_bits(db, {code for _, _, code in grants if code})
+        direct: Dict[int, Dict[Optional[int], int]] = defaultdict(lambda: defaultdict(int))
+        for role_id, perm_tenant_id, code in grants:
+            if code:
+                direct[role_id][perm_tenant_id] |= 1 << bits[code]
+
+        closure_rows = []
+        mask_rows = []
+        for rid, chain in chains.items():
+            effective: Dict[Optional[int], int] = {None: 0}
+            for depth, ancestor_id in enumerate(chain):
+                closure_rows.append(
+                    {"ancestor_id": ancestor_id, "descendant_id": rid, "depth": depth}
+                )
+                for perm_tenant_id, mask in direct.get(ancestor_id, {}).items():
+                    effective[perm_tenant_id] = effective.get(perm_tenant_id, 0) | mask
+            mask_rows.extend(
+                {"role_id": rid, "perm_tenant_id": perm_tenant_id, "mask": _encode(mask)}
+                for perm_tenant_id, mask in effective.items()
+            )
+
+        targets = sorted(affected)
+        db.execute(delete(RoleClosure).where(RoleClosure.descendant_id.in_(targets)))
+        db.execute(delete(RolePermissionMask).where(RolePermissionMask.role_id.in_(targets)))
+        removed = sorted(affected - roles.keys())
+        if removed:
+            db.execute(delete(RoleClosure).where(RoleClosure.ancestor_id.in_(removed)))
+        if closure_rows:
+            db.execute(insert(RoleClosure), closure_rows)
+        if mask_rows:
+            db.execute(insert(RolePermissionMask), mask_rows)
+        return len(existing)
+
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """全量重建（定时任务入口，用于修复绕过 ORM 的直接 SQL 变更，不提交）"""
+        if not RolePermissionIndex.is_available(db):
+            return 0
+        role_ids = db.execute(select(Role.id)).scalars().all()
+        db.execute(delete(RoleClosure).where(RoleClosure.descendant_id.notin_(select(Role.id))))
+        db.execute(
+            delete(RolePermissionMask).where(RolePermissionMask.role_id.notin_(select(Role.id)))
+        )
+        return RolePermissionIndex.rebuild_roles(db, role_ids)
+
+
+# ==================== 变更事件 → 子树重算 ====================
+
+
+def _changed(obj, *attrs: str) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _values(obj, attr: str) -> Set:
+    """属性的新旧值（过滤 None）"""
+    history = sa_inspect(obj).attrs[attr].history
+    values = set(history.added or ()) | set(history.deleted or ()) | set(history.unchanged or ())
+    return {v for v in values if v is not None}
+
+
+def _roles_granted(session: Session, permission_condition) -> Set[int]:
+    """持有满足条件权限的角色（走会话连接，不触发自动 flush）"""
+    return set(
+        session.connection()
+        .execute(
+            select(RoleApiPermission.role_id).where(
+                RoleApiPermission.permission_id.in_(select(ApiPermission.id).where(permission_condition))
+            )
+        )
+        .scalars()
+    )
+
+
+def _pending(session: Session) -> list:
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+_WATCHED_TYPES = (Role, RoleApiPermission, ApiPermission)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_permission_index_changes(session, flush_context, instances) -> None:
+    """flush 前收集受影响角色（新建对象的ID在提交前解析）"""
+    if not settings.PERMISSION_INDEX_ENABLED:
+        return
+    if not any(
+        isinstance(obj, _WATCHED_TYPES)
+        for objs in (session.new, session.dirty, session.deleted)
+        for obj in objs
+    ):
+        return
+
+    pending = _pending(session)
+    try:
+        for obj in session.new:
+            if isinstance(obj, (Role, RoleApiPermission)):
+                pending.append(obj)
+
+        for obj in session.dirty:
+            if isinstance(obj, Role):
+                if _changed(obj, "parent_id", "inherit_permissions"):
+                    pending.append(obj.id)
+            elif isinstance(obj, RoleApiPermission):
+                if _changed(obj, "role_id", "permission_id"):
+                    pending.extend(_values(obj, "role_id"))
+            elif isinstance(obj, ApiPermission):
+                if obj.id and _changed(obj, "perm_code", "tenant_id", "is_active"):
+                    pending.extend(_roles_granted(session, ApiPermission.id == obj.id))
+
+        for obj in session.deleted:
+            if isinstance(obj, Role):
+                pending.append(obj.id)
+            elif isinstance(obj, RoleApiPermission):
+                pending.append(obj.role_id)
+            elif isinstance(obj, ApiPermission) and obj.id:
+                pending.extend(_roles_granted(session, ApiPermission.id == obj.id))
+    except Exception as e:
+        logger.warning(f"收集角色权限索引变更失败: {e}")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_permission_changes(orm_execute_state) -> None:
+    """批量 UPDATE/DELETE（如 query(...).delete()）执行前按相同条件收集受影响角色"""
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    if not settings.PERMISSION_INDEX_ENABLED:
+        return
+    mapper = orm_execute_state.bind_mapper
+    entity = getattr(mapper, "class_", None)
+    if entity not in _WATCHED_TYPES:
+        return
+
+    session = orm_execute_state.session
+    where = orm_execute_state.statement.whereclause
+    try:
+        if entity is RoleApiPermission:
+            query = select(RoleApiPermission.role_id)
+            role_ids = session.connection().execute(
+                query if where is None else query.where(where)
+            ).scalars()
+        elif entity is Role:
+            query = select(Role.id)
+            role_ids = session.connection().execute(
+                query if where is None else query.where(where)
+            ).scalars()
+        else:
+            role_ids = _roles_granted(session, true() if where is None else where)
+        _pending(session).extend(role_ids)
+    except Exception as e:
+        logger.warning(f"收集角色权限索引批量变更失败: {e}")
+
+
+def _resolve(item) -> Optional[int]:
+    if isinstance(item, Role):
+        return item.id
+    if isinstance(item, RoleApiPermission):
+        return item.role_id
+    return item
+
+
+@event.listens_for(Session, "before_commit")
+def _rebuild_pending_role_indexes(session) -> None:
+    """提交前在同一事务内重算受影响角色的子树"""
+    if not settings.PERMISSION_INDEX_ENABLED:
+        return
+    # before_commit 早于提交时的 flush，先 flush 以收集未刷新对象的变更
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    role_ids = {_resolve(item) for item in pending or ()} - {None}
+    if not role_ids or not RolePermissionIndex.is_available(session):
+        return
+
+    try:
+        with session.begin_nested():
+            RolePermissionIndex.rebuild_roles(session, role_ids)
+    except Exception as e:
+        logger.warning(f"重算角色权限索引失败，相关角色降级为递归查询: roles={role_ids}, error={e}")
+        try:
+            with session.begin_nested():
+                session.execute(
+                    delete(RolePermissionMask).where(
+                        RolePermissionMask.role_id.in_(
+                            select(RoleClosure.descendant_id).where(
+                                RoleClosure.ancestor_id.in_(role_ids)
+                            )
+                        )
+                        | RolePermissionMask.role_id.in_(role_ids)
+                    )
+                )
+        except Exception as e2:
+            logger.error(f"清理角色权限索引失败: {e2}")
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_permission_index_state(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_BITS_ASSIGNED_KEY, None)
@@ -115,6 +115,12 @@ try:
     async def startup_event():
         import os
 
+        # 注册 ORM 变更事件，维护汇总表/索引（须早于任何写库操作）
+        from app.core import permission_index  # noqa: F401  角色/权限变更 → 权限位图索引
+        from app.services import timesheet_rollup_service  # noqa: F401  工时变更 → 工时汇总表
+        from app.services import progress_rollup_service  # noqa: F401  任务变更 → 项目进度汇总
+        from app.services import material_where_used_service  # noqa: F401  BOM 变更 → 物料反查索引
+
         # 初始化基础数据（预置模板等）
         try:
             from app.utils.init_data import init_all_data
@@ -135,6 +141,16 @@ try:
 
             logging.getLogger(__name__).error(f"状态处理器注册失败: {e}")
 
+        # 启动通知队列消费者（需配置 Redis）
+        try:
+            from app.services.notification_worker import start_notification_worker
+
+            start_notification_worker()
+        except Exception as e:
+            import logging
+
+            logging.getLogger(__name__).error(f"通知队列消费者启动失败: {e}")
+
         enable_scheduler = os.getenv("ENABLE_SCHEDULER", "true").lower() == "true"
         if enable_scheduler:
             if start_progress_scheduler:
@@ -143,6 +159,11 @@ try:
 
     @app.on_event("shutdown")
     async def shutdown_event():
+        from app.services.notification_worker import stop_notification_worker
+        from app.services.production.schedule_search import shutdown_search_pool
+
+        stop_notification_worker()
+        shutdown_search_pool()
         if stop_progress_scheduler:
             stop_progress_scheduler()
         shutdown_scheduler()
@@ -55,6 +55,24 @@ from .kitting_optimization import ExpediteRecord, MaterialAlternative  # noqa: F
 # Material Shortage (from material.py)
 from .material import MaterialShortage  # noqa: F401
 from .material_progress_subscription import MaterialProgressSubscription  # noqa: F401
+
+# Data Scope Index
+from .data_scope_index import UserProjectScope, UserScopeIndexState  # noqa: F401
+
+# Role Permission Index
+from .permission_index import PermissionBit, RoleClosure, RolePermissionMask  # noqa: F401
+
+# Sequence Counter
+from .sequence_counter import SequenceCounter  # noqa: F401
+
+# Timesheet Rollup
+from .timesheet_rollup import TimesheetDailyRollup, TimesheetMonthlyRollup  # noqa: F401
+
+# Project Progress Rollup
+from .progress_rollup import ProjectProgressRollup  # noqa: F401
+
+# Material Where-Used Index
+from .material_where_used import MaterialWhereUsed  # noqa: F401
 from .presale_ai import (  # noqa: F401
     PresaleAIAuditLog,
     PresaleAIConfig,
@@ -207,6 +225,16 @@ __all__ = [
     "BomItem",
     "MaterialShortage",
     "MaterialProgressSubscription",
+    "UserProjectScope",
+    "UserScopeIndexState",
+    "RoleClosure",
+    "PermissionBit",
+    "RolePermissionMask",
+    "SequenceCounter",
+    "TimesheetDailyRollup",
+    "TimesheetMonthlyRollup",
+    "ProjectProgressRollup",
+    "MaterialWhereUsed",
     # Shortage
     "ShortageReport",
     "MaterialArrival",
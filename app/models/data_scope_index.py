@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+数据权限范围索引模型
+
+将用户可访问的项目ID物化为行，列表查询通过半连接（IN 子查询）过滤，
+避免每次请求重算权限范围并拼接超长的字面量 IN 列表。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
+
+from .base import Base
+
+
+class UserProjectScope(Base):
+    """用户可访问项目索引表"""
+
+    __tablename__ = "user_project_scopes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, comment="租户ID")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="用户ID")
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, comment="项目ID")
+
+    __table_args__ = (
+        Index("idx_ups_user_project", "user_id", "project_id", unique=True),
+        Index("idx_ups_project", "project_id"),
+        {"comment": "用户可访问项目索引表"},
+    )
+
+    def __repr__(self):
+        return f"<UserProjectScope user={self.user_id} project={self.project_id}>"
+
+
+class UserScopeIndexState(Base):
+    """用户权限范围索引状态表"""
+
+    __tablename__ = "user_scope_index_states"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, comment="租户ID")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="用户ID")
+    data_scope = Column(String(20), nullable=False, comment="构建时的数据权限范围")
+    project_count = Column(Integer, default=0, comment="可访问项目数")
+    is_stale = Column(Boolean, default=False, nullable=False, comment="是否需要重建")
+    refreshed_at = Column(DateTime, default=datetime.now, nullable=False, comment="最后构建时间")
+
+    __table_args__ = (
+        Index("idx_usis_user", "user_id", unique=True),
+        Index("idx_usis_stale", "is_stale"),
+        Index("idx_usis_scope", "data_scope"),
+        {"comment": "用户权限范围索引状态表"},
+    )
+
+    def __repr__(self):
+        return f"<UserScopeIndexState user={self.user_id} scope={self.data_scope}>"
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+物料反查（where-used）索引模型
+
+每个BOM明细一行，记录物料 → (BOM, 明细, 设备, 项目) 的引用关系。BOM明细保存、
+BOM发布时维护，ECN影响分析按受影响物料直接定位引用的BOM明细，不再逐个加载
+设备下全部BOM及其明细。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from .base import Base
+
+
+class MaterialWhereUsed(Base):
+    """物料反查索引表"""
+
+    __tablename__ = "material_where_used"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    material_id = Column(Integer, comment="物料ID")
+    material_code = Column(String(50), nullable=False, comment="物料编码")
+
+    # 引用位置
+    bom_item_id = Column(Integer, nullable=False, comment="BOM明细ID")
+    parent_item_id = Column(Integer, comment="父级明细ID")
+    bom_id = Column(Integer, nullable=False, comment="BOM ID")
+    machine_id = Column(Integer, comment="设备ID")
+    project_id = Column(Integer, comment="项目ID")
+
+    updated_at = Column(DateTime, default=datetime.now, comment="索引更新时间")
+
+    __table_args__ = (
+        Index("idx_mwu_item", "bom_item_id", unique=True),
+        Index("idx_mwu_material", "material_id"),
+        Index("idx_mwu_code", "material_code"),
+        Index("idx_mwu_bom", "bom_id"),
+        {"comment": "物料反查索引表"},
+    )
+
+    def __repr__(self):
+        return f"<MaterialWhereUsed material={self.material_code} item={self.bom_item_id}>"
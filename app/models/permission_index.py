@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+角色权限索引模型
+
+预先展开角色继承关系并把权限压缩为位图，登录/缓存未命中时
+用户权限 = 其角色有效权限位图的按位或，不再执行递归 CTE。
+索引表均为可重建的派生数据，角色ID不设外键，删除角色时随事务清理。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+
+from .base import Base
+
+
+class RoleClosure(Base):
+    """角色继承闭包表（descendant 继承 ancestor 的权限，含自身，depth=0）"""
+
+    __tablename__ = "role_closures"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ancestor_id = Column(Integer, nullable=False, comment="祖先角色ID")
+    descendant_id = Column(Integer, nullable=False, comment="后代角色ID")
+    depth = Column(Integer, nullable=False, default=0, comment="继承层数")
+
+    __table_args__ = (
+        Index("idx_rc_ancestor_descendant", "ancestor_id", "descendant_id", unique=True),
+        Index("idx_rc_descendant", "descendant_id"),
+        {"comment": "角色继承闭包表"},
+    )
+
+    def __repr__(self):
+        return f"<RoleClosure {self.ancestor_id}->{self.descendant_id} depth={self.depth}>"
+
+
+class PermissionBit(Base):
+    """权限编码位序表（只追加，位序分配后不再变化）"""
+
+    __tablename__ = "permission_bits"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    perm_code = Column(String(100), nullable=False, comment="权限编码")
+    bit_index = Column(Integer, nullable=False, comment="位序")
+
+    __table_args__ = (
+        Index("idx_pb_perm_code", "perm_code", unique=True),
+        Index("idx_pb_bit_index", "bit_index", unique=True),
+        {"comment": "权限编码位序表"},
+    )
+
+    def __repr__(self):
+        return f"<PermissionBit {self.perm_code}={self.bit_index}>"
+
+
+class RolePermissionMask(Base):
+    """角色有效权限位图（含继承）
+
+    perm_tenant_id 为权限所属租户：NULL 行为系统级权限（每个已索引角色必有该行），
+    其余行为对应租户的权限。
+    """
+
+    __tablename__ = "role_permission_masks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    role_id = Column(Integer, nullable=False, comment="角色ID")
+    perm_tenant_id = Column(Integer, nullable=True, comment="权限所属租户ID（NULL为系统级）")
+    mask = Column(LargeBinary, nullable=False, comment="权限位图（小端字节序）")
+    built_at = Column(DateTime, default=datetime.now, nullable=False, comment="构建时间")
+
+    __table_args__ = (
+        Index("idx_rpm_role_tenant", "role_id", "perm_tenant_id"),
+        {"comment": "角色有效权限位图表"},
+    )
+
+    def __repr__(self):
+        return f"<RolePermissionMask role={self.role_id} tenant={self.perm_tenant_id}>"
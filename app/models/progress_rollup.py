@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+项目进度汇总（rollup）模型
+
+每个项目一行，保存参与进度计算的任务数与进度之和的运行总计。任务变更时由
+flush 事件按增量更新，进度聚合直接读取该行，不再对项目全部任务执行 COUNT/SUM；
+同时标记待重算，变更平息后由定时任务统一精确重算进度并检查健康度。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer
+
+from .base import Base
+
+
+class ProjectProgressRollup(Base):
+    """项目进度汇总表"""
+
+    __tablename__ = "project_progress_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, nullable=False, comment="项目ID")
+
+    # 运行总计（口径：活跃且未取消的任务）
+    task_count = Column(Integer, default=0, nullable=False, comment="任务数")
+    progress_sum = Column(Integer, default=0, nullable=False, comment="任务进度之和")
+
+    # 合并重算
+    pending = Column(Boolean, default=False, nullable=False, comment="是否待重算进度与健康度")
+    changed_at = Column(DateTime, default=datetime.now, comment="最后一次任务变更时间")
+    recomputed_at = Column(DateTime, comment="最后一次精确重算时间")
+
+    __table_args__ = (
+        Index("idx_ppr_project", "project_id", unique=True),
+        Index("idx_ppr_pending", "pending", "changed_at"),
+        {"comment": "项目进度汇总表"},
+    )
+
+    def __repr__(self):
+        return f"<ProjectProgressRollup project={self.project_id} count={self.task_count}>"
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+编号序列计数器模型
+
+每个（编号字段, 前缀）一行计数器，前缀中含日期/月份即为按周期计数。
+编号生成通过原子自增分配序号，不再按 LIKE 扫描业务表取最大值。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from .base import Base
+
+
+class SequenceCounter(Base):
+    """编号序列计数器表"""
+
+    __tablename__ = "sequence_counters"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, comment="序列名（表名.编号字段）")
+    prefix = Column(String(100), nullable=False, comment="编号前缀（含周期，如 ECN-250115-）")
+    current_value = Column(Integer, default=0, nullable=False, comment="已分配的最大序号")
+    updated_at = Column(
+        DateTime, default=datetime.now, onupdate=datetime.now, comment="最后分配时间"
+    )
+
+    __table_args__ = (
+        Index("idx_seq_name_prefix", "name", "prefix", unique=True),
+        {"comment": "编号序列计数器表"},
+    )
+
+    def __repr__(self):
+        return f"<SequenceCounter {self.name} {self.prefix}={self.current_value}>"
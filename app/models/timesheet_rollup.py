@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+工时汇总（rollup）模型
+
+已审批工时按 用户/日期/项目/研发项目/任务 预聚合为日汇总行，再按 用户/月/项目
+聚合为月汇总行。工时审批、修改、删除时在同一事务内按受影响的"用户-日"增量重建，
+HR、财务、研发、项目报表直接读取汇总行，不再加载全部工时记录逐条累加。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, Numeric, String
+
+from .base import Base
+
+
+class TimesheetDailyRollup(Base):
+    """工时日汇总表"""
+
+    __tablename__ = "timesheet_daily_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # 汇总维度
+    work_date = Column(Date, nullable=False, comment="工作日期")
+    year = Column(Integer, nullable=False, comment="年份")
+    month = Column(Integer, nullable=False, comment="月份")
+    user_id = Column(Integer, nullable=False, comment="用户ID")
+    department_id = Column(Integer, comment="部门ID")
+    project_id = Column(Integer, comment="项目ID（非标项目）")
+    rd_project_id = Column(Integer, comment="研发项目ID")
+    task_id = Column(Integer, comment="任务ID")
+
+    # 冗余名称（取自工时记录）
+    user_name = Column(String(50), comment="用户姓名")
+    department_name = Column(String(100), comment="部门名称")
+    project_code = Column(String(50), comment="项目编号")
+    project_name = Column(String(200), comment="项目名称")
+    task_name = Column(String(200), comment="任务名称")
+
+    # 汇总数据
+    total_hours = Column(Numeric(8, 2), default=0, nullable=False, comment="总工时")
+    normal_hours = Column(Numeric(8, 2), default=0, nullable=False, comment="正常工时")
+    overtime_hours = Column(Numeric(8, 2), default=0, nullable=False, comment="加班工时")
+    weekend_hours = Column(Numeric(8, 2), default=0, nullable=False, comment="周末工时")
+    holiday_hours = Column(Numeric(8, 2), default=0, nullable=False, comment="节假日工时")
+    entries_count = Column(Integer, default=0, nullable=False, comment="记录条数")
+
+    updated_at = Column(DateTime, default=datetime.now, comment="汇总时间")
+
+    __table_args__ = (
+        Index("idx_tsdr_user_date", "user_id", "work_date"),
+        Index("idx_tsdr_date", "work_date"),
+        Index("idx_tsdr_project_date", "project_id", "work_date"),
+        Index("idx_tsdr_rd_project_date", "rd_project_id", "work_date"),
+        {"comment": "工时日汇总表"},
+    )
+
+    def __repr__(self):
+        return f"<TimesheetDailyRollup user={self.user_id} date={self.work_date}>"
+
+
+class TimesheetMonthlyRollup(Base):
+    """工时月汇总表"""
+
+    __tablename__ = "timesheet_monthly_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # 汇总维度
+    year = Column(Integer, nullable=False, comment="年份")
+    month = Column(Integer, nullable=False, comment="月份")
+    user_id = Column(Integer, nullable=False, comment="用户ID")
+    department_id = Column(Integer, comment="部门ID")
+    project_id = Column(Integer, comment="项目ID（非标项目）")
+    rd_project_id = Column(Integer, comment="研发项目ID")
+
+    # 冗余名称（取自工时记录）
+    user_name = Column(String(50), comment="用户姓名")
+    department_name = Column(String(100), comment="部门名称")
+    project_code = Column(String(50), comment="项目编号")
+    project_name = Column(String(200), comment="项目名称")
+
+    # 汇总数据
+    total_hours = Column(Numeric(10, 2), default=0, nullable=False, comment="总工时")
+    normal_hours = Column(Numeric(10, 2), default=0, nullable=False, comment="正常工时")
+    overtime_hours = Column(Numeric(10, 2), default=0, nullable=False, comment="加班工时")
+    weekend_hours = Column(Numeric(10, 2), default=0, nullable=False, comment="周末工时")
+    holiday_hours = Column(Numeric(10, 2), default=0, nullable=False, comment="节假日工时")
+    entries_count = Column(Integer, default=0, nullable=False, comment="记录条数")
+
+    updated_at = Column(DateTime, default=datetime.now, comment="汇总时间")
+
+    __table_args__ = (
+        Index("idx_tsmr_period_user", "year", "month", "user_id"),
+        Index("idx_tsmr_period_project", "year", "month", "project_id"),
+        Index("idx_tsmr_period_rd_project", "year", "month", "rd_project_id"),
+        {"comment": "工时月汇总表"},
+    )
+
+    def __repr__(self):
+        return f"<TimesheetMonthlyRollup user={self.user_id} {self.year}-{self.month}>"
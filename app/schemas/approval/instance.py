@@ -103,7 +103,10 @@ class ApprovalInstanceDetail(ApprovalInstanceResponse):
 class ApprovalInstanceListResponse(BaseModel):
     """审批实例列表响应"""
 
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
     items: List[ApprovalInstanceResponse]
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
+    total_estimated: bool = False
@@ -29,6 +29,16 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pages: int = Field(default=0, description="总页数")
 
 
+class CursorPaginatedResponse(PaginatedResponse[T], Generic[T]):
+    """支持游标分页与可选计数的分页响应模型"""
+
+    total: Optional[int] = Field(default=0, description="总记录数（count_mode=none 时为空）")
+    pages: Optional[int] = Field(default=0, description="总页数（count_mode=none 时为空）")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标（游标分页时返回）")
+    has_more: Optional[bool] = Field(default=None, description="是否还有下一页（游标分页时返回）")
+    total_estimated: bool = Field(default=False, description="总数是否为估算值")
+
+
 class PageParams(BaseModel):
     """分页参数"""
 
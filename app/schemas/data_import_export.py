@@ -3,7 +3,7 @@
 数据导入导出 Schema
 """
 
-from datetime import date
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
@@ -70,6 +70,23 @@ class ImportUploadResponse(BaseModel):
     message: str
 
 
+class ImportJobResponse(BaseModel):
+    """导入任务状态响应（流式导入轮询）"""
+
+    task_id: int
+    task_no: str
+    import_type: str
+    file_name: str
+    status: str = Field(description="PENDING/RUNNING/COMPLETED/PARTIAL/FAILED")
+    processed_rows: int = Field(description="已处理行数")
+    success_rows: int
+    failed_rows: int
+    errors: List[Dict[str, Any]] = Field(default=[], description="错误明细（前20条）")
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
 # ==================== 数据导出 ====================
 
 
@@ -102,6 +119,9 @@ class ExportTimesheetRequest(BaseModel):
     end_date: date
     user_id: Optional[int] = None
     project_id: Optional[int] = None
+    filters: Optional[Dict[str, Any]] = Field(
+        default={}, description="过滤条件（user_id/project_id/department_id/status）"
+    )
 
 
 class ExportWorkloadRequest(BaseModel):
@@ -99,7 +99,7 @@ class ScheduleGenerateRequest(BaseModel):
     work_orders: List[int] = Field(..., description="工单ID列表")
     start_date: datetime = Field(..., description="排程开始日期")
     end_date: datetime = Field(..., description="排程结束日期")
-    algorithm: str = Field("GREEDY", description="排程算法: GREEDY/HEURISTIC/GENETIC")
+    algorithm: str = Field("GREEDY", description="排程算法: GREEDY/HEURISTIC/SEARCH/GENETIC")
     optimize_target: str = Field("BALANCED", description="优化目标: TIME/RESOURCE/BALANCED")
     constraints: Optional[Dict[str, Any]] = Field(None, description="约束条件")
     consider_worker_skills: bool = Field(True, description="考虑工人技能匹配")
@@ -131,6 +131,9 @@ class ScheduleGenerateResponse(BaseModel):
     score: float = Field(..., description="总评分")
     metrics: Dict[str, Any] = Field(..., description="评估指标")
     warnings: List[str] = Field(default_factory=list, description="警告信息")
+    candidate_plans: List[Dict[str, Any]] = Field(
+        default_factory=list, description="多策略搜索的帕累托候选方案(SEARCH)"
+    )
 
 
 # ==================== 紧急插单 ====================
@@ -150,6 +153,7 @@ class UrgentInsertResponse(BaseModel):
     schedule: Optional[ScheduleResponse]
     adjusted_schedules: List[ScheduleResponse] = Field(default_factory=list)
     conflicts: List[Dict[str, Any]] = Field(default_factory=list)
+    moved: List[Dict[str, Any]] = Field(default_factory=list, description="被顺延排程的调整前后时间")
     message: str
 
 
@@ -9,7 +9,7 @@ from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
-from .common import PaginatedResponse, TimestampSchema
+from .common import CursorPaginatedResponse, TimestampSchema
 
 # ==================== 工时记录 ====================
 
@@ -58,7 +58,7 @@ class TimesheetResponse(TimestampSchema):
     approved_at: Optional[datetime] = None
 
 
-class TimesheetListResponse(PaginatedResponse):
+class TimesheetListResponse(CursorPaginatedResponse):
     """工时记录列表响应"""
 
     items: List[TimesheetResponse]
@@ -4,7 +4,6 @@ AI进度排期优化器
 自动生成甘特图、优化关键路径、处理约束条件
 """
 
-import json
 import logging
 from datetime import date, timedelta
 from typing import Any, Dict, List, Optional
@@ -13,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.models import Project
 from app.models.ai_planning import AIResourceAllocation, AIWbsSuggestion
+from app.services.cpm_engine import CPMGraph, parse_dependencies
 
 logger = logging.getLogger(__name__)
 
@@ -108,70 +108,26 @@ class AIScheduleOptimizer:
         """
         关键路径法(CPM)计算
 
+        依赖只解析一次构建邻接表，按真实拓扑序计算；存在循环依赖时强制断环并记录告警。
+
         Returns:
             包含ES, EF, LS, LF, 浮动时间等信息
         """
-        task_dict = {task.id: task for task in tasks}
-
-        # 初始化
-        es_dict = {}  # Earliest Start
-        ef_dict = {}  # Earliest Finish
-        ls_dict = {}  # Latest Start
-        lf_dict = {}  # Latest Finish
-        slack_dict = {}  # 浮动时间
-
-        # 按拓扑排序（按WBS层级和序号）
-        sorted_tasks = sorted(tasks, key=lambda t: (t.wbs_level, t.wbs_code))
-
-        # 正向计算 ES 和 EF
-        for task in sorted_tasks:
-            duration = task.estimated_duration_days or 0
-
-            # 获取前置任务
-            predecessors = self._get_predecessors(task, task_dict)
-
-            if not predecessors:
-                # 无前置任务，从开始日期开始
-                es_dict[task.id] = 0
-            else:
-                # 取所有前置任务的最晚结束时间
-                max_ef = max(ef_dict.get(p.id, 0) for p in predecessors)
-                es_dict[task.id] = max_ef
-
-            ef_dict[task.id] = es_dict[task.id] + duration
-
-        # 项目总工期
-        total_duration = max(ef_dict.values()) if ef_dict else 0
-        end_date = start_date + timedelta(days=int(total_duration))
-
-        # 反向计算 LS 和 LF
-        for task in reversed(sorted_tasks):
-            duration = task.estimated_duration_days or 0
+        result = CPMGraph.from_tasks(tasks).compute(strict=False)
+        if result.cycle_task_ids:
+            logger.warning(f"WBS任务存在循环依赖，已强制断环计算: {result.cycle_task_ids}")
 
-            # 获取后继任务
-            successors = self._get_successors(task, task_dict)
-
-            if not successors:
-                # 无后继任务，LF = 项目结束时间
-                lf_dict[task.id] = total_duration
-            else:
-                # 取所有后继任务的最早开始时间
-                min_ls = min(ls_dict.get(s.id, total_duration) for s in successors)
-                lf_dict[task.id] = min_ls
-
-            ls_dict[task.id] = lf_dict[task.id] - duration
-
-            # 计算浮动时间（总时差）
-            slack_dict[task.id] = ls_dict[task.id] - es_dict[task.id]
+        end_date = start_date + timedelta(days=int(result.total_duration))
 
         return {
-            "es": es_dict,
-            "ef": ef_dict,
-            "ls": ls_dict,
-            "lf": lf_dict,
-            "slack": slack_dict,
-            "total_duration": total_duration,
+            "es": result.es,
+            "ef": result.ef,
+            "ls": result.ls,
+            "lf": result.lf,
+            "slack": result.slack,
+            "total_duration": result.total_duration,
             "end_date": end_date.isoformat(),
+            "cycle_task_ids": result.cycle_task_ids,
         }
 
     def _get_predecessors(
@@ -179,41 +135,24 @@ class AIScheduleOptimizer:
     ) -> List[AIWbsSuggestion]:
         """获取前置任务"""
 
-        predecessors = []
-
-        if task.dependencies:
-            try:
-                deps = json.loads(task.dependencies)
-                for dep in deps:
-                    dep_id = dep.get("task_id")
-                    if dep_id and dep_id in task_dict:
-                        predecessors.append(task_dict[dep_id])
-            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
-                # 依赖关系解析失败，忽略
-                pass
-
-        return predecessors
+        return [
+            task_dict[dep_id]
+            for dep_id, _, _ in parse_dependencies(task.dependencies)
+            if dep_id in task_dict
+        ]
 
     def _get_successors(
         self, task: AIWbsSuggestion, task_dict: Dict[int, AIWbsSuggestion]
     ) -> List[AIWbsSuggestion]:
         """获取后继任务"""
 
-        successors = []
-
-        for other_task in task_dict.values():
-            if other_task.dependencies:
-                try:
-                    deps = json.loads(other_task.dependencies)
-                    for dep in deps:
-                        if dep.get("task_id") == task.id:
-                            successors.append(other_task)
-                            break
-                except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
-                    # 依赖关系解析失败，忽略
-                    pass
-
-        return successors
+        return [
+            other_task
+            for other_task in task_dict.values()
+            if any(
+                dep_id == task.id for dep_id, _, _ in parse_dependencies(other_task.dependencies)
+            )
+        ]
 
     def _generate_gantt_data(
         self, tasks: List[AIWbsSuggestion], cpm_result: Dict, start_date: date
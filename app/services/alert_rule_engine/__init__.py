@@ -44,6 +44,38 @@ class AlertRuleEngine(AlertCreator, AlertUpgrader):
         if not self.check_condition(rule, target_data, context):
             return None
 
+        return self._handle_matched(rule, target_data, context)
+
+    def evaluate_rule_many(self, rule, targets, context=None):
+        """
+        同一规则批量评估多个目标（预警扫描）
+
+        条件批量检查（自定义表达式只解析一次），命中的目标逐个创建或升级预警。
+
+        Args:
+            rule: 预警规则
+            targets: 目标对象数据序列
+            context: 上下文数据（可选）
+
+        Returns:
+            List[AlertRecord]: 创建或升级的预警记录
+        """
+        if not rule.is_enabled:
+            return []
+
+        targets = list(targets)
+        matched = self.check_condition_many(rule, targets, context)
+        records = []
+        for target_data, hit in zip(targets, matched):
+            if not hit:
+                continue
+            record = self._handle_matched(rule, target_data, context)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def _handle_matched(self, rule, target_data, context=None):
+        """条件已满足：确定级别、去重/升级或创建预警记录"""
         # 确定预警级别
         alert_level = LevelDeterminer.determine_alert_level(rule, target_data, context, self)
 
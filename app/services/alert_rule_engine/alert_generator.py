@@ -8,8 +8,8 @@ from typing import Any, Dict, Optional
 
 from sqlalchemy.orm import Session
 
-from app.common.query_filters import apply_like_filter
 from app.models.alert import AlertRecord, AlertRule
+from app.utils.number_generator import allocate_sequence
 
 from .base import AlertRuleEngineBase
 
@@ -32,19 +32,12 @@ class AlertGenerator(AlertRuleEngineBase):
         """
         today = datetime.now().strftime("%Y%m%d")
         rule_code = rule.rule_code[:3].upper()
+        prefix = f"{rule_code}{today}"
 
-        # 查询今天的预警数量
-        count_query = db.query(AlertRecord)
-        count_query = apply_like_filter(
-            count_query,
-            AlertRecord,
-            f"{rule_code}{today}%",
-            "alert_no",
-            use_ilike=False,
-        )
-        count = count_query.count()
-
-        return f"{rule_code}{today}{str(count + 1).zfill(4)}"
+        # 按规则编码+日期分配序号（计数器原子自增，预警风暴下不重复）
+        seq = allocate_sequence(db, AlertRecord, "alert_no", prefix)
+
+        return f"{prefix}{str(seq).zfill(4)}"
 
     @staticmethod
     def generate_alert_title(
@@ -2,18 +2,23 @@
 """
 预警规则引擎 - 条件评估
 包含：各种匹配方法（阈值、偏差、逾期、自定义表达式）
+
+自定义表达式按文本解析为 AST 后缓存（app.common.expression_cache），
+同一规则批量评估多个目标时只解析一次。
 """
 
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 try:
-    from simpleeval import InvalidExpression, simple_eval
+    from simpleeval import InvalidExpression, SimpleEval, simple_eval
 except ImportError:
     # 如果 simpleeval 未安装，保留旧的（不安全）实现
     simple_eval = None
+    SimpleEval = None
     InvalidExpression = Exception
 
+from app.common.expression_cache import compiled_expressions
 from app.models.alert import AlertRule
 
 from .base import AlertRuleEngineBase
@@ -52,6 +57,27 @@ class ConditionEvaluator(AlertRuleEngineBase):
         else:
             return False
 
+    def check_condition_many(
+        self,
+        rule: AlertRule,
+        targets: Iterable[Dict[str, Any]],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[bool]:
+        """
+        同一规则批量检查多个目标（预警扫描场景）
+
+        Args:
+            rule: 预警规则
+            targets: 目标对象数据序列
+            context: 上下文数据
+
+        Returns:
+            List[bool]: 与 targets 顺序一致的匹配结果
+        """
+        if rule.rule_type == "CUSTOM":
+            return self.match_custom_expr_many(rule, targets, context)
+        return [self.check_condition(rule, target_data, context) for target_data in targets]
+
     def match_threshold(
         self,
         rule: AlertRule,
@@ -195,7 +221,7 @@ class ConditionEvaluator(AlertRuleEngineBase):
         context: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """
-        自定义表达式匹配（简单实现，实际可以使用更复杂的表达式引擎）
+        自定义表达式匹配（simpleeval 安全求值，表达式 AST 按文本缓存）
 
         Args:
             rule: 预警规则
@@ -205,27 +231,48 @@ class ConditionEvaluator(AlertRuleEngineBase):
         Returns:
             bool: 是否匹配
         """
+        return self.match_custom_expr_many(rule, [target_data], context)[0]
+
+    def match_custom_expr_many(
+        self,
+        rule: AlertRule,
+        targets: Iterable[Dict[str, Any]],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> List[bool]:
+        """
+        自定义表达式批量匹配：表达式解析一次（AST 缓存），逐个目标求值
+
+        表达式为空、simpleeval 未安装、解析失败时全部返回 False；
+        单个目标求值失败只影响该目标。
+        """
+        targets = list(targets)
         if not rule.condition_expr:
-            return False
+            return [False] * len(targets)
+        # 后备方案：simpleeval 未安装时返回 False
+        # 建议安装: pip install simpleeval==1.0.2
+        if simple_eval is None or SimpleEval is None:
+            return [False] * len(targets)
 
+        expr = rule.condition_expr
         try:
+            parsed = compiled_expressions.get_or_compile(
+                ("simpleeval", expr), lambda: SimpleEval.parse(expr)
+            )
+        except Exception:
+            return [False] * len(targets)
+
+        # simpleeval 只允许白名单内的运算和函数
+        evaluator = SimpleEval()
+        results = []
+        for target_data in targets:
             # 构建安全的评估上下文
             eval_context = {}
             eval_context.update(target_data)
             if context:
                 eval_context.update(context)
-
-            # 使用 simpleeval 进行安全的表达式评估（如果可用）
-            if simple_eval is not None:
-                result = simple_eval(
-                    rule.condition_expr,
-                    names=eval_context,
-                    safe=True,  # 禁用所有未授权的功能
-                )
-                return bool(result)
-            else:
-                # 后备方案：simpleeval 未安装时返回 False
-                # 建议安装: pip install simpleeval==1.0.2
-                return False
-        except (InvalidExpression, Exception):
-            return False
+            evaluator.names = eval_context
+            try:
+                results.append(bool(evaluator.eval(expr, previously_parsed=parsed)))
+            except (InvalidExpression, Exception):
+                results.append(False)
+        return results
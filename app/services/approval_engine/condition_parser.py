@@ -6,8 +6,12 @@
 1. Jinja2模板语法：{{ variable | filter }}
 2. 简单条件语言：{"operator": "AND", "items": [...]}
 3. 类SQL表达式：field > value AND field2 < value2
+
+表达式按文本编译一次（Jinja2 模板 / 解析后的 JSON / SQL-like 条件结构）并进程内缓存，
+重复评估只执行编译结果；evaluate_many 对同一表达式批量评估多个上下文。
 """
 
+import json
 import logging
 import re
 
@@ -17,10 +21,22 @@ except ImportError:  # pragma: no cover - 可选依赖
     Environment = None
     TemplateSyntaxError = Exception
     StrictUndefined = None
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from app.common.expression_cache import compiled_expressions
 
 logger = logging.getLogger(__name__)
 
+# SQL-like 比较运算符（按匹配顺序）
+_SQL_OPERATORS = [
+    (r">=", ">="),
+    (r"<=", "<="),
+    (r"=", "!="),
+    (r">", ">"),
+    (r"<", "<"),
+    (r"=", "=="),
+]
+
 
 class ConditionParseError(Exception):
     """条件表达式解析错误"""
@@ -110,23 +126,47 @@ class ConditionEvaluator:
         """
         if not expression:
             return None
+        return self._compiled_runner(expression)(context)
+
+    def evaluate_many(self, expression: str, contexts: Iterable[Dict[str, Any]]) -> List[Any]:
+        """
+        同一表达式批量评估多个上下文（表达式只解析/编译一次）
 
-        # 检测表达式类型
+        Args:
+            expression: 表达式字符串
+            contexts: 上下文数据序列
+
+        Returns:
+            与 contexts 顺序一致的评估结果列表
+        """
+        contexts = list(contexts)
+        if not expression:
+            return [None] * len(contexts)
+        run = self._compiled_runner(expression)
+        return [run(context) for context in contexts]
+
+    def _compiled_runner(self, expression: str) -> Callable[[Dict[str, Any]], Any]:
+        """检测表达式类型，取出（或编译）编译结果，返回评估函数"""
         if "{{" in expression or "{%" in expression:
             # Jinja2模板语法
-            return self._evaluate_jinja2(expression, context)
+            template = self._compile_jinja2(expression)
+            return lambda context: self._render_jinja2(template, context)
         elif expression.startswith("{") and expression.endswith("}"):
             # 简单条件JSON
-            try:
-                import json
-
-                condition_dict = json.loads(expression)
-                return self._evaluate_simple_conditions(condition_dict, context)
-            except json.JSONDecodeError as e:
-                raise ConditionParseError(f"JSON格式错误: {e}")
+            condition_dict = compiled_expressions.get_or_compile(
+                ("json", expression), lambda: self._load_json_conditions(expression)
+            )
+            return lambda context: self._evaluate_simple_conditions(condition_dict, context)
         else:
             # SQL-like表达式
-            return self._evaluate_sql_like(expression, context)
+            return self._sql_like_runner(expression)
+
+    @staticmethod
+    def _load_json_conditions(expression: str) -> Dict[str, Any]:
+        try:
+            return json.loads(expression)
+        except json.JSONDecodeError as e:
+            raise ConditionParseError(f"JSON格式错误: {e}")
 
     def _evaluate_jinja2(self, expression: str, context: Dict[str, Any]) -> Any:
         """
@@ -140,11 +180,26 @@ class ConditionEvaluator:
         - {{ today() }}  # 如果注册了today函数
         - {{ items | count_by("status", "DONE") }}
         """
+        return self._render_jinja2(self._compile_jinja2(expression), context)
+
+    def _compile_jinja2(self, expression: str):
+        """编译Jinja2模板（按表达式文本缓存）"""
         if self._jinja_env is None:
             raise ConditionParseError("未安装 jinja2 依赖，无法解析模板表达式")
 
         try:
-            template = self._jinja_env.from_string(expression)
+            return compiled_expressions.get_or_compile(
+                ("jinja2", expression), lambda: self._jinja_env.from_string(expression)
+            )
+        except TemplateSyntaxError as e:
+            raise ConditionParseError(f"Jinja2语法错误: {e}")
+        except Exception as e:
+            logger.error(f"Jinja2表达式编译失败: {e}")
+            raise ConditionParseError(f"表达式评估失败: {e}")
+
+    def _render_jinja2(self, template, context: Dict[str, Any]) -> Any:
+        """渲染已编译的模板，结果尽量转换为数值"""
+        try:
             result = template.render(**context)
             # 尝试转换为数值类型
             try:
@@ -155,8 +210,6 @@ class ConditionEvaluator:
             except (ValueError, TypeError):
                 # 返回字符串
                 return result
-        except TemplateSyntaxError as e:
-            raise ConditionParseError(f"Jinja2语法错误: {e}")
         except Exception as e:
             logger.error(f"Jinja2表达式评估失败: {e}")
             raise ConditionParseError(f"表达式评估失败: {e}")
@@ -352,13 +405,31 @@ class ConditionEvaluator:
         """
         if not expression:
             return True
+        return self._sql_like_runner(expression)(context)
+
+    def _sql_like_runner(self, expression: str) -> Callable[[Dict[str, Any]], Any]:
+        """编译SQL-like表达式（按文本缓存），解析/评估失败时降级到Jinja2直接评估"""
+
+        def fallback(context: Dict[str, Any]) -> Any:
+            return self._evaluate_jinja2(f"{{{{{expression}}}}}", context)
 
         try:
-            return self._parse_sql_expression(expression, context)
+            compiled = compiled_expressions.get_or_compile(
+                ("sql", expression), lambda: self._compile_sql_expression(expression)
+            )
         except Exception as e:
             logger.error(f"SQL-like表达式解析失败: {e}")
-            # 降级到直接评估
-            return self._evaluate_jinja2(f"{{{{{expression}}}}}", context)
+            return fallback
+
+        def run(context: Dict[str, Any]) -> Any:
+            try:
+                return self._run_sql_expression(compiled, context)
+            except Exception as e:
+                logger.error(f"SQL-like表达式解析失败: {e}")
+                # 降级到直接评估
+                return fallback(context)
+
+        return run
 
     def _parse_sql_expression(self, expression: str, context: Dict[str, Any]) -> bool:
         """
@@ -366,6 +437,14 @@ class ConditionEvaluator:
 
         将表达式转换为简单条件JSON格式
         """
+        return self._run_sql_expression(self._compile_sql_expression(expression), context)
+
+    def _compile_sql_expression(self, expression: str) -> Tuple[str, List[Tuple]]:
+        """
+        把SQL-like表达式编译为 (逻辑运算, [条件结构])
+
+        逻辑运算为 AND / OR / SINGLE，条件结构见 _compile_sql_condition
+        """
         # 标准化：去除多余空格，统一关键字大小写
         expr = expression.strip().replace("\n", " ")
 
@@ -376,15 +455,23 @@ class ConditionEvaluator:
 
         if and_parts:
             # AND逻辑
-            items = [self._parse_sql_condition(part.strip(), context) for part in and_parts]
-            return all(items)
+            return "AND", [self._compile_sql_condition(part.strip()) for part in and_parts]
         elif or_parts:
             # OR逻辑
-            items = [self._parse_sql_condition(part.strip(), context) for part in or_parts]
-            return any(items)
+            return "OR", [self._compile_sql_condition(part.strip()) for part in or_parts]
         else:
             # 单个条件
-            return self._parse_sql_condition(expr, context)
+            return "SINGLE", [self._compile_sql_condition(expr)]
+
+    def _run_sql_expression(
+        self, compiled: Tuple[str, List[Tuple]], context: Dict[str, Any]
+    ) -> bool:
+        """评估编译后的SQL-like表达式"""
+        logic, conditions = compiled
+        items = [self._run_sql_condition(condition, context) for condition in conditions]
+        if logic == "OR":
+            return any(items)
+        return all(items)
 
     def _split_by_operator(self, expr: str, op1: str, op2: str) -> List[str]:
         """按逻辑运算符分割表达式"""
@@ -408,17 +495,25 @@ class ConditionEvaluator:
         - field IS NULL
         - field IS NOT NULL
         """
+        return self._run_sql_condition(self._compile_sql_condition(condition), context)
+
+    def _compile_sql_condition(self, condition: str) -> Tuple:
+        """
+        把单个SQL条件编译为条件结构
+
+        - ("not_null", field) / ("null", field)
+        - ("in", field, values)
+        - ("between", field, min_val, max_val)
+        - ("compare", field, op, value)
+        - ("invalid", condition)：无法解析，评估结果为 False
+        """
         condition = condition.strip()
 
         # 处理 IS NULL / IS NOT NULL
         if " IS NOT NULL" in condition.upper():
-            field = condition.replace(" IS NOT NULL", "").strip()
-            actual = self._get_field_value(field, context)
-            return actual is not None
+            return ("not_null", condition.replace(" IS NOT NULL", "").strip())
         elif " IS NULL" in condition.upper():
-            field = condition.replace(" IS NULL", "").strip()
-            actual = self._get_field_value(field, context)
-            return actual is None
+            return ("null", condition.replace(" IS NULL", "").strip())
 
         # 处理 IN
         in_match = re.match(r"(.+?)\s+IN\s*\((.*?)\)", condition, re.IGNORECASE)
@@ -427,11 +522,7 @@ class ConditionEvaluator:
             values_str = in_match.group(2).strip()
             # 解析值列表
             values = [v.strip() for v in values_str.split(",")]
-            actual = self._get_field_value(field, context)
-            try:
-                return actual in values
-            except TypeError:
-                return str(actual) in values
+            return ("in", field, values)
 
         # 处理 BETWEEN
         between_match = re.match(r"(.+?)\s+BETWEEN\s+(.+?)\s+AND\s+(.+)", condition, re.IGNORECASE)
@@ -439,35 +530,45 @@ class ConditionEvaluator:
             field = between_match.group(1).strip()
             min_val = self._parse_value(between_match.group(2).strip())
             max_val = self._parse_value(between_match.group(3).strip())
-            actual = self._get_field_value(field, context)
-            try:
-                return min_val <= actual <= max_val
-            except TypeError:
-                return False
+            return ("between", field, min_val, max_val)
 
         # 处理比较运算符
-        operators = [
-            (r">=", ">="),
-            (r"<=", "<="),
-            (r"=", "!="),
-            (r">", ">"),
-            (r"<", "<"),
-            (r"=", "=="),
-        ]
-
-        for op_pattern, op_name in operators:
+        for op_pattern, op_name in _SQL_OPERATORS:
             # 使用正则查找运算符
             op_regex = re.escape(op_pattern)
             match = re.match(rf"(.+?)\s*{op_regex}\s*(.+)", condition, re.IGNORECASE)
             if match:
                 field = match.group(1).strip()
                 value = self._parse_value(match.group(2).strip())
-                actual = self._get_field_value(field, context)
-                return self._compare_values(actual, op_name, value)
+                return ("compare", field, op_name, value)
 
-        # 无法解析，直接返回False
+        # 无法解析
         logger.warning(f"无法解析条件: {condition}")
-        return False
+        return ("invalid", condition)
+
+    def _run_sql_condition(self, compiled: Tuple, context: Dict[str, Any]) -> bool:
+        """评估编译后的单个SQL条件"""
+        kind = compiled[0]
+        if kind == "invalid":
+            return False
+
+        actual = self._get_field_value(compiled[1], context)
+        if kind == "not_null":
+            return actual is not None
+        if kind == "null":
+            return actual is None
+        if kind == "in":
+            values = compiled[2]
+            try:
+                return actual in values
+            except TypeError:
+                return str(actual) in values
+        if kind == "between":
+            try:
+                return compiled[2] <= actual <= compiled[3]
+            except TypeError:
+                return False
+        return self._compare_values(actual, compiled[2], compiled[3])
 
     def _parse_value(self, value_str: str) -> Any:
         """
@@ -4,6 +4,10 @@
 
 提供 Redis + 内存降级的通用缓存服务。当 Redis 不可用时自动降级到内存缓存。
 
+两级缓存：使用进程共享的 Redis 客户端时，读取先查进程内一级缓存（app.services.local_cache），
+写入/删除通过 Redis pub/sub 通知其他 worker 清理本地副本。
+批量失效使用标签版本（键后附加标签版本号，失效时 INCR 版本），不再扫描键。
+
 缓存系统架构说明：
 - 本模块 (CacheService): 通用缓存服务，支持 Redis + 内存降级。
  被 permission_cache_service 等上层服务使用。
@@ -19,8 +23,11 @@ Issue 5.3: 实现项目数据的缓存机制，提升系统响应速度
 import hashlib
 import json
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from app.services.local_cache import NamespaceStats, get_local_tier
 
 # 尝试导入Redis（可选）
 try:
@@ -32,6 +39,21 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 标签版本键前缀
+TAG_VERSION_PREFIX = "cache:tag:"
+# 标签版本键 TTL（写入带标签的条目时刷新，须长于条目 TTL，避免版本归零后复用旧版本号）
+TAG_VERSION_TTL = 7 * 24 * 3600
+
+# 项目缓存标签（"project" 覆盖全部项目缓存）
+PROJECT_TAG = "project"
+PROJECT_DETAIL_TAGS = (PROJECT_TAG,)
+PROJECT_LIST_TAGS = (PROJECT_TAG, "project:list")
+PROJECT_STATISTICS_TAGS = (PROJECT_TAG, "project:statistics")
+
+
+# _get 未预取 Redis 值的标记
+_NOT_FETCHED = object()
+
 
 class CacheService:
     """项目数据缓存服务"""
@@ -44,6 +66,7 @@ class CacheService:
             redis_client: Redis客户端（可选，如果不提供则尝试从工具获取）
         """
         # Sprint 5.3: 完善Redis配置 - 优先使用传入的客户端，否则尝试从工具获取
+        shared_client = redis_client is None
         if redis_client is None:
             try:
                 from app.utils.redis_client import get_redis_client
@@ -55,11 +78,22 @@ class CacheService:
 
         self.redis_client = redis_client
         self.memory_cache: Dict[str, tuple] = {}  # 内存缓存：{key: (value, expire_at)}
+        self._memory_tags: Dict[str, set] = {}  # 内存缓存标签索引：{tag: {key}}
+        self._version_hints: Dict[str, int] = {}  # 最近读到的标签版本（无一级缓存时预取用）
         self.use_redis = REDIS_AVAILABLE and redis_client is not None
 
+        # 一级缓存只挂在进程共享的客户端上（注入的客户端保持直连语义）
+        self._local = get_local_tier(redis_client) if self.use_redis and shared_client else None
+        self.namespace_stats = self._local.stats if self._local is not None else NamespaceStats()
+
         # Sprint 5.3: 缓存统计
         self.stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "errors": 0}
 
+    def _active_local(self):
+        """可用的一级缓存（订阅离线时旁路）"""
+        local = self._local
+        return local if local is not None and local.active else None
+
     def _generate_cache_key(self, prefix: str, **kwargs) -> str:
         """
         生成缓存键
@@ -86,12 +120,30 @@ class CacheService:
         Returns:
             Any: 缓存值，如果不存在或已过期则返回None
         """
+        return self._get(key)
+
+    def _get(self, key: str, prefetched: Any = _NOT_FETCHED) -> Optional[Any]:
+        """读取缓存（prefetched 为已在管道中取回的 Redis 值）"""
+        started = time.perf_counter()
+        local = self._active_local()
+        if local is not None:
+            raw = local.cache.get(key)
+            if raw is not None:
+                self.stats["hits"] += 1
+                self.namespace_stats.record_read(key, "l1_hits", time.perf_counter() - started)
+                return json.loads(raw)
+
         if self.use_redis:
             try:
-                value = self.redis_client.get(key)
+                generation = local.cache.generation if local is not None else None
+                value = self.redis_client.get(key) if prefetched is _NOT_FETCHED else prefetched
                 if value:
                     self.stats["hits"] += 1
-                    return json.loads(value)
+                    result = json.loads(value)
+                    if local is not None:
+                        local.cache.set(key, value, generation=generation)
+                    self.namespace_stats.record_read(key, "l2_hits", time.perf_counter() - started)
+                    return result
                 else:
                     self.stats["misses"] += 1
             except Exception as e:
@@ -104,6 +156,7 @@ class CacheService:
             value, expire_at = self.memory_cache[key]
             if expire_at is None or datetime.now() < expire_at:
                 self.stats["hits"] += 1
+                self.namespace_stats.record_read(key, "memory_hits", time.perf_counter() - started)
                 return value
             else:
                 # 已过期，删除
@@ -112,9 +165,12 @@ class CacheService:
         else:
             self.stats["misses"] += 1
 
+        self.namespace_stats.record_read(key, "misses", time.perf_counter() - started)
         return None
 
-    def set(self, key: str, value: Any, expire_seconds: int = 300) -> bool:
+    def set(
+        self, key: str, value: Any, expire_seconds: int = 300, tags: Iterable[str] = ()
+    ) -> bool:
         """
         设置缓存值
 
@@ -122,6 +178,7 @@ class CacheService:
             key: 缓存键
             value: 缓存值
             expire_seconds: 过期时间（秒），默认5分钟
+            tags: 标签（invalidate_tags 时一并清除本地副本）
 
         Returns:
             bool: 是否设置成功
@@ -129,11 +186,25 @@ class CacheService:
         expire_at = (
             datetime.now() + timedelta(seconds=expire_seconds) if expire_seconds > 0 else None
         )
+        tags = tuple(tags)
+        self.namespace_stats.record(key, "sets")
 
         if self.use_redis:
             try:
-                self.redis_client.setex(key, expire_seconds, json.dumps(value, default=str))
+                raw = json.dumps(value, default=str)
+                if tags:
+                    # 同一往返刷新标签版本键 TTL，版本键始终比其下的条目存活更久
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.setex(key, expire_seconds, raw)
+                    for tag in tags:
+                        pipe.expire(TAG_VERSION_PREFIX + tag, max(TAG_VERSION_TTL, expire_seconds))
+                    pipe.execute()
+                else:
+                    self.redis_client.setex(key, expire_seconds, raw)
                 self.stats["sets"] += 1
+                if self._local is not None:
+                    self._local.bus.publish("key", key)
+                    self._local.cache.set(key, raw, expire_seconds, tags)
                 return True
             except Exception as e:
                 # Redis失败时降级到内存缓存
@@ -142,6 +213,8 @@ class CacheService:
 
         # 内存缓存
         self.memory_cache[key] = (value, expire_at)
+        for tag in tags:
+            self._memory_tags.setdefault(tag, set()).add(key)
         self.stats["sets"] += 1
         return True
 
@@ -156,6 +229,10 @@ class CacheService:
             bool: 是否删除成功
         """
         deleted = False
+        self.namespace_stats.record(key, "deletes")
+        if self._local is not None:
+            self._local.apply("key", key)
+            self._local.bus.publish("key", key)
         if self.use_redis:
             try:
                 self.redis_client.delete(key)
@@ -176,6 +253,8 @@ class CacheService:
         """
         按模式删除缓存（支持通配符）
 
+        需要扫描键，批量失效优先使用 invalidate_tags。
+
         Args:
             pattern: 模式（如 "project:*"）
 
@@ -183,6 +262,10 @@ class CacheService:
             int: 删除的缓存数量
         """
         deleted_count = 0
+        if self._local is not None:
+            prefix = pattern.split("*", 1)[0]
+            self._local.apply("prefix", prefix)
+            self._local.bus.publish("prefix", prefix)
 
         if self.use_redis:
             try:
@@ -209,6 +292,9 @@ class CacheService:
         Returns:
             bool: 是否清空成功
         """
+        if self._local is not None:
+            self._local.apply("clear", None)
+            self._local.bus.publish("clear")
         if self.use_redis:
             try:
                 self.redis_client.flushdb()
@@ -216,60 +302,165 @@ class CacheService:
                 logger.debug("Redis flushdb 失败，已忽略", exc_info=True)
 
         self.memory_cache.clear()
+        self._memory_tags.clear()
         return True
 
+    # ==================== 标签版本失效 ====================
+
+    def _tag_versions(self, tags: Sequence[str]) -> Dict[str, int]:
+        """读取标签版本（一级缓存命中时不访问 Redis）"""
+        local = self._active_local()
+        versions = local.get_versions(tuple(tags)) if local is not None else {}
+        missing = [t for t in tags if t not in versions]
+        if missing:
+            generation = local.cache.generation if local is not None else None
+            try:
+                values = self.redis_client.mget([TAG_VERSION_PREFIX + t for t in missing])
+                loaded = {t: int(v or 0) for t, v in zip(missing, values)}
+            except Exception:
+                logger.debug("读取缓存标签版本失败，按初始版本处理", exc_info=True)
+                loaded = {}
+            versions.update(loaded)
+            if local is not None and loaded:
+                local.remember_versions(loaded, generation)
+            self._version_hints.update(loaded)
+        return versions
+
+    @staticmethod
+    def _versioned_key(key: str, tags: Sequence[str], versions: Dict[str, int]) -> str:
+        return f"{key}@{'.'.join(str(versions.get(t, 0)) for t in tags)}"
+
+    def tagged_key(self, key: str, tags: Sequence[str]) -> str:
+        """
+        为缓存键附加标签版本
+
+        标签失效时版本递增，旧版本的键不再被读到，由 TTL 自然淘汰。
+        内存模式下失效直接清除条目，键保持不变。
+        """
+        if not tags or not self.use_redis:
+            return key
+        return self._versioned_key(key, tags, self._tag_versions(tags))
+
+    def get_tagged(self, key: str, tags: Sequence[str]) -> Optional[Any]:
+        """
+        读取带标签版本的缓存
+
+        没有一级缓存（注入的客户端）时，按最近读到的版本预取值，与标签版本在同一个管道中读取；
+        版本未变化则一次往返完成，已变化再按新版本读取。
+        """
+        if not tags or not self.use_redis or self._active_local() is not None:
+            return self.get(self.tagged_key(key, tags))
+
+        hint = {t: self._version_hints.get(t, 0) for t in tags}
+        guess = self._versioned_key(key, tags, hint)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.mget([TAG_VERSION_PREFIX + t for t in tags])
+            pipe.get(guess)
+            values, raw = pipe.execute()
+            versions = {t: int(v or 0) for t, v in zip(tags, values)}
+        except Exception:
+            logger.debug("管道读取缓存标签版本失败，改为逐步读取", exc_info=True)
+            return self.get(self.tagged_key(key, tags))
+
+        self._version_hints.update(versions)
+        if versions != hint:
+            return self.get(self._versioned_key(key, tags, versions))
+        return self._get(guess, prefetched=raw)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        使标签下的所有缓存失效（标签同时覆盖以 "标签:" 开头的键）
+
+        Returns:
+            int: 清除的本地条目数（Redis 中的旧版本键由 TTL 淘汰）
+        """
+        removed = 0
+        if self.use_redis:
+            versions = {}
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.incr(TAG_VERSION_PREFIX + tag)
+                    pipe.expire(TAG_VERSION_PREFIX + tag, TAG_VERSION_TTL)
+                results = pipe.execute()
+                versions = {tag: int(v) for tag, v in zip(tags, results[::2])}
+                self._version_hints.update(versions)
+            except Exception as e:
+                logger.warning(f"递增缓存标签版本失败: {e}")
+                self.stats["errors"] += 1
+            if self._local is not None:
+                removed += self._local.apply("tags", list(tags))
+                self._local.remember_versions(versions)
+                self._local.bus.publish("tags", list(tags))
+
+        for tag in tags:
+            prefix = f"{tag}:"
+            keys = self._memory_tags.pop(tag, set())
+            keys.update(k for k in self.memory_cache if k.startswith(prefix))
+            removed += sum(1 for k in keys if self.memory_cache.pop(k, None) is not None)
+        return removed
+
     # ==================== 项目相关缓存方法 ====================
 
+    def _project_detail_key(self, project_id: int) -> str:
+        return self.tagged_key(f"project:detail:{project_id}", PROJECT_DETAIL_TAGS)
+
     def get_project_detail(self, project_id: int) -> Optional[Dict[str, Any]]:
         """获取项目详情缓存"""
-        key = f"project:detail:{project_id}"
-        return self.get(key)
+        return self.get_tagged(f"project:detail:{project_id}", PROJECT_DETAIL_TAGS)
 
     def set_project_detail(
         self, project_id: int, data: Dict[str, Any], expire_seconds: int = 600
     ) -> bool:
         """设置项目详情缓存（默认10分钟）"""
-        key = f"project:detail:{project_id}"
-        return self.set(key, data, expire_seconds)
+        key = self._project_detail_key(project_id)
+        return self.set(key, data, expire_seconds, tags=PROJECT_DETAIL_TAGS)
 
     def invalidate_project_detail(self, project_id: int) -> bool:
         """使项目详情缓存失效"""
-        key = f"project:detail:{project_id}"
-        return self.delete(key)
+        return self.delete(self._project_detail_key(project_id))
 
     def get_project_list(self, **filters) -> Optional[Dict[str, Any]]:
         """获取项目列表缓存"""
         key = self._generate_cache_key("project:list", **filters)
-        return self.get(key)
+        return self.get_tagged(key, PROJECT_LIST_TAGS)
 
     def set_project_list(self, data: Dict[str, Any], expire_seconds: int = 300, **filters) -> bool:
         """设置项目列表缓存（默认5分钟）"""
         key = self._generate_cache_key("project:list", **filters)
-        return self.set(key, data, expire_seconds)
+        return self.set(
+            self.tagged_key(key, PROJECT_LIST_TAGS), data, expire_seconds, tags=PROJECT_LIST_TAGS
+        )
 
     def invalidate_project_list(self) -> int:
         """使所有项目列表缓存失效"""
-        return self.delete_pattern("project:list:*")
+        return self.invalidate_tags("project:list")
 
     def get_project_statistics(self, **filters) -> Optional[Dict[str, Any]]:
         """获取项目统计缓存"""
         key = self._generate_cache_key("project:statistics", **filters)
-        return self.get(key)
+        return self.get_tagged(key, PROJECT_STATISTICS_TAGS)
 
     def set_project_statistics(
         self, data: Dict[str, Any], expire_seconds: int = 600, **filters
     ) -> bool:
         """设置项目统计缓存（默认10分钟）"""
         key = self._generate_cache_key("project:statistics", **filters)
-        return self.set(key, data, expire_seconds)
+        return self.set(
+            self.tagged_key(key, PROJECT_STATISTICS_TAGS),
+            data,
+            expire_seconds,
+            tags=PROJECT_STATISTICS_TAGS,
+        )
 
     def invalidate_project_statistics(self) -> int:
         """使所有项目统计缓存失效"""
-        return self.delete_pattern("project:statistics:*")
+        return self.invalidate_tags("project:statistics")
 
     def invalidate_all_project_cache(self) -> int:
         """使所有项目相关缓存失效"""
-        return self.delete_pattern("project:*")
+        return self.invalidate_tags(PROJECT_TAG)
 
     # ==================== Sprint 5.3: 缓存统计和监控 ====================
 
@@ -293,11 +484,24 @@ class CacheService:
             "hit_rate": round(hit_rate, 2),
             "cache_type": "redis" if self.use_redis else "memory",
             "memory_cache_size": len(self.memory_cache),
+            "local_cache": (
+                {
+                    "enabled": True,
+                    "active": self._local.active,
+                    "size": len(self._local.cache),
+                    "max_size": self._local.cache.max_size,
+                    "ttl": self._local.cache.default_ttl,
+                }
+                if self._local is not None
+                else {"enabled": False}
+            ),
+            "namespaces": self.namespace_stats.snapshot(),
         }
 
     def reset_stats(self) -> None:
         """重置缓存统计"""
         self.stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "errors": 0}
+        self.namespace_stats.reset()
 
     def get_redis_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -70,6 +70,27 @@ class ChannelHandler(ABC):
         """发送通知"""
         pass
 
+    def send_batch(self, requests: List[NotificationRequest]) -> List[NotificationResult]:
+        """批量发送通知，结果与 requests 一一对应；子类可合并为一次调用"""
+        results = []
+        for request in requests:
+            try:
+                results.append(self.send(request))
+            except Exception as e:
+                self.logger.error(f"渠道{self.channel}发送失败: {e}")
+                results.append(
+                    NotificationResult(channel=self.channel, success=False, error_message=str(e))
+                )
+        return results
+
+    def _load_recipients(self, requests: List[NotificationRequest]) -> Dict[int, Any]:
+        """批量加载接收人，返回 {用户ID: User}"""
+        from app.models.user import User
+
+        recipient_ids = list({request.recipient_id for request in requests})
+        users = self.db.query(User).filter(User.id.in_(recipient_ids)).all()
+        return {user.id: user for user in users}
+
     def is_enabled(self) -> bool:
         """检查渠道是否启用"""
         return True
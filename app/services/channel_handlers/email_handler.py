@@ -9,6 +9,7 @@ EmailNotificationHandler: 完整 SMTP 邮件处理器（预警通知系统使用
 """
 
 from datetime import datetime
+from typing import List
 
 from app.core.config import settings
 from app.models.user import User
@@ -42,5 +43,38 @@ class EmailChannelHandler(ChannelHandler):
             channel=self.channel, success=True, sent_at=datetime.now().isoformat()
         )
 
+    def send_batch(self, requests: List[NotificationRequest]) -> List[NotificationResult]:
+        """同一批接收人一次加载邮箱，相同标题的邮件合并为一次发送"""
+        if not self.is_enabled():
+            return [
+                NotificationResult(
+                    channel=self.channel, success=False, error_message="邮件功能未启用"
+                )
+                for _ in requests
+            ]
+
+        recipients = self._load_recipients(requests)
+        results = []
+        groups = {}
+        for request in requests:
+            recipient = recipients.get(request.recipient_id)
+            if not recipient or not recipient.email:
+                results.append(
+                    NotificationResult(
+                        channel=self.channel, success=False, error_message="用户未配置邮箱"
+                    )
+                )
+                continue
+            groups.setdefault((request.title, request.content), []).append(recipient.email)
+            results.append(
+                NotificationResult(
+                    channel=self.channel, success=True, sent_at=datetime.now().isoformat()
+                )
+            )
+
+        for (title, _), emails in groups.items():
+            self.logger.info(f"[邮件通知] 批量发送给 {len(emails)} 人: {title}")
+        return results
+
     def is_enabled(self) -> bool:
         return bool(settings.EMAIL_ENABLED)
@@ -4,6 +4,7 @@
 """
 
 from datetime import datetime
+from typing import List
 
 from app.models.notification import Notification
 from app.services.channel_handlers.base import (
@@ -18,7 +19,24 @@ class SystemChannelHandler(ChannelHandler):
     """站内通知处理器"""
 
     def send(self, request: NotificationRequest) -> NotificationResult:
-        notification = Notification(
+        save_obj(self.db, self._build_notification(request))
+        return NotificationResult(
+            channel=self.channel, success=True, sent_at=datetime.now().isoformat()
+        )
+
+    def send_batch(self, requests: List[NotificationRequest]) -> List[NotificationResult]:
+        """批量写入站内通知，一次提交"""
+        self.db.add_all([self._build_notification(request) for request in requests])
+        self.db.commit()
+        sent_at = datetime.now().isoformat()
+        return [
+            NotificationResult(channel=self.channel, success=True, sent_at=sent_at)
+            for _ in requests
+        ]
+
+    @staticmethod
+    def _build_notification(request: NotificationRequest) -> Notification:
+        return Notification(
             user_id=request.recipient_id,
             notification_type=request.notification_type,
             title=request.title,
@@ -29,7 +47,3 @@ class SystemChannelHandler(ChannelHandler):
             priority=request.priority,
             extra_data=request.extra_data or {},
         )
-        save_obj(self.db, notification)
-        return NotificationResult(
-            channel=self.channel, success=True, sent_at=datetime.now().isoformat()
-        )
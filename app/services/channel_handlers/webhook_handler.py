@@ -3,8 +3,9 @@
 Webhook通知处理器（钉钉、飞书等）
 """
 
+import json
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 try:
     import requests
@@ -51,6 +52,17 @@ class WebhookChannelHandler(ChannelHandler):
             self.logger.error(f"发送Webhook通知失败: {e}")
             return NotificationResult(channel=self.channel, success=False, error_message=str(e))
 
+    def send_batch(self, requests: List[NotificationRequest]) -> List[NotificationResult]:
+        """Webhook 推送到群，同一批内相同消息只推送一次"""
+        results = []
+        sent: Dict[str, NotificationResult] = {}
+        for request in requests:
+            key = json.dumps(self._build_message(request), sort_keys=True, ensure_ascii=False)
+            if key not in sent:
+                sent[key] = self.send(request)
+            results.append(sent[key])
+        return results
+
     def _build_message(self, request: NotificationRequest) -> Dict[str, Any]:
         if request.wechat_template:
             return request.wechat_template
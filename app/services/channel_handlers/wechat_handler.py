@@ -8,6 +8,9 @@ WeChatNotificationHandler: 完整企业微信处理器（预警通知系统使
 完整的 API/Webhook 实现在 notification_handlers/wechat_handler.py 中。
 """
 
+import json
+from datetime import datetime
+from typing import List
 
 from app.core.config import settings
 from app.models.user import User
@@ -21,6 +24,9 @@ from app.utils.wechat_client import WeChatClient
 
 __all__ = ["WeChatChannelHandler", "WeChatNotificationHandler"]
 
+# 企业微信单次发送的接收人上限
+MAX_TOUSER = 1000
+
 
 class WeChatChannelHandler(ChannelHandler):
     """企业微信通知处理器"""
@@ -63,5 +69,60 @@ class WeChatChannelHandler(ChannelHandler):
             self.logger.error(f"企业微信发送消息失败: {e}")
             return NotificationResult(channel=self.channel, success=False, error_message=str(e))
 
+    def send_batch(self, requests: List[NotificationRequest]) -> List[NotificationResult]:
+        """相同消息内容的接收人合并为一次企业微信调用（每次至多 MAX_TOUSER 人）"""
+        if not self.is_enabled():
+            return [
+                NotificationResult(
+                    channel=self.channel, success=False, error_message="企业微信功能未启用"
+                )
+                for _ in requests
+            ]
+
+        recipients = self._load_recipients(requests)
+        results: List[NotificationResult] = [None] * len(requests)
+        groups = {}
+        for i, request in enumerate(requests):
+            recipient = recipients.get(request.recipient_id)
+            if not recipient or not recipient.wechat_userid:
+                results[i] = NotificationResult(
+                    channel=self.channel, success=False, error_message="用户未绑定企业微信ID"
+                )
+                continue
+            message = self._build_message(request)
+            key = json.dumps(message, sort_keys=True, ensure_ascii=False)
+            groups.setdefault(key, (message, request.wechat_template is not None, []))
+            groups[key][2].append((i, recipient.wechat_userid))
+
+        client = WeChatClient() if groups else None
+        for message, is_template, members in groups.values():
+            for start in range(0, len(members), MAX_TOUSER):
+                chunk = members[start : start + MAX_TOUSER]
+                user_ids = [user_id for _, user_id in chunk]
+                try:
+                    if is_template:
+                        success = client.send_template_card(user_ids, message)
+                    else:
+                        success = client.send_message(user_ids, message)
+                    error = None if success else "企业微信发送失败"
+                except Exception as e:
+                    self.logger.error(f"企业微信批量发送消息失败: {e}")
+                    success, error = False, str(e)
+                sent_at = datetime.now().isoformat() if success else None
+                for i, _ in chunk:
+                    results[i] = NotificationResult(
+                        channel=self.channel, success=success, error_message=error, sent_at=sent_at
+                    )
+        return results
+
+    @staticmethod
+    def _build_message(request: NotificationRequest):
+        if request.wechat_template:
+            return request.wechat_template.get("template_card", {})
+        return {
+            "msgtype": "text",
+            "text": {"content": f"【{request.title}】\n{request.content}"},
+        }
+
     def is_enabled(self) -> bool:
         return bool(settings.WECHAT_ENABLED)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+关键路径法(CPM)计算引擎
+
+依赖关系只解析一次，按任务下标构建前驱/后继邻接表；正向、反向计算都沿
+Kahn 拓扑序进行，复杂度 O(V+E)。支持 FS/SS/FF/SF 依赖类型和滞后天数
+（负数表示提前），并检测循环依赖。
+"""
+
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_TYPES = ("FS", "SS", "FF", "SF")
+
+# 输出保留的小数位，避免浮点误差让关键任务的浮动时间不为 0
+_PRECISION = 6
+
+
+class DependencyCycleError(ValueError):
+    """任务依赖存在循环"""
+
+    def __init__(self, task_ids: List[Hashable]):
+        self.task_ids = task_ids
+        super().__init__(f"任务依赖存在循环: {task_ids}")
+
+
+def parse_dependencies(raw: Any) -> List[Tuple[Hashable, str, float]]:
+    """
+    解析任务依赖
+
+    支持 JSON 字符串或已反序列化的列表，元素可以是
+    {"task_id": 1, "type": "FS", "lag": 2} 或直接的任务ID；格式错误时返回空列表。
+
+    Returns:
+        [(前置任务ID, 依赖类型, 滞后天数)]
+    """
+    if not raw:
+        return []
+    if isinstance(raw, (str, bytes)):
+        try:
+            raw = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(raw, list):
+        return []
+
+    dependencies = []
+    for dep in raw:
+        if isinstance(dep, dict):
+            task_id = dep.get("task_id")
+            dep_type = str(dep.get("type") or "FS").upper()
+            lag = dep.get("lag", dep.get("lag_days")) or 0
+        else:
+            task_id, dep_type, lag = dep, "FS", 0
+        if task_id is None or isinstance(task_id, (dict, list)):
+            continue
+        if dep_type not in DEPENDENCY_TYPES:
+            dep_type = "FS"
+        try:
+            lag = float(lag)
+        except (TypeError, ValueError):
+            lag = 0.0
+        dependencies.append((task_id, dep_type, lag))
+    return dependencies
+
+
+@dataclass
+class CPMResult:
+    """CPM 计算结果，各字典均以任务ID为键"""
+
+    es: Dict[Hashable, float]
+    ef: Dict[Hashable, float]
+    ls: Dict[Hashable, float]
+    lf: Dict[Hashable, float]
+    slack: Dict[Hashable, float]
+    total_duration: float
+    order: List[Hashable]
+    # 处于环上或被环阻塞的任务（非严格模式下强制断环计算）
+    cycle_task_ids: List[Hashable] = field(default_factory=list)
+
+    @property
+    def critical_ids(self) -> List[Hashable]:
+        """按拓扑序返回浮动时间为 0 的任务"""
+        return [task_id for task_id in self.order if self.slack[task_id] <= 0]
+
+
+class CPMGraph:
+    """CPM 依赖图：任务按下标编号，前驱/后继以邻接表保存"""
+
+    def __init__(self, task_ids: Iterable[Hashable], durations: Iterable[Any]):
+        self.ids = list(task_ids)
+        self.durations = [float(d or 0) for d in durations]
+        if len(self.durations) != len(self.ids):
+            raise ValueError("任务ID与工期数量不一致")
+        self.index = {task_id: i for i, task_id in enumerate(self.ids)}
+        # preds[i] / succs[i]: [(对端下标, 依赖类型, 滞后天数)]
+        self.preds: List[List[Tuple[int, str, float]]] = [[] for _ in self.ids]
+        self.succs: List[List[Tuple[int, str, float]]] = [[] for _ in self.ids]
+
+    @classmethod
+    def from_tasks(
+        cls,
+        tasks: Sequence[Any],
+        key: Callable[[Any], Hashable] = lambda t: t.id,
+        duration: Callable[[Any], Any] = lambda t: t.estimated_duration_days,
+        dependencies: Callable[[Any], Any] = lambda t: t.dependencies,
+    ) -> "CPMGraph":
+        """从任务对象构建依赖图，每个任务的依赖只解析一次"""
+        graph = cls([key(t) for t in tasks], [duration(t) for t in tasks])
+        for task in tasks:
+            task_id = key(task)
+            for pred_id, dep_type, lag in parse_dependencies(dependencies(task)):
+                graph.add_dependency(task_id, pred_id, dep_type, lag)
+        return graph
+
+    def add_dependency(
+        self, task_id: Hashable, predecessor_id: Hashable, dep_type: str = "FS", lag: float = 0
+    ) -> bool:
+        """添加依赖：task_id 依赖 predecessor_id；任一任务不在图中时忽略并返回 False"""
+        i = self.index.get(task_id)
+        p = self.index.get(predecessor_id)
+        if i is None or p is None:
+            return False
+        dep_type = dep_type if dep_type in DEPENDENCY_TYPES else "FS"
+        self.preds[i].append((p, dep_type, float(lag)))
+        self.succs[p].append((i, dep_type, float(lag)))
+        return True
+
+    def topological_order(self, strict: bool = True) -> Tuple[List[int], List[int]]:
+        """
+        Kahn 拓扑排序
+
+        Args:
+            strict: True 时遇到循环依赖抛出 DependencyCycleError；
+                    False 时按下标从小到大强制断环继续排序
+
+        Returns:
+            (拓扑序下标列表, 环上及被环阻塞的任务下标)
+        """
+        n = len(self.ids)
+        indegree = [len(p) for p in self.preds]
+        queued = [d == 0 for d in indegree]
+        queue = deque(i for i in range(n) if queued[i])
+        order: List[int] = []
+        blocked: List[int] = []
+        cursor = 0
+
+        while len(order) < n:
+            if not queue:
+                if not blocked:
+                    blocked = [i for i in range(n) if not queued[i]]
+                    if strict:
+                        raise DependencyCycleError([self.ids[i] for i in blocked])
+                # 断环：取下标最小的未入队任务
+                while queued[cursor]:
+                    cursor += 1
+                queued[cursor] = True
+                queue.append(cursor)
+
+            i = queue.popleft()
+            order.append(i)
+            for s, _, _ in self.succs[i]:
+                indegree[s] -= 1
+                if indegree[s] == 0 and not queued[s]:
+                    queued[s] = True
+                    queue.append(s)
+
+        return order, blocked
+
+    def compute(self, strict: bool = True) -> CPMResult:
+        """沿拓扑序正向计算 ES/EF、反向计算 LS/LF 及总时差"""
+        n = len(self.ids)
+        order, blocked = self.topological_order(strict)
+        position = [0] * n
+        for pos, i in enumerate(order):
+            position[i] = pos
+        d = self.durations
+
+        es = [0.0] * n
+        ef = [0.0] * n
+        for i in order:
+            start = 0.0
+            for p, dep_type, lag in self.preds[i]:
+                # 断环时跳过尚未计算的前置任务
+                if position[p] >= position[i]:
+                    continue
+                if dep_type == "FS":
+                    start = max(start, ef[p] + lag)
+                elif dep_type == "SS":
+                    start = max(start, es[p] + lag)
+                elif dep_type == "FF":
+                    start = max(start, ef[p] + lag - d[i])
+                else:  # SF
+                    start = max(start, es[p] + lag - d[i])
+            es[i] = start
+            ef[i] = start + d[i]
+
+        total = max(ef, default=0.0)
+
+        ls = [0.0] * n
+        lf = [0.0] * n
+        for i in reversed(order):
+            finish = total
+            for s, dep_type, lag in self.succs[i]:
+                if position[s] <= position[i]:
+                    continue
+                if dep_type == "FS":
+                    finish = min(finish, ls[s] - lag)
+                elif dep_type == "SS":
+                    finish = min(finish, ls[s] - lag + d[i])
+                elif dep_type == "FF":
+                    finish = min(finish, lf[s] - lag)
+                else:  # SF
+                    finish = min(finish, lf[s] - lag + d[i])
+            lf[i] = finish
+            ls[i] = finish - d[i]
+
+        def by_id(values: List[float]) -> Dict[Hashable, float]:
+            return {self.ids[i]: round(values[i], _PRECISION) for i in range(n)}
+
+        result_es, result_ls = by_id(es), by_id(ls)
+        return CPMResult(
+            es=result_es,
+            ef=by_id(ef),
+            ls=result_ls,
+            lf=by_id(lf),
+            slack={k: round(result_ls[k] - result_es[k], _PRECISION) for k in result_es},
+            total_duration=round(total, _PRECISION),
+            order=[self.ids[i] for i in order],
+            cycle_task_ids=[self.ids[i] for i in blocked],
+        )
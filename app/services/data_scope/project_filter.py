@@ -14,6 +14,7 @@ from app.models.organization import Department
 from app.models.project import Project
 from app.models.user import User
 
+from .scope_index import ProjectScopeIndexService
 from .user_scope import UserScopeService
 
 
@@ -43,8 +44,20 @@ class ProjectFilterService:
             all_projects = db.query(Project.id).filter(Project.is_active).all()
             return {p[0] for p in all_projects}
 
+        # 优先读取物化索引（新鲜时）
+        state = ProjectScopeIndexService.get_fresh_state(db, user)
+        if state is not None:
+            if state.data_scope == DataScopeEnum.ALL.value:
+                all_projects = db.query(Project.id).filter(Project.is_active).all()
+                return {p[0] for p in all_projects}
+            return ProjectScopeIndexService.get_indexed_project_ids(db, user.id)
+
         data_scope = UserScopeService.get_user_data_scope(db, user)
+        return ProjectFilterService._compute_accessible_project_ids(db, user, data_scope)
 
+    @staticmethod
+    def _compute_accessible_project_ids(db: Session, user: User, data_scope: str) -> Set[int]:
+        """按数据权限范围实时计算可访问项目ID（索引构建与降级路径共用）"""
         if data_scope == DataScopeEnum.ALL.value:
             # 全部可见
             all_projects = db.query(Project.id).filter(Project.is_active).all()
@@ -147,6 +160,15 @@ class ProjectFilterService:
         if user.is_superuser:
             return query
 
+        # 索引新鲜时使用半连接，避免拼接超长的字面量 IN 列表
+        state = ProjectScopeIndexService.get_fresh_state(db, user)
+        if state is not None:
+            if state.data_scope == DataScopeEnum.ALL.value:
+                subquery = ProjectScopeIndexService.active_projects_subquery()
+            else:
+                subquery = ProjectScopeIndexService.scope_subquery(user.id)
+            return query.filter(project_id_column.in_(subquery))
+
         accessible_ids = ProjectFilterService.get_accessible_project_ids(db, user)
 
         if accessible_ids:
@@ -162,6 +184,9 @@ class ProjectFilterService:
         """
         根据用户数据权限范围过滤项目查询
 
+        参与项目（PROJECT）与下属（SUBORDINATE）范围用 IN 子查询半连接，
+        索引新鲜时直接半连接物化索引，不再拼接字面量 ID 列表。
+
         Args:
             db: 数据库会话
             query: 项目查询对象
@@ -174,7 +199,12 @@ class ProjectFilterService:
         if user.is_superuser:
             return query
 
-        data_scope = UserScopeService.get_user_data_scope(db, user)
+        # 索引新鲜时直接复用物化的权限范围，免去角色解析
+        state = ProjectScopeIndexService.get_fresh_state(db, user)
+        if state is not None:
+            data_scope = state.data_scope
+        else:
+            data_scope = UserScopeService.get_user_data_scope(db, user)
 
         if data_scope == DataScopeEnum.ALL.value:
             # 全部可见，无需过滤
@@ -195,27 +225,27 @@ class ProjectFilterService:
             # 如果没有部门信息，降级为OWN
             return ProjectFilterService._filter_own_projects(query, user)
         elif data_scope == DataScopeEnum.SUBORDINATE.value:
-            # 下属项目可见：自己的项目 + 直接下属创建/负责的项目
-            subordinate_ids = UserScopeService.get_subordinate_ids(db, user.id)
-            # 包括自己和所有下属
-            allowed_user_ids = subordinate_ids | {user.id}
+            # 下属项目可见：自己的项目 + 直接下属创建/负责的项目（下属走半连接）
+            subordinates = UserScopeService.subordinate_subquery(user.id)
             return query.filter(
-                or_(Project.created_by.in_(allowed_user_ids), Project.pm_id.in_(allowed_user_ids))
+                or_(
+                    Project.created_by == user.id,
+                    Project.pm_id == user.id,
+                    Project.created_by.in_(subordinates),
+                    Project.pm_id.in_(subordinates),
+                )
             )
         elif data_scope == DataScopeEnum.PROJECT.value:
-            # 参与项目可见
-            user_project_ids = UserScopeService.get_user_project_ids(db, user.id)
+            # 参与项目可见：索引新鲜时半连接索引表，否则半连接项目成员表
+            if state is not None:
+                subquery = ProjectScopeIndexService.scope_subquery(user.id)
+            else:
+                subquery = UserScopeService.user_project_subquery(user.id)
+            query = query.filter(Project.id.in_(subquery))
             if project_ids:
                 # 取交集
-                allowed_ids = set(project_ids) & user_project_ids
-            else:
-                allowed_ids = user_project_ids
-
-            if allowed_ids:
-                return query.filter(Project.id.in_(allowed_ids))
-            else:
-                # 没有参与任何项目，返回空结果
-                return query.filter(Project.id == -1)  # 永远不匹配的条件
+                query = query.filter(Project.id.in_(project_ids))
+            return query
         else:  # OWN
             # 自己创建/负责的项目可见
             return ProjectFilterService._filter_own_projects(query, user)
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+数据权限范围索引
+
+把用户可访问的项目ID物化到 user_project_scopes 表：
+- 读：索引新鲜时用半连接（IN 子查询）过滤，不再重算权限范围
+- 写：ORM flush 事件按变更精确标记受影响用户的索引为过期
+  （项目成员、项目经理/创建人/部门变更、部门更名、汇报关系、角色变更）
+- 重建：定时任务批量重建过期/缺失的索引，并随写事务提交
+
+索引不新鲜时调用方降级到实时计算，结果与未启用索引时一致。
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import delete, event, insert, inspect as sa_inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.data_scope_index import UserProjectScope, UserScopeIndexState
+from app.models.enums import DataScopeEnum
+from app.models.organization import Department
+from app.models.project import Project, ProjectMember
+from app.models.user import Role, User, UserRole
+from app.utils.db_helpers import tables_exist
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectScopeIndexService:
+    """用户可访问项目索引服务"""
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """索引表是否存在"""
+        return tables_exist(
+            db, UserProjectScope.__tablename__, UserScopeIndexState.__tablename__
+        )
+
+    @staticmethod
+    def get_fresh_state(db: Session, user: User) -> Optional[UserScopeIndexState]:
+        """
+        获取用户的新鲜索引状态
+
+        Returns:
+            未过期且未超过最大存活时间的状态行；否则返回 None
+        """
+        if not settings.DATA_SCOPE_INDEX_ENABLED or not isinstance(user, User):
+            return None
+        if not ProjectScopeIndexService.is_available(db):
+            return None
+
+        row = db.execute(
+            select(
+                UserScopeIndexState.data_scope,
+                UserScopeIndexState.is_stale,
+                UserScopeIndexState.refreshed_at,
+            ).where(UserScopeIndexState.user_id == user.id)
+        ).first()
+        if row is None or row.is_stale:
+            return None
+
+        max_age = timedelta(seconds=settings.DATA_SCOPE_INDEX_MAX_AGE)
+        if row.refreshed_at is None or datetime.now() - row.refreshed_at > max_age:
+            return None
+        return row
+
+    @staticmethod
+    def scope_subquery(user_id: int):
+        """用户可访问项目ID子查询（用于半连接过滤）"""
+        return select(UserProjectScope.project_id).where(UserProjectScope.user_id == user_id)
+
+    @staticmethod
+    def active_projects_subquery():
+        """全部活跃项目ID子查询（ALL 权限范围）"""
+        return select(Project.id).where(Project.is_active)
+
+    @staticmethod
+    def get_indexed_project_ids(db: Session, user_id: int) -> Set[int]:
+        """读取索引中的项目ID集合"""
+        rows = db.execute(ProjectScopeIndexService.scope_subquery(user_id)).all()
+        return {r[0] for r in rows}
+
+    @staticmethod
+    def rebuild_user_index(db: Session, user: User) -> int:
+        """
+        重建单个用户的索引（不提交，由调用方提交）
+
+        Returns:
+            可访问项目数
+        """
+        from .project_filter import ProjectFilterService
+        from .user_scope import UserScopeService
+
+        data_scope = UserScopeService.get_user_data_scope(db, user)
+        if user.is_superuser or data_scope == DataScopeEnum.ALL.value:
+            # ALL 不物化，读取时直接半连接活跃项目
+            data_scope = DataScopeEnum.ALL.value
+            project_ids: Set[int] = set()
+        else:
+            project_ids = ProjectFilterService._compute_accessible_project_ids(
+                db, user, data_scope
+            )
+
+        db.execute(delete(UserProjectScope).where(UserProjectScope.user_id == user.id))
+        if project_ids:
+            db.execute(
+                insert(UserProjectScope),
+                [
+                    {"tenant_id": user.tenant_id, "user_id": user.id, "project_id": pid}
+                    for pid in project_ids
+                ],
+            )
+
+        values = {
+            "tenant_id": user.tenant_id,
+            "data_scope": data_scope,
+            "project_count": len(project_ids),
+            "is_stale": False,
+            "refreshed_at": datetime.now(),
+        }
+        updated = db.execute(
+            update(UserScopeIndexState)
+            .where(UserScopeIndexState.user_id == user.id)
+            .values(**values)
+        ).rowcount
+        if not updated:
+            db.execute(insert(UserScopeIndexState).values(user_id=user.id, **values))
+
+        return len(project_ids)
+
+    @staticmethod
+    def refresh_indexes(db: Session, batch_size: int = 500) -> Dict[str, int]:
+        """
+        批量重建过期、超龄或缺失的索引（定时任务入口，不提交）
+
+        Returns:
+            {"rebuilt": 重建用户数, "failed": 失败用户数}
+        """
+        if not ProjectScopeIndexService.is_available(db):
+            return {"rebuilt": 0, "failed": 0}
+
+        expire_before = datetime.now() - timedelta(seconds=settings.DATA_SCOPE_INDEX_MAX_AGE)
+        fresh_user_ids = select(UserScopeIndexState.user_id).where(
+            UserScopeIndexState.is_stale.is_(False),
+            UserScopeIndexState.refreshed_at >= expire_before,
+        )
+        users = (
+            db.query(User)
+            .filter(User.is_active, User.id.notin_(fresh_user_ids))
+            .order_by(User.id)
+            .limit(batch_size)
+            .all()
+        )
+
+        rebuilt = failed = 0
+        for user in users:
+            try:
+                with db.begin_nested():
+                    ProjectScopeIndexService.rebuild_user_index(db, user)
+                rebuilt += 1
+            except Exception as e:
+                failed += 1
+                logger.warning(f"重建数据权限索引失败: user_id={user.id}, error={e}")
+        return {"rebuilt": rebuilt, "failed": failed}
+
+
+# ==================== 变更事件 → 标记过期 ====================
+
+
+def _changed(obj, *attrs: str) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[a].history.has_changes() for a in attrs)
+
+
+def _values(obj, attr: str) -> Set:
+    """属性的新旧值（过滤 None）"""
+    history = sa_inspect(obj).attrs[attr].history
+    values = set(history.added or ()) | set(history.deleted or ()) | set(history.unchanged or ())
+    return {v for v in values if v is not None}
+
+
+def _collect_changes(session: Session):
+    """收集本次 flush 受影响的用户（ID集合 + 子查询条件）"""
+    user_ids: Set[int] = set()
+    conditions: List = []
+    dept_scope_changed = False
+
+    def owners_and_managers(owner_ids: Set[int]) -> None:
+        if not owner_ids:
+            return
+        user_ids.update(owner_ids)
+        conditions.append(
+            UserScopeIndexState.user_id.in_(
+                select(User.reporting_to).where(User.id.in_(owner_ids))
+            )
+        )
+
+    for obj in session.new:
+        if isinstance(obj, ProjectMember) and obj.user_id:
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Project):
+            owners_and_managers({v for v in (obj.pm_id, obj.created_by) if v})
+            dept_scope_changed = True
+        elif isinstance(obj, UserRole) and obj.user_id:
+            user_ids.add(obj.user_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, ProjectMember):
+            if _changed(obj, "user_id", "project_id", "is_active"):
+                user_ids.update(_values(obj, "user_id"))
+        elif isinstance(obj, Project):
+            if _changed(obj, "pm_id", "created_by", "dept_id", "is_active"):
+                owners_and_managers(_values(obj, "pm_id") | _values(obj, "created_by"))
+                conditions.append(
+                    UserScopeIndexState.user_id.in_(
+                        select(UserProjectScope.user_id).where(
+                            UserProjectScope.project_id == obj.id
+                        )
+                    )
+                )
+                dept_scope_changed = True
+        elif isinstance(obj, User):
+            if _changed(obj, "department", "reporting_to", "is_active", "tenant_id", "is_superuser"):
+                user_ids.add(obj.id)
+                user_ids.update(_values(obj, "reporting_to"))
+        elif isinstance(obj, Department):
+            if _changed(obj, "dept_name", "is_active"):
+                dept_scope_changed = True
+        elif isinstance(obj, UserRole):
+            user_ids.update(_values(obj, "user_id"))
+        elif isinstance(obj, Role):
+            if _changed(obj, "data_scope", "is_active"):
+                conditions.append(
+                    UserScopeIndexState.user_id.in_(
+                        select(UserRole.user_id).where(UserRole.role_id == obj.id)
+                    )
+                )
+
+    for obj in session.deleted:
+        if isinstance(obj, ProjectMember) and obj.user_id:
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Project):
+            owners_and_managers({v for v in (obj.pm_id, obj.created_by) if v})
+            conditions.append(
+                UserScopeIndexState.user_id.in_(
+                    select(UserProjectScope.user_id).where(UserProjectScope.project_id == obj.id)
+                )
+            )
+        elif isinstance(obj, User):
+            user_ids.add(obj.id)
+            if obj.reporting_to:
+                user_ids.add(obj.reporting_to)
+        elif isinstance(obj, UserRole) and obj.user_id:
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Role):
+            conditions.append(
+                UserScopeIndexState.user_id.in_(
+                    select(UserRole.user_id).where(UserRole.role_id == obj.id)
+                )
+            )
+
+    if user_ids:
+        conditions.append(UserScopeIndexState.user_id.in_(user_ids))
+    if dept_scope_changed:
+        conditions.append(UserScopeIndexState.data_scope == DataScopeEnum.DEPT.value)
+    return conditions
+
+
+_WATCHED_TYPES = (ProjectMember, Project, User, Department, UserRole, Role)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_scope_index_changes(session, flush_context, instances) -> None:
+    """flush 前收集变更（此时属性历史仍包含旧值）"""
+    if not settings.DATA_SCOPE_INDEX_ENABLED:
+        return
+    if not any(
+        isinstance(obj, _WATCHED_TYPES)
+        for objs in (session.new, session.dirty, session.deleted)
+        for obj in objs
+    ):
+        return
+    try:
+        conditions = _collect_changes(session)
+    except Exception as e:
+        logger.warning(f"收集数据权限索引变更失败: {e}")
+        return
+    if conditions:
+        session.info.setdefault("_scope_index_conditions", []).extend(conditions)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_scope_indexes_stale(session, flush_context) -> None:
+    """flush 后在同一事务内标记受影响用户的索引过期"""
+    conditions = session.info.pop("_scope_index_conditions", None)
+    if not conditions or not ProjectScopeIndexService.is_available(session):
+        return
+    session.connection().execute(
+        update(UserScopeIndexState).where(or_(*conditions)).values(is_stale=True)
+    )
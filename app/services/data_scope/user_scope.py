@@ -6,6 +6,7 @@
 
 from typing import Set
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.enums import DataScopeEnum
@@ -60,3 +61,15 @@ class UserScopeService:
         """获取用户的直接下属ID列表"""
         subordinates = db.query(User.id).filter(User.reporting_to == user_id, User.is_active).all()
         return {s[0] for s in subordinates}
+
+    @staticmethod
+    def user_project_subquery(user_id: int):
+        """用户参与的项目ID子查询（用于半连接过滤）"""
+        return select(ProjectMember.project_id).where(
+            ProjectMember.user_id == user_id, ProjectMember.is_active
+        )
+
+    @staticmethod
+    def subordinate_subquery(user_id: int):
+        """用户直接下属ID子查询（用于半连接过滤）"""
+        return select(User.id).where(User.reporting_to == user_id, User.is_active)
@@ -4,11 +4,12 @@ ECN BOM影响分析服务 - 主要分析功能
 """
 from datetime import datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
 from app.models.ecn import Ecn, EcnAffectedMaterial
-from app.models.material import BomHeader, BomItem
+from app.models.material import BomHeader, BomItem, Material
 from app.models.project import Machine
+from app.services.material_where_used_service import MaterialWhereUsedService
 
 from .calculation import calculate_cost_impact, calculate_schedule_impact
 from .cascade import analyze_cascade_impact
@@ -81,6 +82,23 @@ def analyze_bom_impact(
             "message": "设备没有已发布的BOM",
         }
 
+    # 物料反查索引可用时，只分析引用了受影响物料的BOM，并只加载命中的明细
+    item_ids_by_bom = None
+    materials = None
+    if MaterialWhereUsedService.is_available(service.db):
+        usages = MaterialWhereUsedService.find_usages(
+            service.db,
+            material_ids=[am.material_id for am in affected_materials],
+            material_codes=[am.material_code for am in affected_materials],
+            bom_ids=[bom_header.id for bom_header in bom_headers],
+        )
+        item_ids_by_bom = {}
+        for usage in usages:
+            item_ids_by_bom.setdefault(usage.bom_id, set()).add(usage.bom_item_id)
+        materials = MaterialWhereUsedService.load_materials(
+            service.db, {usage.material_id for usage in usages}
+        )
+
     # 分析每个BOM的影响
     bom_impacts = []
     total_cost_impact = Decimal(0)
@@ -88,12 +106,17 @@ def analyze_bom_impact(
     max_schedule_impact = 0
 
     for bom_header in bom_headers:
+        if item_ids_by_bom is not None and bom_header.id not in item_ids_by_bom:
+            # 未引用受影响物料，既无直接影响也无级联影响
+            continue
         impact_result = analyze_single_bom(
             service=service,
             ecn_id=ecn_id,
             bom_header=bom_header,
             affected_materials=affected_materials,
             include_cascade=include_cascade,
+            item_ids=None if item_ids_by_bom is None else item_ids_by_bom[bom_header.id],
+            materials=materials,
         )
 
         if impact_result["has_impact"]:
@@ -140,10 +163,20 @@ def analyze_single_bom(
     bom_header: BomHeader,
     affected_materials: List[EcnAffectedMaterial],
     include_cascade: bool = True,
+    item_ids: Optional[Iterable[int]] = None,
+    materials: Optional[Dict[int, Material]] = None,
 ) -> Dict[str, Any]:
-    """分析单个BOM的影响"""
-    # 获取BOM所有物料项
-    bom_items = service.db.query(BomItem).filter(BomItem.bom_id == bom_header.id).all()
+    """
+    分析单个BOM的影响
+
+    item_ids 为物料反查索引命中的明细ID时，只加载这些明细及级联分析所需的
+    祖先与子项；materials 为预先批量加载的物料。
+    """
+    if item_ids is not None:
+        bom_items = load_impacted_items(service, bom_header.id, item_ids, include_cascade)
+    else:
+        # 获取BOM所有物料项
+        bom_items = service.db.query(BomItem).filter(BomItem.bom_id == bom_header.id).all()
 
     # 构建物料编码到BOM项的映射
     material_code_to_items = {}
@@ -213,6 +246,7 @@ def analyze_single_bom(
         affected_materials=affected_materials,
         bom_items=bom_items,
         affected_item_ids=affected_item_ids,
+        materials=materials,
     )
 
     return {
@@ -226,3 +260,38 @@ def analyze_single_bom(
         "cost_impact": float(cost_impact),
         "schedule_impact_days": schedule_impact,
     }
+
+
+def load_impacted_items(
+    service: "EcnBomAnalysisService",
+    bom_id: int,
+    item_ids: Iterable[int],
+    include_cascade: bool = True,
+) -> List[BomItem]:
+    """
+    加载受影响的BOM明细
+
+    级联分析向上追溯全部祖先，并向下涉及受影响明细及其祖先的直接子项，
+    因此只需补充这两部分，结果与加载整个BOM时一致。
+    """
+    items = {}
+    queried = set()
+    pending = set(item_ids)
+    while pending:
+        queried |= pending
+        for item in service.db.query(BomItem).filter(BomItem.id.in_(list(pending))).all():
+            items[item.id] = item
+        if not include_cascade:
+            break
+        pending = {item.parent_item_id for item in items.values() if item.parent_item_id} - queried
+
+    if include_cascade and items:
+        children = (
+            service.db.query(BomItem)
+            .filter(BomItem.bom_id == bom_id, BomItem.parent_item_id.in_(list(items)))
+            .all()
+        )
+        for item in children:
+            items.setdefault(item.id, item)
+
+    return [items[item_id] for item_id in sorted(items)]
@@ -3,7 +3,7 @@
 ECN BOM影响分析服务 - 计算功能
 """
 from decimal import Decimal
-from typing import TYPE_CHECKING, List, Set
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
 
 from app.models.ecn import EcnAffectedMaterial
 from app.models.material import BomItem, Material
@@ -12,6 +12,31 @@ if TYPE_CHECKING:
     from app.services.ecn_bom_analysis_service import EcnBomAnalysisService
 
 
+def build_affected_matcher(
+    affected_materials: List[EcnAffectedMaterial],
+) -> Callable[[BomItem], Optional[EcnAffectedMaterial]]:
+    """
+    构建BOM项 → 受影响物料的匹配函数
+
+    物料编码或物料ID任一相同即匹配，多条匹配时取列表中靠前的一条。
+    """
+    by_code: Dict = {}
+    by_id: Dict = {}
+    for index, am in enumerate(affected_materials):
+        by_code.setdefault(am.material_code, index)
+        by_id.setdefault(am.material_id, index)
+
+    def match(bom_item: BomItem) -> Optional[EcnAffectedMaterial]:
+        indexes = [
+            index
+            for index in (by_code.get(bom_item.material_code), by_id.get(bom_item.material_id))
+            if index is not None
+        ]
+        return affected_materials[min(indexes)] if indexes else None
+
+    return match
+
+
 def calculate_cost_impact(
     service: "EcnBomAnalysisService",
     affected_materials: List[EcnAffectedMaterial],
@@ -27,19 +52,13 @@ def calculate_cost_impact(
             total_impact += Decimal(affected_mat.cost_impact)
 
     # 从BOM项中计算变更成本
+    items_by_id = {item.id: item for item in bom_items}
+    match_affected = build_affected_matcher(affected_materials)
     for item_id in affected_item_ids:
-        bom_item = next((item for item in bom_items if item.id == item_id), None)
+        bom_item = items_by_id.get(item_id)
         if bom_item and bom_item.amount:
             # 如果物料被删除，成本影响为负
-            affected_mat = next(
-                (
-                    am
-                    for am in affected_materials
-                    if am.material_code == bom_item.material_code
-                    or am.material_id == bom_item.material_id
-                ),
-                None,
-            )
+            affected_mat = match_affected(bom_item)
             if affected_mat and affected_mat.change_type == "DELETE":
                 total_impact -= Decimal(bom_item.amount)
             elif affected_mat and affected_mat.change_type == "ADD":
@@ -55,29 +74,33 @@ def calculate_schedule_impact(
     affected_materials: List[EcnAffectedMaterial],
     bom_items: List[BomItem],
     affected_item_ids: Set[int],
+    materials: Optional[Dict[int, Material]] = None,
 ) -> int:
-    """计算交期影响（天数）"""
+    """
+    计算交期影响（天数）
+
+    materials 为预先批量加载的 {物料ID: 物料}，未提供时逐项查询。
+    """
     max_impact_days = 0
 
+    items_by_id = {item.id: item for item in bom_items}
+    match_affected = build_affected_matcher(affected_materials)
     for item_id in affected_item_ids:
-        bom_item = next((item for item in bom_items if item.id == item_id), None)
+        bom_item = items_by_id.get(item_id)
         if not bom_item:
             continue
 
         # 获取物料信息
-        material = service.db.query(Material).filter(Material.id == bom_item.material_id).first()
+        if materials is not None:
+            material = materials.get(bom_item.material_id)
+        else:
+            material = (
+                service.db.query(Material).filter(Material.id == bom_item.material_id).first()
+            )
 
         if material and material.lead_time_days:
             # 如果物料变更，可能需要重新采购，影响交期
-            affected_mat = next(
-                (
-                    am
-                    for am in affected_materials
-                    if am.material_code == bom_item.material_code
-                    or am.material_id == bom_item.material_id
-                ),
-                None,
-            )
+            affected_mat = match_affected(bom_item)
 
             if affected_mat:
                 # 变更类型影响交期
@@ -7,8 +7,8 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, Any, Dict
 
 from app.models.ecn import Ecn, EcnAffectedMaterial
-from app.models.material import Material
-from app.models.purchase import PurchaseOrder, PurchaseOrderItem
+from app.services.kit_rate.kit_rate_batch import load_in_transit
+from app.services.material_where_used_service import MaterialWhereUsedService
 
 if TYPE_CHECKING:
     from app.services.ecn_bom_analysis_service import EcnBomAnalysisService
@@ -44,34 +44,21 @@ def check_obsolete_material_risk(service: "EcnBomAnalysisService", ecn_id: int)
     obsolete_risks = []
     total_obsolete_cost = Decimal(0)
 
-    for affected_mat in affected_materials:
-        if not affected_mat.material_id:
-            continue
-
-        material = (
-            service.db.query(Material).filter(Material.id == affected_mat.material_id).first()
-        )
+    # 批量加载物料与在途数量，避免逐个物料查询
+    material_ids = {am.material_id for am in affected_materials if am.material_id}
+    materials = MaterialWhereUsedService.load_materials(service.db, material_ids)
+    in_transit = load_in_transit(service.db, material_ids)
 
+    for affected_mat in affected_materials:
+        material = materials.get(affected_mat.material_id)
         if not material:
             continue
 
         # 获取当前库存
         current_stock = Decimal(material.current_stock or 0)
 
-        # 检查是否有在途采购订单
-        po_items = (
-            service.db.query(PurchaseOrderItem)
-            .join(PurchaseOrder)
-            .filter(
-                PurchaseOrderItem.material_id == material.id,
-                PurchaseOrder.status.in_(["APPROVED", "ORDERED", "PARTIAL_RECEIVED"]),
-            )
-            .all()
-        )
-
-        in_transit_qty = sum(
-            Decimal(item.quantity or 0) - Decimal(item.received_qty or 0) for item in po_items
-        )
+        # 在途采购数量（与齐套率同一口径）
+        in_transit_qty = in_transit.get(material.id, Decimal(0))
 
         # 计算呆滞料数量
         obsolete_qty = current_stock + in_transit_qty
@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING, Any, Dict, List
 
 from app.models.ecn import Ecn, EcnAffectedMaterial
 
+from .similarity_index import EcnSimilarityIndex, load_material_codes
+
 if TYPE_CHECKING:
     from app.services.ecn_knowledge_service import EcnKnowledgeService
 
@@ -30,6 +32,10 @@ def find_similar_ecns(
     if not current_ecn:
         raise ValueError(f"ECN {ecn_id} 不存在")
 
+    index = EcnSimilarityIndex.get(service.db)
+    if index is not None:
+        return _find_similar_by_index(service, index, current_ecn, top_n, min_similarity)
+
     # 获取所有已完成的ECN（排除当前ECN）
     completed_ecns = (
         service.db.query(Ecn)
@@ -48,21 +54,7 @@ def find_similar_ecns(
         similarity_score = _calculate_similarity(service, current_ecn, ecn)
 
         if similarity_score >= min_similarity:
-            similar_ecns.append(
-                {
-                    "ecn_id": ecn.id,
-                    "ecn_no": ecn.ecn_no,
-                    "ecn_title": ecn.ecn_title,
-                    "ecn_type": ecn.ecn_type,
-                    "similarity_score": similarity_score,
-                    "solution": ecn.solution,
-                    "root_cause_category": ecn.root_cause_category,
-                    "cost_impact": float(ecn.cost_impact or 0),
-                    "schedule_impact_days": ecn.schedule_impact_days or 0,
-                    "completed_at": ecn.execution_end.isoformat() if ecn.execution_end else None,
-                    "match_reasons": _get_match_reasons(current_ecn, ecn, similarity_score),
-                }
-            )
+            similar_ecns.append(_similar_ecn_result(current_ecn, ecn, similarity_score))
 
     # 按相似度排序
     similar_ecns.sort(key=lambda x: x["similarity_score"], reverse=True)
@@ -70,6 +62,46 @@ def find_similar_ecns(
     return similar_ecns[:top_n]
 
 
+def _find_similar_by_index(
+    service: "EcnKnowledgeService",
+    index: EcnSimilarityIndex,
+    current_ecn: Ecn,
+    top_n: int,
+    min_similarity: float,
+) -> List[Dict[str, Any]]:
+    """按相似度索引一次性对全部已完成ECN打分，只加载排名靠前的ECN"""
+    material_codes = load_material_codes(service.db, [current_ecn.id]).get(current_ecn.id, ())
+    ranked = index.rank(current_ecn, material_codes, top_n, min_similarity)
+    if not ranked:
+        return []
+
+    ecns = {
+        ecn.id: ecn
+        for ecn in service.db.query(Ecn).filter(Ecn.id.in_([ecn_id for ecn_id, _ in ranked]))
+    }
+    return [
+        _similar_ecn_result(current_ecn, ecns[ecn_id], score)
+        for ecn_id, score in ranked
+        if ecn_id in ecns
+    ]
+
+
+def _similar_ecn_result(current_ecn: Ecn, ecn: Ecn, similarity_score: float) -> Dict[str, Any]:
+    return {
+        "ecn_id": ecn.id,
+        "ecn_no": ecn.ecn_no,
+        "ecn_title": ecn.ecn_title,
+        "ecn_type": ecn.ecn_type,
+        "similarity_score": similarity_score,
+        "solution": ecn.solution,
+        "root_cause_category": ecn.root_cause_category,
+        "cost_impact": float(ecn.cost_impact or 0),
+        "schedule_impact_days": ecn.schedule_impact_days or 0,
+        "completed_at": ecn.execution_end.isoformat() if ecn.execution_end else None,
+        "match_reasons": _get_match_reasons(current_ecn, ecn, similarity_score),
+    }
+
+
 def _calculate_similarity(service: "EcnKnowledgeService", ecn1: Ecn, ecn2: Ecn) -> float:
     """计算两个ECN的相似度"""
     score = 0.0
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+ECN知识库服务 - 相似度索引
+
+已完成ECN的类型、原因分类、成本按行存为数组，变更描述建 TF-IDF 索引，
+受影响物料编码集合存 MinHash 签名；查找相似ECN时对全部候选一次向量化打分，
+只加载得分最高的若干条ECN。权重与逐条计算（similarity._calculate_similarity）一致。
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.models.ecn import Ecn, EcnAffectedMaterial
+from app.services.text_index import CorpusIndex, MinHasher, TfidfIndex, top_indices
+from app.utils.db_helpers import in_chunks
+
+# 参与相似查找的ECN状态
+COMPLETED_STATUSES = ("COMPLETED", "CLOSED")
+
+# 各维度权重（合计 100）
+WEIGHT_TYPE, WEIGHT_ROOT_CAUSE, WEIGHT_TEXT, WEIGHT_MATERIAL, WEIGHT_COST = 30, 25, 20, 15, 10
+
+_minhasher = MinHasher()
+
+
+def _is_candidate(ecn) -> bool:
+    return ecn.status in COMPLETED_STATUSES and bool(ecn.solution)
+
+
+def cost_similarity(cost: float, costs: np.ndarray) -> np.ndarray:
+    """成本相似度（向量化），口径与 similarity._cost_similarity 一致"""
+    larger = np.maximum(np.abs(costs), abs(cost))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = 1.0 - np.minimum(np.abs(costs - cost) / larger, 1.0)
+    if cost == 0:
+        return (costs == 0).astype(np.float64)
+    return np.where(costs == 0, 0.0, similarity)
+
+
+class EcnSimilarityIndex(CorpusIndex):
+    """已完成ECN的相似度索引"""
+
+    def __init__(self):
+        super().__init__()
+        self.text = TfidfIndex()
+        self._ids: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._types = np.zeros(0, dtype=np.int64)
+        self._root_causes = np.zeros(0, dtype=np.int64)
+        self._costs = np.zeros(0, dtype=np.float64)
+        self._signatures = np.zeros((0, _minhasher.num_perm), dtype=np.uint64)
+        # 分类值 → 编码；原因分类为空编码为 -1，不与任何ECN匹配
+        self._codes: Dict[Tuple[str, Optional[str]], int] = {}
+
+    def __len__(self) -> int:
+        return int(self._alive.sum())
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        return self._codes.setdefault((field, value), len(self._codes))
+
+    def _load(self, db, since: Optional[datetime]) -> None:
+        columns = (
+            Ecn.id,
+            Ecn.status,
+            Ecn.solution,
+            Ecn.ecn_type,
+            Ecn.root_cause_category,
+            Ecn.change_description,
+            Ecn.cost_impact,
+        )
+        if since is None:
+            ecns = (
+                db.query(*columns)
+                .filter(Ecn.status.in_(COMPLETED_STATUSES), Ecn.solution.isnot(None))
+                .all()
+            )
+        else:
+            changed_ids = {
+                ecn_id
+                for (ecn_id,) in db.query(EcnAffectedMaterial.ecn_id)
+                .filter(EcnAffectedMaterial.updated_at >= since)
+                .distinct()
+            }
+            ecns = db.query(*columns).filter(Ecn.updated_at >= since).all()
+            changed_ids -= {ecn.id for ecn in ecns}
+            for chunk in in_chunks(changed_ids):
+                ecns.extend(db.query(*columns).filter(Ecn.id.in_(chunk)).all())
+
+        candidates = [ecn for ecn in ecns if _is_candidate(ecn)]
+        for ecn in ecns:
+            if not _is_candidate(ecn):
+                self.remove(ecn.id)
+
+        if since is None:
+            self.text = TfidfIndex.build((ecn.id, ecn.change_description) for ecn in candidates)
+        codes = load_material_codes(db, [ecn.id for ecn in candidates])
+        self.upsert_many(candidates, codes, index_text=since is not None)
+
+    def upsert_many(
+        self, ecns: Iterable, material_codes: Dict[int, Set[str]], index_text: bool = True
+    ) -> None:
+        """
+        新增或更新ECN
+
+        Args:
+            ecns: 含 id/ecn_type/root_cause_category/change_description/cost_impact 的行
+            material_codes: {ECN ID: 受影响物料编码集合}
+            index_text: 是否同时更新变更描述索引（全量构建时已批量建好）
+        """
+        new_rows = []
+        for ecn in ecns:
+            values = (
+                self._code("type", ecn.ecn_type),
+                self._code("root", ecn.root_cause_category) if ecn.root_cause_category else -1,
+                float(ecn.cost_impact or 0),
+                _minhasher.signature(material_codes.get(ecn.id, ())),
+            )
+            if index_text:
+                self.text.upsert(ecn.id, ecn.change_description)
+            row = self._row_of.get(ecn.id)
+            if row is None:
+                new_rows.append((ecn.id, values))
+                continue
+            self._alive[row] = True
+            self._types[row], self._root_causes[row], self._costs[row] = values[:3]
+            self._signatures[row] = values[3]
+
+        if not new_rows:
+            return
+        start = len(self._ids)
+        for offset, (ecn_id, _) in enumerate(new_rows):
+            self._ids.append(ecn_id)
+            self._row_of[ecn_id] = start + offset
+        values = [v for _, v in new_rows]
+        self._alive = np.concatenate((self._alive, np.ones(len(values), dtype=bool)))
+        self._types = np.concatenate((self._types, [v[0] for v in values]))
+        self._root_causes = np.concatenate((self._root_causes, [v[1] for v in values]))
+        self._costs = np.concatenate((self._costs, [v[2] for v in values]))
+        self._signatures = np.vstack([self._signatures] + [v[3] for v in values])
+
+    def remove(self, ecn_id: int) -> None:
+        """移除ECN（不存在时忽略）"""
+        self.text.remove(ecn_id)
+        row = self._row_of.get(ecn_id)
+        if row is not None:
+            self._alive[row] = False
+
+    def rank(
+        self,
+        ecn,
+        material_codes: Iterable[str],
+        top_n: int = 5,
+        min_similarity: float = 0.3,
+    ) -> List[Tuple[int, float]]:
+        """
+        对全部已完成ECN打分，返回相似度最高的 (ECN ID, 相似度)
+
+        Args:
+            ecn: 当前ECN
+            material_codes: 当前ECN受影响物料编码
+            top_n: 返回数量
+            min_similarity: 最小相似度阈值
+        """
+        with self._lock:
+            n = len(self._ids)
+            score = WEIGHT_TYPE * (self._types == self._codes.get(("type", ecn.ecn_type), -2))
+            if ecn.root_cause_category:
+                root = self._codes.get(("root", ecn.root_cause_category), -2)
+                score = score + WEIGHT_ROOT_CAUSE * (self._root_causes == root)
+
+            if ecn.change_description:
+                keys, text_scores = self.text.scores(ecn.change_description)
+                text = np.zeros(n)
+                for i in np.flatnonzero(text_scores):
+                    text[self._row_of[keys[i]]] = text_scores[i]
+                score = score + WEIGHT_TEXT * text
+
+            signature = _minhasher.signature(material_codes)
+            score = score + WEIGHT_MATERIAL * _minhasher.jaccard(signature, self._signatures)
+            score = score + WEIGHT_COST * cost_similarity(float(ecn.cost_impact or 0), self._costs)
+
+            similarity = np.where(self._alive, score / 100.0, -1.0)
+            own_row = self._row_of.get(ecn.id)
+            if own_row is not None:
+                similarity[own_row] = -1.0
+            top = top_indices(similarity, top_n, min_similarity)
+            return [(self._ids[i], float(similarity[i])) for i in top]
+
+
+def load_material_codes(db, ecn_ids: Iterable[int]) -> Dict[int, Set[str]]:
+    """批量加载ECN受影响物料编码，返回 {ECN ID: 编码集合}"""
+    codes: Dict[int, Set[str]] = defaultdict(set)
+    for chunk in in_chunks(ecn_ids):
+        rows = (
+            db.query(EcnAffectedMaterial.ecn_id, EcnAffectedMaterial.material_code)
+            .filter(EcnAffectedMaterial.ecn_id.in_(chunk))
+            .all()
+        )
+        for ecn_id, material_code in rows:
+            codes[ecn_id].add(material_code)
+    return codes
@@ -9,7 +9,7 @@ NOTE: 共享样式常量已迁移到 report_framework/renderers/excel_styles.py
 import io
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Union
 from urllib.parse import quote
 
 try:
@@ -84,23 +84,7 @@ class ExcelExportService:
                 key = col["key"]
                 value = row.get(key)
 
-                # 应用格式化函数
-                if "format" in col and callable(col["format"]):
-                    value = col["format"](value)
-
-                # 处理特殊类型
-                if isinstance(value, (date, datetime)):
-                    value = (
-                        value.strftime("%Y-%m-%d %H:%M:%S")
-                        if isinstance(value, datetime)
-                        else value.strftime("%Y-%m-%d")
-                    )
-                elif isinstance(value, Decimal):
-                    value = float(value)
-                elif value is None:
-                    value = ""
-
-                df_row[col["label"]] = value
+                df_row[col["label"]] = self._cell_value(value, col)
             df_data.append(df_row)
 
         df = pd.DataFrame(df_data)
@@ -203,25 +187,7 @@ class ExcelExportService:
                 row += 1
                 for idx, col in enumerate(columns, start=1):
                     col_letter = get_column_letter(idx)
-                    key = col["key"]
-                    value = data_row.get(key)
-
-                    # 应用格式化函数
-                    if "format" in col and callable(col["format"]):
-                        value = col["format"](value)
-
-                    # 处理特殊类型
-                    if isinstance(value, (date, datetime)):
-                        value = (
-                            value.strftime("%Y-%m-%d %H:%M:%S")
-                            if isinstance(value, datetime)
-                            else value.strftime("%Y-%m-%d")
-                        )
-                    elif isinstance(value, Decimal):
-                        value = float(value)
-                    elif value is None:
-                        value = ""
-
+                    value = self._cell_value(data_row.get(col["key"]), col)
                     cell = ws[f"{col_letter}{row}"]
                     cell.value = value
                     cell.alignment = Alignment(horizontal="left", vertical="center")
@@ -234,6 +200,72 @@ class ExcelExportService:
         output.seek(0)
         return output
 
+    def stream_to_excel(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        columns: List[Dict[str, Any]],
+        sheet_name: str = "Sheet1",
+        title: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """
+        流式导出 Excel（适用于大数据量）
+
+        rows 可以是逐行产出的生成器（如 yield_per 查询），行写入只写工作表后即丢弃；
+        工作簿落在临时文件而非内存，返回按块读取该文件的迭代器，可直接交给 StreamingResponse。
+        列配置同 export_to_excel，必须显式给出。
+
+        注意：本方法在返回前就消费完 rows（数据库会话在响应发送前仍可用），
+        返回的迭代器读取结束后删除临时文件。
+        """
+        from app.services.report_framework.renderers.excel_stream import (
+            StreamingWorkbook,
+            iter_file_chunks,
+        )
+
+        workbook = StreamingWorkbook()
+        header_style = workbook.register_style(
+            "export_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        )
+        ws = workbook.create_sheet(sheet_name, [col.get("width", 15) for col in columns])
+
+        if title:
+            title_style = workbook.register_style(
+                "export_title",
+                font=Font(bold=True, size=14),
+                alignment=Alignment(horizontal="center", vertical="center"),
+            )
+            ws.merged_cells.add(f"A1:{get_column_letter(len(columns))}1")
+            workbook.append(ws, [title], [title_style])
+
+        workbook.append(ws, [col["label"] for col in columns], [header_style] * len(columns))
+        for row in rows:
+            ws.append([self._cell_value(row.get(col["key"]), col) for col in columns])
+
+        return iter_file_chunks(workbook.save())
+
+    @staticmethod
+    def _cell_value(value: Any, col: Dict[str, Any]) -> Any:
+        """应用列格式化函数并转换为 Excel 可写入的值"""
+        # 应用格式化函数
+        if "format" in col and callable(col["format"]):
+            value = col["format"](value)
+
+        # 处理特殊类型
+        if isinstance(value, (date, datetime)):
+            value = (
+                value.strftime("%Y-%m-%d %H:%M:%S")
+                if isinstance(value, datetime)
+                else value.strftime("%Y-%m-%d")
+            )
+        elif isinstance(value, Decimal):
+            value = float(value)
+        elif value is None:
+            value = ""
+        return value
+
     def _format_headers(self, worksheet, num_columns: int):
         """
         格式化表头
@@ -320,7 +352,7 @@ class ExcelExportService:
 
 
 def create_excel_response(
-    excel_data: io.BytesIO,
+    excel_data: Union[io.BytesIO, Iterator[bytes]],
     filename: str,
     media_type: str = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
 ) -> Any:
@@ -328,7 +360,7 @@ def create_excel_response(
     创建 Excel 下载响应
 
     Args:
-        excel_data: Excel 文件的内存流
+        excel_data: Excel 文件的内存流，或 stream_to_excel 返回的字节块迭代器
         filename: 文件名
         media_type: MIME 类型
 
@@ -10,9 +10,11 @@
 - H4: 已完结(灰色) - Closed
 """
 
+import logging
 from datetime import date, datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import case, func, insert, update
 from sqlalchemy.orm import Session
 
 from app.models.alert import AlertRecord, AlertRule
@@ -21,6 +23,13 @@ from app.models.issue import Issue, IssueTypeEnum
 from app.models.progress import Task
 from app.models.project import Project, ProjectMilestone, ProjectStatusLog
 
+logger = logging.getLogger(__name__)
+
+# 状态分组（逐项目检查与批量模式共用）
+CLOSED_STATUSES = ("ST30", "ST99")  # 已结项、项目取消
+BLOCKED_STATUSES = ("ST14", "ST19")  # 缺料阻塞、技术阻塞
+RECTIFICATION_STATUSES = ("ST22", "ST26")  # FAT整改中、SAT整改中
+
 
 class HealthCalculator:
     """项目健康度计算器"""
@@ -60,8 +69,7 @@ class HealthCalculator:
         条件：
         - 状态为 ST30(已结项) 或 ST99(项目取消)
         """
-        closed_statuses = ["ST30", "ST99"]
-        return project.status in closed_statuses
+        return project.status in CLOSED_STATUSES
 
     def _is_blocked(self, project: Project) -> bool:
         """
@@ -74,8 +82,7 @@ class HealthCalculator:
         4. 有严重缺料预警
         """
         # 1. 检查状态
-        blocked_statuses = ["ST14", "ST19"]  # 缺料阻塞、技术阻塞
-        if project.status in blocked_statuses:
+        if project.status in BLOCKED_STATUSES:
             return True
 
         # 2. 检查关键任务阻塞
@@ -105,8 +112,7 @@ class HealthCalculator:
         6. 进度偏差超过阈值
         """
         # 1. 检查整改状态
-        rectification_statuses = ["ST22", "ST26"]  # FAT整改中、SAT整改中
-        if project.status in rectification_statuses:
+        if project.status in RECTIFICATION_STATUSES:
             return True
 
         # 2. 检查交期临近
@@ -419,55 +425,218 @@ class HealthCalculator:
         return result
 
     def batch_calculate(
-        self, project_ids: Optional[list] = None, batch_size: int = 100
+        self, project_ids: Optional[list] = None, batch_size: int = 100, auto_save: bool = True
     ) -> Dict[str, Any]:
         """
-        Issue 5.2: 批量计算项目健康度（性能优化）
+        Issue 5.2: 批量计算项目健康度（集合运算）
+
+        按主键游标（keyset）分页读取项目必要字段，每页以少量分组聚合查询
+        取得全部健康度信号，判定规则与 calculate_health 一致；
+        全部计算完成后只对健康度变化的项目执行一次批量更新并写入状态日志。
 
         Args:
             project_ids: 项目ID列表，如果为None则计算所有活跃项目
-            batch_size: 批处理大小（默认100，避免一次性加载过多数据）
+            batch_size: 每页项目数（默认100）
+            auto_save: 是否保存变化的健康度
 
         Returns:
             dict: 批量计算结果
         """
-        # 查询项目（Sprint 5.2: 性能优化 - 只查询必要字段）
-        query = self.db.query(Project).filter(
-            Project.is_active == True, Project.is_archived == False
-        )
+        query = self.db.query(
+            Project.id,
+            Project.project_code,
+            Project.stage,
+            Project.status,
+            Project.health,
+            Project.planned_start_date,
+            Project.planned_end_date,
+            Project.progress_pct,
+        ).filter(Project.is_active == True, Project.is_archived == False)
 
         if project_ids:
             query = query.filter(Project.id.in_(project_ids))
 
-        # Sprint 5.2: 性能优化 - 分批处理，避免一次性加载过多数据
-        total_count = query.count()
-        results = {"total": total_count, "updated": 0, "unchanged": 0, "details": []}
-
-        # 分批处理
-        for offset in range(0, total_count, batch_size):
-            projects = query.offset(offset).limit(batch_size).all()
-
-            for project in projects:
-                result = self.calculate_and_update(project, auto_save=False)  # 先不保存，批量提交
+        results = {"total": 0, "updated": 0, "unchanged": 0, "details": []}
+        changes: List[Dict[str, Any]] = []
+        last_id = 0
+
+        while True:
+            rows = query.filter(Project.id > last_id).order_by(Project.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            signals = self._collect_batch_signals([row.id for row in rows])
+            calculation_time = datetime.now().isoformat()
+            for row in rows:
+                new_health = self._health_from_signals(row, signals)
+                result = {
+                    "project_id": row.id,
+                    "project_code": row.project_code,
+                    "old_health": row.health,
+                    "new_health": new_health,
+                    "changed": row.health != new_health,
+                    "calculation_time": calculation_time,
+                }
                 results["details"].append(result)
 
                 if result["changed"]:
                     results["updated"] += 1
+                    changes.append({**result, "stage": row.stage, "status": row.status})
                 else:
                     results["unchanged"] += 1
 
-            # 每批处理完后提交一次，减少数据库事务开销
-            try:
-                self.db.commit()
-            except Exception as e:
-                self.db.rollback()
-                import logging
+            results["total"] += len(rows)
+            if len(rows) < batch_size:
+                break
 
-                logger = logging.getLogger(__name__)
-                logger.error(f"批量计算健康度提交失败：{str(e)}", exc_info=True)
+        if changes and auto_save:
+            self._bulk_save_health(changes)
 
         return results
 
+    def _collect_batch_signals(self, project_ids: List[int]) -> Dict[str, Dict[int, int]]:
+        """
+        分组聚合查询一批项目的健康度信号
+
+        每个数据源一条 GROUP BY 查询，过滤条件与 _has_* 逐项目检查一致。
+
+        Returns:
+            dict: 信号名 -> {项目ID: 计数}
+        """
+        open_statuses = [IssueStatusEnum.OPEN.value, IssueStatusEnum.IN_PROGRESS.value]
+        signals: Dict[str, Dict[int, int]] = {}
+
+        def count_if(condition):
+            return func.sum(case((condition, 1), else_=0))
+
+        # 阻塞任务
+        signals["blocked_tasks"] = dict(
+            self.db.query(Task.project_id, func.count(Task.id))
+            .filter(Task.project_id.in_(project_ids), Task.status == "BLOCKED")
+            .group_by(Task.project_id)
+            .all()
+        )
+
+        # 阻塞问题 / 高优先级问题
+        issue_rows = (
+            self.db.query(
+                Issue.project_id,
+                count_if(Issue.issue_type == IssueTypeEnum.BLOCKER),
+                count_if(Issue.priority.in_(["HIGH", "URGENT"])),
+            )
+            .filter(Issue.project_id.in_(project_ids), Issue.status.in_(open_statuses))
+            .group_by(Issue.project_id)
+            .all()
+        )
+        signals["blocking_issues"] = {pid: blocking or 0 for pid, blocking, _ in issue_rows}
+        signals["high_priority_issues"] = {pid: high or 0 for pid, _, high in issue_rows}
+
+        # 逾期关键里程碑
+        signals["overdue_milestones"] = dict(
+            self.db.query(ProjectMilestone.project_id, func.count(ProjectMilestone.id))
+            .filter(
+                ProjectMilestone.project_id.in_(project_ids),
+                ProjectMilestone.planned_date < date.today(),
+                ProjectMilestone.status != "COMPLETED",
+                ProjectMilestone.is_key,
+            )
+            .group_by(ProjectMilestone.project_id)
+            .all()
+        )
+
+        # 缺料预警（严重 / 警告）
+        alert_rows = (
+            self.db.query(
+                AlertRecord.project_id,
+                count_if(AlertRecord.alert_level == AlertLevelEnum.CRITICAL.value),
+                count_if(
+                    AlertRecord.alert_level.in_(
+                        [AlertLevelEnum.WARNING.value, AlertLevelEnum.URGENT.value]
+                    )
+                ),
+            )
+            .join(AlertRule, AlertRecord.rule_id == AlertRule.id)
+            .filter(
+                AlertRecord.project_id.in_(project_ids),
+                AlertRecord.status == "PENDING",
+                AlertRule.rule_type == "MATERIAL_SHORTAGE",
+            )
+            .group_by(AlertRecord.project_id)
+            .all()
+        )
+        signals["critical_shortage_alerts"] = {pid: c or 0 for pid, c, _ in alert_rows}
+        signals["shortage_warnings"] = {pid: w or 0 for pid, _, w in alert_rows}
+
+        return signals
+
+    def _health_from_signals(self, project, signals: Dict[str, Dict[int, int]]) -> str:
+        """
+        根据预取的信号判定健康度（优先级与 calculate_health 相同）
+
+        Args:
+            project: 项目对象或包含项目字段的行
+            signals: _collect_batch_signals 的返回值
+        """
+
+        def has(name: str) -> bool:
+            return signals[name].get(project.id, 0) > 0
+
+        if self._is_closed(project):
+            return ProjectHealthEnum.H4.value
+
+        if (
+            project.status in BLOCKED_STATUSES
+            or has("blocked_tasks")
+            or has("blocking_issues")
+            or has("critical_shortage_alerts")
+        ):
+            return ProjectHealthEnum.H3.value
+
+        if (
+            project.status in RECTIFICATION_STATUSES
+            or self._is_deadline_approaching(project, days=7)
+            or has("overdue_milestones")
+            or has("shortage_warnings")
+            or has("high_priority_issues")
+            or self._has_schedule_variance(project, threshold=10)
+        ):
+            return ProjectHealthEnum.H2.value
+
+        return ProjectHealthEnum.H1.value
+
+    def _bulk_save_health(self, changes: List[Dict[str, Any]]) -> None:
+        """一次批量更新变化的健康度，并批量写入状态变更日志"""
+        now = datetime.now()
+        try:
+            self.db.execute(
+                update(Project),
+                [{"id": c["project_id"], "health": c["new_health"]} for c in changes],
+            )
+            self.db.execute(
+                insert(ProjectStatusLog),
+                [
+                    {
+                        "project_id": c["project_id"],
+                        "old_stage": c["stage"],
+                        "new_stage": c["stage"],
+                        "old_status": c["status"],
+                        "new_status": c["status"],
+                        "old_health": c["old_health"],
+                        "new_health": c["new_health"],
+                        "change_type": "HEALTH_AUTO_CALCULATED",
+                        "changed_by": None,
+                        "changed_at": now,
+                        "change_note": f"系统自动计算健康度：{c['old_health']} -> {c['new_health']}",
+                    }
+                    for c in changes
+                ],
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"批量计算健康度提交失败：{str(e)}", exc_info=True)
+
     def get_health_details(self, project: Project) -> Dict[str, Any]:
         """
         获取项目健康度详细信息（用于诊断）
@@ -6,7 +6,7 @@
 """
 
 import io
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
 
 from fastapi import HTTPException
 
@@ -41,6 +41,24 @@ class ExcelExportEngine:
             title=title,
         )
 
+    @classmethod
+    def stream_table(
+        cls,
+        *,
+        rows: Iterable[Dict[str, Any]],
+        columns: List[Dict[str, Any]],
+        sheet_name: str = "Sheet1",
+        title: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """流式导出单表数据（只写工作表 + 临时文件，返回字节块迭代器）"""
+        exporter = cls._get_exporter()
+        return exporter.stream_to_excel(
+            rows=rows,
+            columns=columns,
+            sheet_name=sheet_name,
+            title=title,
+        )
+
     @classmethod
     def export_multi_sheet(
         cls,
@@ -96,6 +114,79 @@ class ImportExportEngine:
         df = df.dropna(how="all")
         return df
 
+    @classmethod
+    def iter_excel_chunks(
+        cls,
+        source: Union[bytes, str, BinaryIO],
+        chunk_size: int = 1000,
+        filename: Optional[str] = None,
+    ) -> Iterator[Any]:
+        """
+        按固定行数流式读取 Excel/CSV，逐块产出 DataFrame
+
+        .xlsx 使用 openpyxl 只读模式逐行迭代，CSV 使用 pandas 分块读取，内存占用只与
+        chunk_size 有关。首行为表头，全空行被丢弃；每块的索引为数据行序号（与 parse_excel
+        一致，Excel 行号 = 索引 + 2）。.xls 格式无法流式读取，退化为整表读取后切块。
+
+        Args:
+            source: 文件内容、文件路径或可 seek 的二进制文件对象
+            chunk_size: 每块行数
+            filename: 文件名（用于识别格式，source 为路径时可省略）
+        """
+        try:
+            import pandas as pd
+        except ImportError as exc:
+            raise HTTPException(
+                status_code=500, detail="Excel处理库未安装，请安装pandas和openpyxl"
+            ) from exc
+
+        name = (filename or (source if isinstance(source, str) else "")).lower()
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        if name.endswith(".csv"):
+            for chunk in pd.read_csv(source, chunksize=chunk_size, encoding="utf-8-sig"):
+                chunk = chunk.dropna(how="all")
+                if len(chunk):
+                    yield chunk
+            return
+
+        if name.endswith(".xls"):
+            if not isinstance(source, str):
+                source = io.BytesIO(source.read())
+            df = pd.read_excel(source).dropna(how="all")
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start : start + chunk_size]
+            return
+
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                col if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)
+            ]
+            width = len(columns)
+
+            records, index = [], []
+            for position, values in enumerate(rows):
+                values = tuple(values[:width]) + (None,) * (width - len(values))
+                if all(v is None for v in values):
+                    continue
+                records.append(values)
+                index.append(position)
+                if len(records) >= chunk_size:
+                    yield pd.DataFrame.from_records(records, columns=columns, index=index)
+                    records, index = [], []
+            if records:
+                yield pd.DataFrame.from_records(records, columns=columns, index=index)
+        finally:
+            workbook.close()
+
     @classmethod
     def get_required_columns(cls, template_type: str) -> List[str]:
         """获取模板类型所需的必填列"""
@@ -132,6 +223,32 @@ class ImportExportEngine:
             update_existing=update_existing,
         )
 
+    @staticmethod
+    def import_stream(
+        *,
+        db,
+        source,
+        filename: str,
+        template_type: str,
+        current_user_id: int,
+        update_existing: bool = False,
+        job=None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """流式分块导入入口（委托给 unified_import_service）"""
+        from app.services.unified_import import unified_import_service
+
+        return unified_import_service.import_stream(
+            db=db,
+            source=source,
+            filename=filename,
+            template_type=template_type,
+            current_user_id=current_user_id,
+            update_existing=update_existing,
+            job=job,
+            chunk_size=chunk_size,
+        )
+
 
 __all__ = [
     "ExcelExportEngine",
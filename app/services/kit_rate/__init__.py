@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Kit rate services."""
 
+from .kit_rate_batch import KitRateBatch
 from .kit_rate_service import KitRateService
 
-__all__ = ["KitRateService"]
+__all__ = ["KitRateBatch", "KitRateService"]
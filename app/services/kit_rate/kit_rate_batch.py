@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Batched loading for kit-rate computation.
+
+For a whole set of projects, machines, latest BOM headers, BOM items (with their
+materials) and in-transit quantities are each loaded with one grouped query
+(IN lists chunked), so kit rates are computed in memory instead of querying per
+machine and per BOM item.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.material import BomHeader, BomItem
+from app.models.project import Machine
+from app.models.purchase import PurchaseOrderItem
+from app.utils.db_helpers import in_chunks
+
+# Purchase order item statuses that count as in transit
+IN_TRANSIT_STATUSES = ("APPROVED", "ORDERED", "PARTIAL_RECEIVED")
+
+
+def load_in_transit(db: Session, material_ids: Iterable[Optional[int]]) -> Dict[int, Decimal]:
+    """In-transit quantity (ordered - received) per material, one grouped query per chunk."""
+    in_transit: Dict[int, Decimal] = {}
+    for chunk in in_chunks(material_ids):
+        rows = (
+            db.query(
+                PurchaseOrderItem.material_id,
+                func.sum(
+                    func.coalesce(PurchaseOrderItem.quantity, 0)
+                    - func.coalesce(PurchaseOrderItem.received_qty, 0)
+                ),
+            )
+            .filter(PurchaseOrderItem.material_id.in_(chunk))
+            .filter(PurchaseOrderItem.status.in_(IN_TRANSIT_STATUSES))
+            .group_by(PurchaseOrderItem.material_id)
+            .all()
+        )
+        for material_id, qty in rows:
+            in_transit[material_id] = Decimal(str(qty or 0))
+    return in_transit
+
+
+class KitRateBatch:
+    """Machines, latest BOMs, BOM items and in-transit quantities for a set of projects."""
+
+    def __init__(
+        self,
+        machines: Dict[int, List[Machine]],
+        boms: Dict[int, BomHeader],
+        items: Dict[int, List[BomItem]],
+        in_transit: Dict[int, Decimal],
+    ):
+        self._machines = machines
+        self._boms = boms
+        self._items = items
+        self.in_transit = in_transit
+
+    @classmethod
+    def load(cls, db: Session, project_ids: Sequence[int]) -> "KitRateBatch":
+        """Load everything needed for the given projects in a fixed number of queries."""
+        machines: Dict[int, List[Machine]] = defaultdict(list)
+        for chunk in in_chunks(project_ids):
+            for machine in (
+                db.query(Machine).filter(Machine.project_id.in_(chunk)).order_by(Machine.id).all()
+            ):
+                machines[machine.project_id].append(machine)
+
+        boms: Dict[int, BomHeader] = {}
+        machine_ids = [m.id for group in machines.values() for m in group]
+        for chunk in in_chunks(machine_ids):
+            for bom in (
+                db.query(BomHeader)
+                .filter(BomHeader.machine_id.in_(chunk))
+                .filter(BomHeader.is_latest)
+                .order_by(BomHeader.id)
+                .all()
+            ):
+                boms.setdefault(bom.machine_id, bom)
+
+        items: Dict[int, List[BomItem]] = defaultdict(list)
+        for chunk in in_chunks(bom.id for bom in boms.values()):
+            for item in (
+                db.query(BomItem)
+                .options(selectinload(BomItem.material))
+                .filter(BomItem.bom_id.in_(chunk))
+                .order_by(BomItem.id)
+                .all()
+            ):
+                items[item.bom_id].append(item)
+
+        material_ids = [item.material_id for group in items.values() for item in group]
+        return cls(machines, boms, items, load_in_transit(db, material_ids))
+
+    def machines(self, project_id: int) -> List[Machine]:
+        return self._machines.get(project_id, [])
+
+    def bom(self, machine_id: int) -> Optional[BomHeader]:
+        return self._boms.get(machine_id)
+
+    def machine_items(self, machine_id: int) -> List[BomItem]:
+        bom = self._boms.get(machine_id)
+        return self._items.get(bom.id, []) if bom else []
+
+    def project_items(self, project_id: int) -> List[BomItem]:
+        items: List[BomItem] = []
+        for machine in self.machines(project_id):
+            items.extend(self.machine_items(machine.id))
+        return items
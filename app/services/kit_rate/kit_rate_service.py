@@ -3,7 +3,7 @@
 Kit rate service for procurement readiness.
 """
 
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
@@ -11,12 +11,19 @@ from fastapi import HTTPException
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.assembly_kit import KitRateSnapshot
 from app.models.material import BomHeader, BomItem
 from app.models.project import Machine, Project
 from app.models.purchase import PurchaseOrderItem
+from app.utils.cache_decorator import get_cache_service
 from app.utils.db_helpers import get_or_404
 
+from .kit_rate_batch import KitRateBatch, load_in_transit
+
+# Cache key of the periodically refreshed dashboard snapshot (all active projects)
+DASHBOARD_SNAPSHOT_KEY = "kit_rate:dashboard"
+
 
 class KitRateService:
     """Centralized kit-rate business logic."""
@@ -49,14 +56,7 @@ class KitRateService:
 
     def list_bom_items_for_project(self, project_id: int) -> List[BomItem]:
         self._get_project(project_id)
-        machines = self.db.query(Machine).filter(Machine.project_id == project_id).all()
-        all_items: List[BomItem] = []
-        for machine in machines:
-            bom = self._get_latest_bom(machine.id)
-            if not bom:
-                continue
-            all_items.extend(bom.items.all())
-        return all_items
+        return KitRateBatch.load(self.db, [project_id]).project_items(project_id)
 
     def _get_in_transit_qty(self, material_id: Optional[int]) -> Decimal:
         if not material_id:
@@ -76,7 +76,14 @@ class KitRateService:
         self,
         bom_items: List[BomItem],
         calculate_by: str = "quantity",
+        in_transit: Optional[Dict[int, Decimal]] = None,
     ) -> Dict[str, Any]:
+        """
+        Compute the kit rate of a list of BOM items.
+
+        ``in_transit`` maps material id to in-transit quantity (see ``KitRateBatch``);
+        when omitted it is loaded for all items with one grouped query.
+        """
         if calculate_by not in ["quantity", "amount"]:
             raise HTTPException(status_code=400, detail="calculate_by 必须是 quantity 或 amount")
 
@@ -99,10 +106,13 @@ class KitRateService:
         fulfilled_quantity = Decimal(0)
         fulfilled_amount = Decimal(0)
 
+        if in_transit is None:
+            in_transit = load_in_transit(self.db, (item.material_id for item in bom_items))
+
         for item in bom_items:
             material = item.material
             available_qty = (material.current_stock or 0) + (item.received_qty or 0)
-            in_transit_qty = self._get_in_transit_qty(item.material_id)
+            in_transit_qty = in_transit.get(item.material_id, Decimal(0))
             total_available = available_qty + in_transit_qty
 
             required_qty = item.quantity or 0
@@ -175,18 +185,21 @@ class KitRateService:
 
     def get_project_kit_rate(self, project_id: int, calculate_by: str) -> Dict[str, Any]:
         project = self._get_project(project_id)
-        machines = self.db.query(Machine).filter(Machine.project_id == project_id).all()
+        batch = KitRateBatch.load(self.db, [project_id])
+        return self._project_kit_rate(project, batch, calculate_by)
 
+    def _project_kit_rate(
+        self, project: Project, batch: KitRateBatch, calculate_by: str
+    ) -> Dict[str, Any]:
         all_bom_items: List[BomItem] = []
         machine_stats: List[Dict[str, Any]] = []
 
-        for machine in machines:
-            bom = self._get_latest_bom(machine.id)
-            if not bom:
+        for machine in batch.machines(project.id):
+            if not batch.bom(machine.id):
                 continue
-            bom_items = bom.items.all()
+            bom_items = batch.machine_items(machine.id)
             all_bom_items.extend(bom_items)
-            machine_kit_rate = self.calculate_kit_rate(bom_items, calculate_by)
+            machine_kit_rate = self.calculate_kit_rate(bom_items, calculate_by, batch.in_transit)
             machine_stats.append(
                 {
                     "machine_id": machine.id,
@@ -196,9 +209,9 @@ class KitRateService:
                 }
             )
 
-        project_kit_rate = self.calculate_kit_rate(all_bom_items, calculate_by)
+        project_kit_rate = self.calculate_kit_rate(all_bom_items, calculate_by, batch.in_transit)
         return {
-            "project_id": project_id,
+            "project_id": project.id,
             "project_code": project.project_code,
             "project_name": project.project_name,
             **project_kit_rate,
@@ -211,14 +224,17 @@ class KitRateService:
         if not bom:
             raise HTTPException(status_code=404, detail="机台没有BOM")
 
+        bom_items = bom.items.all()
+        in_transit = load_in_transit(self.db, (item.material_id for item in bom_items))
+
         material_status_list = []
-        for item in bom.items.all():
+        for item in bom_items:
             material = item.material
             required_qty = item.quantity or 0
             current_stock = material.current_stock or 0 if material else 0
             received_qty = item.received_qty or 0
             available_qty = current_stock + received_qty
-            in_transit_qty = self._get_in_transit_qty(item.material_id)
+            in_transit_qty = in_transit.get(item.material_id, Decimal(0))
             total_available = available_qty + in_transit_qty
             shortage_qty = max(0, required_qty - total_available)
 
@@ -262,15 +278,12 @@ class KitRateService:
 
     def get_project_material_status(self, project_id: int) -> Dict[str, Any]:
         project = self._get_project(project_id)
-        machines = self.db.query(Machine).filter(Machine.project_id == project_id).all()
+        batch = KitRateBatch.load(self.db, [project_id])
 
         material_summary: Dict[str, Dict[str, Any]] = {}
 
-        for machine in machines:
-            bom = self._get_latest_bom(machine.id)
-            if not bom:
-                continue
-            for item in bom.items.all():
+        for machine in batch.machines(project_id):
+            for item in batch.machine_items(machine.id):
                 material_code = item.material_code
                 if material_code not in material_summary:
                     material = item.material
@@ -291,7 +304,9 @@ class KitRateService:
                 summary = material_summary[material_code]
                 summary["total_required_qty"] += item.quantity or 0
                 summary["total_received_qty"] += item.received_qty or 0
-                summary["total_in_transit_qty"] += self._get_in_transit_qty(item.material_id)
+                summary["total_in_transit_qty"] += batch.in_transit.get(
+                    item.material_id, Decimal(0)
+                )
 
                 summary["machines"].append(
                     {
@@ -347,7 +362,22 @@ class KitRateService:
             "materials": material_list,
         }
 
-    def get_dashboard(self, project_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    def get_dashboard(
+        self, project_ids: Optional[List[int]] = None, use_snapshot: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Kit-rate dashboard.
+
+        All projects are computed from one ``KitRateBatch``. With ``use_snapshot`` the
+        all-active-projects dashboard is served from the cached snapshot kept fresh by
+        the ``refresh_kit_rate_dashboard`` scheduled task (built on a cache miss).
+        """
+        if use_snapshot and not project_ids:
+            snapshot = get_cache_service().get(DASHBOARD_SNAPSHOT_KEY)
+            if snapshot is not None:
+                return snapshot
+            return self.refresh_dashboard_snapshot()
+
         if project_ids:
             projects = self.db.query(Project).filter(Project.id.in_(project_ids)).all()
         else:
@@ -361,10 +391,10 @@ class KitRateService:
         partial_projects = 0
         shortage_projects = 0
 
+        batch = KitRateBatch.load(self.db, [project.id for project in projects])
+
         for project in projects:
-            kit_rate_data = self.get_project_kit_rate(
-                project_id=project.id, calculate_by="quantity"
-            )
+            kit_rate_data = self._project_kit_rate(project, batch, "quantity")
 
             dashboard_data.append(
                 {
@@ -401,6 +431,17 @@ class KitRateService:
             "projects": dashboard_data,
         }
 
+    def refresh_dashboard_snapshot(self) -> Dict[str, Any]:
+        """Recompute the all-active-projects dashboard and store it as the cached snapshot."""
+        dashboard = self.get_dashboard()
+        dashboard["snapshot_at"] = datetime.now().isoformat()
+        get_cache_service().set(
+            DASHBOARD_SNAPSHOT_KEY,
+            dashboard,
+            expire_seconds=settings.KIT_RATE_DASHBOARD_SNAPSHOT_TTL,
+        )
+        return dashboard
+
     def _ensure_snapshot_table(self) -> None:
         inspector = inspect(self.db.get_bind())
         if not inspector.has_table(KitRateSnapshot.__tablename__):
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+知识检索文本索引
+
+标题、摘要、问题描述、解决方案、根因合并建 TF-IDF 索引（含全部状态，状态等
+条件仍由 SQL 过滤）。关键词检索先在索引中取包含全部关键词词项的全部条目
+（英文/数字词按子串匹配），SQL 只在这些候选上做各列 ILIKE '%kw%' 短语复核、
+精确筛选与分页，不再全表扫描五个文本列。词项可能分散在不同位置或不同列，
+索引命中是 ILIKE 的超集，复核后结果与总数和 ILIKE 一致。
+命中超过 KNOWLEDGE_SEARCH_MAX_CANDIDATES 条时不截断，直接全表 ILIKE。
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.knowledge_base import KnowledgeEntry
+from app.services.text_index import CorpusIndex, TfidfIndex, tokenize
+
+# 参与检索的文本列
+SEARCH_COLUMNS = ("title", "summary", "problem_description", "solution", "root_cause")
+
+
+def _entry_text(entry) -> str:
+    return "\n".join(getattr(entry, column) or "" for column in SEARCH_COLUMNS)
+
+
+class KnowledgeSearchIndex(CorpusIndex):
+    """知识条目文本索引"""
+
+    def __init__(self):
+        super().__init__()
+        self.text = TfidfIndex()
+
+    def _load(self, db: Session, since: Optional[datetime]) -> None:
+        query = db.query(
+            KnowledgeEntry.id, *(getattr(KnowledgeEntry, c) for c in SEARCH_COLUMNS)
+        )
+        if since is None:
+            self.text = TfidfIndex.build((entry.id, _entry_text(entry)) for entry in query)
+            return
+        for entry in query.filter(KnowledgeEntry.updated_at >= since):
+            self.text.upsert(entry.id, _entry_text(entry))
+
+    def match(self, keyword: str, limit: Optional[int] = None) -> Optional[List[int]]:
+        """
+        按关键词检索候选条目ID（ILIKE 命中的超集，调用方需按短语复核）
+
+        关键词含单个汉字（不在二元组词表中）、没有可检索的词项或命中超过 limit 条时
+        返回 None，调用方降级为 ILIKE 匹配。
+        """
+        tokens = tokenize(keyword)
+        if not tokens or any(len(t) == 1 and "一" <= t <= "鿿" for t in tokens):
+            return None
+        if limit is None:
+            limit = settings.KNOWLEDGE_SEARCH_MAX_CANDIDATES
+        with self._lock:
+            keys = self.text.matching_keys(keyword)
+        return keys if len(keys) <= limit else None
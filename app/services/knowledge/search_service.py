@@ -13,6 +13,7 @@ from app.models.knowledge_base import (
     KnowledgeEntry,
     KnowledgeStatusEnum,
 )
+from app.services.knowledge.search_index import KnowledgeSearchIndex
 
 
 class KnowledgeSearchService:
@@ -61,8 +62,12 @@ class KnowledgeSearchService:
         else:
             q = q.filter(KnowledgeEntry.status == KnowledgeStatusEnum.PUBLISHED)
 
-        # 关键词：搜标题、摘要、问题描述、解决方案
+        # 关键词：搜标题、摘要、问题描述、解决方案、根因
+        # 索引只缩小候选范围（命中为 ILIKE 的超集），结果仍按各列 ILIKE 短语匹配复核
         if keyword:
+            matched_ids = self._match_keyword(keyword)
+            if matched_ids is not None:
+                q = q.filter(KnowledgeEntry.id.in_(matched_ids))
             like_pattern = f"%{keyword}%"
             q = q.filter(
                 or_(
@@ -119,6 +124,13 @@ class KnowledgeSearchService:
             "page_size": page_size,
         }
 
+    def _match_keyword(self, keyword: str) -> Optional[List[int]]:
+        """通过文本索引检索关键词，索引不可用时返回 None（降级为 ILIKE）"""
+        index = KnowledgeSearchIndex.get(self.db)
+        if index is None:
+            return None
+        return index.match(keyword)
+
     def get_by_id(self, entry_id: int, *, increment_view: bool = True) -> Optional[KnowledgeEntry]:
         """获取单条知识详情，自动增加查看次数"""
         entry = self.db.query(KnowledgeEntry).filter(KnowledgeEntry.id == entry_id).first()
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+进程内一级缓存（L1）
+
+CacheService（app.services.cache_service）在 Redis（L2）前面加一层进程内缓存：
+- LocalCache: 有界 LRU + TTL，存序列化后的 JSON 字符串（命中时反序列化，调用方拿到的是副本）
+- CacheInvalidationBus: 通过 Redis pub/sub 广播失效消息，各 worker 收到后清理本地条目
+  （认证主体缓存 app.core.auth_principal 的按用户/租户/JTI 失效也经此广播）
+- NamespaceStats: 按命名空间统计命中/未命中/耗时
+
+订阅断开期间一级缓存自动旁路（直接读 Redis），重连后整体清空，避免错过失效消息。
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def key_namespace(key: str) -> str:
+    """缓存键的命名空间：取前两段中不含数字的部分（project:detail:1 → project:detail）"""
+    parts = []
+    for part in key.split(":")[:2]:
+        if any(ch.isdigit() for ch in part):
+            break
+        parts.append(part)
+    return ":".join(parts) or "default"
+
+
+class LocalCache:
+    """有界 LRU + TTL 进程内缓存（线程安全）
+
+    每个条目可挂标签；按标签或键前缀批量清除。
+    """
+
+    def __init__(self, max_size: int = 5000, default_ttl: int = 30):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[str, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+        # 每次失效递增；回填前后代数不同说明期间有失效，放弃回填以免写回旧值
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        """返回序列化值，不存在或过期返回 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            raw, expire_at, _ = entry
+            if expire_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return raw
+
+    def set(
+        self,
+        key: str,
+        raw: str,
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+        generation: Optional[int] = None,
+    ) -> None:
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0:
+            ttl = self.default_ttl
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (raw, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._data) > self.max_size:
+                self._remove(next(iter(self._data)))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self.generation += 1
+            return self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            self.generation += 1
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def delete_tag(self, tag: str) -> int:
+        """清除挂有该标签或位于该命名空间（tag:...）下的条目"""
+        with self._lock:
+            self.generation += 1
+            keys = set(self._tags.pop(tag, ()))
+            prefix = f"{tag}:"
+            keys.update(k for k in self._data if k.startswith(prefix))
+            removed = 0
+            for k in keys:
+                removed += self._remove(k)
+            return removed
+
+    def clear(self) -> int:
+        with self._lock:
+            self.generation += 1
+            count = len(self._data)
+            self._data.clear()
+            self._tags.clear()
+            return count
+
+    def _remove(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+class NamespaceStats:
+    """按命名空间的缓存统计（线程安全）"""
+
+    _FIELDS = ("l1_hits", "l2_hits", "memory_hits", "misses", "sets", "deletes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = {}
+
+    def _bucket(self, key: str) -> Dict[str, float]:
+        namespace = key_namespace(key)
+        bucket = self._data.get(namespace)
+        if bucket is None:
+            bucket = self._data[namespace] = dict.fromkeys(
+                self._FIELDS + ("reads", "total_ms", "max_ms"), 0
+            )
+        return bucket
+
+    def record(self, key: str, field: str) -> None:
+        with self._lock:
+            self._bucket(key)[field] += 1
+
+    def record_read(self, key: str, outcome: str, elapsed: float) -> None:
+        """记录一次读取（outcome: l1_hits / l2_hits / memory_hits / misses）"""
+        ms = elapsed * 1000
+        with self._lock:
+            bucket = self._bucket(key)
+            bucket[outcome] += 1
+            bucket["reads"] += 1
+            bucket["total_ms"] += ms
+            if ms > bucket["max_ms"]:
+                bucket["max_ms"] = ms
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for namespace, bucket in self._data.items():
+                reads = bucket["reads"]
+                hits = bucket["l1_hits"] + bucket["l2_hits"] + bucket["memory_hits"]
+                result[namespace] = {
+                    **{f: int(bucket[f]) for f in self._FIELDS},
+                    "hit_rate": round(hits / reads * 100, 2) if reads else 0,
+                    "avg_ms": round(bucket["total_ms"] / reads, 3) if reads else 0,
+                    "max_ms": round(bucket["max_ms"], 3),
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CacheInvalidationBus:
+    """基于 Redis pub/sub 的跨进程缓存失效广播"""
+
+    def __init__(self, redis_client: Any, channel: str, handler: Callable[[str, Any], None]):
+        self.node_id = uuid.uuid4().hex
+        self._client = redis_client
+        self._channel = channel
+        self._handler = handler
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        """订阅是否在线（离线时一级缓存旁路）"""
+        return self._connected.is_set()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="cache-invalidation", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._connected.clear()
+
+    def publish(self, op: str, arg: Any = None) -> None:
+        try:
+            self._client.publish(
+                self._channel, json.dumps({"node": self.node_id, "op": op, "arg": arg})
+            )
+        except Exception:
+            logger.debug("发布缓存失效消息失败，已忽略", exc_info=True)
+
+    def _run(self) -> None:
+        backoff = 1
+        first = True
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                if not first:
+                    # 断线期间可能错过失效消息
+                    self._handler("clear", None)
+                first = False
+                self._connected.set()
+                backoff = 1
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    if not isinstance(message, dict):
+                        raise TypeError(f"unexpected pub/sub message: {type(message)!r}")
+                    self._dispatch(message.get("data"))
+            except Exception as e:
+                self._connected.clear()
+                logger.warning(f"缓存失效订阅中断，一级缓存暂时旁路: {e}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+        self._connected.clear()
+
+    def _dispatch(self, data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(message, dict) or message.get("node") == self.node_id:
+            return
+        self._handler(message.get("op"), message.get("arg"))
+
+
+class LocalCacheTier:
+    """共享同一 Redis 客户端的进程级一级缓存 + 标签版本 + 失效广播"""
+
+    def __init__(self, redis_client: Any):
+        self.cache = LocalCache(settings.CACHE_L1_MAX_SIZE, settings.CACHE_L1_TTL)
+        self.stats = NamespaceStats()
+        self.tag_versions: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        self.bus = CacheInvalidationBus(
+            redis_client, settings.CACHE_INVALIDATION_CHANNEL, self.apply
+        )
+        self.bus.start()
+
+    @property
+    def active(self) -> bool:
+        return self.bus.connected
+
+    def apply(self, op: str, arg: Any) -> int:
+        """应用一条失效消息（本地或远端），返回清除的本地条目数"""
+        if op == "key":
+            return int(self.cache.delete(arg))
+        if op == "prefix":
+            return self.cache.delete_prefix(arg)
+        if op == "tags":
+            with self._versions_lock:
+                for tag in arg or ():
+                    self.tag_versions.pop(tag, None)
+            return sum(self.cache.delete_tag(tag) for tag in arg or ())
+        if op == "principal":
+            from app.core.auth_principal import get_principal_cache
+
+            kind, value = arg
+            return get_principal_cache().apply_remote(kind, value)
+        if op == "clear":
+            from app.core.auth_principal import get_principal_cache
+
+            # 包括订阅重连：断线期间可能错过认证快照的失效
+            get_principal_cache().apply_remote("clear", None)
+            with self._versions_lock:
+                self.tag_versions.clear()
+            return self.cache.clear()
+        return 0
+
+    def get_versions(self, tags: Tuple[str, ...]) -> Dict[str, int]:
+        with self._versions_lock:
+            return {t: self.tag_versions[t] for t in tags if t in self.tag_versions}
+
+    def remember_versions(self, versions: Dict[str, int], generation: Optional[int] = None) -> None:
+        """缓存标签版本（读取期间发生过失效则放弃）"""
+        if not self.active:
+            return
+        with self._versions_lock:
+            if generation is not None and generation != self.cache.generation:
+                return
+            self.tag_versions.update(versions)
+
+
+_tiers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_tiers_lock = threading.Lock()
+
+
+def get_local_tier(redis_client: Any) -> Optional[LocalCacheTier]:
+    """获取 Redis 客户端对应的进程级一级缓存（未启用返回 None）"""
+    if not settings.CACHE_L1_ENABLED or redis_client is None:
+        return None
+    with _tiers_lock:
+        try:
+            tier = _tiers.get(redis_client)
+            if tier is None:
+                tier = _tiers[redis_client] = LocalCacheTier(redis_client)
+        except TypeError:
+            return None
+    return tier
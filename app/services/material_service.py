@@ -52,9 +52,13 @@ class MaterialService(BaseService[Material, MaterialCreate, MaterialUpdate, Mate
         material_type: Optional[str] = None,
         is_key_material: Optional[bool] = None,
         is_active: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        count_mode: str = "exact",
     ) -> Dict[str, Any]:
         """
         获取物料列表（支持分页、搜索、筛选）
+
+        cursor 不为 None 时使用游标分页；count_mode 控制总数统计方式。
         """
         from app.common.crud.types import QueryParams
 
@@ -76,6 +80,8 @@ class MaterialService(BaseService[Material, MaterialCreate, MaterialUpdate, Mate
             filters=filters,
             sort_by="created_at",
             sort_order="desc",
+            cursor=cursor,
+            count_mode=count_mode,
         )
 
         result = self.list(params)
@@ -85,7 +91,14 @@ class MaterialService(BaseService[Material, MaterialCreate, MaterialUpdate, Mate
             "total": result.total,
             "page": result.page,
             "page_size": result.page_size,
-            "pages": (result.total + result.page_size - 1) // result.page_size,
+            "pages": (
+                (result.total + result.page_size - 1) // result.page_size
+                if result.total is not None
+                else None
+            ),
+            "next_cursor": result.next_cursor,
+            "has_more": result.has_more,
+            "total_estimated": result.total_estimated,
         }
 
     def generate_code(self, category_id: Optional[int] = None) -> str:
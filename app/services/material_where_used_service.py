@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+物料反查（where-used）索引维护服务
+
+- 维护：ORM flush 事件收集新增/修改/删除的BOM明细及设备、项目变更的BOM头，
+  在同一事务内按明细或按BOM重建对应索引行；BOM发布时按BOM整体重建一次，
+  纠正绕过 ORM 的批量写入
+- 查询：按物料ID/编码批量定位引用的BOM明细，并批量加载物料，
+  ECN影响分析的耗时与受影响物料数成正比，而不是与设备下全部BOM明细数成正比
+
+索引表不存在（未执行迁移）时 is_available 返回 False，调用方降级为逐BOM加载。
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, insert, literal, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.material import BomHeader, BomItem, Material
+from app.models.material_where_used import MaterialWhereUsed
+from app.utils.db_helpers import in_chunks, tables_exist
+
+logger = logging.getLogger(__name__)
+
+# 影响索引行的明细/BOM头字段
+_ITEM_FIELDS = ("bom_id", "parent_item_id", "material_id", "material_code")
+_HEADER_FIELDS = ("machine_id", "project_id")
+
+
+def _index_rows_select(condition):
+    """按条件从BOM明细及其BOM头生成索引行"""
+    item = BomItem.__table__.c
+    header = BomHeader.__table__.c
+    return (
+        select(
+            item.material_id,
+            item.material_code,
+            item.id,
+            item.parent_item_id,
+            item.bom_id,
+            header.machine_id,
+            header.project_id,
+            literal(datetime.now()),
+        )
+        .select_from(BomItem.__table__.join(BomHeader.__table__, header.id == item.bom_id))
+        .where(condition)
+    )
+
+
+_INDEX_COLUMNS = [
+    "material_id",
+    "material_code",
+    "bom_item_id",
+    "parent_item_id",
+    "bom_id",
+    "machine_id",
+    "project_id",
+    "updated_at",
+]
+
+
+class MaterialWhereUsedService:
+    """物料反查索引维护服务"""
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """索引表是否存在"""
+        return tables_exist(db, MaterialWhereUsed.__tablename__)
+
+    @staticmethod
+    def sync_items(executor, item_ids: Iterable[int]) -> None:
+        """
+        按明细重建索引行；已删除的明细只删除索引行
+
+        Args:
+            executor: 数据库会话或连接（语句在其当前事务内执行）
+            item_ids: BOM明细ID
+        """
+        table = MaterialWhereUsed.__table__
+        for ids in in_chunks(item_ids):
+            executor.execute(delete(table).where(table.c.bom_item_id.in_(ids)))
+            executor.execute(
+                insert(table).from_select(
+                    _INDEX_COLUMNS, _index_rows_select(BomItem.__table__.c.id.in_(ids))
+                )
+            )
+
+    @staticmethod
+    def sync_boms(executor, bom_ids: Iterable[int]) -> None:
+        """
+        按BOM整体重建索引行；已删除的BOM只删除索引行
+
+        Args:
+            executor: 数据库会话或连接（语句在其当前事务内执行）
+            bom_ids: BOM ID
+        """
+        if isinstance(executor, Session):
+            executor.flush()
+        table = MaterialWhereUsed.__table__
+        for ids in in_chunks(bom_ids):
+            executor.execute(delete(table).where(table.c.bom_id.in_(ids)))
+            executor.execute(
+                insert(table).from_select(
+                    _INDEX_COLUMNS, _index_rows_select(BomItem.__table__.c.bom_id.in_(ids))
+                )
+            )
+
+    @staticmethod
+    def find_usages(
+        db: Session,
+        material_ids: Iterable[int] = (),
+        material_codes: Iterable[str] = (),
+        bom_ids: Optional[Iterable[int]] = None,
+        released_only: bool = False,
+    ) -> List[MaterialWhereUsed]:
+        """
+        按物料ID或编码批量查询引用位置
+
+        Args:
+            db: 数据库会话
+            material_ids: 物料ID
+            material_codes: 物料编码（与物料ID任一匹配即命中）
+            bom_ids: 限定的BOM ID（可选）
+            released_only: 是否只返回已发布的最新版本BOM
+
+        Returns:
+            索引行列表，按BOM明细ID排序
+        """
+        ids = {i for i in material_ids if i}
+        codes = {c for c in material_codes if c}
+        usages: Dict[int, MaterialWhereUsed] = {}
+        for column, values in (
+            (MaterialWhereUsed.material_id, ids),
+            (MaterialWhereUsed.material_code, codes),
+        ):
+            for chunk in in_chunks(values):
+                query = db.query(MaterialWhereUsed).filter(column.in_(chunk))
+                if bom_ids is not None:
+                    query = query.filter(MaterialWhereUsed.bom_id.in_(list(bom_ids)))
+                if released_only:
+                    query = query.join(BomHeader, BomHeader.id == MaterialWhereUsed.bom_id).filter(
+                        BomHeader.status == "RELEASED", BomHeader.is_latest
+                    )
+                for usage in query.all():
+                    usages[usage.bom_item_id] = usage
+        return [usages[item_id] for item_id in sorted(usages)]
+
+    @staticmethod
+    def load_materials(db: Session, material_ids: Iterable[int]) -> Dict[int, Material]:
+        """批量加载物料，返回 {物料ID: 物料}"""
+        materials: Dict[int, Material] = {}
+        for chunk in in_chunks(i for i in material_ids if i):
+            for material in db.query(Material).filter(Material.id.in_(chunk)).all():
+                materials[material.id] = material
+        return materials
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_bom_changes(session, flush_context) -> None:
+    """flush 后在同一事务内重建变更明细/BOM的索引行（此时新增对象已分配ID）"""
+    if not settings.MATERIAL_WHERE_USED_ENABLED:
+        return
+
+    item_ids = set()
+    bom_ids = set()
+    for obj in session.new:
+        if isinstance(obj, BomItem) and obj.id:
+            item_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, BomItem) and obj.id:
+            state = sa_inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _ITEM_FIELDS):
+                item_ids.add(obj.id)
+        elif isinstance(obj, BomHeader) and obj.id:
+            state = sa_inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _HEADER_FIELDS):
+                bom_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, BomItem) and obj.id:
+            item_ids.add(obj.id)
+        elif isinstance(obj, BomHeader) and obj.id:
+            bom_ids.add(obj.id)
+
+    if not (item_ids or bom_ids) or not MaterialWhereUsedService.is_available(session):
+        return
+
+    connection = session.connection()
+    MaterialWhereUsedService.sync_boms(connection, bom_ids)
+    MaterialWhereUsedService.sync_items(connection, item_ids)
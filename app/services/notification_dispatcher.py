@@ -239,9 +239,27 @@ class NotificationDispatcher:
                     force_send=effective_force_send,
                 )
 
-            # 使用统一服务发送
-            result = self.unified_service.send_notification(request)
+            # 使用统一服务发送（入队时带上通知ID，由队列消费者回写最终状态）
+            result = self.unified_service.send_notification(
+                request,
+                queue_meta={
+                    "notification_id": notification.id,
+                    "alert_id": notification.alert_id,
+                    "notify_channel": notification.notify_channel,
+                },
+            )
 
+            if result.get("queued") is True:
+                notification.status = "QUEUED"
+                notification.error_message = None
+                notification.next_retry_at = None
+                notification.retry_count = notification.retry_count or 0
+                return True
+            if result.get("disabled") is True:
+                notification.status = "SKIPPED"
+                notification.error_message = result.get("message")
+                notification.next_retry_at = None
+                return True
             if result.get("success", False):
                 notification.status = "SENT"
                 notification.sent_at = datetime.now()
@@ -6,21 +6,36 @@ Redis-backed notification queue for async dispatch.
 - app.services.unified_notification_service: 主通知服务，提供 NotificationService 和 get_notification_service()
 - app.services.notification_service: 兼容层，re-export 统一服务并提供旧接口的枚举和 AlertNotificationService
 - app.services.notification_dispatcher: 预警通知调度协调器，内部使用统一服务
-- app.services.notification_queue (本模块): Redis 通知队列（异步分发）
+- app.services.notification_queue (本模块): Redis 通知队列（异步分发）、处理中确认、延迟重试、死信与去重
+- app.services.notification_worker: 通知队列消费者（按渠道限并发、批量发送、退避重试）
 - app.services.notification_utils: 通知工具函数（渠道解析、接收者解析、免打扰判断等）
 - app.services.channel_handlers/: 渠道处理器（System/Email/WeChat/SMS/Webhook）
 """
 
 import json
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from app.utils.redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
 
 QUEUE_KEY = "notification:dispatch:queue"
+# 延迟重试（有序集合，score 为到期时间戳）
+RETRY_KEY = "notification:dispatch:retry"
+# 死信列表（重试耗尽的通知）
+DEAD_LETTER_KEY = "notification:dispatch:dead"
+DEDUP_KEY_PREFIX = "notification:dedup:"
+# 消费者处理中列表（取出的通知先移入，处理完成后确认删除）
+PROCESSING_KEY_PREFIX = "notification:dispatch:processing:"
+# 在册消费者集合与消费者心跳键
+CONSUMERS_KEY = "notification:dispatch:consumers"
+CONSUMER_HEARTBEAT_PREFIX = "notification:dispatch:consumer:"
+# 心跳超时（秒）：超时未续期的消费者视为已失联，其处理中的通知移回主队列
+# 消费者取出通知时续期，处理一批通知期间由消费者定时续期（见 notification_worker）
+CONSUMER_TIMEOUT_SECONDS = 300
 
 
 def enqueue_notification(payload: Dict[str, Any]) -> bool:
@@ -66,3 +81,229 @@ def dequeue_notification(block: bool = True, timeout: int = 5) -> Optional[Dict[
     except Exception as exc:
         logger.error(f"读取通知队列失败: {exc}")
         return None
+
+
+def enqueue_notifications(payloads: Sequence[Dict[str, Any]]) -> bool:
+    """批量写入通知队列（一次 RPUSH）"""
+    if not payloads:
+        return True
+    redis_client = get_redis_client()
+    if not redis_client:
+        logger.warning("Redis未配置，无法使用通知队列")
+        return False
+    enqueue_at = datetime.now(timezone.utc).isoformat()
+    try:
+        redis_client.rpush(
+            QUEUE_KEY,
+            *(
+                json.dumps({"enqueue_at": enqueue_at, **payload}, ensure_ascii=False)
+                for payload in payloads
+            ),
+        )
+        return True
+    except Exception as exc:
+        logger.error(f"写入通知队列失败: {exc}")
+        return False
+
+
+def _processing_key(consumer_id: str) -> str:
+    return PROCESSING_KEY_PREFIX + consumer_id
+
+
+def _touch(redis_client, consumer_id: str) -> None:
+    pipe = redis_client.pipeline()
+    pipe.sadd(CONSUMERS_KEY, consumer_id)
+    pipe.set(CONSUMER_HEARTBEAT_PREFIX + consumer_id, 1, ex=CONSUMER_TIMEOUT_SECONDS)
+    pipe.execute()
+
+
+def heartbeat(consumer_id: str) -> bool:
+    """登记消费者并续期心跳"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return False
+    try:
+        _touch(redis_client, consumer_id)
+        return True
+    except Exception as exc:
+        logger.error(f"续期通知消费者心跳失败: {exc}")
+        return False
+
+
+def dequeue_notifications(
+    consumer_id: str, max_items: int, timeout: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    阻塞读取一批通知：等待第一条最多 timeout 秒，再非阻塞取出其余至多 max_items - 1 条
+
+    取出的通知移入该消费者的处理中列表（BLMOVE/LMOVE），处理完成后调用 ack_notifications 确认；
+    消费者在确认前崩溃时，由 recover_notifications 移回主队列，不会丢失。
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return []
+    processing = _processing_key(consumer_id)
+    try:
+        _touch(redis_client, consumer_id)
+        first = redis_client.blmove(QUEUE_KEY, processing, timeout, "LEFT", "RIGHT")
+        if first is None:
+            return []
+        items = [first]
+        if max_items > 1:
+            pipe = redis_client.pipeline()
+            for _ in range(max_items - 1):
+                pipe.lmove(QUEUE_KEY, processing, "LEFT", "RIGHT")
+            items.extend(data for data in pipe.execute() if data is not None)
+    except Exception as exc:
+        logger.error(f"读取通知队列失败: {exc}")
+        return []
+
+    payloads = []
+    for data in items:
+        try:
+            payloads.append(json.loads(data))
+        except ValueError:
+            logger.error(f"通知队列数据格式错误，已丢弃: {data!r}")
+    return payloads
+
+
+def ack_notifications(consumer_id: str) -> bool:
+    """确认该消费者处理中的通知已处理完毕（重试/死信已写入）"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return False
+    try:
+        redis_client.delete(_processing_key(consumer_id))
+        return True
+    except Exception as exc:
+        logger.error(f"确认通知处理失败: {exc}")
+        return False
+
+
+def recover_notifications(consumer_id: str) -> int:
+    """
+    把未确认的通知移回主队列队首，返回移动条数
+
+    包括本消费者上一批未确认的通知（处理中途异常）和心跳超时消费者的处理中列表。
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return 0
+    try:
+        owners = [consumer_id] + [
+            other
+            for other in redis_client.smembers(CONSUMERS_KEY)
+            if other != consumer_id and not redis_client.exists(CONSUMER_HEARTBEAT_PREFIX + other)
+        ]
+        moved = 0
+        for owner in owners:
+            # 从队尾逐条移到主队列队首，保持原有顺序
+            while (
+                redis_client.lmove(_processing_key(owner), QUEUE_KEY, "RIGHT", "LEFT") is not None
+            ):
+                moved += 1
+            if owner != consumer_id:
+                redis_client.srem(CONSUMERS_KEY, owner)
+        if moved:
+            logger.warning(f"{moved} 条未确认的通知已移回队列")
+        return moved
+    except Exception as exc:
+        logger.error(f"回收未确认通知失败: {exc}")
+        return 0
+
+
+def release_consumer(consumer_id: str) -> None:
+    """消费者停止时删除心跳，未确认的通知由其他消费者回收"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return
+    try:
+        redis_client.delete(CONSUMER_HEARTBEAT_PREFIX + consumer_id)
+    except Exception as exc:
+        logger.error(f"注销通知消费者失败: {exc}")
+
+
+def schedule_retry(payload: Dict[str, Any], delay_seconds: float) -> bool:
+    """延迟 delay_seconds 秒后重新入队"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return False
+    try:
+        redis_client.zadd(
+            RETRY_KEY, {json.dumps(payload, ensure_ascii=False): time.time() + delay_seconds}
+        )
+        return True
+    except Exception as exc:
+        logger.error(f"写入通知重试队列失败: {exc}")
+        return False
+
+
+def promote_due_retries(limit: int = 500) -> int:
+    """把到期的延迟重试移回主队列，返回移动条数"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return 0
+    try:
+        due = redis_client.zrangebyscore(RETRY_KEY, "-inf", time.time(), start=0, num=limit)
+        if not due:
+            return 0
+        # 多个消费者并发时以 ZREM 成功者为准，避免重复入队
+        pipe = redis_client.pipeline()
+        for data in due:
+            pipe.zrem(RETRY_KEY, data)
+        claimed = [data for data, removed in zip(due, pipe.execute()) if removed]
+        if claimed:
+            redis_client.rpush(QUEUE_KEY, *claimed)
+        return len(claimed)
+    except Exception as exc:
+        logger.error(f"处理通知重试队列失败: {exc}")
+        return 0
+
+
+def dead_letter(payload: Dict[str, Any], error: Optional[str] = None) -> bool:
+    """写入死信列表"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return False
+    try:
+        record = {
+            **payload,
+            "error": error,
+            "dead_at": datetime.now(timezone.utc).isoformat(),
+        }
+        redis_client.rpush(DEAD_LETTER_KEY, json.dumps(record, ensure_ascii=False))
+        return True
+    except Exception as exc:
+        logger.error(f"写入通知死信列表失败: {exc}")
+        return False
+
+
+def claim_dedup(key: str, window_seconds: int) -> Optional[bool]:
+    """
+    在 Redis 中占用去重键（SET NX EX），跨请求、跨进程共享
+
+    发送失败时调用方须 release_dedup 释放，避免整个去重窗口内丢失该通知。
+
+    Returns:
+        True 表示首次占用（应发送），False 表示窗口内已发送过，
+        None 表示 Redis 不可用（调用方使用本地去重）
+    """
+    redis_client = get_redis_client()
+    if not redis_client:
+        return None
+    try:
+        return bool(redis_client.set(DEDUP_KEY_PREFIX + key, 1, nx=True, ex=window_seconds))
+    except Exception as exc:
+        logger.error(f"通知去重检查失败: {exc}")
+        return None
+
+
+def release_dedup(key: str) -> None:
+    """释放去重键（发送失败后允许重新发送）"""
+    redis_client = get_redis_client()
+    if not redis_client:
+        return
+    try:
+        redis_client.delete(DEDUP_KEY_PREFIX + key)
+    except Exception as exc:
+        logger.error(f"释放通知去重键失败: {exc}")
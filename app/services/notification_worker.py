@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+通知队列消费者
+
+从 Redis 通知队列（notification_queue）批量取出通知并投递：
+- 取出的通知先移入本消费者的处理中列表，一批处理完（投递、重试或死信已写入）后才确认，
+  消费者崩溃时未确认的通知移回主队列（至少投递一次）；处理期间定时续期心跳，
+  耗时超过心跳超时的慢批次不会被其他消费者回收重复投递
+- 一批通知一次预取接收人通知偏好，按渠道分组，每 NOTIFICATION_CHANNEL_BATCH_SIZE 个接收人
+  调用一次 ChannelHandler.send_batch（企业微信相同内容合并为一次调用、站内通知一次提交）
+- 线程池并行投递各渠道，每个渠道同时进行的批次数受 NOTIFICATION_CHANNEL_CONCURRENCY 限制，
+  Webhook 等慢渠道不会占满全部线程
+- 失败的渠道按 NOTIFICATION_RETRY_BACKOFF_SECONDS 退避后重新入队，超过
+  NOTIFICATION_MAX_ATTEMPTS 次写入死信列表并释放去重占用；免打扰时间内的通知延迟到免打扰结束后投递
+- 预警通知（载荷带 notification_id）投递后回写 AlertNotification 状态（SENT/SKIPPED/FAILED）
+
+应用启动时（配置了 REDIS_URL 且启用 NOTIFICATION_ASYNC_ENABLED）由 start_notification_worker 启动。
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.dependencies import get_db_session
+from app.models.alert import AlertNotification
+from app.services.channel_handlers.base import NotificationRequest, NotificationResult
+from app.services.notification_queue import (
+    CONSUMER_TIMEOUT_SECONDS,
+    ack_notifications,
+    dead_letter,
+    dequeue_notifications,
+    heartbeat,
+    promote_due_retries,
+    recover_notifications,
+    release_consumer,
+    release_dedup,
+    schedule_retry,
+)
+from app.services.notification_utils import next_quiet_resume
+from app.services.unified_notification_service import NotificationService
+from app.utils.scheduler_metrics import (
+    record_notification_failure,
+    record_notification_success,
+)
+
+logger = logging.getLogger(__name__)
+
+# 处理一批通知期间的心跳续期间隔（秒）
+HEARTBEAT_INTERVAL_SECONDS = CONSUMER_TIMEOUT_SECONDS / 3
+
+
+def _retry_delay(attempts: int) -> int:
+    """第 attempts 次失败后的重试间隔（秒）"""
+    backoff = settings.NOTIFICATION_RETRY_BACKOFF_SECONDS
+    return backoff[min(attempts, len(backoff)) - 1]
+
+
+class NotificationWorker:
+    """通知队列消费者"""
+
+    def __init__(
+        self,
+        threads: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        channel_concurrency: Optional[Dict[str, int]] = None,
+    ):
+        self.batch_size = batch_size or settings.NOTIFICATION_WORKER_BATCH_SIZE
+        limits = channel_concurrency or settings.NOTIFICATION_CHANNEL_CONCURRENCY
+        self._limits = {
+            channel: threading.BoundedSemaphore(max(1, limit)) for channel, limit in limits.items()
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=threads or settings.NOTIFICATION_WORKER_THREADS,
+            thread_name_prefix="notification-worker",
+        )
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.consumer_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def start(self) -> None:
+        """启动后台消费线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, name="notification-consumer", daemon=True
+        )
+        self._thread.start()
+        logger.info("通知队列消费者已启动")
+
+    def stop(self, timeout: float = 10) -> None:
+        """停止消费并等待进行中的投递结束"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        release_consumer(self.consumer_id)
+        logger.info("通知队列消费者已停止")
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                logger.error(f"通知队列消费失败: {exc}", exc_info=True)
+                self._stop.wait(5)
+
+    def run_once(self, timeout: int = 5) -> Dict[str, int]:
+        """移入到期重试并回收未确认的通知，取出一批通知投递后确认"""
+        promote_due_retries()
+        recover_notifications(self.consumer_id)
+        payloads = dequeue_notifications(self.consumer_id, self.batch_size, timeout=timeout)
+        with self._keep_alive():
+            stats = self.process(payloads)
+        ack_notifications(self.consumer_id)
+        return stats
+
+    @contextmanager
+    def _keep_alive(self):
+        """处理期间每 HEARTBEAT_INTERVAL_SECONDS 秒续期一次心跳"""
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(HEARTBEAT_INTERVAL_SECONDS):
+                heartbeat(self.consumer_id)
+
+        thread = threading.Thread(target=beat, name="notification-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def process(self, payloads: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        投递一批通知
+
+        Returns:
+            {"delivered": 成功, "skipped": 用户禁用, "deferred": 免打扰延迟,
+             "retried": 待重试, "dead": 进入死信}
+        """
+        stats = dict.fromkeys(("delivered", "skipped", "deferred", "retried", "dead"), 0)
+        items: List[Tuple[Dict[str, Any], NotificationRequest]] = []
+        for payload in payloads:
+            try:
+                items.append((payload, NotificationRequest(**payload["request"])))
+            except (KeyError, TypeError) as exc:
+                dead_letter(payload, f"通知载荷无效: {exc}")
+                stats["dead"] += 1
+        if not items:
+            return stats
+
+        # 1. 一次预取通知偏好，确定各条通知的投递渠道
+        by_channel: Dict[str, List[int]] = defaultdict(list)
+        finished: Dict[int, str] = {}
+        now = datetime.now()
+        with get_db_session() as db:
+            service = NotificationService(db)
+            with service.prefetched_settings(request.recipient_id for _, request in items) as cache:
+                for i, (payload, request) in enumerate(items):
+                    early_result, channels = service._plan_delivery(request)
+                    if early_result is None:
+                        for channel in channels:
+                            by_channel[channel].append(i)
+                    elif early_result.get("quiet_hours"):
+                        resume_at = next_quiet_resume(cache[request.recipient_id], now)
+                        schedule_retry(payload, max((resume_at - now).total_seconds(), 1))
+                        finished[i] = "deferred"
+                    else:
+                        finished[i] = "skipped"
+
+        # 2. 各渠道按批并行投递
+        chunk_size = settings.NOTIFICATION_CHANNEL_BATCH_SIZE
+        futures = [
+            (
+                channel,
+                indexes[start : start + chunk_size],
+                self._executor.submit(
+                    self._deliver,
+                    channel,
+                    [items[i][1] for i in indexes[start : start + chunk_size]],
+                ),
+            )
+            for channel, indexes in by_channel.items()
+            for start in range(0, len(indexes), chunk_size)
+        ]
+        failures: Dict[int, Dict[str, Optional[str]]] = defaultdict(dict)
+        for channel, indexes, future in futures:
+            for i, result in zip(indexes, future.result()):
+                if not result.success:
+                    failures[i][channel] = result.error_message
+
+        # 3. 失败渠道退避重试或进入死信，回写预警通知状态
+        alert_outcomes: Dict[int, Tuple[str, Optional[str], int]] = {}
+        for i, (payload, request) in enumerate(items):
+            if i in finished:
+                stats[finished[i]] += 1
+                if finished[i] == "skipped" and payload.get("notification_id"):
+                    alert_outcomes[payload["notification_id"]] = ("SKIPPED", "用户禁用此类通知", 0)
+                continue
+            if i not in failures:
+                stats["delivered"] += 1
+                if payload.get("notification_id"):
+                    alert_outcomes[payload["notification_id"]] = ("SENT", None, 0)
+                continue
+
+            attempts = payload.get("attempts", 0) + 1
+            error = "; ".join(f"{channel}: {msg}" for channel, msg in failures[i].items())
+            retry_payload = {
+                **payload,
+                "attempts": attempts,
+                "last_error": error,
+                "request": {**payload["request"], "channels": list(failures[i])},
+            }
+            if attempts < settings.NOTIFICATION_MAX_ATTEMPTS and schedule_retry(
+                retry_payload, _retry_delay(attempts)
+            ):
+                stats["retried"] += 1
+                continue
+            dead_letter(retry_payload, error)
+            stats["dead"] += 1
+            if not request.force_send:
+                release_dedup(NotificationService._dedup_key(request))
+            if payload.get("notification_id"):
+                alert_outcomes[payload["notification_id"]] = ("FAILED", error, attempts)
+
+        if alert_outcomes:
+            self._update_alert_notifications(alert_outcomes)
+        logger.info(f"通知批量投递完成: {stats}")
+        return stats
+
+    def _deliver(
+        self, channel: str, requests: List[NotificationRequest]
+    ) -> List[NotificationResult]:
+        """在独立会话中投递一批同渠道通知，受渠道并发上限约束"""
+        limit = self._limits.get(channel)
+        if limit:
+            limit.acquire()
+        try:
+            with get_db_session() as db:
+                handler = NotificationService(db).get_handler(channel)
+                if handler is None:
+                    logger.warning(f"未注册的渠道: {channel}")
+                    return [
+                        NotificationResult(
+                            channel=channel, success=False, error_message="未注册的渠道"
+                        )
+                        for _ in requests
+                    ]
+                return handler.send_batch(requests)
+        except Exception as exc:
+            logger.error(f"渠道{channel}批量发送失败: {exc}")
+            return [
+                NotificationResult(channel=channel, success=False, error_message=str(exc))
+                for _ in requests
+            ]
+        finally:
+            if limit:
+                limit.release()
+
+    @staticmethod
+    def _update_alert_notifications(outcomes: Dict[int, Tuple[str, Optional[str], int]]) -> None:
+        """回写预警通知状态：成功为 SENT，用户禁用为 SKIPPED，重试耗尽为 FAILED"""
+        with get_db_session() as db:
+            notifications = (
+                db.query(AlertNotification).filter(AlertNotification.id.in_(list(outcomes))).all()
+            )
+            for notification in notifications:
+                status, error, attempts = outcomes[notification.id]
+                notification.status = status
+                notification.error_message = error
+                notification.next_retry_at = None
+                channel = (notification.notify_channel or "SYSTEM").upper()
+                if status == "SENT":
+                    notification.sent_at = datetime.now()
+                    record_notification_success(channel)
+                elif status == "FAILED":
+                    notification.retry_count = (notification.retry_count or 0) + attempts
+                    record_notification_failure(channel)
+
+
+_worker: Optional[NotificationWorker] = None
+
+
+def start_notification_worker() -> Optional[NotificationWorker]:
+    """启动进程内通知队列消费者（未启用异步投递或未配置 Redis 时不启动）"""
+    global _worker
+    if not (settings.NOTIFICATION_ASYNC_ENABLED and settings.REDIS_URL):
+        return None
+    if _worker is None:
+        _worker = NotificationWorker()
+    _worker.start()
+    return _worker
+
+
+def stop_notification_worker() -> None:
+    """停止进程内通知队列消费者"""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
@@ -4,11 +4,14 @@
 
 提供用户/角色权限的缓存和即时生效机制。
 支持多租户隔离，防止跨租户数据泄露。
+批量失效按标签版本进行（perm / perm:t{tenant_id} / perm:{kind} / perm:t{tenant_id}:{kind}），
+不再按模式扫描 Redis 键。
 """
 
 import logging
 from typing import Any, Dict, List, Optional, Set
 
+from app.core.auth_principal import get_principal_cache
 from app.services.cache_service import CacheService
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,12 @@ CACHE_PREFIX_USER_ROLES = "perm:t{tenant_id}:user_roles"
 CACHE_PREFIX_ROLE_USERS = "perm:t{tenant_id}:role_users"
 CACHE_PREFIX_TENANT = "perm:tenant"
 
+# 缓存类别（用于标签）
+KIND_USER = "user"
+KIND_ROLE = "role"
+KIND_USER_ROLES = "user_roles"
+KIND_ROLE_USERS = "role_users"
+
 # 缓存过期时间（秒）
 PERMISSION_CACHE_TTL = 600  # 10 分钟
 ROLE_CACHE_TTL = 1800  # 30 分钟
@@ -60,6 +69,24 @@ class PermissionCacheService:
         tid = tenant_id if tenant_id is not None else "system"
         return f"{prefix.format(tenant_id=tid)}:{resource_id}"
 
+    @staticmethod
+    def _tags(kind: str, tenant_id: Optional[int]) -> tuple:
+        """缓存标签：全部权限 / 租户 / 类别 / 租户+类别"""
+        tid = tenant_id if tenant_id is not None else "system"
+        return ("perm", f"perm:t{tid}", f"perm:{kind}", f"perm:t{tid}:{kind}")
+
+    def _key(self, prefix: str, kind: str, tenant_id: Optional[int], resource_id: int) -> str:
+        """构建附带标签版本的缓存键"""
+        return self._cache.tagged_key(
+            self._build_key(prefix, tenant_id, resource_id), self._tags(kind, tenant_id)
+        )
+
+    def _get(self, prefix: str, kind: str, tenant_id: Optional[int], resource_id: int) -> Any:
+        """读取附带标签版本的缓存"""
+        return self._cache.get_tagged(
+            self._build_key(prefix, tenant_id, resource_id), self._tags(kind, tenant_id)
+        )
+
     # ==================== 用户权限缓存 ====================
 
     def get_user_permissions(
@@ -71,8 +98,7 @@ class PermissionCacheService:
             user_id: 用户ID
             tenant_id: 租户ID（可选，用于租户隔离）
         """
-        key = self._build_key(CACHE_PREFIX_USER_PERMISSIONS, tenant_id, user_id)
-        data = self._cache.get(key)
+        data = self._get(CACHE_PREFIX_USER_PERMISSIONS, KIND_USER, tenant_id, user_id)
         return set(data) if data else None
 
     def set_user_permissions(
@@ -85,8 +111,10 @@ class PermissionCacheService:
             permissions: 权限编码集合
             tenant_id: 租户ID（可选）
         """
-        key = self._build_key(CACHE_PREFIX_USER_PERMISSIONS, tenant_id, user_id)
-        return self._cache.set(key, list(permissions), PERMISSION_CACHE_TTL)
+        key = self._key(CACHE_PREFIX_USER_PERMISSIONS, KIND_USER, tenant_id, user_id)
+        return self._cache.set(
+            key, list(permissions), PERMISSION_CACHE_TTL, tags=self._tags(KIND_USER, tenant_id)
+        )
 
     def invalidate_user_permissions(self, user_id: int, tenant_id: Optional[int] = None) -> bool:
         """使用户权限缓存失效
@@ -95,8 +123,9 @@ class PermissionCacheService:
             user_id: 用户ID
             tenant_id: 租户ID（可选）
         """
-        key = self._build_key(CACHE_PREFIX_USER_PERMISSIONS, tenant_id, user_id)
+        key = self._key(CACHE_PREFIX_USER_PERMISSIONS, KIND_USER, tenant_id, user_id)
         logger.info(f"Invalidating user permission cache: tenant_id={tenant_id}, user_id={user_id}")
+        get_principal_cache().invalidate_user(user_id)
         return self._cache.delete(key)
 
     def invalidate_tenant_user_permissions(self, tenant_id: int) -> int:
@@ -108,14 +137,13 @@ class PermissionCacheService:
         Returns:
             删除的缓存数量
         """
-        pattern = f"perm:t{tenant_id}:user:*"
         logger.info(f"Invalidating all user permissions for tenant: tenant_id={tenant_id}")
-        return self._cache.delete_pattern(pattern)
+        return self._cache.invalidate_tags(f"perm:t{tenant_id}:{KIND_USER}")
 
     def invalidate_all_user_permissions(self) -> int:
         """使所有用户权限缓存失效（跨所有租户）"""
         logger.info("Invalidating all user permission caches (all tenants)")
-        return self._cache.delete_pattern("perm:t*:user:*")
+        return self._cache.invalidate_tags(f"perm:{KIND_USER}")
 
     # ==================== 角色权限缓存 ====================
 
@@ -123,32 +151,32 @@ class PermissionCacheService:
         self, role_id: int, tenant_id: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """获取角色权限缓存"""
-        key = self._build_key(CACHE_PREFIX_ROLE_PERMISSIONS, tenant_id, role_id)
-        return self._cache.get(key)
+        return self._get(CACHE_PREFIX_ROLE_PERMISSIONS, KIND_ROLE, tenant_id, role_id)
 
     def set_role_permissions(
         self, role_id: int, data: Dict[str, Any], tenant_id: Optional[int] = None
     ) -> bool:
         """设置角色权限缓存"""
-        key = self._build_key(CACHE_PREFIX_ROLE_PERMISSIONS, tenant_id, role_id)
-        return self._cache.set(key, data, ROLE_CACHE_TTL)
+        key = self._key(CACHE_PREFIX_ROLE_PERMISSIONS, KIND_ROLE, tenant_id, role_id)
+        return self._cache.set(
+            key, data, ROLE_CACHE_TTL, tags=self._tags(KIND_ROLE, tenant_id)
+        )
 
     def invalidate_role_permissions(self, role_id: int, tenant_id: Optional[int] = None) -> bool:
         """使角色权限缓存失效"""
-        key = self._build_key(CACHE_PREFIX_ROLE_PERMISSIONS, tenant_id, role_id)
+        key = self._key(CACHE_PREFIX_ROLE_PERMISSIONS, KIND_ROLE, tenant_id, role_id)
         logger.info(f"Invalidating role permission cache: tenant_id={tenant_id}, role_id={role_id}")
         return self._cache.delete(key)
 
     def invalidate_tenant_role_permissions(self, tenant_id: int) -> int:
         """使指定租户的所有角色权限缓存失效"""
-        pattern = f"perm:t{tenant_id}:role:*"
         logger.info(f"Invalidating all role permissions for tenant: tenant_id={tenant_id}")
-        return self._cache.delete_pattern(pattern)
+        return self._cache.invalidate_tags(f"perm:t{tenant_id}:{KIND_ROLE}")
 
     def invalidate_all_role_permissions(self) -> int:
         """使所有角色权限缓存失效"""
         logger.info("Invalidating all role permission caches")
-        return self._cache.delete_pattern("perm:t*:role:*")
+        return self._cache.invalidate_tags(f"perm:{KIND_ROLE}")
 
     # ==================== 用户-角色关联缓存 ====================
 
@@ -156,29 +184,31 @@ class PermissionCacheService:
         self, user_id: int, tenant_id: Optional[int] = None
     ) -> Optional[List[int]]:
         """获取用户的角色 ID 列表缓存"""
-        key = self._build_key(CACHE_PREFIX_USER_ROLES, tenant_id, user_id)
-        return self._cache.get(key)
+        return self._get(CACHE_PREFIX_USER_ROLES, KIND_USER_ROLES, tenant_id, user_id)
 
     def set_user_role_ids(
         self, user_id: int, role_ids: List[int], tenant_id: Optional[int] = None
     ) -> bool:
         """设置用户的角色 ID 列表缓存"""
-        key = self._build_key(CACHE_PREFIX_USER_ROLES, tenant_id, user_id)
-        return self._cache.set(key, role_ids, PERMISSION_CACHE_TTL)
+        key = self._key(CACHE_PREFIX_USER_ROLES, KIND_USER_ROLES, tenant_id, user_id)
+        return self._cache.set(
+            key, role_ids, PERMISSION_CACHE_TTL, tags=self._tags(KIND_USER_ROLES, tenant_id)
+        )
 
     def get_role_user_ids(
         self, role_id: int, tenant_id: Optional[int] = None
     ) -> Optional[List[int]]:
         """获取角色下的用户 ID 列表缓存"""
-        key = self._build_key(CACHE_PREFIX_ROLE_USERS, tenant_id, role_id)
-        return self._cache.get(key)
+        return self._get(CACHE_PREFIX_ROLE_USERS, KIND_ROLE_USERS, tenant_id, role_id)
 
     def set_role_user_ids(
         self, role_id: int, user_ids: List[int], tenant_id: Optional[int] = None
     ) -> bool:
         """设置角色下的用户 ID 列表缓存"""
-        key = self._build_key(CACHE_PREFIX_ROLE_USERS, tenant_id, role_id)
-        return self._cache.set(key, user_ids, ROLE_CACHE_TTL)
+        key = self._key(CACHE_PREFIX_ROLE_USERS, KIND_ROLE_USERS, tenant_id, role_id)
+        return self._cache.set(
+            key, user_ids, ROLE_CACHE_TTL, tags=self._tags(KIND_ROLE_USERS, tenant_id)
+        )
 
     # ==================== 批量失效操作 ====================
 
@@ -205,7 +235,7 @@ class PermissionCacheService:
             count += 1
 
         # 4. 清除角色-用户关联缓存
-        key = self._build_key(CACHE_PREFIX_ROLE_USERS, tenant_id, role_id)
+        key = self._key(CACHE_PREFIX_ROLE_USERS, KIND_ROLE_USERS, tenant_id, role_id)
         self._cache.delete(key)
         count += 1
 
@@ -230,7 +260,7 @@ class PermissionCacheService:
         count += 1
 
         # 2. 清除用户-角色关联缓存
-        key = self._build_key(CACHE_PREFIX_USER_ROLES, tenant_id, user_id)
+        key = self._key(CACHE_PREFIX_USER_ROLES, KIND_USER_ROLES, tenant_id, user_id)
         self._cache.delete(key)
         count += 1
 
@@ -239,7 +269,7 @@ class PermissionCacheService:
         added_roles = set(new_role_ids) - set(old_role_ids)
 
         for role_id in removed_roles | added_roles:
-            key = self._build_key(CACHE_PREFIX_ROLE_USERS, tenant_id, role_id)
+            key = self._key(CACHE_PREFIX_ROLE_USERS, KIND_ROLE_USERS, tenant_id, role_id)
             self._cache.delete(key)
             count += 1
 
@@ -261,7 +291,8 @@ class PermissionCacheService:
             删除的缓存数量
         """
         count = 0
-        count += self._cache.delete_pattern(f"perm:t{tenant_id}:*")
+        count += self._cache.invalidate_tags(f"perm:t{tenant_id}")
+        get_principal_cache().invalidate_tenant(tenant_id)
         logger.info(
             f"Invalidated all permission caches for tenant: tenant_id={tenant_id}, count={count}"
         )
@@ -270,7 +301,8 @@ class PermissionCacheService:
     def invalidate_all(self) -> int:
         """使所有权限相关缓存失效（谨慎使用，影响所有租户）"""
         count = 0
-        count += self._cache.delete_pattern("perm:t*:*")
+        count += self._cache.invalidate_tags("perm")
+        get_principal_cache().clear()
         logger.info(f"Invalidated all permission caches: count={count}")
         return count
 
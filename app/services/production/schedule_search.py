@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+生产排程多策略并行搜索
+
+在进程池中并发运行多种工单排序 × 排程算法（贪心/启发式），
+每个候选方案用 _calculate_schedule_score 评分，在墙钟预算内收集结果，
+返回帕累托最优方案集合。
+
+子进程只接触脱离会话的内存快照（工单、设备、工人、技能表），不访问数据库。
+进程池为模块级单例，跨请求复用，以 forkserver/spawn 方式启动子进程
+（Web 进程是多线程的，fork 可能复制到被其他线程持有的锁）。
+每个候选携带截止时间，超时后在子进程内自行终止，不占用后续请求的进程池。
+"""
+
+import logging
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from app.schemas.production_schedule import ScheduleGenerateRequest
+from app.services.production_schedule_service import ProductionScheduleService
+
+logger = logging.getLogger(__name__)
+
+# 工单排序策略
+ORDERINGS = ("PRIORITY_DUE", "DUE_DATE", "SHORTEST_FIRST", "LONGEST_FIRST")
+ALGORITHMS = ("GREEDY", "HEURISTIC")
+
+
+@dataclass(frozen=True)
+class OrderSnapshot:
+    """工单快照（排程所需字段）"""
+
+    id: int
+    work_order_no: str
+    priority: Optional[str]
+    plan_end_date: Optional[date]
+    standard_hours: Optional[float]
+    workshop_id: Optional[int]
+    process_id: Optional[int]
+    machine_id: Optional[int]
+    assigned_to: Optional[int]
+
+    @classmethod
+    def from_model(cls, order) -> "OrderSnapshot":
+        return cls(
+            id=order.id,
+            work_order_no=order.work_order_no or "",
+            priority=order.priority,
+            plan_end_date=order.plan_end_date,
+            standard_hours=float(order.standard_hours) if order.standard_hours else None,
+            workshop_id=order.workshop_id,
+            process_id=order.process_id,
+            machine_id=order.machine_id,
+            assigned_to=order.assigned_to,
+        )
+
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """设备/工人快照"""
+
+    id: int
+    workshop_id: Optional[int]
+
+    @classmethod
+    def from_model(cls, resource) -> "ResourceSnapshot":
+        return cls(id=resource.id, workshop_id=resource.workshop_id)
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """一次搜索的全部输入"""
+
+    orders: Tuple[OrderSnapshot, ...]
+    equipment: Tuple[ResourceSnapshot, ...]
+    workers: Tuple[ResourceSnapshot, ...]
+    skills: Dict[int, FrozenSet[int]]
+    request: ScheduleGenerateRequest
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """单个工单的排程结果"""
+
+    work_order_id: int
+    equipment_id: Optional[int]
+    worker_id: Optional[int]
+    start: datetime
+    end: datetime
+    duration_hours: float
+    priority_score: float
+    sequence_no: int
+    score: float
+
+
+@dataclass
+class CandidatePlan:
+    """候选方案及其目标值"""
+
+    ordering: str
+    algorithm: str
+    assignments: List[Assignment] = field(default_factory=list)
+    score: float = 0.0  # 平均单排程评分（越大越好）
+    conflict_count: int = 0  # 资源冲突数（越小越好）
+    late_count: int = 0  # 逾期工单数（越小越好）
+    makespan_hours: float = 0.0  # 总跨度（越小越好）
+    elapsed_seconds: float = 0.0
+
+    @property
+    def strategy(self) -> str:
+        return f"{self.algorithm}/{self.ordering}"
+
+    def dominates(self, other: "CandidatePlan") -> bool:
+        """是否帕累托支配另一方案"""
+        mine, theirs = self.objectives(), other.objectives()
+        return all(a <= b for a, b in zip(mine, theirs)) and mine != theirs
+
+    def objectives(self) -> Tuple[int, float, int, float]:
+        """目标向量（均为越小越好）"""
+        return (self.conflict_count, -self.score, self.late_count, self.makespan_hours)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "score": round(self.score, 2),
+            "conflict_count": self.conflict_count,
+            "late_count": self.late_count,
+            "makespan_hours": round(self.makespan_hours, 2),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+
+def pareto_front(
+    plans: Sequence[CandidatePlan], optimize_target: str = "BALANCED"
+) -> List[CandidatePlan]:
+    """
+    帕累托最优方案（按优化目标排序，首个为推荐方案）
+
+    无冲突优先；TIME 其次看总跨度，其余其次看评分。
+    """
+    front = [p for p in plans if not any(o.dominates(p) for o in plans if o is not p)]
+
+    # 目标值完全相同的方案只保留一个
+    unique: Dict[Tuple, CandidatePlan] = {}
+    for plan in front:
+        unique.setdefault(plan.objectives(), plan)
+    front = list(unique.values())
+
+    if optimize_target == "TIME":
+        front.sort(key=lambda p: (p.conflict_count, p.makespan_hours, p.late_count, -p.score))
+    else:
+        front.sort(key=lambda p: p.objectives())
+    return front
+
+
+def count_resource_overlaps(assignments: Sequence[Assignment]) -> int:
+    """按设备、工人分组统计时间重叠的排程数"""
+    count = 0
+    for attr in ("equipment_id", "worker_id"):
+        groups: Dict[int, List[Assignment]] = {}
+        for a in assignments:
+            resource_id = getattr(a, attr)
+            if resource_id:
+                groups.setdefault(resource_id, []).append(a)
+        for items in groups.values():
+            items.sort(key=lambda a: a.start)
+            latest_end = None
+            for a in items:
+                if latest_end is not None and a.start < latest_end:
+                    count += 1
+                latest_end = a.end if latest_end is None else max(latest_end, a.end)
+    return count
+
+
+# ==================== 单个候选方案（子进程执行） ====================
+
+
+class CandidateTimeout(Exception):
+    """候选方案超过截止时间"""
+
+
+class _SnapshotScheduler(ProductionScheduleService):
+    """基于快照的排程器（不访问数据库，超过截止时间即中止）"""
+
+    def __init__(self, skills: Dict[int, FrozenSet[int]], deadline: Optional[float] = None):
+        super().__init__(db=None)
+        self._skills = skills
+        self._deadline = deadline
+
+    def check_deadline(self) -> None:
+        if self._deadline is not None and time.time() >= self._deadline:
+            raise CandidateTimeout()
+
+    def _get_skilled_worker_ids(self, process_id: int) -> FrozenSet[int]:
+        return self._skills.get(process_id, frozenset())
+
+    def _select_best_equipment(self, *args, **kwargs):
+        # 贪心排程每个工单调用一次
+        self.check_deadline()
+        return super()._select_best_equipment(*args, **kwargs)
+
+    def _should_swap_schedules(self, *args, **kwargs) -> bool:
+        # 交换优化的内层循环
+        self.check_deadline()
+        return super()._should_swap_schedules(*args, **kwargs)
+
+
+def _order_sort_key(ordering: str, weight: Callable[[Optional[str]], int]):
+    if ordering.startswith("RANDOM:"):
+        # 已在外部打乱，稳定排序保持原顺序
+        return lambda o: 0
+
+    def due(o):
+        return o.plan_end_date or date.max
+
+    def hours(o):
+        return float(o.standard_hours or 8)
+
+    if ordering == "DUE_DATE":
+        return lambda o: (due(o), weight(o.priority), o.work_order_no)
+    if ordering == "SHORTEST_FIRST":
+        return lambda o: (hours(o), weight(o.priority), due(o))
+    if ordering == "LONGEST_FIRST":
+        return lambda o: (-hours(o), weight(o.priority), due(o))
+    return lambda o: (weight(o.priority), due(o), o.work_order_no)
+
+
+def run_candidate(
+    snapshot: ScheduleSnapshot,
+    ordering: str,
+    algorithm: str,
+    deadline: Optional[float] = None,
+) -> CandidatePlan:
+    """
+    在快照上运行一种排序 + 算法组合并评分
+
+    deadline 为 time.time() 时间戳，超过即抛出 CandidateTimeout（含排队到截止后才开始的情况）。
+    """
+    began = time.monotonic()
+    scheduler = _SnapshotScheduler(snapshot.skills, deadline)
+    scheduler.check_deadline()
+    orders = list(snapshot.orders)
+    if ordering.startswith("RANDOM:"):
+        random.Random(int(ordering.split(":", 1)[1])).shuffle(orders)
+
+    schedules = scheduler._greedy_scheduling(
+        orders,
+        list(snapshot.equipment),
+        list(snapshot.workers),
+        snapshot.request,
+        plan_id=0,
+        user_id=0,
+        sort_key=_order_sort_key(ordering, scheduler._get_priority_weight),
+    )
+    if algorithm == "HEURISTIC":
+        schedules = scheduler._optimize_schedules(schedules, snapshot.request)
+
+    order_map = {o.id: o for o in orders}
+    plan = CandidatePlan(ordering=ordering, algorithm=algorithm)
+    late = 0
+    for s in schedules:
+        order = order_map[s.work_order_id]
+        score = scheduler._calculate_schedule_score(s, [order])
+        if order.plan_end_date and s.scheduled_end_time.date() > order.plan_end_date:
+            late += 1
+        plan.assignments.append(
+            Assignment(
+                work_order_id=s.work_order_id,
+                equipment_id=s.equipment_id,
+                worker_id=s.worker_id,
+                start=s.scheduled_start_time,
+                end=s.scheduled_end_time,
+                duration_hours=s.duration_hours,
+                priority_score=s.priority_score,
+                sequence_no=s.sequence_no,
+                score=score,
+            )
+        )
+
+    if plan.assignments:
+        plan.score = sum(a.score for a in plan.assignments) / len(plan.assignments)
+        plan.makespan_hours = (
+            max(a.end for a in plan.assignments) - min(a.start for a in plan.assignments)
+        ).total_seconds() / 3600
+    plan.late_count = late
+    plan.conflict_count = count_resource_overlaps(plan.assignments)
+    plan.elapsed_seconds = time.monotonic() - began
+    return plan
+
+
+# ==================== 进程池 ====================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """获取模块级进程池（大小与 max_workers 不一致时重建）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != max_workers:
+            # 旧池上进行中的搜索照常完成，之后进程随旧池退出
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            context = multiprocessing.get_context(_start_method())
+            if context.get_start_method() == "forkserver":
+                # forkserver 预先导入本模块，子进程由其 fork 而来，不必各自重新导入应用
+                context.set_forkserver_preload([__name__])
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            _pool_workers = max_workers
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """丢弃已损坏的进程池（子进程异常退出），下次搜索时重建"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_search_pool() -> None:
+    """关闭排程搜索进程池（应用退出时调用）"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ==================== 搜索引擎 ====================
+
+
+class ScheduleSearchEngine:
+    """多策略并行排程搜索"""
+
+    def __init__(
+        self,
+        budget_seconds: float = 5.0,
+        max_workers: int = 4,
+        random_restarts: int = 4,
+    ):
+        self.budget_seconds = budget_seconds
+        self.max_workers = max_workers
+        self.random_restarts = random_restarts
+
+    @staticmethod
+    def build_snapshot(
+        work_orders: Sequence[Any],
+        equipment: Sequence[Any],
+        workers: Sequence[Any],
+        skills: Dict[int, FrozenSet[int]],
+        request: ScheduleGenerateRequest,
+    ) -> ScheduleSnapshot:
+        """由 ORM 对象构建脱离会话的快照"""
+        return ScheduleSnapshot(
+            orders=tuple(OrderSnapshot.from_model(o) for o in work_orders),
+            equipment=tuple(ResourceSnapshot.from_model(e) for e in equipment),
+            workers=tuple(ResourceSnapshot.from_model(w) for w in workers),
+            skills=skills,
+            request=request,
+        )
+
+    def candidates(self) -> List[Tuple[str, str]]:
+        """候选（排序, 算法）组合，按优先程度排列"""
+        combos = [(ordering, algorithm) for algorithm in ALGORITHMS for ordering in ORDERINGS]
+        combos += [(f"RANDOM:{seed}", "HEURISTIC") for seed in range(self.random_restarts)]
+        return combos
+
+    def search(self, snapshot: ScheduleSnapshot) -> List[CandidatePlan]:
+        """
+        在预算内运行全部候选并返回帕累托最优方案
+
+        其他候选的截止时间为一个预算，预算耗尽时取消未开始的候选，运行中的候选在子进程内自行中止；
+        首个候选（默认策略）截止时间为两个预算，若预算耗尽时尚无结果，再等待它至多一个预算，
+        仍无结果则在当前进程顺序执行。
+        """
+        if not snapshot.orders:
+            return []
+
+        combos = self.candidates()
+        plans: List[CandidatePlan] = []
+        if self.max_workers > 1:
+            try:
+                plans = self._search_in_pool(snapshot, combos)
+            except (OSError, NotImplementedError, RuntimeError) as e:
+                logger.warning(f"排程搜索进程池不可用，改为顺序执行: {e}")
+                plans = []
+        if not plans:
+            plans = self._search_sequential(snapshot, combos)
+
+        return pareto_front(plans, snapshot.request.optimize_target)
+
+    def _search_sequential(
+        self, snapshot: ScheduleSnapshot, combos: List[Tuple[str, str]]
+    ) -> List[CandidatePlan]:
+        deadline = time.monotonic() + self.budget_seconds
+        plans = []
+        for ordering, algorithm in combos:
+            if plans and time.monotonic() >= deadline:
+                break
+            plans.append(run_candidate(snapshot, ordering, algorithm))
+        return plans
+
+    def _search_in_pool(
+        self, snapshot: ScheduleSnapshot, combos: List[Tuple[str, str]]
+    ) -> List[CandidatePlan]:
+        pool = _get_pool(self.max_workers)
+        futures = []
+        started = time.time()
+        try:
+            futures = [
+                pool.submit(
+                    run_candidate,
+                    snapshot,
+                    o,
+                    a,
+                    started + self.budget_seconds * (2 if i == 0 else 1),
+                )
+                for i, (o, a) in enumerate(combos)
+            ]
+            done, _ = wait(futures, timeout=self.budget_seconds)
+            if not done:
+                done, _ = wait(futures, timeout=self.budget_seconds, return_when=FIRST_COMPLETED)
+
+            plans = []
+            for future in done:
+                try:
+                    plans.append(future.result())
+                except BrokenProcessPool:
+                    raise
+                except CandidateTimeout:
+                    continue
+                except Exception as e:
+                    logger.warning(f"排程候选方案执行失败: {e}")
+            logger.info(f"排程搜索完成: {len(plans)}/{len(combos)} 个候选在预算内完成")
+            return plans
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+        finally:
+            # 取消尚未开始的候选；已在运行的候选到截止时间自行中止
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+生产排程资源时间线
+
+每个资源（设备/工人）维护一条按开始时间排序的占用区间表：
+- 重叠区间在插入时合并，区间两两不相交，开始/结束时间均单调递增
+- 冲突查询用二分定位，O(log n)
+- 最早可用时间查询只跳过真正挡路的区间，不再逐个扫描全部已排程
+- 冲突检测按资源分组扫描线，O(n log n)；单个排程可对已有索引增量检查
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from heapq import heappop, heappush
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+Interval = Tuple[datetime, datetime]
+
+
+class ResourceTimeline:
+    """单个资源的占用时间线"""
+
+    __slots__ = ("_starts", "_ends", "_count")
+
+    def __init__(self, slots: Optional[Iterable[Interval]] = None):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        self._count = 0
+        for start, end in sorted(slots or ()):
+            self.add(start, end)
+
+    @classmethod
+    def of(cls, slots: Union["ResourceTimeline", Sequence[Interval], None]) -> "ResourceTimeline":
+        """把区间列表包装为时间线（已是时间线则原样返回）"""
+        if isinstance(slots, ResourceTimeline):
+            return slots
+        return cls(slots)
+
+    def __len__(self) -> int:
+        """已安排的排程数（用于选择最空闲资源）"""
+        return self._count
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(zip(self._starts, self._ends))
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """登记占用区间，与已有区间重叠时合并"""
+        self._count += 1
+        if end <= start:
+            return
+
+        # 第一个结束时间晚于 start 的区间起，所有开始时间早于 end 的区间都与之重叠
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end, lo)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def first_overlap(self, start: datetime, end: datetime) -> Optional[Interval]:
+        """返回与 [start, end) 重叠的最早占用区间，无冲突返回 None"""
+        i = bisect_right(self._ends, start)
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """[start, end) 是否空闲"""
+        return self.first_overlap(start, end) is None
+
+
+def find_earliest_fit(
+    timelines: Sequence[ResourceTimeline],
+    start_from: datetime,
+    align: Callable[[datetime], datetime],
+    end_of: Callable[[datetime], datetime],
+) -> datetime:
+    """
+    在多条时间线上查找同时空闲的最早开始时间
+
+    Args:
+        timelines: 需要同时空闲的资源时间线
+        start_from: 最早开始时间
+        align: 把时间对齐到工作时间
+        end_of: 由开始时间计算结束时间（考虑工作日历）
+
+    Returns:
+        最早可用开始时间。每次冲突都会越过一个占用区间，因此必然终止。
+    """
+    current = align(start_from)
+    while True:
+        end = end_of(current)
+        for timeline in timelines:
+            blocking = timeline.first_overlap(current, end)
+            if blocking is not None:
+                current = align(blocking[1])
+                break
+        else:
+            return current
+
+
+# ==================== 冲突检测 ====================
+
+# 参与冲突检测的资源：(资源类型, 排程上的资源字段)
+RESOURCE_FIELDS = (("equipment", "equipment_id"), ("worker", "worker_id"))
+
+
+def _overlaps(start1: datetime, end1: datetime, start2: datetime, end2: datetime) -> bool:
+    return start1 < end2 and end1 > start2
+
+
+def find_overlapping_pairs(schedules: Sequence) -> List[Tuple[int, int, str]]:
+    """
+    扫描线检测同一设备/工人上时间重叠的排程对
+
+    按资源分组、按开始时间排序后扫描，活动集合为按结束时间的小顶堆，
+    复杂度 O(n log n + k)，k 为冲突对数。
+
+    Returns:
+        [(i, j, 资源类型)]，i < j 为 schedules 中的下标，
+        按 (i, j, 设备先于工人) 排序，与逐对比较的输出顺序一致
+    """
+    pairs: List[Tuple[int, int, int]] = []
+    for rank, (resource_type, field) in enumerate(RESOURCE_FIELDS):
+        groups = {}
+        for index, schedule in enumerate(schedules):
+            resource_id = getattr(schedule, field, None)
+            if resource_id and schedule.scheduled_start_time and schedule.scheduled_end_time:
+                groups.setdefault(resource_id, []).append(index)
+
+        for indices in groups.values():
+            if len(indices) < 2:
+                continue
+            indices.sort(key=lambda i: schedules[i].scheduled_start_time)
+            active: List[Tuple[datetime, int]] = []
+            for index in indices:
+                start = schedules[index].scheduled_start_time
+                end = schedules[index].scheduled_end_time
+                while active and active[0][0] <= start:
+                    heappop(active)
+                for _, other in active:
+                    other_schedule = schedules[other]
+                    if _overlaps(
+                        start,
+                        end,
+                        other_schedule.scheduled_start_time,
+                        other_schedule.scheduled_end_time,
+                    ):
+                        pairs.append((min(index, other), max(index, other), rank))
+                heappush(active, (end, index))
+
+    pairs.sort()
+    return [(i, j, RESOURCE_FIELDS[rank][0]) for i, j, rank in pairs]
+
+
+class ScheduleIndex:
+    """
+    按资源索引的已有排程，用于单个新排程的增量冲突检查
+
+    每个资源的排程按开始时间排序，并维护结束时间的前缀最大值：
+    二分定位开始时间早于新排程结束的区段后向前扫描，
+    前缀最大结束时间不晚于新排程开始即可停止。
+    """
+
+    def __init__(self, schedules: Iterable = ()):
+        self._groups = {}
+        for schedule in schedules:
+            self._register(schedule)
+        self._built = {}
+
+    def _register(self, schedule) -> None:
+        for resource_type, field in RESOURCE_FIELDS:
+            resource_id = getattr(schedule, field, None)
+            if resource_id:
+                self._groups.setdefault((resource_type, resource_id), []).append(schedule)
+
+    def add(self, schedule) -> None:
+        """登记排程（下一次查询时重建对应资源的索引）"""
+        self._register(schedule)
+        for resource_type, field in RESOURCE_FIELDS:
+            self._built.pop((resource_type, getattr(schedule, field, None)), None)
+
+    def _index(self, key):
+        built = self._built.get(key)
+        if built is None:
+            items = sorted(self._groups.get(key, ()), key=lambda s: s.scheduled_start_time)
+            starts = [s.scheduled_start_time for s in items]
+            max_ends: List[datetime] = []
+            for s in items:
+                end = s.scheduled_end_time
+                max_ends.append(max(max_ends[-1], end) if max_ends else end)
+            built = self._built[key] = (items, starts, max_ends)
+        return built
+
+    def conflicts_with(self, schedule) -> List[Tuple[str, object]]:
+        """返回与给定排程在同一设备/工人上时间重叠的已有排程 [(资源类型, 排程)]"""
+        start, end = schedule.scheduled_start_time, schedule.scheduled_end_time
+        result = []
+        for resource_type, field in RESOURCE_FIELDS:
+            resource_id = getattr(schedule, field, None)
+            if not resource_id:
+                continue
+            items, starts, max_ends = self._index((resource_type, resource_id))
+            i = bisect_left(starts, end) - 1
+            while i >= 0 and max_ends[i] > start:
+                other = items[i]
+                if other is not schedule and _overlaps(
+                    start, end, other.scheduled_start_time, other.scheduled_end_time
+                ):
+                    result.append((resource_type, other))
+                i -= 1
+        return result
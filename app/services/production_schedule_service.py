@@ -4,12 +4,13 @@
 """
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from sqlalchemy import and_, or_
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.common.query_filters import apply_pagination
+from app.core.config import settings
 from app.models.production import (
     Equipment,
     ProductionResourceConflict,
@@ -27,6 +28,12 @@ from app.schemas.production_schedule import (
     ScheduleResponse,
     ScheduleScoreMetrics,
 )
+from app.services.production.schedule_timeline import (
+    ResourceTimeline,
+    ScheduleIndex,
+    find_earliest_fit,
+    find_overlapping_pairs,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +59,10 @@ class ProductionScheduleService:
 
     def __init__(self, db: Session):
         self.db = db
+        # 最近一次多策略搜索的帕累托方案（algorithm=SEARCH 时填充）
+        self.last_search_plans: List[Any] = []
+        # 最近一次紧急插单移动的排程（schedule_id -> 调整前后时间）
+        self.last_insert_diff: List[Dict[str, Any]] = []
 
     # ==================== 智能排程算法 ====================
 
@@ -91,6 +102,10 @@ class ProductionScheduleService:
             schedules = self._heuristic_scheduling(
                 work_orders, available_equipment, available_workers, request, plan_id, user_id
             )
+        elif request.algorithm == "SEARCH":
+            schedules = self._search_scheduling(
+                work_orders, available_equipment, available_workers, request, plan_id, user_id
+            )
         else:
             # 默认使用贪心算法
             schedules = self._greedy_scheduling(
@@ -175,6 +190,7 @@ class ProductionScheduleService:
                 "elapsed_time_seconds": elapsed_time,
             },
             "warnings": warnings,
+            "candidate_plans": [plan.summary() for plan in self.last_search_plans],
         }
 
     def _greedy_scheduling(
@@ -185,12 +201,13 @@ class ProductionScheduleService:
         request: ScheduleGenerateRequest,
         plan_id: int,
         user_id: int,
+        sort_key: Optional[Callable[[WorkOrder], Any]] = None,
     ) -> List[ProductionSchedule]:
         """
         贪心排程算法
 
         策略:
-        1. 按优先级和交期排序工单
+        1. 按优先级和交期排序工单（可通过 sort_key 指定其他排序）
         2. 对每个工单选择最优资源(设备+工人)
         3. 安排在最早可用时间
         """
@@ -199,16 +216,19 @@ class ProductionScheduleService:
         # 1. 工单排序: 优先级 > 交期 > 工单号
         sorted_orders = sorted(
             work_orders,
-            key=lambda x: (
-                self._get_priority_weight(x.priority),
-                x.plan_end_date or datetime.max.date(),
-                x.work_order_no,
+            key=sort_key
+            or (
+                lambda x: (
+                    self._get_priority_weight(x.priority),
+                    x.plan_end_date or datetime.max.date(),
+                    x.work_order_no,
+                )
             ),
         )
 
-        # 2. 资源时间表 (记录每个资源的占用情况)
-        equipment_timeline = {eq.id: [] for eq in equipment}
-        worker_timeline = {w.id: [] for w in workers}
+        # 2. 资源时间线 (记录每个资源的占用情况，二分查找冲突)
+        equipment_timeline = {eq.id: ResourceTimeline() for eq in equipment}
+        worker_timeline = {w.id: ResourceTimeline() for w in workers}
 
         # 3. 为每个工单分配资源和时间
         current_time = request.start_date
@@ -225,8 +245,8 @@ class ProductionScheduleService:
 
             # 计算最早开始时间
             earliest_start = self._find_earliest_available_slot(
-                equipment_timeline.get(best_equipment.id if best_equipment else None, []),
-                worker_timeline.get(best_worker.id if best_worker else None, []),
+                equipment_timeline.get(best_equipment.id if best_equipment else None),
+                worker_timeline.get(best_worker.id if best_worker else None),
                 current_time,
                 duration_hours,
                 request,
@@ -257,9 +277,9 @@ class ProductionScheduleService:
 
             # 更新资源时间表
             if best_equipment:
-                equipment_timeline[best_equipment.id].append((earliest_start, end_time))
+                equipment_timeline[best_equipment.id].add(earliest_start, end_time)
             if best_worker:
-                worker_timeline[best_worker.id].append((earliest_start, end_time))
+                worker_timeline[best_worker.id].add(earliest_start, end_time)
 
         return schedules
 
@@ -290,6 +310,61 @@ class ProductionScheduleService:
 
         return schedules
 
+    def _search_scheduling(
+        self,
+        work_orders: List[WorkOrder],
+        equipment: List[Equipment],
+        workers: List[Worker],
+        request: ScheduleGenerateRequest,
+        plan_id: int,
+        user_id: int,
+    ) -> List[ProductionSchedule]:
+        """
+        多策略并行搜索排程
+
+        在进程池中并发运行多种工单排序 × 贪心/启发式组合，
+        预算内取帕累托最优方案中的首选方案落地。
+        """
+        from app.services.production.schedule_search import ScheduleSearchEngine
+
+        skills = {}
+        if request.consider_worker_skills:
+            process_ids = {o.process_id for o in work_orders if o.process_id}
+            skills = self._load_worker_skills(process_ids)
+
+        engine = ScheduleSearchEngine(
+            budget_seconds=settings.SCHEDULE_SEARCH_BUDGET_SECONDS,
+            max_workers=settings.SCHEDULE_SEARCH_MAX_WORKERS,
+            random_restarts=settings.SCHEDULE_SEARCH_RANDOM_RESTARTS,
+        )
+        snapshot = engine.build_snapshot(work_orders, equipment, workers, skills, request)
+        self.last_search_plans = engine.search(snapshot)
+        if not self.last_search_plans:
+            return []
+
+        best = self.last_search_plans[0]
+        logger.info(f"排程搜索选用方案: {best.strategy}, 评分 {best.score:.2f}")
+        orders = {o.id: o for o in work_orders}
+        return [
+            ProductionSchedule(
+                work_order_id=a.work_order_id,
+                schedule_plan_id=plan_id,
+                equipment_id=a.equipment_id,
+                worker_id=a.worker_id,
+                workshop_id=orders[a.work_order_id].workshop_id,
+                process_id=orders[a.work_order_id].process_id,
+                scheduled_start_time=a.start,
+                scheduled_end_time=a.end,
+                duration_hours=a.duration_hours,
+                priority_score=a.priority_score,
+                status="PENDING",
+                algorithm_version=self.ALGORITHM_VERSION,
+                created_by=user_id,
+                sequence_no=a.sequence_no,
+            )
+            for a in best.assignments
+        ]
+
     def _optimize_schedules(
         self, schedules: List[ProductionSchedule], request: ScheduleGenerateRequest
     ) -> List[ProductionSchedule]:
@@ -376,12 +451,7 @@ class ProductionScheduleService:
 
         if request.consider_worker_skills and order.process_id:
             # 查询具有该工序技能的工人
-            skilled_worker_ids = (
-                self.db.query(WorkerSkill.worker_id)
-                .filter(WorkerSkill.process_id == order.process_id)
-                .all()
-            )
-            skilled_ids = [w[0] for w in skilled_worker_ids]
+            skilled_ids = self._get_skilled_worker_ids(order.process_id)
             candidates = [
                 w for w in workers if w.id in skilled_ids and w.workshop_id == order.workshop_id
             ]
@@ -396,51 +466,54 @@ class ProductionScheduleService:
         best_worker = min(candidates, key=lambda w: len(timeline.get(w.id, [])))
         return best_worker
 
+    def _get_skilled_worker_ids(self, process_id: int) -> List[int]:
+        """具有指定工序技能的工人ID"""
+        rows = (
+            self.db.query(WorkerSkill.worker_id)
+            .filter(WorkerSkill.process_id == process_id)
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    def _load_worker_skills(self, process_ids) -> Dict[int, frozenset]:
+        """一次查询加载多个工序的技能工人表"""
+        if not process_ids:
+            return {}
+        rows = (
+            self.db.query(WorkerSkill.process_id, WorkerSkill.worker_id)
+            .filter(WorkerSkill.process_id.in_(list(process_ids)))
+            .all()
+        )
+        skills: Dict[int, set] = {}
+        for process_id, worker_id in rows:
+            skills.setdefault(process_id, set()).add(worker_id)
+        return {pid: frozenset(ids) for pid, ids in skills.items()}
+
     # ==================== 时间计算 ====================
 
     def _find_earliest_available_slot(
         self,
-        equipment_slots: List[Tuple[datetime, datetime]],
-        worker_slots: List[Tuple[datetime, datetime]],
+        equipment_slots: Optional[Union[ResourceTimeline, List[Tuple[datetime, datetime]]]],
+        worker_slots: Optional[Union[ResourceTimeline, List[Tuple[datetime, datetime]]]],
         start_from: datetime,
         duration_hours: float,
         request: ScheduleGenerateRequest,
     ) -> datetime:
-        """找到最早可用时间槽"""
-        current = start_from
-
-        # 调整到工作时间开始
-        current = self._adjust_to_work_time(current, request)
-
-        max_attempts = 100
-        attempts = 0
-
-        while attempts < max_attempts:
-            end = self._calculate_end_time(current, duration_hours, request)
-
-            # 检查是否与已有排程冲突
-            has_conflict = False
-
-            for slot_start, slot_end in equipment_slots:
-                if self._time_overlap(current, end, slot_start, slot_end):
-                    has_conflict = True
-                    current = slot_end
-                    break
-
-            if not has_conflict:
-                for slot_start, slot_end in worker_slots:
-                    if self._time_overlap(current, end, slot_start, slot_end):
-                        has_conflict = True
-                        current = slot_end
-                        break
-
-            if not has_conflict:
-                return current
-
-            current = self._adjust_to_work_time(current, request)
-            attempts += 1
+        """
+        找到设备和工人同时空闲的最早可用时间槽
 
-        return current
+        占用区间按时间线二分定位，冲突时直接跳到挡路区间的结束时间，
+        并按工作时间日历对齐，直到找到可用时间（不设尝试次数上限）。
+        """
+        timelines = [
+            ResourceTimeline.of(slots) for slots in (equipment_slots, worker_slots) if slots
+        ]
+        return find_earliest_fit(
+            timelines,
+            start_from,
+            align=lambda dt: self._adjust_to_work_time(dt, request),
+            end_of=lambda dt: self._calculate_end_time(dt, duration_hours, request),
+        )
 
     def _calculate_end_time(
         self, start_time: datetime, duration_hours: float, request: ScheduleGenerateRequest
@@ -494,76 +567,54 @@ class ProductionScheduleService:
     def _detect_conflicts(
         self, schedules: List[ProductionSchedule]
     ) -> List[ProductionResourceConflict]:
-        """检测资源冲突"""
-        conflicts = []
+        """检测资源冲突（按设备/工人分组扫描线，O(n log n)）"""
         detected_at = datetime.now()
+        return [
+            self._build_conflict(schedules[i], schedules[j], resource_type, detected_at)
+            for i, j, resource_type in find_overlapping_pairs(schedules)
+        ]
 
-        # 检查设备冲突
-        for i, schedule1 in enumerate(schedules):
-            for schedule2 in schedules[i + 1 :]:
-                # 设备冲突
-                if (
-                    schedule1.equipment_id
-                    and schedule1.equipment_id == schedule2.equipment_id
-                    and self._time_overlap(
-                        schedule1.scheduled_start_time,
-                        schedule1.scheduled_end_time,
-                        schedule2.scheduled_start_time,
-                        schedule2.scheduled_end_time,
-                    )
-                ):
-                    conflict = ProductionResourceConflict(
-                        schedule_id=schedule1.id,
-                        conflicting_schedule_id=schedule2.id,
-                        conflict_type="EQUIPMENT",
-                        resource_type="equipment",
-                        resource_id=schedule1.equipment_id,
-                        conflict_description=f"设备 {schedule1.equipment_id} 时间冲突",
-                        severity="HIGH",
-                        conflict_start_time=max(
-                            schedule1.scheduled_start_time, schedule2.scheduled_start_time
-                        ),
-                        conflict_end_time=min(
-                            schedule1.scheduled_end_time, schedule2.scheduled_end_time
-                        ),
-                        status="UNRESOLVED",
-                        detected_at=detected_at,
-                        detected_by="AUTO",
-                    )
-                    conflicts.append(conflict)
-
-                # 工人冲突
-                if (
-                    schedule1.worker_id
-                    and schedule1.worker_id == schedule2.worker_id
-                    and self._time_overlap(
-                        schedule1.scheduled_start_time,
-                        schedule1.scheduled_end_time,
-                        schedule2.scheduled_start_time,
-                        schedule2.scheduled_end_time,
-                    )
-                ):
-                    conflict = ProductionResourceConflict(
-                        schedule_id=schedule1.id,
-                        conflicting_schedule_id=schedule2.id,
-                        conflict_type="WORKER",
-                        resource_type="worker",
-                        resource_id=schedule1.worker_id,
-                        conflict_description=f"工人 {schedule1.worker_id} 时间冲突",
-                        severity="MEDIUM",
-                        conflict_start_time=max(
-                            schedule1.scheduled_start_time, schedule2.scheduled_start_time
-                        ),
-                        conflict_end_time=min(
-                            schedule1.scheduled_end_time, schedule2.scheduled_end_time
-                        ),
-                        status="UNRESOLVED",
-                        detected_at=detected_at,
-                        detected_by="AUTO",
-                    )
-                    conflicts.append(conflict)
+    def _detect_conflicts_against(
+        self, schedule: ProductionSchedule, index: ScheduleIndex
+    ) -> List[ProductionResourceConflict]:
+        """增量检查单个排程与已有排程索引的冲突"""
+        detected_at = datetime.now()
+        return [
+            self._build_conflict(schedule, other, resource_type, detected_at)
+            for resource_type, other in index.conflicts_with(schedule)
+        ]
 
-        return conflicts
+    def _build_conflict(
+        self,
+        schedule1: ProductionSchedule,
+        schedule2: ProductionSchedule,
+        resource_type: str,
+        detected_at: datetime,
+    ) -> ProductionResourceConflict:
+        """构建资源冲突记录"""
+        if resource_type == "equipment":
+            resource_id = schedule1.equipment_id
+            description = f"设备 {resource_id} 时间冲突"
+            severity = "HIGH"
+        else:
+            resource_id = schedule1.worker_id
+            description = f"工人 {resource_id} 时间冲突"
+            severity = "MEDIUM"
+
+        return ProductionResourceConflict(
+            schedule_id=schedule1.id,
+            conflicting_schedule_id=schedule2.id,
+            conflict_type=resource_type.upper(),
+            resource_type=resource_type,
+            resource_id=resource_id,
+            conflict_description=description,
+            severity=severity,
+            conflict_start_time=max(schedule1.scheduled_start_time, schedule2.scheduled_start_time),
+            conflict_end_time=min(schedule1.scheduled_end_time, schedule2.scheduled_end_time),
+            status="UNRESOLVED",
+            detected_at=detected_at,
+            detected_by="AUTO",
+        )
 
     # ==================== 评分算法 ====================
 
@@ -773,42 +824,174 @@ class ProductionScheduleService:
 
         adjusted_schedules = []
         conflicts = []
+        self.last_insert_diff = []
 
         if auto_adjust:
-            # 查找冲突的排程
-            conflicting = (
-                self.db.query(ProductionSchedule)
-                .filter(
-                    and_(
-                        or_(
-                            ProductionSchedule.equipment_id == new_schedule.equipment_id,
-                            ProductionSchedule.worker_id == new_schedule.worker_id,
-                        ),
-                        ProductionSchedule.scheduled_start_time < end_time,
-                        ProductionSchedule.scheduled_end_time > insert_time,
-                        ProductionSchedule.status.in_(["PENDING", "CONFIRMED"]),
-                    )
-                )
-                .all()
+            adjusted_schedules, conflicts, self.last_insert_diff = self._ripple_downstream(
+                new_schedule, max_delay_hours
+            )
+
+        return new_schedule, adjusted_schedules, conflicts
+
+    def _load_downstream_schedules(
+        self, resource_filter, after: datetime, exclude: set
+    ) -> List[ProductionSchedule]:
+        """加载资源上 after 之后仍占用的待执行排程"""
+        rows = (
+            self.db.query(ProductionSchedule)
+            .filter(
+                resource_filter,
+                ProductionSchedule.scheduled_end_time > after,
+                ProductionSchedule.status.in_(["PENDING", "CONFIRMED"]),
+            )
+            .all()
+        )
+        return [row for row in rows if id(row) not in exclude]
+
+    def _ripple_downstream(
+        self, new_schedule: ProductionSchedule, max_delay_hours: float
+    ) -> Tuple[List[ProductionSchedule], List[ProductionResourceConflict], List[Dict[str, Any]]]:
+        """
+        增量插单：只顺延插单设备/工人上的下游排程链
+
+        按原开始时间依次处理受影响资源上的排程，每个资源维护“可用起点”游标；
+        排程被顺延后，其另一资源（设备或工人）也纳入受影响范围，
+        该资源上排在它之前的排程视为固定前驱。未受影响的资源不查询、不改动。
+
+        Returns:
+            (被移动的排程, 超出最大延迟而未移动的冲突, 移动差异)
+        """
+        request = ScheduleGenerateRequest(
+            work_orders=[],
+            start_date=new_schedule.scheduled_start_time,
+            end_date=new_schedule.scheduled_end_time + timedelta(days=7),
+        )
+
+        def resource_keys(schedule) -> List[Tuple[str, int]]:
+            keys = []
+            if schedule.equipment_id:
+                keys.append(("equipment", schedule.equipment_id))
+            if schedule.worker_id:
+                keys.append(("worker", schedule.worker_id))
+            return keys
+
+        def resource_filter(key):
+            column = (
+                ProductionSchedule.equipment_id
+                if key[0] == "equipment"
+                else ProductionSchedule.worker_id
             )
+            return column == key[1]
+
+        def order_key(schedule):
+            return (schedule.scheduled_start_time, schedule.id or 0)
+
+        # 资源 -> 可用起点；插单本身占用其设备和工人
+        available: Dict[Tuple[str, int], datetime] = {}
+        seen: set = set()
+        queue: List[ProductionSchedule] = []
+
+        def enqueue(schedules, key_set, before=None) -> None:
+            for schedule in schedules:
+                if id(schedule) in seen or not set(resource_keys(schedule)) & key_set:
+                    continue
+                if before is not None and order_key(schedule) < before:
+                    # 固定前驱：不移动，只占用该资源的时间
+                    for key in key_set & set(resource_keys(schedule)):
+                        available[key] = max(available[key], schedule.scheduled_end_time)
+                    continue
+                seen.add(id(schedule))
+                queue.append(schedule)
+
+        initial_keys = set(resource_keys(new_schedule))
+        if not initial_keys:
+            return [], [], []
+        for key in initial_keys:
+            available[key] = new_schedule.scheduled_end_time
+        enqueue(
+            self._load_downstream_schedules(
+                or_(*[resource_filter(k) for k in initial_keys]),
+                new_schedule.scheduled_start_time,
+                seen,
+            ),
+            initial_keys,
+        )
+        queue.sort(key=order_key)
+
+        adjusted: List[ProductionSchedule] = []
+        conflicts: List[ProductionResourceConflict] = []
+        diff: List[Dict[str, Any]] = []
+        detected_at = datetime.now()
 
-            # 延后冲突的排程
-            for conf_schedule in conflicting:
-                delay = (end_time - conf_schedule.scheduled_start_time).total_seconds() / 3600
-                if delay <= max_delay_hours:
-                    conf_schedule.scheduled_start_time = end_time
-                    conf_schedule.scheduled_end_time = self._calculate_end_time(
-                        end_time,
-                        conf_schedule.duration_hours,
-                        ScheduleGenerateRequest(
-                            work_orders=[],
-                            start_date=end_time,
-                            end_date=end_time + timedelta(days=7),
-                        ),
+        index = 0
+        while index < len(queue):
+            schedule = queue[index]
+            index += 1
+            keys = resource_keys(schedule)
+            old_start, old_end = schedule.scheduled_start_time, schedule.scheduled_end_time
+
+            def required_start():
+                return max([available[k] for k in keys if k in available] + [old_start])
+
+            if required_start() > old_start:
+                # 将被顺延：先把另一资源纳入受影响范围（含其固定前驱）
+                for key in keys:
+                    if key not in available:
+                        available[key] = datetime.min
+                        enqueue(
+                            self._load_downstream_schedules(resource_filter(key), old_start, seen),
+                            {key},
+                            before=order_key(schedule),
+                        )
+                queue[index:] = sorted(queue[index:], key=order_key)
+
+            required = required_start()
+            if required > old_start:
+                # 延迟按原开始时间到挡路排程结束时刻计算（与原逻辑一致）
+                delay_hours = (required - old_start).total_seconds() / 3600
+                if delay_hours <= max_delay_hours:
+                    new_start = self._adjust_to_work_time(required, request)
+                    schedule.scheduled_start_time = new_start
+                    schedule.scheduled_end_time = self._calculate_end_time(
+                        new_start, schedule.duration_hours, request
+                    )
+                    adjusted.append(schedule)
+                    diff.append(
+                        {
+                            "schedule_id": schedule.id,
+                            "old_start": old_start,
+                            "old_end": old_end,
+                            "new_start": schedule.scheduled_start_time,
+                            "new_end": schedule.scheduled_end_time,
+                        }
+                    )
+                else:
+                    blocking = max(
+                        (k for k in keys if k in available), key=lambda k: available[k]
+                    )
+                    conflicts.append(
+                        ProductionResourceConflict(
+                            schedule_id=schedule.id,
+                            conflict_type=blocking[0].upper(),
+                            resource_type=blocking[0],
+                            resource_id=blocking[1],
+                            conflict_description=(
+                                f"紧急插单需延后 {delay_hours:.1f} 小时，超过允许的 {max_delay_hours} 小时"
+                            ),
+                            severity="HIGH",
+                            conflict_start_time=old_start,
+                            conflict_end_time=min(available[blocking], old_end),
+                            status="UNRESOLVED",
+                            detected_at=detected_at,
+                            detected_by="AUTO",
+                        )
                     )
-                    adjusted_schedules.append(conf_schedule)
 
-        return new_schedule, adjusted_schedules, conflicts
+            for key in keys:
+                if key in available:
+                    available[key] = max(available[key], schedule.scheduled_end_time)
+
+        return adjusted, conflicts, diff
 
     def execute_urgent_insert_with_logging(
         self,
@@ -829,7 +1012,8 @@ class ProductionScheduleService:
             user_id: 用户ID
 
         Returns:
-            包含 schedule, adjusted_schedules, conflicts, message 的字典
+            包含 schedule, adjusted_schedules, conflicts, moved, message 的字典
+            （moved 与 last_insert_diff 字段一致：schedule_id、old_start/old_end、new_start/new_end）
         """
         new_schedule, adjusted_schedules, conflicts = self.urgent_insert(
             work_order_id=work_order_id,
@@ -846,12 +1030,30 @@ class ProductionScheduleService:
         if conflicts:
             self.db.add_all(conflicts)
 
-        # 创建调整日志
+        # 创建调整日志（记录调整前后时间）
+        moved = {item["schedule_id"]: item for item in self.last_insert_diff}
         for adj_schedule in adjusted_schedules:
+            item = moved.get(adj_schedule.id)
             log = ScheduleAdjustmentLog(
                 schedule_id=adj_schedule.id,
                 adjustment_type="TIME_CHANGE",
                 trigger_source="URGENT_ORDER",
+                before_data=(
+                    {
+                        "scheduled_start_time": item["old_start"].isoformat(),
+                        "scheduled_end_time": item["old_end"].isoformat(),
+                    }
+                    if item
+                    else None
+                ),
+                after_data=(
+                    {
+                        "scheduled_start_time": item["new_start"].isoformat(),
+                        "scheduled_end_time": item["new_end"].isoformat(),
+                    }
+                    if item
+                    else None
+                ),
                 reason=f"紧急插单导致延后: 工单 {work_order_id}",
                 adjusted_by=user_id,
                 adjusted_at=datetime.now(),
@@ -869,6 +1071,7 @@ class ProductionScheduleService:
             "schedule": schedule_response,
             "adjusted_schedules": adjusted_responses,
             "conflicts": conflict_dicts,
+            "moved": [dict(item) for item in self.last_insert_diff],
             "message": f"紧急插单成功，调整了 {len(adjusted_schedules)} 个排程",
         }
 
@@ -1159,9 +1362,27 @@ class ProductionScheduleService:
 
         self.db.add(adjustment_log)
 
-        # 如果需要自动解决冲突
+        # 如果需要自动解决冲突：只检查同设备/同工人且时间重叠的已有排程
         if request.auto_resolve_conflicts:
-            conflicts = self._detect_conflicts([schedule])
+            resource_filters = []
+            if schedule.equipment_id:
+                resource_filters.append(ProductionSchedule.equipment_id == schedule.equipment_id)
+            if schedule.worker_id:
+                resource_filters.append(ProductionSchedule.worker_id == schedule.worker_id)
+            neighbours = []
+            if resource_filters:
+                neighbours = (
+                    self.db.query(ProductionSchedule)
+                    .filter(
+                        or_(*resource_filters),
+                        ProductionSchedule.id != schedule.id,
+                        ProductionSchedule.scheduled_start_time < schedule.scheduled_end_time,
+                        ProductionSchedule.scheduled_end_time > schedule.scheduled_start_time,
+                        ProductionSchedule.status.in_(["PENDING", "CONFIRMED", "IN_PROGRESS"]),
+                    )
+                    .all()
+                )
+            conflicts = self._detect_conflicts_against(schedule, ScheduleIndex(neighbours))
             if conflicts:
                 self.db.add_all(conflicts)
 
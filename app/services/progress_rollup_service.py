@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+项目进度汇总维护服务
+
+- 增量：ORM flush 事件比较任务变更前后对项目进度的贡献（任务数, 进度），
+  在同一事务内对 project_progress_rollups 行执行 task_count = task_count + Δ，
+  读取项目进度时只需取一行，不再对项目全部任务 COUNT/SUM
+- 合并：每次变更只标记 pending 并刷新 changed_at；项目在合并窗口内无新变更后，
+  由 flush_pending 统一精确重算一次进度并检查健康度，批量/连续上报只触发一次
+- 汇总行不存在时按项目现有任务精确初始化；精确重算同时纠正绕过 ORM 的批量写入
+
+汇总表不存在（未执行迁移）时 is_available 返回 False，进度聚合降级为全量统计。
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.progress_rollup import ProjectProgressRollup
+from app.models.project import Project
+from app.models.task_center import TaskUnified
+from app.utils.db_helpers import tables_exist
+
+logger = logging.getLogger(__name__)
+
+# 单次 flush_pending 处理的项目数上限
+FLUSH_BATCH_SIZE = 200
+
+# 影响进度汇总或健康度的任务字段
+_ROLLUP_FIELDS = ("project_id", "progress", "status", "is_active", "is_delayed", "deadline")
+
+# (任务数, 进度之和)
+Totals = Tuple[int, int]
+
+
+def _contribution(status, is_active, progress) -> Totals:
+    """任务对项目进度的贡献，口径与 aggregate_task_progress 一致：活跃且未取消"""
+    if not is_active or status is None or status == "CANCELLED":
+        return 0, 0
+    return 1, progress or 0
+
+
+def _exact_totals_select(project_id: int):
+    task = TaskUnified.__table__.c
+    return select(func.count(task.id), func.coalesce(func.sum(task.progress), 0)).where(
+        task.project_id == project_id,
+        task.is_active,
+        task.status.notin_(["CANCELLED"]),
+    )
+
+
+class ProgressRollupService:
+    """项目进度汇总维护服务"""
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """汇总表是否存在"""
+        return tables_exist(db, ProjectProgressRollup.__tablename__)
+
+    @staticmethod
+    def apply_deltas(executor, deltas: Dict[int, Totals]) -> None:
+        """
+        按增量更新项目运行总计并标记待重算
+
+        汇总行不存在时按项目现有任务（已包含本次变更）精确初始化。
+
+        Args:
+            executor: 数据库会话或连接（语句在其当前事务内执行）
+            deltas: {项目ID: (任务数增量, 进度之和增量)}
+        """
+        table = ProjectProgressRollup.__table__
+        now = datetime.now()
+        for project_id, (count_delta, progress_delta) in sorted(deltas.items()):
+            stmt = (
+                update(table)
+                .where(table.c.project_id == project_id)
+                .values(
+                    task_count=table.c.task_count + count_delta,
+                    progress_sum=table.c.progress_sum + progress_delta,
+                    pending=True,
+                    changed_at=now,
+                )
+            )
+            if executor.execute(stmt).rowcount:
+                continue
+            if not ProgressRollupService._seed(executor, project_id, pending=True):
+                # 并发事务已先初始化，改走增量
+                executor.execute(stmt)
+
+    @staticmethod
+    def get_totals(db: Session, project_id: int) -> Totals:
+        """读取项目运行总计 (任务数, 进度之和)，汇总行不存在时精确初始化"""
+        table = ProjectProgressRollup.__table__
+        query = select(table.c.task_count, table.c.progress_sum).where(
+            table.c.project_id == project_id
+        )
+        row = db.execute(query).first()
+        if row is None:
+            ProgressRollupService._seed(db, project_id)
+            row = db.execute(query).first()
+        return row[0], row[1]
+
+    @staticmethod
+    def _seed(executor, project_id: int, pending: bool = False) -> bool:
+        """按项目现有任务插入汇总行；行已存在（并发初始化）时返回 False"""
+        count, progress_sum = executor.execute(_exact_totals_select(project_id)).one()
+        try:
+            with executor.begin_nested():
+                executor.execute(
+                    insert(ProjectProgressRollup.__table__).values(
+                        project_id=project_id,
+                        task_count=count,
+                        progress_sum=progress_sum,
+                        pending=pending,
+                        changed_at=datetime.now(),
+                    )
+                )
+        except IntegrityError:
+            logger.debug(f"项目进度汇总行已存在: {project_id}")
+            return False
+        return True
+
+    @staticmethod
+    def flush_pending(db: Session, debounce_seconds: Optional[int] = None) -> Dict[str, int]:
+        """
+        重算合并窗口已结束的待处理项目
+
+        对每个项目锁定汇总行后精确统计任务，回写运行总计与项目进度，再检查健康度；
+        每个项目单独提交。
+
+        Args:
+            db: 数据库会话
+            debounce_seconds: 合并窗口（秒），默认取 PROGRESS_ROLLUP_DEBOUNCE_SECONDS
+
+        Returns:
+            dict: processed 重算项目数，failed 失败项目数
+        """
+        from app.services.progress_service import _check_and_update_health
+
+        if debounce_seconds is None:
+            debounce_seconds = settings.PROGRESS_ROLLUP_DEBOUNCE_SECONDS
+        cutoff = datetime.now() - timedelta(seconds=debounce_seconds)
+        table = ProjectProgressRollup.__table__
+
+        project_ids = (
+            db.execute(
+                select(table.c.project_id)
+                .where(table.c.pending, table.c.changed_at <= cutoff)
+                .order_by(table.c.changed_at)
+                .limit(FLUSH_BATCH_SIZE)
+            )
+            .scalars()
+            .all()
+        )
+
+        result = {"processed": 0, "failed": 0}
+        for project_id in project_ids:
+            try:
+                # 先锁定汇总行，重算期间的增量更新排在本次提交之后
+                locked = db.execute(
+                    select(table.c.pending)
+                    .where(table.c.project_id == project_id)
+                    .with_for_update()
+                ).scalar()
+                if not locked:
+                    db.rollback()
+                    continue
+
+                count, progress_sum = db.execute(_exact_totals_select(project_id)).one()
+                db.execute(
+                    update(table)
+                    .where(table.c.project_id == project_id)
+                    .values(
+                        task_count=count,
+                        progress_sum=progress_sum,
+                        pending=False,
+                        recomputed_at=datetime.now(),
+                    )
+                )
+                if count:
+                    db.execute(
+                        update(Project.__table__)
+                        .where(Project.__table__.c.id == project_id)
+                        .values(
+                            progress_pct=round(float(progress_sum) / count, 2),
+                            updated_at=datetime.now(),
+                        )
+                    )
+                db.commit()
+
+                _check_and_update_health(db, project_id)
+                result["processed"] += 1
+            except Exception as e:
+                db.rollback()
+                result["failed"] += 1
+                logger.error(f"项目进度重算失败: project_id={project_id}, error={e}")
+
+        return result
+
+
+def _task_totals_by_project(session: Session, task_ids: Iterable[int]) -> Dict[int, Totals]:
+    """按库中当前值统计指定任务对各项目的贡献"""
+    ids = list(task_ids)
+    totals: Dict[int, Totals] = {}
+    if not ids:
+        return totals
+    task = TaskUnified.__table__.c
+    with session.no_autoflush:
+        rows = session.execute(
+            select(task.project_id, task.status, task.is_active, task.progress).where(
+                task.id.in_(ids)
+            )
+        ).all()
+    for project_id, status, is_active, progress in rows:
+        if not project_id:
+            continue
+        count, progress_sum = _contribution(status, is_active, progress)
+        old_count, old_sum = totals.get(project_id, (0, 0))
+        totals[project_id] = (old_count + count, old_sum + progress_sum)
+    return totals
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_task_changes(session, flush_context, instances) -> None:
+    """flush 前按库中旧值记录变更任务原有的贡献（此时尚未写入）"""
+    session.info.pop("_progress_rollup_pending", None)
+    if not settings.PROGRESS_ROLLUP_ENABLED:
+        return
+    new = [obj for obj in session.new if isinstance(obj, TaskUnified)]
+    changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, TaskUnified)
+        and obj.id
+        and any(sa_inspect(obj).attrs[f].history.has_changes() for f in _ROLLUP_FIELDS)
+    ]
+    removed = [obj for obj in session.deleted if isinstance(obj, TaskUnified) and obj.id]
+    if not (new or changed or removed):
+        return
+    try:
+        before = _task_totals_by_project(session, [obj.id for obj in changed + removed])
+    except Exception as e:
+        logger.warning(f"收集项目进度汇总变更失败: {e}")
+        return
+    session.info["_progress_rollup_pending"] = (before, new + changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_task_changes(session, flush_context) -> None:
+    """flush 后按库中新值计算增量，在同一事务内更新项目运行总计"""
+    pending = session.info.pop("_progress_rollup_pending", None)
+    if not pending or not ProgressRollupService.is_available(session):
+        return
+    before, objs = pending
+
+    # 涉及的项目（含任务改挂前后的项目）即使贡献不变也标记待重算健康度
+    after = _task_totals_by_project(session, {obj.id for obj in objs if obj.id})
+    deltas: Dict[int, Totals] = {}
+    for project_id in set(before) | set(after):
+        count, progress_sum = after.get(project_id, (0, 0))
+        old_count, old_sum = before.get(project_id, (0, 0))
+        deltas[project_id] = (count - old_count, progress_sum - old_sum)
+
+    ProgressRollupService.apply_deltas(session.connection(), deltas)
@@ -19,11 +19,13 @@ from fastapi import HTTPException, status
 from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.notification import Notification
 from app.models.progress import ProgressLog, Task, TaskDependency
 from app.models.project import Project, ProjectStage
 from app.models.task_center import TaskUnified
 from app.schemas.progress import DependencyIssue, TaskForecastItem
+from app.services.progress_rollup_service import ProgressRollupService
 from app.services.sales_reminder import create_notification
 from app.utils.db_helpers import save_obj
 
@@ -190,13 +192,22 @@ def aggregate_task_progress(db: Session, task_id: int) -> dict:
         TaskUnified.status.notin_(["CANCELLED"]),
     )
 
-    total_tasks_result = db.query(func.count(TaskUnified.id)).filter(base_filter).scalar()
+    use_rollup = settings.PROGRESS_ROLLUP_ENABLED and ProgressRollupService.is_available(db)
+    if use_rollup:
+        # 读取由 flush 事件按增量维护的运行总计，不再扫描项目全部任务
+        total_tasks_result, weighted_progress_result = ProgressRollupService.get_totals(
+            db, project_id
+        )
+    else:
+        total_tasks_result = db.query(func.count(TaskUnified.id)).filter(base_filter).scalar()
+        weighted_progress_result = None
 
     if total_tasks_result:
-        # 使用SQL聚合计算加权平均
-        weighted_progress_result = (
-            db.query(func.sum(TaskUnified.progress)).filter(base_filter).scalar()
-        )
+        if weighted_progress_result is None:
+            # 使用SQL聚合计算加权平均
+            weighted_progress_result = (
+                db.query(func.sum(TaskUnified.progress)).filter(base_filter).scalar()
+            )
         project_progress = round(float(weighted_progress_result or 0) / total_tasks_result, 2)
 
         # 更新项目进度
@@ -253,8 +264,9 @@ def aggregate_task_progress(db: Session, task_id: int) -> dict:
                 result["stage_progress_updated"] = True
                 result["new_stage_progress"] = stage_progress
 
-    # 4. 检查并更新健康度
-    _check_and_update_health(db, project_id)
+    # 4. 检查并更新健康度（启用合并窗口时由 flush_pending 在变更平息后统一检查）
+    if not (use_rollup and settings.PROGRESS_ROLLUP_DEBOUNCE_SECONDS > 0):
+        _check_and_update_health(db, project_id)
 
     return result
 
@@ -16,7 +16,7 @@ from fastapi import HTTPException
 from sqlalchemy import case, desc
 from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.common.pagination import PaginationParams
+from app.common.pagination import PaginationParams, apply_keyset_pagination
 from app.common.query_filters import apply_keyword_filter, apply_pagination
 from app.models.project import Customer, Project, ProjectMember
 from app.models.user import User
@@ -126,6 +126,16 @@ class ProjectCrudService:
 
         return query
 
+    def keyset_order_by(self, sort: Optional[str] = None) -> Optional[List[Any]]:
+        """游标分页的排序键（按预算使用率排序为计算表达式，不支持游标分页）"""
+        if sort == "cost_desc":
+            return [desc(Project.actual_cost), desc(Project.id)]
+        if sort == "cost_asc":
+            return [Project.actual_cost, Project.id]
+        if sort == "budget_used_pct":
+            return None
+        return [desc(Project.created_at), desc(Project.id)]
+
     def get_projects_with_pagination(
         self,
         pagination: PaginationParams,
@@ -162,19 +172,29 @@ class ProjectCrudService:
         # 使用selectinload优化关联查询
         query = query.options(selectinload(Project.customer), selectinload(Project.manager))
 
-        # 应用排序
-        query = self.apply_sorting(query, sort)
+        # 应用排序（游标分页在取数时按排序键排序）
+        if pagination.is_keyset:
+            order_by = self.keyset_order_by(sort)
+            if order_by is None:
+                raise HTTPException(status_code=400, detail="该排序方式不支持游标分页")
+        else:
+            query = self.apply_sorting(query, sort)
 
         # 总数统计
         try:
-            count_result = query.count()
-            total = int(count_result) if count_result is not None else 0
+            count_result = pagination.count(query)
+            total = int(count_result) if count_result is not None else None
         except Exception:
             logger.debug("项目列表统计总数失败，降级为 0", exc_info=True)
             total = 0
 
         # 分页
-        projects = apply_pagination(query, pagination.offset, pagination.limit).all()
+        if pagination.is_keyset:
+            projects = apply_keyset_pagination(
+                query, order_by, pagination.cursor, pagination.limit
+            ).all()
+        else:
+            projects = apply_pagination(query, pagination.offset, pagination.limit).all()
 
         return projects, total
 
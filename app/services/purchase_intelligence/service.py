@@ -34,6 +34,7 @@ from app.schemas.purchase_intelligence import (
     SupplierRankingItem,
 )
 from app.services.supplier_performance_evaluator import SupplierPerformanceEvaluator
+from app.utils.number_generator import allocate_sequence
 
 logger = logging.getLogger(__name__)
 
@@ -576,19 +577,14 @@ class PurchaseIntelligenceService:
         prefix = "QT"
         date_str = datetime.now().strftime("%Y%m%d")
 
-        latest = (
-            self.db.query(SupplierQuotation)
-            .filter(SupplierQuotation.quotation_no.like(f"{prefix}{date_str}%"))
-            .order_by(desc(SupplierQuotation.quotation_no))
-            .first()
+        seq = allocate_sequence(
+            self.db,
+            SupplierQuotation,
+            "quotation_no",
+            f"{prefix}{date_str}",
+            parse_seq=lambda no: int(no[-4:]),
         )
 
-        if latest:
-            last_seq = int(latest.quotation_no[-4:])
-            seq = last_seq + 1
-        else:
-            seq = 1
-
         return f"{prefix}{date_str}{seq:04d}"
 
     def _generate_receipt_no(self) -> str:
@@ -596,19 +592,14 @@ class PurchaseIntelligenceService:
         prefix = "GR"
         date_str = datetime.now().strftime("%Y%m%d")
 
-        latest = (
-            self.db.query(GoodsReceipt)
-            .filter(GoodsReceipt.receipt_no.like(f"{prefix}{date_str}%"))
-            .order_by(desc(GoodsReceipt.receipt_no))
-            .first()
+        seq = allocate_sequence(
+            self.db,
+            GoodsReceipt,
+            "receipt_no",
+            f"{prefix}{date_str}",
+            parse_seq=lambda no: int(no[-4:]),
         )
 
-        if latest:
-            last_seq = int(latest.receipt_no[-4:])
-            seq = last_seq + 1
-        else:
-            seq = 1
-
         return f"{prefix}{date_str}{seq:04d}"
 
     def _generate_purchase_order_no(self) -> str:
@@ -616,17 +607,12 @@ class PurchaseIntelligenceService:
         prefix = "PO"
         date_str = datetime.now().strftime("%Y%m%d")
 
-        latest = (
-            self.db.query(PurchaseOrder)
-            .filter(PurchaseOrder.order_no.like(f"{prefix}{date_str}%"))
-            .order_by(desc(PurchaseOrder.order_no))
-            .first()
+        seq = allocate_sequence(
+            self.db,
+            PurchaseOrder,
+            "order_no",
+            f"{prefix}{date_str}",
+            parse_seq=lambda no: int(no[-4:]),
         )
 
-        if latest:
-            last_seq = int(latest.order_no[-4:])
-            seq = last_seq + 1
-        else:
-            seq = 1
-
         return f"{prefix}{date_str}{seq:04d}"
@@ -3,12 +3,22 @@
 数据源解析器
 
 协调多个数据源，获取报告所需的所有数据
+
+数据源之间的依赖由 args 中表达式引用的数据源名确定（只能引用声明在前的数据源）。
+依赖已就绪的数据源在线程池中并发解析，每个线程使用独立的数据库会话；
+单连接的数据库（如内存 SQLite）或无法创建会话时按声明顺序串行解析。
 """
 
-from typing import Any, Dict, Type
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, Callable, Dict, List, Optional, Type
 
-from sqlalchemy.orm import Session
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
+from app.core.config import settings
 from app.services.report_framework.data_sources.base import DataSource, DataSourceError
 from app.services.report_framework.data_sources.query import QueryDataSource
 from app.services.report_framework.data_sources.service import ServiceDataSource
@@ -29,20 +39,32 @@ class DataResolver:
         DataSourceType.SERVICE: ServiceDataSource,
     }
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_workers: Optional[int] = None,
+    ):
         """
         初始化数据源解析器
 
         Args:
             db: 数据库会话
+            session_factory: 并发解析时为每个数据源创建会话（默认按 db 的绑定创建）
+            max_workers: 并发线程数（默认取 REPORT_DATA_SOURCE_MAX_WORKERS）
         """
         self.db = db
         self._expression_parser = ExpressionParser()
+        self._session_factory = session_factory
+        self.max_workers = (
+            settings.REPORT_DATA_SOURCE_MAX_WORKERS if max_workers is None else max_workers
+        )
 
     def resolve_all(
         self,
         data_sources: Dict[str, DataSourceConfig],
         params: Dict[str, Any],
+        timings: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         解析所有数据源
@@ -50,36 +72,153 @@ class DataResolver:
         Args:
             data_sources: 数据源配置字典
             params: 参数
+            timings: 可选，填入每个数据源的耗时 {名称: {elapsed_ms, status, depends_on}}
 
         Returns:
-            数据字典，键为数据源名称
+            数据字典，键为数据源名称（按声明顺序）
         """
+        if timings is None:
+            timings = {}
+        dependencies = self.build_dependencies(data_sources)
+        for name in data_sources:
+            timings[name] = {"elapsed_ms": 0.0, "status": "ok", "depends_on": dependencies[name]}
+
         context = {"params": params}
+        session_factory = self._get_session_factory() if len(data_sources) > 1 else None
+        if session_factory is None or self.max_workers <= 1:
+            for name, config in data_sources.items():
+                self._resolve_into(context, name, config, params, timings)
+        else:
+            self._resolve_concurrently(
+                data_sources, dependencies, params, context, timings, session_factory
+            )
 
-        for name, config in data_sources.items():
-            try:
-                # 处理配置中的表达式
-                resolved_config = self._resolve_config_expressions(config, context)
+        # 移除 params，只返回数据
+        context.pop("params", None)
+        return {name: context[name] for name in data_sources}
 
-                # 获取数据
-                data = self.resolve_one(resolved_config, params)
+    def build_dependencies(self, data_sources: Dict[str, DataSourceConfig]) -> Dict[str, List[str]]:
+        """
+        由 args 中的表达式引用构建数据源依赖
 
-                # 添加到上下文（供后续数据源使用）
-                context[name] = data
+        与顺序解析的语义一致，只有声明在前的数据源可被引用。
 
-            except DataSourceError as e:
-                # 数据源错误，记录并继续
-                context[name] = []
-                print(f"Warning: Data source '{name}' failed: {e}")
+        Returns:
+            {数据源名称: [依赖的数据源名称]}
+        """
+        dependencies: Dict[str, List[str]] = {}
+        declared: List[str] = []
+        for name, config in data_sources.items():
+            referenced = set()
+            for value in (getattr(config, "args", None) or {}).values():
+                if isinstance(value, str) and "{{" in value:
+                    referenced |= self._expression_parser.referenced_names(value)
+            dependencies[name] = [d for d in declared if d in referenced]
+            declared.append(name)
+        return dependencies
 
-        # 移除 params，只返回数据
-        context.pop("params", None)
-        return context
+    def _resolve_into(
+        self,
+        context: Dict[str, Any],
+        name: str,
+        config: DataSourceConfig,
+        params: Dict[str, Any],
+        timings: Dict[str, Any],
+        db: Optional[Session] = None,
+    ) -> None:
+        """解析单个数据源并写入上下文（数据源错误记录后以空列表继续）"""
+        started = time.perf_counter()
+        try:
+            # 处理配置中的表达式
+            resolved_config = self._resolve_config_expressions(config, context)
+
+            # 获取数据，添加到上下文（供后续数据源使用）
+            context[name] = self.resolve_one(resolved_config, params, db=db)
+
+        except DataSourceError as e:
+            # 数据源错误，记录并继续
+            context[name] = []
+            timings[name]["status"] = "error"
+            print(f"Warning: Data source '{name}' failed: {e}")
+        finally:
+            timings[name]["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _resolve_concurrently(
+        self,
+        data_sources: Dict[str, DataSourceConfig],
+        dependencies: Dict[str, List[str]],
+        params: Dict[str, Any],
+        context: Dict[str, Any],
+        timings: Dict[str, Any],
+        session_factory: Callable[[], Session],
+    ) -> None:
+        """依赖就绪即提交到线程池，每个数据源使用独立会话"""
+
+        def run(name: str, config: DataSourceConfig, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+            db = session_factory()
+            try:
+                self._resolve_into(snapshot, name, config, params, timings, db=db)
+            finally:
+                db.close()
+            return snapshot
+
+        pending = dict(data_sources)
+        done_names = set()
+        running = {}
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(data_sources)),
+            thread_name_prefix="report-data",
+        ) as executor:
+            while pending or running:
+                for name in [n for n in pending if set(dependencies[n]) <= done_names]:
+                    # 表达式在工作线程中计算，只传入其依赖，避免与其他线程共享上下文
+                    snapshot = {"params": params, **{d: context[d] for d in dependencies[name]}}
+                    future = executor.submit(
+                        copy_context().run, run, name, pending.pop(name), snapshot
+                    )
+                    running[future] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        context[name] = future.result()[name]
+                    except BaseException:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    done_names.add(name)
+
+    def _get_session_factory(self) -> Optional[Callable[[], Session]]:
+        """并发解析用的会话工厂；绑定不支持多连接时返回 None（串行解析）"""
+        if self._session_factory is not None:
+            return self._session_factory
+        try:
+            bind = self.db.get_bind()
+        except Exception:
+            return None
+        if not isinstance(bind, Engine) or isinstance(bind.pool, StaticPool):
+            return None
+        factory = sessionmaker(
+            bind=bind,
+            autoflush=False,
+            class_=type(self.db),
+            query_cls=getattr(self.db, "_query_cls", None) or Query,
+        )
+        info = dict(self.db.info)
+
+        def create() -> Session:
+            session = factory()
+            session.info.update(info)
+            return session
+
+        return create
 
     def resolve_one(
         self,
         config: DataSourceConfig,
         params: Dict[str, Any],
+        db: Optional[Session] = None,
     ) -> Any:
         """
         解析单个数据源
@@ -87,6 +226,7 @@ class DataResolver:
         Args:
             config: 数据源配置
             params: 参数
+            db: 使用的数据库会话（默认 self.db）
 
         Returns:
             数据源返回的数据
@@ -105,7 +245,7 @@ class DataResolver:
             raise DataSourceError(f"Unsupported data source type: {ds_type}")
 
         # 创建数据源实例
-        ds_instance = ds_class(self.db, config)
+        ds_instance = ds_class(db if db is not None else self.db, config)
 
         # 合并配置参数和运行时参数
         merged_params = {**config.args, **params}
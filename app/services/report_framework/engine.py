@@ -138,10 +138,12 @@ class ReportEngine:
             if cached:
                 return cached
 
-        # 5. 获取数据
+        # 5. 获取数据（独立数据源并发解析，记录各数据源耗时）
+        data_source_timings: Dict[str, Any] = {}
         context = self.data_resolver.resolve_all(
             config.data_sources,
             validated_params,
+            timings=data_source_timings,
         )
 
         # 添加参数到上下文供 section 渲染使用
@@ -159,6 +161,7 @@ class ReportEngine:
             "code": config.meta.code,
             "name": config.meta.name,
             "parameters": validated_params,
+            "data_source_timings": data_source_timings,
         }
 
         result = renderer.render(rendered_sections, metadata)
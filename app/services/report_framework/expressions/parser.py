@@ -5,12 +5,14 @@
 基于 Jinja2 的表达式引擎
 """
 
+import re
 from datetime import date, datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Set
 
 try:
-    from jinja2 import BaseLoader, Environment, TemplateSyntaxError, UndefinedError
+    from jinja2 import BaseLoader, Environment, TemplateSyntaxError, UndefinedError, meta
 except ImportError:  # pragma: no cover - 可选依赖
+    meta = None
     Environment = None
     BaseLoader = None
     TemplateSyntaxError = Exception
@@ -134,6 +136,28 @@ class ExpressionParser:
         except Exception as e:
             raise ExpressionError(f"Expression evaluation failed: {e}")
 
+    def referenced_names(self, expression: str) -> Set[str]:
+        """
+        表达式引用的变量名（含全局函数名，调用方按需过滤）
+
+        Args:
+            expression: Jinja2 表达式
+
+        Returns:
+            变量名集合；语法错误时退化为按标识符匹配
+        """
+        if not expression or "{{" not in expression:
+            return set()
+        if self._env is not None and meta is not None:
+            try:
+                return set(meta.find_undeclared_variables(self._env.parse(expression)))
+            except TemplateSyntaxError:
+                pass
+        names = set()
+        for body in re.findall(r"\{\{(.*?)\}\}", expression, re.S):
+            names.update(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", body))
+        return names
+
     def evaluate_dict(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """
         递归计算字典中的所有表达式
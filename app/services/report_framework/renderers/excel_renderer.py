@@ -7,10 +7,9 @@ Excel 渲染器
 
 import os
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
+from openpyxl.styles import Font
 
 from app.services.report_framework.renderers.base import Renderer, RenderError, ReportResult
 from app.services.report_framework.renderers.excel_styles import (
@@ -22,14 +21,23 @@ from app.services.report_framework.renderers.excel_styles import (
     HEADER_FONT,
     METRIC_LABEL_FONT,
     METRIC_VALUE_FONT,
+    SUBTITLE_FONT,
     THIN_BORDER,
+    TITLE_ALIGNMENT,
+    TITLE_FONT,
 )
+from app.services.report_framework.renderers.excel_stream import StreamingWorkbook
+
+# 一行：(值列表, 样式角色列表, 是否合并 A:F)
+Row = Tuple[List[Any], List[Optional[str]], bool]
 
 
 class ExcelRenderer(Renderer):
     """
     Excel 渲染器 — canonical Excel renderer (#39).
     共享样式定义见 ``excel_styles.py``。
+
+    使用只写工作表逐行写出，单元格样式为预先注册的命名样式。
     """
 
     def __init__(self, output_dir: str = "reports/excel"):
@@ -77,23 +85,23 @@ class ExcelRenderer(Renderer):
             file_name = f"{report_code}_{timestamp}.xlsx"
             file_path = os.path.join(self.output_dir, file_name)
 
-            # 创建工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = metadata.get("name", "报告")[:31]  # Excel sheet name max 31 chars
-
-            # 写入标题
-            current_row = self._write_header(ws, metadata)
-
-            # 渲染各 section
-            for section in sections:
-                current_row = self._render_section(ws, section, current_row)
+            # 只写工作簿：列宽需在写入前确定，先按行布局预计算
+            title = metadata.get("name", "报告")
+            workbook = StreamingWorkbook()
+            styles = self._register_styles(workbook)
+            ws = workbook.create_sheet(
+                title, self._column_widths(self._iter_rows(sections, metadata))
+            )
 
-            # 调整列宽
-            self._auto_adjust_column_width(ws)
+            for row_number, (values, row_styles, merge) in enumerate(
+                self._iter_rows(sections, metadata), start=1
+            ):
+                if merge:
+                    ws.merged_cells.add(f"A{row_number}:F{row_number}")
+                workbook.append(ws, values, [styles.get(name) for name in row_styles])
 
             # 保存文件
-            wb.save(file_path)
+            workbook.save(file_path)
 
             return ReportResult(
                 data={"file_path": file_path, "sections": sections},
@@ -107,147 +115,131 @@ class ExcelRenderer(Renderer):
         except Exception as e:
             raise RenderError(f"Excel rendering failed: {e}")
 
-    def _write_header(self, ws, metadata: Dict[str, Any]) -> int:
-        """写入报告头部"""
-        # 标题
-        title = metadata.get("name", "报告")
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
-        title_cell = ws.cell(row=1, column=1, value=title)
-        title_cell.font = Font(bold=True, size=16)
-        title_cell.alignment = Alignment(horizontal="center")
-
-        # 生成时间
+    def _register_styles(self, workbook: StreamingWorkbook) -> Dict[str, str]:
+        """注册本渲染器使用的命名样式，返回 角色 -> 样式名"""
+        return {
+            "title": workbook.register_style(
+                "report_title", font=TITLE_FONT, alignment=TITLE_ALIGNMENT
+            ),
+            "subtitle": workbook.register_style(
+                "report_subtitle", font=SUBTITLE_FONT, alignment=TITLE_ALIGNMENT
+            ),
+            "section": workbook.register_style("report_section", font=Font(bold=True, size=12)),
+            "metric_label": workbook.register_style(
+                "report_metric_label", font=self.metric_label_font
+            ),
+            "metric_value": workbook.register_style(
+                "report_metric_value", font=self.metric_value_font
+            ),
+            "header": workbook.register_style(
+                "report_header",
+                font=self.header_font,
+                fill=self.header_fill,
+                alignment=self.header_alignment,
+                border=self.border,
+            ),
+            "data": workbook.register_style(
+                "report_data",
+                font=self.data_font,
+                alignment=self.data_alignment,
+                border=self.border,
+            ),
+            "data_alt": workbook.register_style(
+                "report_data_alt",
+                font=self.data_font,
+                alignment=self.data_alignment,
+                border=self.border,
+                fill=self.alt_row_fill,
+            ),
+        }
+
+    def _iter_rows(self, sections: List[Dict[str, Any]], metadata: Dict[str, Any]) -> Iterator[Row]:
+        """
+        按顺序产出工作表的每一行：(值列表, 样式角色列表, 是否合并 A:F)
+        """
+        # 报告头部：标题、生成时间、空行，内容从第4行开始
         gen_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=6)
-        time_cell = ws.cell(row=2, column=1, value=f"生成时间: {gen_time}")
-        time_cell.font = Font(size=10, color="666666")
-        time_cell.alignment = Alignment(horizontal="center")
+        yield [metadata.get("name", "报告")], ["title"], True
+        yield [f"生成时间: {gen_time}"], ["subtitle"], True
+        yield [], [], False
 
-        return 4  # 从第4行开始写内容
+        for section in sections:
+            yield from self._section_rows(section)
 
-    def _render_section(self, ws, section: Dict[str, Any], start_row: int) -> int:
-        """渲染单个 section"""
+    def _section_rows(self, section: Dict[str, Any]) -> Iterator[Row]:
+        """单个 section 的行"""
         section_type = section.get("type")
         title = section.get("title")
-        current_row = start_row
 
         # section 标题
         if title:
-            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=6)
-            title_cell = ws.cell(row=current_row, column=1, value=title)
-            title_cell.font = Font(bold=True, size=12)
-            current_row += 1
+            yield [title], ["section"], True
 
         if section_type == "metrics":
-            current_row = self._render_metrics(ws, section, current_row)
+            yield from self._metric_rows(section)
         elif section_type == "table":
-            current_row = self._render_table(ws, section, current_row)
+            yield from self._table_rows(section)
         elif section_type == "chart":
-            ws.cell(row=current_row, column=1, value="[图表: Excel 原生图表需要额外实现]")
-            current_row += 1
+            yield ["[图表: Excel 原生图表需要额外实现]"], [], False
 
         # 空行分隔
-        return current_row + 1
+        yield [], [], False
 
-    def _render_metrics(self, ws, section: Dict[str, Any], start_row: int) -> int:
-        """渲染指标卡片"""
+    def _metric_rows(self, section: Dict[str, Any]) -> Iterator[Row]:
+        """指标卡片：每行 4 个指标，标签行 + 值行"""
         items = section.get("items", [])
         if not items:
-            return start_row
+            return
 
-        # 每行 4 个指标
         cols = 4
-        current_row = start_row
-
-        for i, item in enumerate(items):
-            col = (i % cols) * 2 + 1
-            if i > 0 and i % cols == 0:
-                current_row += 2
-
-            label = str(item.get("label", ""))
-            value = str(item.get("value", ""))
-
-            # 标签
-            label_cell = ws.cell(row=current_row, column=col, value=label)
-            label_cell.font = self.metric_label_font
-
-            # 值
-            value_cell = ws.cell(row=current_row + 1, column=col, value=value)
-            value_cell.font = self.metric_value_font
-
-        return current_row + 3
-
-    def _render_table(self, ws, section: Dict[str, Any], start_row: int) -> int:
-        """渲染数据表格"""
+        for start in range(0, len(items), cols):
+            group = items[start : start + cols]
+            labels, values = [], []
+            for item in group:
+                labels.extend([str(item.get("label", "")), None])
+                values.extend([str(item.get("value", "")), None])
+            yield labels, ["metric_label", None] * len(group), False
+            yield values, ["metric_value", None] * len(group), False
+
+        yield [], [], False
+
+    def _table_rows(self, section: Dict[str, Any]) -> Iterator[Row]:
+        """数据表格（最多 1000 行）"""
         data = section.get("data", [])
         columns = section.get("columns", [])
 
         if not data or not columns:
-            ws.cell(row=start_row, column=1, value="无数据")
-            return start_row + 1
-
-        current_row = start_row
+            yield ["无数据"], [], False
+            return
 
-        # 写入表头
-        for col_idx, col in enumerate(columns, 1):
-            cell = ws.cell(
-                row=current_row, column=col_idx, value=col.get("label", col.get("field", ""))
-            )
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.alignment = self.header_alignment
-            cell.border = self.border
-
-        current_row += 1
+        # 表头
+        yield (
+            [col.get("label", col.get("field", "")) for col in columns],
+            ["header"] * len(columns),
+            False,
+        )
 
-        # 写入数据行（限制最多 1000 行）
+        # 数据行（斑马纹）
         for row_idx, row in enumerate(data[:1000]):
-            for col_idx, col in enumerate(columns, 1):
-                field = col.get("field", "")
-                value = row.get(field, "")
-                if value is None:
-                    value = ""
-
-                cell = ws.cell(row=current_row, column=col_idx, value=value)
-                cell.font = self.data_font
-                cell.alignment = self.data_alignment
-                cell.border = self.border
-
-                # 斑马纹
-                if row_idx % 2 == 1:
-                    cell.fill = self.alt_row_fill
-
-            current_row += 1
+            values = []
+            for col in columns:
+                value = row.get(col.get("field", ""), "")
+                values.append("" if value is None else value)
+            yield values, ["data_alt" if row_idx % 2 == 1 else "data"] * len(columns), False
 
         # 显示数据量提示
         if len(data) > 1000:
-            ws.cell(row=current_row, column=1, value=f"(显示前 1000 条，共 {len(data)} 条)")
-            current_row += 1
-
-        return current_row
-
-    def _auto_adjust_column_width(self, ws) -> None:
-        """自动调整列宽"""
-        from openpyxl.cell.cell import MergedCell
-        from openpyxl.utils import get_column_letter
-
-        for col_idx in range(1, ws.max_column + 1):
-            max_length = 0
-            column = get_column_letter(col_idx)
-
-            for row in range(1, ws.max_row + 1):
-                cell = ws.cell(row=row, column=col_idx)
-                # 跳过合并单元格
-                if isinstance(cell, MergedCell):
-                    continue
-                try:
-                    if cell.value:
-                        # 中文字符按 2 个单位计算
-                        cell_length = sum(2 if ord(c) > 127 else 1 for c in str(cell.value))
-                        max_length = max(max_length, cell_length)
-                except Exception:
-                    pass
-
-            # 设置列宽（最小 8，最大 50）
-            adjusted_width = min(max(max_length + 2, 8), 50)
-            ws.column_dimensions[column].width = adjusted_width
+            yield [f"(显示前 1000 条，共 {len(data)} 条)"], [], False
+
+    @staticmethod
+    def _column_widths(rows: Iterator[Row]) -> List[float]:
+        """按内容计算列宽（中文字符按 2 个单位计算，最小 8，最大 50）"""
+        lengths: List[int] = [0] * 6  # 合并区域 A:F 至少覆盖 6 列
+        for values, _styles, _merge in rows:
+            for col_idx, value in enumerate(values):
+                if col_idx >= len(lengths):
+                    lengths.append(0)
+                if value:
+                    cell_length = sum(2 if ord(c) > 127 else 1 for c in str(value))
+                    lengths[col_idx] = max(lengths[col_idx], cell_length)
+        return [min(max(length + 2, 8), 50) for length in lengths]
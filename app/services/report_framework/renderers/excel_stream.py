@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Excel 流式写入
+
+基于 openpyxl 只写（write-only）工作表：每行追加后即序列化到临时文件，
+工作簿不在内存中保留单元格对象，内存占用与行数无关。
+样式按名称注册一次为 NamedStyle，逐单元格只复制样式索引，不再重复创建 Font/Fill 对象。
+"""
+
+import os
+import tempfile
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
+
+# 文件下发时每次读取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StreamingWorkbook:
+    """只写工作簿（带样式缓存）"""
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        self._styles = set()
+
+    def register_style(self, name: str, **attrs: Any) -> str:
+        """
+        注册命名样式（同名只注册一次），返回样式名
+
+        Args:
+            name: 样式名（勿与 Excel 内置样式重名）
+            attrs: font / fill / alignment / border / number_format，为 None 的项忽略
+        """
+        if name not in self._styles:
+            style = NamedStyle(name=name)
+            for key, value in attrs.items():
+                if value is not None:
+                    setattr(style, key, value)
+            self.workbook.add_named_style(style)
+            self._styles.add(name)
+        return name
+
+    def create_sheet(self, title: str, widths: Sequence[Optional[float]] = ()):
+        """创建工作表；只写模式下列宽必须在写入行之前设置"""
+        ws = self.workbook.create_sheet(title=title[:31])  # Excel sheet name max 31 chars
+        for idx, width in enumerate(widths, start=1):
+            if width:
+                ws.column_dimensions[get_column_letter(idx)].width = width
+        return ws
+
+    @staticmethod
+    def append(ws, values: Iterable[Any], styles: Sequence[Optional[str]] = ()) -> None:
+        """追加一行；styles 与 values 按位置对应，无样式的单元格直接写值"""
+        row = []
+        for idx, value in enumerate(values):
+            style = styles[idx] if idx < len(styles) else None
+            if style is None:
+                row.append(value)
+            else:
+                cell = WriteOnlyCell(ws, value)
+                cell.style = style
+                row.append(cell)
+        ws.append(row)
+
+    def save(self, file_path: Optional[str] = None) -> str:
+        """保存工作簿；未指定路径时写入临时文件，返回文件路径"""
+        if file_path is None:
+            fd, file_path = tempfile.mkstemp(suffix=".xlsx")
+            os.close(fd)
+        self.workbook.save(file_path)
+        return file_path
+
+
+def iter_file_chunks(
+    file_path: str, chunk_size: int = STREAM_CHUNK_SIZE, remove: bool = True
+) -> Iterator[bytes]:
+    """按块读取文件（用于 StreamingResponse），读取结束或中断后删除文件"""
+    try:
+        with open(file_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if remove and os.path.exists(file_path):
+            os.remove(file_path)
@@ -66,6 +66,7 @@ class JsonRenderer(Renderer):
                     "report_name": metadata.get("name", ""),
                     "generated_at": datetime.now().isoformat(),
                     "parameters": metadata.get("parameters", {}),
+                    "data_source_timings": metadata.get("data_source_timings", {}),
                 },
                 "sections": sections,
             }
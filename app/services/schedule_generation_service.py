@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from app.models.project import Project
 from app.models.project_schedule import ProjectSchedulePlan, ScheduleTask
+from app.services.cpm_engine import CPMGraph
 
 
 class ScheduleGenerationService:
@@ -318,16 +319,28 @@ class ScheduleGenerationService:
         return tasks
 
     def _calculate_critical_path(self, tasks: List[Dict]) -> Dict[str, Any]:
-        """计算关键路径"""
+        """计算关键路径（按任务前置关系做 CPM 计算）"""
 
         if not tasks:
             return {"total_days": 0, "critical_tasks": []}
 
-        # 简单计算：最后一个任务的结束日期
-        total_days = max(t["end_day"] for t in tasks) + 1
+        graph = CPMGraph(range(len(tasks)), [t["duration"] for t in tasks])
 
-        # 关键任务（所有任务都在关键路径上，简化处理）
-        critical_tasks = [t["task_name"] for t in tasks]
+        # 前置任务按名称引用，取之前最近一个同名任务
+        latest_by_name: Dict[str, int] = {}
+        for idx, task in enumerate(tasks):
+            for name in task.get("predecessors") or []:
+                pred_idx = latest_by_name.get(name)
+                if pred_idx is not None:
+                    # 排程中前后任务之间的间隔（如阶段缓冲）作为滞后天数
+                    lag = task["start_day"] - tasks[pred_idx]["end_day"] - 1
+                    graph.add_dependency(idx, pred_idx, "FS", lag)
+            latest_by_name[task["task_name"]] = idx
+
+        result = graph.compute(strict=False)
+
+        total_days = int(result.total_duration)
+        critical_tasks = [tasks[idx]["task_name"] for idx in result.critical_ids]
 
         return {
             "total_days": total_days,
@@ -558,6 +558,10 @@ class SessionService:
     @classmethod
     def _add_to_blacklist(cls, jti: str, ttl: int):
         """将JTI加入黑名单"""
+        from app.core.auth_principal import get_principal_cache
+
+        get_principal_cache().invalidate_jti(jti)
+
         try:
             from app.utils.redis_client import get_redis_client
 
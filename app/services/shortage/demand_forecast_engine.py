@@ -4,13 +4,17 @@
 
 Team 3: 智能缺料预警系统
 支持多种预测算法：移动平均、指数平滑、线性回归
+
+批量预测（batch_forecast_materials）一次分组查询取出全部物料的历史需求，
+组成 物料×天 矩阵，用 NumPy 对所有物料整体计算，预测记录批量写入。
 """
 import logging
 import statistics
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
@@ -18,9 +22,19 @@ from app.core.exceptions import BusinessException
 from app.models.production.work_order import WorkOrder
 from app.models.shortage.smart_alert import MaterialDemandForecast
 from app.utils.db_helpers import save_obj
+from app.utils.number_generator import allocate_sequence
 
 logger = logging.getLogger(__name__)
 
+# 批量预测时单条 IN 查询的物料数上限
+BATCH_MATERIAL_CHUNK = 500
+
+FORECAST_ALGORITHMS = ("MOVING_AVERAGE", "EXP_SMOOTHING", "LINEAR_REGRESSION")
+
+
+def _to_decimal(value: float, places: int = 4) -> Decimal:
+    return Decimal(str(round(float(value), places)))
+
 
 class DemandForecastEngine:
     """需求预测引擎"""
@@ -374,14 +388,187 @@ class DemandForecastEngine:
 
     def _generate_forecast_no(self) -> str:
         """生成预测编号"""
-        today = datetime.now().strftime("%Y%m%d")
-        count = (
-            self.db.query(func.count(MaterialDemandForecast.id))
-            .filter(MaterialDemandForecast.forecast_date == datetime.now().date())
-            .scalar()
-            or 0
-        )
-        return f"FC{today}{count + 1:04d}"
+        return self._generate_forecast_nos(1)[0]
+
+    def _generate_forecast_nos(self, count: int) -> List[str]:
+        """生成连续的 count 个预测编号（计数器原子分配，并发批量预测不重复）"""
+        prefix = f"FC{datetime.now().strftime('%Y%m%d')}"
+        first = allocate_sequence(self.db, MaterialDemandForecast, "forecast_no", prefix, count)
+        return [f"{prefix}{seq:04d}" for seq in range(first, first + count)]
+
+    # ========== 批量（向量化）预测 ==========
+
+    def _collect_historical_demand_matrix(
+        self, material_ids: List[int], days: int, project_id: Optional[int]
+    ) -> np.ndarray:
+        """
+        收集多个物料的历史需求矩阵
+
+        Returns:
+            np.ndarray: 形状 (物料数, days)，行顺序与 material_ids 一致，无需求的天为 0
+        """
+        today = datetime.now().date()
+        start_date = today - timedelta(days=days)
+        row_of = {material_id: i for i, material_id in enumerate(material_ids)}
+        matrix = np.zeros((len(material_ids), days))
+
+        for i in range(0, len(material_ids), BATCH_MATERIAL_CHUNK):
+            query = self.db.query(
+                WorkOrder.material_id,
+                WorkOrder.plan_start_date,
+                func.sum(WorkOrder.plan_qty),
+            ).filter(
+                and_(
+                    WorkOrder.material_id.in_(material_ids[i : i + BATCH_MATERIAL_CHUNK]),
+                    WorkOrder.plan_start_date >= start_date,
+                    WorkOrder.plan_start_date < today,
+                )
+            )
+            if project_id:
+                query = query.filter(WorkOrder.project_id == project_id)
+
+            for material_id, demand_date, daily_demand in query.group_by(
+                WorkOrder.material_id, WorkOrder.plan_start_date
+            ):
+                if isinstance(demand_date, datetime):
+                    demand_date = demand_date.date()
+                elif isinstance(demand_date, str):
+                    demand_date = date.fromisoformat(demand_date[:10])
+                matrix[row_of[material_id], (demand_date - start_date).days] += float(
+                    daily_demand or 0
+                )
+
+        return matrix
+
+    @staticmethod
+    def _forecast_matrix(
+        matrix: np.ndarray, algorithm: str, alpha: float = 0.3, window: int = 7
+    ) -> Dict[str, np.ndarray]:
+        """
+        对历史需求矩阵逐行预测（与单物料的各内部方法口径一致）
+
+        Returns:
+            Dict: forecast / lower / upper / avg / std / seasonal，均为按物料的一维数组
+        """
+        n = matrix.shape[1]
+        avg = matrix.mean(axis=1)
+        std = matrix.std(axis=1, ddof=1) if n >= 2 else np.zeros(len(matrix))
+
+        # 季节性：最近7天平均 / 此前平均，限制在 0.5 - 2.0
+        seasonal = np.ones(len(matrix))
+        if n >= 14:
+            recent_avg = matrix[:, -7:].mean(axis=1)
+            earlier_avg = matrix[:, :-7].mean(axis=1)
+            nonzero = earlier_avg != 0
+            seasonal[nonzero] = np.clip(recent_avg[nonzero] / earlier_avg[nonzero], 0.5, 2.0)
+
+        if algorithm == "MOVING_AVERAGE":
+            forecast = matrix[:, -min(window, n) :].mean(axis=1)
+        elif algorithm == "EXP_SMOOTHING":
+            # S_t = α*Y_t + (1-α)*S_{t-1}，S_0 = Y_0 展开为对各天的固定权重
+            weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=float)
+            weights[0] = (1 - alpha) ** (n - 1)
+            forecast = matrix @ weights
+        elif algorithm == "LINEAR_REGRESSION":
+            if n < 2:
+                forecast = avg
+            else:
+                x = np.arange(n, dtype=float)
+                x_centered = x - x.mean()
+                slope = matrix @ x_centered / (x_centered**2).sum()
+                forecast = np.maximum(0, slope * n + (avg - slope * x.mean()))
+        else:
+            raise BusinessException(f"不支持的预测算法: {algorithm}")
+
+        forecast = forecast * seasonal
+
+        # 95% 置信区间
+        margin = 1.96 * std
+        return {
+            "forecast": forecast,
+            "lower": np.maximum(0, forecast - margin),
+            "upper": forecast + margin,
+            "avg": avg,
+            "std": std,
+            "seasonal": seasonal,
+        }
+
+    def batch_forecast_materials(
+        self,
+        material_ids: List[int],
+        forecast_horizon_days: int = 30,
+        algorithm: str = "EXP_SMOOTHING",
+        historical_days: int = 90,
+        project_id: Optional[int] = None,
+    ) -> List[MaterialDemandForecast]:
+        """
+        批量预测多个物料需求
+
+        Args:
+            material_ids: 物料ID列表
+            forecast_horizon_days: 预测周期（天）
+            algorithm: 预测算法（同 forecast_material_demand）
+            historical_days: 历史数据周期（天）
+            project_id: 项目ID（可选）
+
+        Returns:
+            预测列表（与 material_ids 去重后的顺序一致）
+        """
+        if algorithm not in FORECAST_ALGORITHMS:
+            raise BusinessException(f"不支持的预测算法: {algorithm}")
+        if historical_days <= 0:
+            raise BusinessException("历史数据不足，无法进行预测")
+
+        material_ids = list(dict.fromkeys(material_ids))
+        if not material_ids:
+            return []
+
+        matrix = self._collect_historical_demand_matrix(material_ids, historical_days, project_id)
+        result = self._forecast_matrix(matrix, algorithm)
+
+        forecast_start_date = datetime.now().date()
+        forecast_end_date = forecast_start_date + timedelta(days=forecast_horizon_days)
+        forecast_nos = self._generate_forecast_nos(len(material_ids))
+
+        forecasts = []
+        for i, material_id in enumerate(material_ids):
+            seasonal_factor = float(result["seasonal"][i])
+            forecasts.append(
+                MaterialDemandForecast(
+                    forecast_no=forecast_nos[i],
+                    material_id=material_id,
+                    project_id=project_id,
+                    forecast_start_date=forecast_start_date,
+                    forecast_end_date=forecast_end_date,
+                    forecast_horizon_days=forecast_horizon_days,
+                    algorithm=algorithm,
+                    algorithm_params={
+                        "historical_days": historical_days,
+                        "data_points": historical_days,
+                    },
+                    forecasted_demand=_to_decimal(result["forecast"][i]),
+                    lower_bound=_to_decimal(result["lower"][i]),
+                    upper_bound=_to_decimal(result["upper"][i]),
+                    confidence_interval=Decimal("95.0"),
+                    historical_avg=_to_decimal(result["avg"][i]),
+                    historical_std=_to_decimal(result["std"][i]),
+                    historical_period_days=historical_days,
+                    seasonal_factor=_to_decimal(seasonal_factor, 2),
+                    seasonal_pattern={
+                        "detected": seasonal_factor != 1.0,
+                        "factor": seasonal_factor,
+                    },
+                    status="ACTIVE",
+                    forecast_date=forecast_start_date,
+                )
+            )
+
+        # 一次提交批量写入
+        self.db.add_all(forecasts)
+        self.db.commit()
+
+        logger.info(f"批量预测完成: {len(forecasts)} 个物料, algorithm={algorithm}")
+        return forecasts
 
     # ========== 高级功能 ==========
 
@@ -410,18 +597,27 @@ class DemandForecastEngine:
             .all()
         )
 
-        forecasts = []
-        for (material_id,) in material_ids:
-            try:
-                forecast = self.forecast_material_demand(
-                    material_id=material_id,
-                    forecast_horizon_days=forecast_horizon_days,
-                    project_id=project_id,
-                )
-                forecasts.append(forecast)
-            except Exception as e:
-                logger.warning(f"预测失败 material_id={material_id}: {e}")
-                continue
+        material_ids = [material_id for (material_id,) in material_ids if material_id]
+        try:
+            forecasts = self.batch_forecast_materials(
+                material_ids, forecast_horizon_days=forecast_horizon_days, project_id=project_id
+            )
+        except Exception as e:
+            # 批量预测失败时逐个物料预测，单个物料失败不影响其他物料
+            self.db.rollback()
+            logger.warning(f"项目 {project_id} 批量预测失败，改为逐个物料预测: {e}")
+            forecasts = []
+            for material_id in material_ids:
+                try:
+                    forecast = self.forecast_material_demand(
+                        material_id=material_id,
+                        forecast_horizon_days=forecast_horizon_days,
+                        project_id=project_id,
+                    )
+                    forecasts.append(forecast)
+                except Exception as e:
+                    logger.warning(f"预测失败 material_id={material_id}: {e}")
+                    continue
 
         logger.info(f"项目 {project_id} 批量预测完成，生成 {len(forecasts)} 个预测")
         return forecasts
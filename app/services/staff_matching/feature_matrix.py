@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+人员智能匹配服务 - 员工特征矩阵
+
+有效标签评估按 员工 × 标签 存为 NumPy 矩阵（未评估为 NaN），态度/特殊能力
+聚合量与历史绩效质量分按员工存为数组；匹配时对全部候选人一次向量化计算
+六个维度得分，不再逐人逐维度查询评估记录。各维度口径与 score_calculators 一致。
+
+矩阵按数据库引擎在进程内缓存（员工表无租户字段，按库隔离），超过
+STAFF_FEATURE_MATRIX_REBUILD_SECONDS 全量重建，其余时候按评估、绩效的
+updated_at 增量刷新变更员工所在行；本进程内删除的评估/绩效在 flush 时标记对应员工待刷新。
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.staff_matching import (
+    HrEmployeeTagEvaluation,
+    HrProjectPerformance,
+    HrTagDict,
+    TagTypeEnum,
+)
+from app.services.text_index import CorpusIndex
+from app.utils.db_helpers import in_chunks
+
+# 贡献等级权重（与 QualityScoreCalculator 一致）
+LEVEL_WEIGHTS = {"CORE": 1.5, "MAJOR": 1.2, "NORMAL": 1.0, "MINOR": 0.8}
+
+
+def quality_score(performances: Iterable) -> Optional[float]:
+    """按历史绩效计算质量分，没有可用绩效时返回 None"""
+    total_score = 0.0
+    total_weight = 0.0
+    for perf in performances:
+        weight = LEVEL_WEIGHTS.get(perf.contribution_level, 1.0)
+        scores = [
+            float(value)
+            for value in (perf.performance_score, perf.quality_score, perf.collaboration_score)
+            if value
+        ]
+        if scores:
+            total_score += sum(scores) / len(scores) * weight
+            total_weight += weight
+    if total_weight > 0:
+        return min(100, total_score / total_weight)
+    return None
+
+
+def workload_scores(workloads: np.ndarray, required_allocation: float) -> np.ndarray:
+    """工作负载分（向量化），workloads 为 NaN 表示没有档案"""
+    available = 100 - np.nan_to_num(workloads)
+    limited = np.where(available > 0, available / required_allocation * 100, 0.0)
+    scores = np.select(
+        [
+            available >= required_allocation,
+            available >= required_allocation * 0.8,
+            available >= required_allocation * 0.5,
+        ],
+        [100.0, 80.0, 50.0],
+        limited,
+    )
+    return np.where(np.isnan(workloads), 80.0, scores)
+
+
+class EmployeeFeatureMatrix(CorpusIndex):
+    """员工 × 标签评估矩阵"""
+
+    ENABLED_SETTING = "STAFF_FEATURE_MATRIX_ENABLED"
+    REBUILD_SETTING = "STAFF_FEATURE_MATRIX_REBUILD_SECONDS"
+
+    def __init__(self):
+        super().__init__()
+        self._row_of: Dict[int, int] = {}
+        self._col_of: Dict[int, int] = {}
+        self.tag_types: List[Optional[str]] = []
+        self.tag_names: List[str] = []
+        self.scores = np.zeros((0, 0))
+        self._attitude_sum = np.zeros(0)
+        self._attitude_count = np.zeros(0)
+        self._special_bonus = np.zeros(0)
+        self._special_count = np.zeros(0)
+        self._quality = np.zeros(0)
+        # 本进程删除了评估/绩效、待刷新的员工
+        self._stale: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _load(self, db: Session, since: Optional[datetime]) -> None:
+        tag_query = db.query(HrTagDict.id, HrTagDict.tag_type, HrTagDict.tag_name)
+        if since is not None and tag_query.filter(HrTagDict.updated_at >= since).first():
+            # 标签类型变化会影响各维度归属，直接全量重建
+            self.__init__()
+            since = None
+        for tag_id, tag_type, tag_name in tag_query:
+            if tag_id not in self._col_of:
+                self._col_of[tag_id] = len(self.tag_types)
+                self.tag_types.append(tag_type)
+                self.tag_names.append(tag_name or "")
+
+        evaluations = db.query(
+            HrEmployeeTagEvaluation.employee_id,
+            HrEmployeeTagEvaluation.tag_id,
+            HrEmployeeTagEvaluation.score,
+        ).filter(HrEmployeeTagEvaluation.is_valid)
+        performances = db.query(
+            HrProjectPerformance.employee_id,
+            HrProjectPerformance.contribution_level,
+            HrProjectPerformance.performance_score,
+            HrProjectPerformance.quality_score,
+            HrProjectPerformance.collaboration_score,
+        )
+        if since is None:
+            eval_rows = evaluations.order_by(HrEmployeeTagEvaluation.id).all()
+            perf_rows = performances.all()
+        else:
+            changed = self._stale | {
+                employee_id
+                for model in (HrEmployeeTagEvaluation, HrProjectPerformance)
+                for (employee_id,) in db.query(model.employee_id)
+                .filter(model.updated_at >= since)
+                .distinct()
+            }
+            self._stale = set()
+            eval_rows, perf_rows = [], []
+            for chunk in in_chunks(changed):
+                eval_rows.extend(
+                    evaluations.filter(HrEmployeeTagEvaluation.employee_id.in_(chunk))
+                    .order_by(HrEmployeeTagEvaluation.id)
+                    .all()
+                )
+                perf_rows.extend(
+                    performances.filter(HrProjectPerformance.employee_id.in_(chunk)).all()
+                )
+            self._resize(changed)
+            self._reset_rows([self._row_of[employee_id] for employee_id in changed])
+
+        self._resize(
+            {r.employee_id for r in eval_rows} | {r.employee_id for r in perf_rows},
+            extra_cols={r.tag_id for r in eval_rows},
+        )
+        self._fill(eval_rows, perf_rows)
+
+    def _resize(self, employee_ids: Iterable[int], extra_cols: Iterable[int] = ()) -> None:
+        """为新员工追加行、为字典外的标签追加列"""
+        for tag_id in extra_cols:
+            if tag_id not in self._col_of:
+                self._col_of[tag_id] = len(self.tag_types)
+                self.tag_types.append(None)
+                self.tag_names.append("")
+        new_ids = [employee_id for employee_id in employee_ids if employee_id not in self._row_of]
+        for employee_id in new_ids:
+            self._row_of[employee_id] = len(self._row_of)
+
+        n_rows, n_cols = len(self._row_of), len(self.tag_types)
+        if self.scores.shape != (n_rows, n_cols):
+            scores = np.full((n_rows, n_cols), np.nan)
+            scores[: self.scores.shape[0], : self.scores.shape[1]] = self.scores
+            self.scores = scores
+        grow = n_rows - len(self._quality)
+        if grow:
+            zeros = np.zeros(grow)
+            self._attitude_sum = np.concatenate((self._attitude_sum, zeros))
+            self._attitude_count = np.concatenate((self._attitude_count, zeros))
+            self._special_bonus = np.concatenate((self._special_bonus, zeros))
+            self._special_count = np.concatenate((self._special_count, zeros))
+            self._quality = np.concatenate((self._quality, np.full(grow, np.nan)))
+
+    def _reset_rows(self, rows: Sequence[int]) -> None:
+        rows = np.asarray(rows, dtype=np.int64)
+        self.scores[rows] = np.nan
+        for values in (
+            self._attitude_sum,
+            self._attitude_count,
+            self._special_bonus,
+            self._special_count,
+        ):
+            values[rows] = 0.0
+        self._quality[rows] = np.nan
+
+    def _fill(self, eval_rows: Sequence, perf_rows: Sequence) -> None:
+        for employee_id, tag_id, score in eval_rows:
+            row, col = self._row_of[employee_id], self._col_of[tag_id]
+            # 同一标签多条有效评估时与逐条计算一致取最后一条；态度均值、特殊能力加分按全部评估累计
+            self.scores[row, col] = score
+            tag_type = self.tag_types[col]
+            if tag_type == TagTypeEnum.ATTITUDE.value:
+                self._attitude_sum[row] += score
+                self._attitude_count[row] += 1
+            elif tag_type == TagTypeEnum.SPECIAL.value:
+                self._special_bonus[row] += score / 5.0 * 10
+                self._special_count[row] += 1
+
+        by_employee = defaultdict(list)
+        for perf in perf_rows:
+            by_employee[perf.employee_id].append(perf)
+        for employee_id, performances in by_employee.items():
+            quality = quality_score(performances)
+            if quality is not None:
+                self._quality[self._row_of[employee_id]] = quality
+
+    def mark_stale(self, employee_ids: Iterable[int]) -> None:
+        """标记员工待下次同步时刷新（可能在同步查询触发的 flush 中调用，不加锁）"""
+        self._stale.update(employee_ids)
+
+    def _requirement_scores(
+        self, features: np.ndarray, requirements: List[dict], tag_type: Optional[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        取候选人在各项要求标签上的评分与最低分要求
+
+        Returns:
+            (评分矩阵 候选人×要求，未评估或标签类型不符为 NaN, 最低分数组)
+        """
+        values = np.full((len(features), len(requirements)), np.nan)
+        for j, req in enumerate(requirements):
+            col = self._col_of.get(req.get("tag_id"))
+            if col is not None and (tag_type is None or self.tag_types[col] == tag_type):
+                values[:, j] = features[:, col]
+        min_scores = np.array([req.get("min_score", 3) for req in requirements], dtype=float)
+        return values, min_scores
+
+    def score_candidates(
+        self,
+        employee_ids: Sequence[int],
+        profiles: Sequence,
+        staffing_need,
+        weights: Dict[str, float],
+    ) -> Dict[str, np.ndarray]:
+        """
+        对全部候选人一次计算六维得分与加权总分
+
+        Args:
+            employee_ids: 候选员工ID
+            profiles: 与 employee_ids 对应的员工档案（可为 None）
+            staffing_need: 人员需求
+            weights: 各维度权重
+
+        Returns:
+            {维度: 得分数组, "total": 总分数组}
+        """
+        n = len(employee_ids)
+        with self._lock:
+            # 矩阵中没有的员工（无任何评估与绩效）各项均按未评估处理
+            rows = np.array([self._row_of.get(e, -1) for e in employee_ids], dtype=np.int64)
+            known = rows >= 0
+            features = np.full((n, len(self.tag_types)), np.nan)
+            features[known] = self.scores[rows[known]]
+            aggregates = np.zeros((4, n))
+            quality = np.full(n, np.nan)
+            for i, values in enumerate(
+                (
+                    self._attitude_sum,
+                    self._attitude_count,
+                    self._special_bonus,
+                    self._special_count,
+                )
+            ):
+                aggregates[i, known] = values[rows[known]]
+            quality[known] = self._quality[rows[known]]
+            scores = self._requirement_dimensions(features, staffing_need)
+        attitude_sum, attitude_count, special_bonus, special_count = aggregates
+
+        # 态度：优先取档案聚合分，否则取态度评估均值，再加态度要求达标奖励
+        profile_attitude = np.array(
+            [float(p.attitude_score) if p and p.attitude_score else np.nan for p in profiles]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            evaluated = np.where(attitude_count > 0, attitude_sum / attitude_count * 20.0, 60.0)
+        attitude = np.where(np.isnan(profile_attitude), evaluated, profile_attitude)
+        if staffing_need.required_attitudes:
+            attitude = np.minimum(100, attitude + scores.pop("attitude_bonus"))
+        scores["attitude"] = attitude
+
+        scores["quality"] = np.where(np.isnan(quality), 60.0, quality)
+        workloads = np.array(
+            [float(p.current_workload_pct or 0) if p else np.nan for p in profiles]
+        )
+        scores["workload"] = workload_scores(workloads, float(staffing_need.allocation_pct or 100))
+        scores["special"] = np.where(special_count > 0, np.minimum(100, 50.0 + special_bonus), 50.0)
+        scores["total"] = sum(scores[dimension] * weight for dimension, weight in weights.items())
+        return scores
+
+    def _requirement_dimensions(self, features: np.ndarray, staffing_need) -> Dict[str, np.ndarray]:
+        """按需求中的标签要求计算技能分、领域分与态度要求奖励"""
+        required_skills = staffing_need.required_skills or []
+        preferred_skills = staffing_need.preferred_skills or []
+        required_domains = staffing_need.required_domains or []
+        required_attitudes = staffing_need.required_attitudes or []
+        n = len(features)
+        scores: Dict[str, np.ndarray] = {}
+
+        # 技能：必需技能按达标与否计分（占80分），优选技能每项达3分奖励5分（最多4项）
+        if required_skills:
+            values, min_scores = self._requirement_scores(
+                features, required_skills, TagTypeEnum.SKILL.value
+            )
+            ratio = np.minimum(values / 5.0, 1.0)
+            points = np.where(values >= min_scores, ratio * 100, ratio * 50)
+            base = np.nansum(points, axis=1) / len(required_skills) * 0.8
+            bonus = np.zeros(n)
+            if preferred_skills:
+                preferred, _ = self._requirement_scores(
+                    features, preferred_skills[:4], TagTypeEnum.SKILL.value
+                )
+                bonus = (preferred >= 3).sum(axis=1) * 5.0
+            scores["skill"] = np.minimum(100, base + bonus)
+        else:
+            scores["skill"] = np.full(n, 60.0)
+
+        # 领域：达标按评分比例计满分，未达标减半
+        if required_domains:
+            values, min_scores = self._requirement_scores(
+                features, required_domains, TagTypeEnum.DOMAIN.value
+            )
+            points = np.where(values >= min_scores, values / 5.0 * 100, values / 5.0 * 50)
+            scores["domain"] = np.nansum(points, axis=1) / len(required_domains)
+        else:
+            scores["domain"] = np.full(n, 60.0)
+
+        # 态度要求：任意类型标签评估达标每项加5分
+        if required_attitudes:
+            values, min_scores = self._requirement_scores(features, required_attitudes, None)
+            scores["attitude_bonus"] = (values >= min_scores).sum(axis=1) * 5.0
+        return scores
+
+    def skill_details(
+        self, employee_id: int, required_skills: List[dict]
+    ) -> Tuple[List[str], List[str]]:
+        """返回员工的 (已匹配技能, 缺失技能) 说明，口径与 SkillScoreCalculator 一致"""
+        matched, missing = [], []
+        with self._lock:
+            row = self._row_of.get(employee_id)
+            for req in required_skills:
+                tag_id = req.get("tag_id")
+                min_score = req.get("min_score", 3)
+                tag_name = req.get("tag_name", "")
+                col = self._col_of.get(tag_id)
+                score = np.nan
+                if row is not None and col is not None:
+                    if self.tag_types[col] == TagTypeEnum.SKILL.value:
+                        score = self.scores[row, col]
+                if np.isnan(score):
+                    missing.append(tag_name or f"Tag-{tag_id}")
+                elif score >= min_score:
+                    matched.append(self.tag_names[col] or tag_name)
+                else:
+                    missing.append(f"{tag_name}(需{min_score}分,实{int(score)}分)")
+        return matched, missing
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_deleted_evaluations(session, flush_context):
+    """删除评估/绩效不会留下 updated_at，标记对应员工待刷新"""
+    employee_ids = {
+        obj.employee_id
+        for obj in session.deleted
+        if isinstance(obj, (HrEmployeeTagEvaluation, HrProjectPerformance))
+    }
+    if not employee_ids:
+        return
+    try:
+        bind = session.get_bind()
+    except Exception:
+        return
+    indexes = CorpusIndex._registry.get(getattr(bind, "engine", bind), {})
+    matrix = indexes.get(EmployeeFeatureMatrix)
+    if matrix is not None:
+        matrix.mark_stale(employee_ids)
@@ -8,6 +8,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
@@ -20,6 +21,7 @@ from app.models.staff_matching import (
 )
 
 from .base import StaffMatchingBase
+from .feature_matrix import EmployeeFeatureMatrix
 from .score_calculators import (
     AttitudeScoreCalculator,
     DomainScoreCalculator,
@@ -70,18 +72,24 @@ class MatchingEngine(StaffMatchingBase):
         # 获取所有活跃员工及其档案
         candidates = cls._get_candidate_employees(db, staffing_need, include_overloaded)
 
-        # 计算每个候选人的得分
-        scored_candidates = []
-        for employee, profile in candidates:
-            scores = cls._calculate_candidate_scores(db, employee, profile, staffing_need)
-            scored_candidates.append(
-                {
-                    "employee": employee,
-                    "profile": profile,
-                    "scores": scores,
-                    "total_score": scores["total"],
-                }
+        # 计算每个候选人的得分（特征矩阵可用时一次向量化打分）
+        matrix = EmployeeFeatureMatrix.get(db)
+        if matrix is not None:
+            scored_candidates = cls._score_candidates_by_matrix(
+                matrix, candidates, staffing_need, top_n
             )
+        else:
+            scored_candidates = []
+            for employee, profile in candidates:
+                scores = cls._calculate_candidate_scores(db, employee, profile, staffing_need)
+                scored_candidates.append(
+                    {
+                        "employee": employee,
+                        "profile": profile,
+                        "scores": scores,
+                        "total_score": scores["total"],
+                    }
+                )
 
         # 按总分排序
         scored_candidates.sort(key=lambda x: x["total_score"], reverse=True)
@@ -192,6 +200,46 @@ class MatchingEngine(StaffMatchingBase):
 
         return query.all()
 
+    @classmethod
+    def _score_candidates_by_matrix(
+        cls,
+        matrix: EmployeeFeatureMatrix,
+        candidates: List[Tuple[Employee, Optional[HrEmployeeProfile]]],
+        staffing_need: MesProjectStaffingNeed,
+        top_n: int,
+    ) -> List[Dict]:
+        """按员工特征矩阵一次计算全部候选人得分，按总分降序返回；技能匹配说明只为前 top_n 名生成"""
+        if not candidates:
+            return []
+        employees = [employee for employee, _ in candidates]
+        profiles = [profile for _, profile in candidates]
+        scores = matrix.score_candidates(
+            [employee.id for employee in employees],
+            profiles,
+            staffing_need,
+            cls.DIMENSION_WEIGHTS,
+        )
+
+        scored_candidates = []
+        for i in np.argsort(-scores["total"], kind="stable"):
+            candidate_scores = {dimension: float(values[i]) for dimension, values in scores.items()}
+            candidate_scores["matched_skills"], candidate_scores["missing_skills"] = [], []
+            if len(scored_candidates) < top_n and staffing_need.required_skills:
+                matched, missing = matrix.skill_details(
+                    employees[i].id, staffing_need.required_skills
+                )
+                candidate_scores["matched_skills"] = matched
+                candidate_scores["missing_skills"] = missing
+            scored_candidates.append(
+                {
+                    "employee": employees[i],
+                    "profile": profiles[i],
+                    "scores": candidate_scores,
+                    "total_score": candidate_scores["total"],
+                }
+            )
+        return scored_candidates
+
     @classmethod
     def _calculate_candidate_scores(
         cls,
@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+"""
+文本相似度索引
+
+- 分词：中文按连续汉字切分为二元组（单字成段时保留单字），英文/数字按词切分，
+  无需额外分词依赖
+- TfidfIndex：稀疏 TF-IDF 向量按词项倒排存储为 NumPy 数组（类 CSC 结构），
+  查询时按查询词项取出倒排片段一次 bincount 得到全部文档的余弦相似度；
+  增删改先进入增量区，增量区过大时整体重新编译
+- MinHasher：物料编码集合的 MinHash 签名，签名逐位相等的比例即 Jaccard 估计值，
+  可对全部文档向量化比较
+- CorpusIndex：按数据库引擎在进程内缓存的语料索引基类。首次使用时全量构建，
+  其余时候按 updated_at 增量同步；超过 TEXT_INDEX_REBUILD_SECONDS 的全量重建
+  在后台线程（或定时任务）中进行，完成后整体替换，不阻塞请求
+"""
+
+import logging
+import re
+import threading
+import weakref
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[一-鿿]+|[a-z0-9]+(?:[._\-][a-z0-9]+)*")
+
+# 增量区文档数超过该值（且超过已编译文档数的 10%）时重新编译
+COMPACT_MIN_DELTA = 1000
+
+# 增量同步回看的秒数，覆盖同步时尚未提交的长事务
+SYNC_OVERLAP_SECONDS = 60
+
+
+def _is_cjk(token: str) -> bool:
+    return "一" <= token[0] <= "鿿"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """中英文混合分词：汉字二元组 + 英文/数字词"""
+    if not text:
+        return []
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _is_cjk(run) and len(run) > 1:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _term_frequencies(tokens: Iterable[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+class TfidfIndex:
+    """稀疏 TF-IDF 文本索引，按余弦相似度检索"""
+
+    def __init__(self):
+        self._vocab: Dict[str, int] = {}
+        # 已编译部分：按词项排序的倒排 (行号, 归一化权重)
+        self._keys: List[Hashable] = []
+        self._row_of: Dict[Hashable, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._weights = np.zeros(0, dtype=np.float64)
+        self._idf = np.zeros(0, dtype=np.float64)
+        # 全部文档的词频，重新编译时使用 {key: (词项ID数组, 词频数组)}
+        self._docs: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+        # 编译后新增/修改的文档 {key: (词项ID数组, 归一化权重数组)}
+        self._delta: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key) -> bool:
+        return key in self._docs
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[Hashable, str]]) -> "TfidfIndex":
+        """由 (key, 文本) 批量构建并编译"""
+        index = cls()
+        for key, text in docs:
+            index._docs[key] = index._encode(text)
+        index.compile()
+        return index
+
+    def _encode(self, text: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        counts = _term_frequencies(tokenize(text))
+        term_ids = np.fromiter(
+            (self._vocab.setdefault(term, len(self._vocab)) for term in counts),
+            dtype=np.int64,
+            count=len(counts),
+        )
+        return term_ids, np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+    def _term_idf(self, term_ids: np.ndarray) -> np.ndarray:
+        """编译后出现的新词项按文档频率 0 计算 IDF"""
+        max_idf = np.log(len(self._keys) + 1.0) + 1.0
+        idf = np.full(len(term_ids), max_idf)
+        known = term_ids < len(self._idf)
+        idf[known] = self._idf[term_ids[known]]
+        return idf
+
+    def _delta_vector(self, key) -> Tuple[np.ndarray, np.ndarray]:
+        term_ids, tf = self._docs[key]
+        weights = (1.0 + np.log(tf)) * self._term_idf(term_ids)
+        norm = np.sqrt(np.dot(weights, weights))
+        return term_ids, weights / norm if norm else weights
+
+    def compile(self) -> None:
+        """将全部文档重新编译为倒排数组，清空增量区"""
+        keys = list(self._docs)
+        lengths = np.fromiter((len(self._docs[k][0]) for k in keys), np.int64, len(keys))
+        if keys:
+            terms = np.concatenate([self._docs[k][0] for k in keys])
+            tf = np.concatenate([self._docs[k][1] for k in keys])
+        else:
+            terms = np.zeros(0, dtype=np.int64)
+            tf = np.zeros(0, dtype=np.float64)
+        rows = np.repeat(np.arange(len(keys), dtype=np.int64), lengths)
+
+        vocab_size = len(self._vocab)
+        df = np.bincount(terms, minlength=vocab_size)
+        idf = np.log((len(keys) + 1.0) / (df + 1.0)) + 1.0
+        weights = (1.0 + np.log(tf)) * idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=len(keys)))
+        weights = weights / np.where(norms > 0, norms, 1.0)[rows]
+
+        order = np.argsort(terms, kind="stable")
+        self._rows = rows[order]
+        self._weights = weights[order]
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(terms, minlength=vocab_size))))
+        self._idf = idf
+        self._keys = keys
+        self._row_of = {key: row for row, key in enumerate(keys)}
+        self._alive = np.ones(len(keys), dtype=bool)
+        self._delta = {}
+
+    def upsert(self, key: Hashable, text: Optional[str]) -> None:
+        """新增或更新文档"""
+        self.remove(key)
+        self._docs[key] = self._encode(text)
+        self._delta[key] = self._delta_vector(key)
+        if len(self._delta) > max(COMPACT_MIN_DELTA, len(self._keys) // 10):
+            self.compile()
+
+    def remove(self, key: Hashable) -> None:
+        """删除文档（不存在时忽略）"""
+        self._docs.pop(key, None)
+        self._delta.pop(key, None)
+        row = self._row_of.get(key)
+        if row is not None:
+            self._alive[row] = False
+
+    def _query_vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        counts = _term_frequencies(tokenize(text))
+        known = [(self._vocab[t], c) for t, c in counts.items() if t in self._vocab]
+        if not known:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        term_ids = np.array([t for t, _ in known], dtype=np.int64)
+        weights = (1.0 + np.log([c for _, c in known])) * self._term_idf(term_ids)
+        norm = np.sqrt(np.dot(weights, weights))
+        return term_ids, weights / norm
+
+    def scores(
+        self, text: Optional[str], require_all: bool = False
+    ) -> Tuple[List[Hashable], np.ndarray]:
+        """
+        计算查询文本与全部文档的余弦相似度
+
+        Args:
+            text: 查询文本
+            require_all: 是否只保留包含查询全部词项的文档（其余记 0 分）
+
+        Returns:
+            (文档 key 列表, 相似度数组)，顺序一一对应
+        """
+        n_query_terms = len(set(tokenize(text)))
+        term_ids, query_weights = self._query_vector(text or "")
+        if require_all and len(term_ids) < n_query_terms:
+            term_ids = term_ids[:0]
+
+        # 已编译部分：取出查询词项的倒排片段一次累加
+        compiled = term_ids[term_ids < len(self._idf)]
+        starts, ends = self._indptr[compiled], self._indptr[compiled + 1]
+        spans = ends - starts
+        if spans.sum():
+            positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            rows = self._rows[positions]
+            factors = np.repeat(query_weights[term_ids < len(self._idf)], spans)
+            base = np.bincount(
+                rows, weights=self._weights[positions] * factors, minlength=len(self._keys)
+            )
+            if require_all:
+                hits = np.bincount(rows, minlength=len(self._keys))
+                base[hits < len(term_ids)] = 0.0
+        else:
+            base = np.zeros(len(self._keys))
+        base[~self._alive] = 0.0
+
+        # 增量区逐个计算
+        query = dict(zip(term_ids.tolist(), query_weights.tolist()))
+        delta_keys = list(self._delta)
+        delta_scores = np.zeros(len(delta_keys))
+        for i, key in enumerate(delta_keys):
+            doc_terms, doc_weights = self._delta[key]
+            matched = [(query[t], w) for t, w in zip(doc_terms.tolist(), doc_weights) if t in query]
+            if matched and (not require_all or len(matched) == len(query)):
+                delta_scores[i] = sum(q * w for q, w in matched)
+
+        return self._keys + delta_keys, np.concatenate((base, delta_scores))
+
+    def _term_group(self, token: str) -> List[int]:
+        """查询词项对应的词项ID：汉字二元组精确匹配，英文/数字词按子串匹配（motor 命中 motors）"""
+        if _is_cjk(token):
+            term_id = self._vocab.get(token)
+            return [] if term_id is None else [term_id]
+        return [term_id for term, term_id in self._vocab.items() if token in term]
+
+    def matching_keys(self, text: Optional[str]) -> List[Hashable]:
+        """
+        返回包含查询全部词项的文档 key（不计算相关度）
+
+        英文/数字词项按子串匹配词表。词项不要求相邻或同列，结果包含 ILIKE '%kw%'
+        的全部命中，但可能多出词项分散出现的文档，需要短语语义的调用方应再行复核。
+        """
+        groups = [self._term_group(token) for token in set(tokenize(text))]
+        if not groups or not all(groups):
+            return []
+
+        # 已编译部分：每个词项组取倒排片段的并集，各组求交
+        mask = self._alive.copy()
+        for group in groups:
+            compiled = [t for t in group if t < len(self._idf)]
+            hit = np.zeros(len(self._keys), dtype=bool)
+            if compiled:
+                rows = [self._rows[self._indptr[t] : self._indptr[t + 1]] for t in compiled]
+                hit[np.concatenate(rows)] = True
+            mask &= hit
+        keys = [self._keys[i] for i in np.flatnonzero(mask)]
+
+        group_sets = [set(group) for group in groups]
+        for key, (doc_terms, _) in self._delta.items():
+            terms = set(doc_terms.tolist())
+            if all(terms & group for group in group_sets):
+                keys.append(key)
+        return keys
+
+    def query(
+        self,
+        text: Optional[str],
+        top_k: Optional[int] = None,
+        min_score: float = 0.0,
+        require_all: bool = False,
+    ) -> List[Tuple[Hashable, float]]:
+        """按相似度降序返回 (key, 相似度)，只包含相似度大于 min_score 的文档"""
+        keys, scores = self.scores(text, require_all=require_all)
+        top = top_indices(scores, top_k or len(keys), min_score, inclusive=False)
+        return [(keys[i], float(scores[i])) for i in top]
+
+
+class MinHasher:
+    """集合的 MinHash 签名"""
+
+    # 梅森素数 2^31 - 1，乘积不超过 uint64
+    _PRIME = np.uint64((1 << 31) - 1)
+
+    def __init__(self, num_perm: int = 64, seed: int = 20261017):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+
+    @property
+    def empty(self) -> np.ndarray:
+        """空集合的签名"""
+        return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+    def signature(self, values: Iterable[str]) -> np.ndarray:
+        """计算集合签名；空集合返回全最大值"""
+        hashes = np.fromiter(
+            {zlib.crc32(str(v).encode("utf-8")) for v in values if v}, dtype=np.uint64
+        )
+        if not len(hashes):
+            return self.empty
+        permuted = (np.outer(hashes, self._a) + self._b) % self._PRIME
+        return permuted.min(axis=0)
+
+    def jaccard(self, signature: np.ndarray, signatures: np.ndarray) -> np.ndarray:
+        """估计一个签名与多个签名（行）的 Jaccard 相似度，任一方为空集合时记 0"""
+        if not len(signatures):
+            return np.zeros(0)
+        estimates = (signatures == signature).mean(axis=1)
+        empty = self.empty
+        if np.array_equal(signature, empty):
+            return np.zeros(len(signatures))
+        estimates[(signatures == empty).all(axis=1)] = 0.0
+        return estimates
+
+
+def top_indices(
+    scores: Sequence[float], top_k: int, min_score: float = 0.0, inclusive: bool = True
+) -> np.ndarray:
+    """返回分数不低于（inclusive=False 时高于）min_score 的前 top_k 个位置，按分数降序"""
+    scores = np.asarray(scores, dtype=np.float64)
+    candidates = np.flatnonzero(scores >= min_score if inclusive else scores > min_score)
+    if len(candidates) > top_k:
+        candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class CorpusIndex:
+    """
+    按更新时间增量同步的语料索引基类
+
+    子类实现 _load(db, since)：since 为 None 时加载全部文档，否则只加载
+    updated_at 不早于 since 的文档并更新（不再符合条件的删除）。
+    ENABLED_SETTING / REBUILD_SETTING 指定启用开关与全量重建间隔的配置项。
+    读取索引数据时持有实例锁 self._lock（增量同步期间同样持有）。
+    """
+
+    ENABLED_SETTING = "TEXT_INDEX_ENABLED"
+    REBUILD_SETTING = "TEXT_INDEX_REBUILD_SECONDS"
+
+    # {engine: {索引类: 索引}}
+    _registry: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _registry_lock = threading.Lock()
+    # 首次构建锁（每个子类一把，见 __init_subclass__）
+    _build_lock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_lock = threading.Lock()
+
+    def __init__(self):
+        self.built_at: Optional[datetime] = None
+        self.synced_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def _load(self, db: Session, since: Optional[datetime]) -> None:
+        raise NotImplementedError
+
+    @classmethod
+    def _engine(cls, db: Session) -> Optional[Engine]:
+        """会话绑定的数据库引擎；未启用或未绑定真实引擎时返回 None"""
+        if not getattr(settings, cls.ENABLED_SETTING):
+            return None
+        try:
+            bind = db.get_bind()
+        except Exception:
+            return None
+        if not isinstance(bind, (Engine, Connection)):
+            return None
+        return getattr(bind, "engine", bind)
+
+    @classmethod
+    def _current(cls, engine: Engine) -> Optional["CorpusIndex"]:
+        with CorpusIndex._registry_lock:
+            return CorpusIndex._registry.get(engine, {}).get(cls)
+
+    @classmethod
+    def _build(cls, db: Session, engine: Engine) -> "CorpusIndex":
+        """全量构建新索引并替换当前索引"""
+        index = cls()
+        now = datetime.now()
+        index._load(db, None)
+        index.built_at = index.synced_at = now
+        with CorpusIndex._registry_lock:
+            CorpusIndex._registry.setdefault(engine, {})[cls] = index
+        return index
+
+    def _rebuild_due(self) -> bool:
+        rebuild_after = timedelta(seconds=getattr(settings, self.REBUILD_SETTING))
+        return self.built_at <= datetime.now() - rebuild_after
+
+    def _sync(self, db: Session) -> None:
+        """按 updated_at 增量同步"""
+        now = datetime.now()
+        with self._lock:
+            self._load(db, self.synced_at - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+            self.synced_at = now
+
+    @classmethod
+    def _rebuild_in_background(cls, engine: Engine, index: "CorpusIndex") -> None:
+        """在后台线程中全量重建（同一索引同时只有一个重建线程）"""
+        with index._lock:
+            if index._rebuilding:
+                return
+            index._rebuilding = True
+
+        def rebuild():
+            try:
+                with Session(bind=engine) as db:
+                    cls._build(db, engine)
+            except Exception:
+                logger.warning(f"{cls.__name__} 全量重建失败，沿用当前索引", exc_info=True)
+                # 下一个重建周期再重试
+                index.built_at = datetime.now()
+                index._rebuilding = False
+
+        threading.Thread(target=rebuild, name=f"{cls.__name__}-rebuild", daemon=True).start()
+
+    @classmethod
+    def get(cls, db: Session) -> Optional["CorpusIndex"]:
+        """
+        获取已同步到最新的索引
+
+        首次使用时在当前请求中构建；之后只做增量同步，到期的全量重建交给后台线程。
+        未启用或会话未绑定数据库引擎时返回 None，调用方降级为逐条计算。
+        """
+        engine = cls._engine(db)
+        if engine is None:
+            return None
+
+        index = cls._current(engine)
+        if index is None:
+            with cls._build_lock:
+                index = cls._current(engine)
+                if index is None:
+                    return cls._build(db, engine)
+
+        if index._rebuild_due():
+            if isinstance(engine.pool, StaticPool):
+                # 单连接（内存库）不能跨线程使用，就地重建
+                with cls._build_lock:
+                    return cls._build(db, engine)
+            cls._rebuild_in_background(engine, index)
+        index._sync(db)
+        return index
+
+    @classmethod
+    def refresh(cls, db: Session) -> Optional["CorpusIndex"]:
+        """定时任务调用：到期时在当前线程全量重建，否则增量同步"""
+        engine = cls._engine(db)
+        if engine is None:
+            return None
+
+        index = cls._current(engine)
+        if index is None or index._rebuild_due():
+            with cls._build_lock:
+                return cls._build(db, engine)
+        index._sync(db)
+        return index
@@ -7,10 +7,12 @@ from datetime import date
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
 
 from app.common.date_range import get_month_range_by_ym
 from app.models.timesheet import Timesheet, TimesheetSummary
+from app.models.timesheet_rollup import TimesheetDailyRollup, TimesheetMonthlyRollup
 
 
 def calculate_month_range(year: int, month: int) -> Tuple[date, date]:
@@ -153,6 +155,170 @@ def build_task_breakdown(timesheets: List[Timesheet]) -> Dict[str, Dict[str, Any
     return task_breakdown
 
 
+# ==================== 基于汇总表的 SQL 聚合 ====================
+
+
+def _filter_rollups(
+    query: Query,
+    model,
+    user_id: Optional[int],
+    department_id: Optional[int],
+    project_id: Optional[int],
+) -> Query:
+    if user_id:
+        query = query.filter(model.user_id == user_id)
+    if department_id:
+        query = query.filter(model.department_id == department_id)
+    if project_id:
+        query = query.filter(model.project_id == project_id)
+    return query
+
+
+def summarize_monthly_rollups(
+    db: Session,
+    year: int,
+    month: int,
+    user_id: Optional[int],
+    department_id: Optional[int],
+    project_id: Optional[int],
+) -> Tuple[Dict[str, float], int]:
+    """
+    从月汇总表计算工时汇总
+
+    Returns:
+        Tuple[Dict, int]: (工时汇总数据, 记录条数)
+    """
+    mr = TimesheetMonthlyRollup
+    query = db.query(
+        func.sum(mr.total_hours),
+        func.sum(mr.normal_hours),
+        func.sum(mr.overtime_hours),
+        func.sum(mr.weekend_hours),
+        func.sum(mr.holiday_hours),
+        func.sum(mr.entries_count),
+    ).filter(mr.year == year, mr.month == month)
+    row = _filter_rollups(query, mr, user_id, department_id, project_id).one()
+
+    hours_summary = {
+        "total_hours": float(row[0] or 0),
+        "normal_hours": float(row[1] or 0),
+        "overtime_hours": float(row[2] or 0),
+        "weekend_hours": float(row[3] or 0),
+        "holiday_hours": float(row[4] or 0),
+    }
+    return hours_summary, int(row[5] or 0)
+
+
+def build_project_breakdown_from_rollups(
+    db: Session,
+    year: int,
+    month: int,
+    user_id: Optional[int],
+    department_id: Optional[int],
+    project_id: Optional[int],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    从月汇总表构建项目分布
+
+    Returns:
+        Dict: 项目分布数据
+    """
+    mr = TimesheetMonthlyRollup
+    query = db.query(
+        mr.project_id,
+        func.max(mr.project_code),
+        func.max(mr.project_name),
+        func.sum(mr.total_hours),
+    ).filter(mr.year == year, mr.month == month, mr.project_id.isnot(None))
+    rows = (
+        _filter_rollups(query, mr, user_id, department_id, project_id)
+        .group_by(mr.project_id)
+        .order_by(mr.project_id)
+        .all()
+    )
+
+    return {
+        f"{code or ''}_{pid}": {
+            "project_id": pid,
+            "project_code": code,
+            "project_name": name,
+            "hours": float(hours or 0),
+        }
+        for pid, code, name, hours in rows
+    }
+
+
+def build_daily_breakdown_from_rollups(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    user_id: Optional[int],
+    department_id: Optional[int],
+    project_id: Optional[int],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    从日汇总表构建日期分布
+
+    Returns:
+        Dict: 日期分布数据
+    """
+    dr = TimesheetDailyRollup
+    query = db.query(
+        dr.work_date,
+        func.sum(dr.total_hours),
+        func.sum(dr.normal_hours),
+    ).filter(dr.work_date >= start_date, dr.work_date <= end_date)
+    rows = (
+        _filter_rollups(query, dr, user_id, department_id, project_id)
+        .group_by(dr.work_date)
+        .order_by(dr.work_date)
+        .all()
+    )
+
+    daily_breakdown = {}
+    for work_date, hours, normal_hours in rows:
+        day_key = str(work_date)
+        hours, normal_hours = float(hours or 0), float(normal_hours or 0)
+        daily_breakdown[day_key] = {
+            "date": day_key,
+            "hours": hours,
+            "normal_hours": normal_hours,
+            "overtime_hours": hours - normal_hours,
+        }
+    return daily_breakdown
+
+
+def build_task_breakdown_from_rollups(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    user_id: Optional[int],
+    department_id: Optional[int],
+    project_id: Optional[int],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    从日汇总表构建任务分布
+
+    Returns:
+        Dict: 任务分布数据
+    """
+    dr = TimesheetDailyRollup
+    query = db.query(dr.task_id, func.max(dr.task_name), func.sum(dr.total_hours)).filter(
+        dr.work_date >= start_date, dr.work_date <= end_date, dr.task_id.isnot(None)
+    )
+    rows = (
+        _filter_rollups(query, dr, user_id, department_id, project_id)
+        .group_by(dr.task_id)
+        .order_by(dr.task_id)
+        .all()
+    )
+
+    return {
+        f"task_{task_id}": {"task_id": task_id, "task_name": name, "hours": float(hours or 0)}
+        for task_id, name, hours in rows
+    }
+
+
 def get_or_create_summary(
     db: Session,
     summary_type: str,
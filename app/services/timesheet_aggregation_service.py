@@ -2,18 +2,26 @@
 """
 工时汇总服务
 负责从工时记录自动生成多维度汇总和多格式报表
+
+工时汇总表（timesheet_daily_rollups / timesheet_monthly_rollups）可用时，
+汇总数据由数据库按汇总表 GROUP BY 得出；否则逐条加载工时记录汇总。
 """
 
 from datetime import date
-from typing import Any, Dict, List, Optional
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.common.date_range import get_month_range_by_ym
+from app.core.config import settings
 from app.models.project import Project
 from app.models.rd_project import RdProject
 from app.models.timesheet import Timesheet
+from app.models.timesheet_rollup import TimesheetDailyRollup, TimesheetMonthlyRollup
 from app.services.hourly_rate_service import HourlyRateService
+from app.services.timesheet_rollup_service import TimesheetRollupService
 
 
 class TimesheetAggregationService:
@@ -22,6 +30,10 @@ class TimesheetAggregationService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _use_rollups(self) -> bool:
+        """是否从工时汇总表读取"""
+        return settings.TIMESHEET_ROLLUP_ENABLED and TimesheetRollupService.is_available(self.db)
+
     def aggregate_monthly_timesheet(
         self,
         year: int,
@@ -45,27 +57,46 @@ class TimesheetAggregationService:
         """
         from app.services.timesheet_aggregation_helpers import (
             build_daily_breakdown,
+            build_daily_breakdown_from_rollups,
             build_project_breakdown,
+            build_project_breakdown_from_rollups,
             build_task_breakdown,
+            build_task_breakdown_from_rollups,
             calculate_hours_summary,
             calculate_month_range,
             get_or_create_summary,
             query_timesheets,
+            summarize_monthly_rollups,
         )
 
         # 计算月份范围
         start_date, end_date = calculate_month_range(year, month)
+        filters = (user_id, department_id, project_id)
 
-        # 查询工时记录
-        timesheets = query_timesheets(
-            self.db, start_date, end_date, user_id, department_id, project_id
-        )
+        if self._use_rollups():
+            # 由数据库从汇总表聚合
+            hours_summary, entries_count = summarize_monthly_rollups(
+                self.db, year, month, *filters
+            )
+            project_breakdown = build_project_breakdown_from_rollups(
+                self.db, year, month, *filters
+            )
+            daily_breakdown = build_daily_breakdown_from_rollups(
+                self.db, start_date, end_date, *filters
+            )
+            task_breakdown = build_task_breakdown_from_rollups(
+                self.db, start_date, end_date, *filters
+            )
+        else:
+            # 查询工时记录
+            timesheets = query_timesheets(self.db, start_date, end_date, *filters)
 
-        # 计算汇总
-        hours_summary = calculate_hours_summary(timesheets)
-        project_breakdown = build_project_breakdown(timesheets)
-        daily_breakdown = build_daily_breakdown(timesheets)
-        task_breakdown = build_task_breakdown(timesheets)
+            # 计算汇总
+            hours_summary = calculate_hours_summary(timesheets)
+            project_breakdown = build_project_breakdown(timesheets)
+            daily_breakdown = build_daily_breakdown(timesheets)
+            task_breakdown = build_task_breakdown(timesheets)
+            entries_count = len(timesheets)
 
         # 确定汇总类型
         summary_type = (
@@ -91,7 +122,7 @@ class TimesheetAggregationService:
             project_breakdown,
             daily_breakdown,
             task_breakdown,
-            len(timesheets),
+            entries_count,
         )
 
         self.db.commit()
@@ -105,7 +136,7 @@ class TimesheetAggregationService:
             "overtime_hours": hours_summary["overtime_hours"],
             "weekend_hours": hours_summary["weekend_hours"],
             "holiday_hours": hours_summary["holiday_hours"],
-            "entries_count": len(timesheets),
+            "entries_count": entries_count,
             "projects_count": len(project_breakdown),
             "project_breakdown": project_breakdown,
             "daily_breakdown": daily_breakdown,
@@ -113,7 +144,11 @@ class TimesheetAggregationService:
         }
 
     def generate_hr_report(
-        self, year: int, month: int, department_id: Optional[int] = None
+        self,
+        year: int,
+        month: int,
+        department_id: Optional[int] = None,
+        include_records: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         生成HR报表（用于计算加班工资）
@@ -122,10 +157,14 @@ class TimesheetAggregationService:
             year: 年份
             month: 月份
             department_id: 部门ID（可选）
+            include_records: 是否附带逐条工时明细（daily_records）
 
         Returns:
             HR报表数据列表
         """
+        if self._use_rollups():
+            return self._hr_report_from_rollups(year, month, department_id, include_records)
+
         start_date, end_date = get_month_range_by_ym(year, month)
 
         query = self.db.query(Timesheet).filter(
@@ -183,7 +222,11 @@ class TimesheetAggregationService:
         return report_data
 
     def generate_finance_report(
-        self, year: int, month: int, project_id: Optional[int] = None
+        self,
+        year: int,
+        month: int,
+        project_id: Optional[int] = None,
+        include_records: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         生成财务报表（用于核算项目成本）
@@ -192,10 +235,27 @@ class TimesheetAggregationService:
             year: 年份
             month: 月份
             project_id: 项目ID（可选）
+            include_records: 是否附带逐条人员工时明细（personnel_records）
 
         Returns:
             财务报表数据列表
         """
+        if self._use_rollups():
+            groups = self._labor_costs_from_rollups(
+                year, month, "project_id", project_id, include_records
+            )
+            return [
+                {
+                    "project_id": key,
+                    "project_code": group["project_code"],
+                    "project_name": group["project_name"],
+                    "total_hours": group["total_hours"],
+                    "total_cost": group["total_cost"],
+                    "personnel_records": group["personnel_records"],
+                }
+                for key, group in groups.items()
+            ]
+
         start_date, end_date = get_month_range_by_ym(year, month)
 
         query = self.db.query(Timesheet).filter(
@@ -251,7 +311,11 @@ class TimesheetAggregationService:
         return report_data
 
     def generate_rd_report(
-        self, year: int, month: int, rd_project_id: Optional[int] = None
+        self,
+        year: int,
+        month: int,
+        rd_project_id: Optional[int] = None,
+        include_records: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         生成研发报表（用于核算研发费用）
@@ -260,10 +324,34 @@ class TimesheetAggregationService:
             year: 年份
             month: 月份
             rd_project_id: 研发项目ID（可选）
+            include_records: 是否附带逐条人员工时明细（personnel_records）
 
         Returns:
             研发报表数据列表
         """
+        if self._use_rollups():
+            groups = self._labor_costs_from_rollups(
+                year, month, "rd_project_id", rd_project_id, include_records
+            )
+            rd_projects = {
+                p.id: p
+                for p in self.db.query(RdProject).filter(RdProject.id.in_(list(groups))).all()
+            }
+            report_data = []
+            for key, group in groups.items():
+                rd_project = rd_projects.get(key)
+                report_data.append(
+                    {
+                        "rd_project_id": key,
+                        "rd_project_code": rd_project.project_code if rd_project else None,
+                        "rd_project_name": rd_project.project_name if rd_project else None,
+                        "total_hours": group["total_hours"],
+                        "total_cost": group["total_cost"],
+                        "personnel_records": group["personnel_records"],
+                    }
+                )
+            return report_data
+
         start_date, end_date = get_month_range_by_ym(year, month)
 
         query = self.db.query(Timesheet).filter(
@@ -333,6 +421,9 @@ class TimesheetAggregationService:
         Returns:
             项目报表数据
         """
+        if self._use_rollups():
+            return self._project_report_from_rollups(project_id, start_date, end_date)
+
         query = self.db.query(Timesheet).filter(
             Timesheet.status == "APPROVED", Timesheet.project_id == project_id
         )
@@ -410,3 +501,244 @@ class TimesheetAggregationService:
             "daily_stats": list(daily_stats.values()),
             "task_stats": list(task_stats.values()),
         }
+
+    # ==================== 基于汇总表的报表 ====================
+
+    def _hr_report_from_rollups(
+        self, year: int, month: int, department_id: Optional[int], include_records: bool
+    ) -> List[Dict[str, Any]]:
+        """HR报表：人员工时取自月汇总表"""
+        mr = TimesheetMonthlyRollup
+        query = self.db.query(
+            mr.user_id,
+            func.max(mr.user_name),
+            func.max(mr.department_id),
+            func.max(mr.department_name),
+            func.sum(mr.total_hours),
+            func.sum(mr.normal_hours),
+            func.sum(mr.overtime_hours),
+            func.sum(mr.weekend_hours),
+            func.sum(mr.holiday_hours),
+        ).filter(mr.year == year, mr.month == month)
+        if department_id:
+            query = query.filter(mr.department_id == department_id)
+        rows = query.group_by(mr.user_id).order_by(mr.user_id).all()
+
+        user_data = {}
+        for row in rows:
+            user_data[row[0]] = {
+                "user_id": row[0],
+                "user_name": row[1],
+                "department_id": row[2],
+                "department_name": row[3],
+                "total_hours": float(row[4] or 0),
+                "normal_hours": float(row[5] or 0),
+                "overtime_hours": float(row[6] or 0),
+                "weekend_hours": float(row[7] or 0),
+                "holiday_hours": float(row[8] or 0),
+                "daily_records": [],
+            }
+
+        if include_records and user_data:
+            start_date, end_date = get_month_range_by_ym(year, month)
+            query = self.db.query(
+                Timesheet.user_id,
+                Timesheet.work_date,
+                Timesheet.hours,
+                Timesheet.overtime_type,
+                Timesheet.work_content,
+            ).filter(
+                Timesheet.status == "APPROVED",
+                Timesheet.work_date >= start_date,
+                Timesheet.work_date <= end_date,
+            )
+            if department_id:
+                query = query.filter(Timesheet.department_id == department_id)
+            for user_id, work_date, hours, overtime_type, work_content in query.order_by(
+                Timesheet.user_id, Timesheet.work_date
+            ):
+                if user_id in user_data:
+                    user_data[user_id]["daily_records"].append(
+                        {
+                            "date": str(work_date),
+                            "hours": float(hours or 0),
+                            "overtime_type": overtime_type,
+                            "work_content": work_content,
+                        }
+                    )
+
+        return list(user_data.values())
+
+    def _labor_costs_from_rollups(
+        self,
+        year: int,
+        month: int,
+        dimension: str,
+        dimension_id: Optional[int],
+        include_records: bool,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        按项目或研发项目汇总工时与人工成本
+
+        时薪只取决于人员和日期，成本按日汇总行（项目-人员-日）计算，
+        与逐条计算结果一致；同一人员同一天的时薪只查询一次。
+        """
+        start_date, end_date = get_month_range_by_ym(year, month)
+        rates: Dict[Tuple[int, date], Decimal] = {}
+
+        def hourly_rate(user_id: int, work_date: date) -> Decimal:
+            key = (user_id, work_date)
+            if key not in rates:
+                rates[key] = HourlyRateService.get_user_hourly_rate(self.db, user_id, work_date)
+            return rates[key]
+
+        dr = TimesheetDailyRollup
+        dr_key = getattr(dr, dimension)
+        query = self.db.query(
+            dr_key,
+            dr.user_id,
+            dr.work_date,
+            func.max(dr.project_code),
+            func.max(dr.project_name),
+            func.sum(dr.total_hours),
+        ).filter(dr.work_date >= start_date, dr.work_date <= end_date, dr_key.isnot(None))
+        if dimension_id:
+            query = query.filter(dr_key == dimension_id)
+        rows = query.group_by(dr_key, dr.user_id, dr.work_date).order_by(
+            dr_key, dr.user_id, dr.work_date
+        )
+
+        groups: Dict[int, Dict[str, Any]] = {}
+        for key, user_id, work_date, project_code, project_name, hours in rows:
+            group = groups.setdefault(
+                key,
+                {
+                    "project_code": project_code,
+                    "project_name": project_name,
+                    "total_hours": 0,
+                    "total_cost": 0,
+                    "personnel_records": [],
+                },
+            )
+            hours = float(hours or 0)
+            group["total_hours"] += hours
+            group["total_cost"] += hours * float(hourly_rate(user_id, work_date))
+
+        if include_records and groups:
+            ts_key = getattr(Timesheet, dimension)
+            query = self.db.query(
+                ts_key,
+                Timesheet.user_id,
+                Timesheet.user_name,
+                Timesheet.work_date,
+                Timesheet.hours,
+                Timesheet.work_content,
+            ).filter(
+                Timesheet.status == "APPROVED",
+                Timesheet.work_date >= start_date,
+                Timesheet.work_date <= end_date,
+                ts_key.isnot(None),
+            )
+            if dimension_id:
+                query = query.filter(ts_key == dimension_id)
+            for key, user_id, user_name, work_date, hours, work_content in query.order_by(
+                ts_key, Timesheet.user_id, Timesheet.work_date
+            ):
+                if key not in groups:
+                    continue
+                rate = hourly_rate(user_id, work_date)
+                groups[key]["personnel_records"].append(
+                    {
+                        "user_id": user_id,
+                        "user_name": user_name,
+                        "date": str(work_date),
+                        "hours": float(hours or 0),
+                        "hourly_rate": rate,
+                        "cost": float(hours or 0) * float(rate),
+                        "work_content": work_content,
+                    }
+                )
+
+        return groups
+
+    def _project_report_from_rollups(
+        self, project_id: int, start_date: Optional[date], end_date: Optional[date]
+    ) -> Dict[str, Any]:
+        """项目报表：人员、日期、任务分布取自日汇总表"""
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            return {"error": "项目不存在"}
+
+        dr = TimesheetDailyRollup
+
+        def scoped(query):
+            query = query.filter(dr.project_id == project_id)
+            if start_date:
+                query = query.filter(dr.work_date >= start_date)
+            if end_date:
+                query = query.filter(dr.work_date <= end_date)
+            return query
+
+        rows = (
+            scoped(
+                self.db.query(
+                    dr.work_date, dr.user_id, func.max(dr.user_name), func.sum(dr.total_hours)
+                )
+            )
+            .group_by(dr.work_date, dr.user_id)
+            .order_by(dr.work_date, dr.user_id)
+            .all()
+        )
+
+        personnel_stats = {}
+        daily_stats = {}
+        total_hours = 0.0
+        for work_date, user_id, user_name, hours in rows:
+            hours = float(hours or 0)
+            total_hours += hours
+
+            person = personnel_stats.setdefault(
+                user_id,
+                {
+                    "user_id": user_id,
+                    "user_name": user_name,
+                    "total_hours": 0,
+                    "contribution_rate": 0,
+                },
+            )
+            person["total_hours"] += hours
+
+            day_key = str(work_date)
+            day = daily_stats.setdefault(
+                day_key, {"date": day_key, "hours": 0, "personnel_count": 0, "personnel": []}
+            )
+            day["hours"] += hours
+            day["personnel"].append({"user_id": user_id, "user_name": user_name, "hours": hours})
+            day["personnel_count"] = len(day["personnel"])
+
+        if total_hours > 0:
+            for person in personnel_stats.values():
+                person["contribution_rate"] = (person["total_hours"] / total_hours) * 100
+
+        task_rows = (
+            scoped(self.db.query(dr.task_id, func.max(dr.task_name), func.sum(dr.total_hours)))
+            .filter(dr.task_id.isnot(None))
+            .group_by(dr.task_id)
+            .order_by(dr.task_id)
+            .all()
+        )
+        task_stats = [
+            {"task_id": task_id, "task_name": name, "total_hours": float(hours or 0)}
+            for task_id, name, hours in task_rows
+        ]
+
+        return {
+            "project_id": project_id,
+            "project_code": project.project_code,
+            "project_name": project.project_name,
+            "total_hours": total_hours,
+            "personnel_count": len(personnel_stats),
+            "personnel_stats": list(personnel_stats.values()),
+            "daily_stats": list(daily_stats.values()),
+            "task_stats": task_stats,
+        }
@@ -12,6 +12,7 @@ from fastapi import HTTPException
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
+from app.common.pagination import PaginationParams, apply_keyset_pagination
 from app.models.organization import Department
 from app.models.project import Project
 from app.models.timesheet import Timesheet
@@ -23,6 +24,13 @@ from app.schemas.timesheet import (
 )
 from app.utils.db_helpers import delete_obj, get_or_404, save_obj
 
+# 工时列表游标分页排序键（工作日期、创建时间倒序，id 保证唯一）
+TIMESHEET_LIST_ORDER_BY = (
+    desc(Timesheet.work_date),
+    desc(Timesheet.created_at),
+    desc(Timesheet.id),
+)
+
 
 class TimesheetRecordsService:
     """工时记录业务逻辑服务"""
@@ -40,12 +48,15 @@ class TimesheetRecordsService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         status: Optional[str] = None,
-    ) -> Tuple[List[TimesheetResponse], int]:
+        pagination: Optional[PaginationParams] = None,
+    ) -> Tuple[List[TimesheetResponse], Optional[int]]:
         """
         获取工时记录列表（分页+筛选）
 
+        传入 pagination 时按其计数模式统计总数，游标分页时忽略 offset。
+
         Returns:
-            Tuple[List[TimesheetResponse], int]: (工时记录列表, 总数)
+            Tuple[List[TimesheetResponse], Optional[int]]: (工时记录列表, 总数)
         """
         from app.core.permissions.timesheet import apply_timesheet_access_filter
 
@@ -64,11 +75,16 @@ class TimesheetRecordsService:
         if status:
             query = query.filter(Timesheet.status == status)
 
-        total = query.count()
+        total = pagination.count(query) if pagination is not None else query.count()
 
         # 排序和分页
-        query = query.order_by(desc(Timesheet.work_date), desc(Timesheet.created_at))
-        timesheets = query.offset(offset).limit(limit).all()
+        if pagination is not None and pagination.is_keyset:
+            timesheets = apply_keyset_pagination(
+                query, TIMESHEET_LIST_ORDER_BY, pagination.cursor, limit
+            ).all()
+        else:
+            query = query.order_by(desc(Timesheet.work_date), desc(Timesheet.created_at))
+            timesheets = query.offset(offset).limit(limit).all()
 
         # 构建响应
         items = [self._build_timesheet_response(ts) for ts in timesheets]
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+工时汇总表维护服务
+
+- 日汇总：已审批工时按 用户/日期/部门/项目/研发项目/任务 在数据库内 GROUP BY 聚合
+- 月汇总：由日汇总按 用户/月/部门/项目/研发项目 再聚合
+- 增量：ORM flush 事件收集受影响的"用户-日"（含修改前的旧值），
+  在同一事务内删除并重新聚合这些用户-日及其所在月份，随业务事务提交或回滚
+- 重建：按日期范围整体重建，用于迁移回填和定时对账
+
+汇总表不存在（未执行迁移）时 is_available 返回 False，报表降级为逐条汇总。
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import and_, case, delete, event, extract, func, insert, or_, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.timesheet import Timesheet
+from app.models.timesheet_rollup import TimesheetDailyRollup, TimesheetMonthlyRollup
+from app.utils.db_helpers import tables_exist
+
+logger = logging.getLogger(__name__)
+
+# 单条语句处理的用户数上限（避免 OR 条件过长）
+REFRESH_USER_CHUNK = 200
+
+# 影响汇总结果的工时字段
+_ROLLUP_FIELDS = (
+    "status",
+    "hours",
+    "overtime_type",
+    "user_id",
+    "work_date",
+    "department_id",
+    "project_id",
+    "rd_project_id",
+    "task_id",
+    "user_name",
+    "department_name",
+    "project_code",
+    "project_name",
+    "task_name",
+)
+
+_HOUR_COLUMNS = (
+    "total_hours",
+    "normal_hours",
+    "overtime_hours",
+    "weekend_hours",
+    "holiday_hours",
+    "entries_count",
+)
+
+_DAILY_COLUMNS = (
+    "work_date",
+    "year",
+    "month",
+    "user_id",
+    "department_id",
+    "project_id",
+    "rd_project_id",
+    "task_id",
+    "user_name",
+    "department_name",
+    "project_code",
+    "project_name",
+    "task_name",
+) + _HOUR_COLUMNS + ("updated_at",)
+
+_MONTHLY_COLUMNS = (
+    "year",
+    "month",
+    "user_id",
+    "department_id",
+    "project_id",
+    "rd_project_id",
+    "user_name",
+    "department_name",
+    "project_code",
+    "project_name",
+) + _HOUR_COLUMNS + ("updated_at",)
+
+UserDay = Tuple[int, date]
+
+
+def _daily_select(condition):
+    """已审批工时按日汇总维度聚合"""
+    ts = Timesheet.__table__
+    hours = func.coalesce(ts.c.hours, 0)
+
+    def typed_hours(overtime_type: str):
+        return func.sum(case((ts.c.overtime_type == overtime_type, hours), else_=0))
+
+    dimensions = (
+        ts.c.work_date,
+        ts.c.user_id,
+        ts.c.department_id,
+        ts.c.project_id,
+        ts.c.rd_project_id,
+        ts.c.task_id,
+    )
+    return (
+        select(
+            ts.c.work_date,
+            extract("year", ts.c.work_date),
+            extract("month", ts.c.work_date),
+            ts.c.user_id,
+            ts.c.department_id,
+            ts.c.project_id,
+            ts.c.rd_project_id,
+            ts.c.task_id,
+            func.max(ts.c.user_name),
+            func.max(ts.c.department_name),
+            func.max(ts.c.project_code),
+            func.max(ts.c.project_name),
+            func.max(ts.c.task_name),
+            func.sum(hours),
+            typed_hours("NORMAL"),
+            typed_hours("OVERTIME"),
+            typed_hours("WEEKEND"),
+            typed_hours("HOLIDAY"),
+            func.count(ts.c.id),
+            func.now(),
+        )
+        .where(ts.c.status == "APPROVED", condition)
+        .group_by(*dimensions)
+    )
+
+
+def _monthly_select(condition):
+    """日汇总按月汇总维度再聚合"""
+    dr = TimesheetDailyRollup.__table__
+    dimensions = (
+        dr.c.year,
+        dr.c.month,
+        dr.c.user_id,
+        dr.c.department_id,
+        dr.c.project_id,
+        dr.c.rd_project_id,
+    )
+    return (
+        select(
+            *dimensions,
+            func.max(dr.c.user_name),
+            func.max(dr.c.department_name),
+            func.max(dr.c.project_code),
+            func.max(dr.c.project_name),
+            *(func.sum(dr.c[name]) for name in _HOUR_COLUMNS),
+            func.now(),
+        )
+        .where(condition)
+        .group_by(*dimensions)
+    )
+
+
+def _user_days_condition(columns, user_days: Dict[int, Set[date]]):
+    return or_(
+        *(
+            and_(columns.user_id == user_id, columns.work_date.in_(sorted(days)))
+            for user_id, days in user_days.items()
+        )
+    )
+
+
+def _user_months_condition(columns, user_months: Dict[int, Set[Tuple[int, int]]]):
+    return or_(
+        *(
+            and_(columns.user_id == user_id, columns.year == year, columns.month == month)
+            for user_id, months in user_months.items()
+            for year, month in sorted(months)
+        )
+    )
+
+
+class TimesheetRollupService:
+    """工时汇总表维护服务"""
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """汇总表是否存在"""
+        return tables_exist(
+            db, TimesheetDailyRollup.__tablename__, TimesheetMonthlyRollup.__tablename__
+        )
+
+    @staticmethod
+    def refresh_user_days(executor, user_days: Iterable[UserDay]) -> int:
+        """
+        重新聚合指定用户-日的日汇总及其所在月份的月汇总
+
+        Args:
+            executor: 数据库会话或连接（语句在其当前事务内执行）
+            user_days: (用户ID, 工作日期) 集合
+
+        Returns:
+            int: 处理的用户-日数量
+        """
+        grouped: Dict[int, Set[date]] = defaultdict(set)
+        for user_id, work_date in user_days:
+            grouped[user_id].add(work_date)
+        if not grouped:
+            return 0
+
+        ts = Timesheet.__table__.c
+        dr = TimesheetDailyRollup.__table__
+        mr = TimesheetMonthlyRollup.__table__
+        user_ids = list(grouped)
+        for i in range(0, len(user_ids), REFRESH_USER_CHUNK):
+            chunk = {u: grouped[u] for u in user_ids[i : i + REFRESH_USER_CHUNK]}
+            executor.execute(delete(dr).where(_user_days_condition(dr.c, chunk)))
+            executor.execute(
+                insert(dr).from_select(
+                    _DAILY_COLUMNS, _daily_select(_user_days_condition(ts, chunk))
+                )
+            )
+
+            months = {u: {(d.year, d.month) for d in days} for u, days in chunk.items()}
+            executor.execute(delete(mr).where(_user_months_condition(mr.c, months)))
+            executor.execute(
+                insert(mr).from_select(
+                    _MONTHLY_COLUMNS, _monthly_select(_user_months_condition(dr.c, months))
+                )
+            )
+
+        return sum(len(days) for days in grouped.values())
+
+    @staticmethod
+    def rebuild(db: Session, start_date: date, end_date: date) -> None:
+        """
+        按日期范围整体重建汇总（按整月对齐月汇总）
+
+        不提交事务，由调用方提交。
+        """
+        ts = Timesheet.__table__.c
+        dr = TimesheetDailyRollup.__table__
+        mr = TimesheetMonthlyRollup.__table__
+
+        db.execute(delete(dr).where(dr.c.work_date.between(start_date, end_date)))
+        db.execute(
+            insert(dr).from_select(
+                _DAILY_COLUMNS, _daily_select(ts.work_date.between(start_date, end_date))
+            )
+        )
+
+        months: List[Tuple[int, int]] = []
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            months.append((year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        period = or_(*(and_(mr.c.year == y, mr.c.month == m) for y, m in months))
+        daily_period = or_(*(and_(dr.c.year == y, dr.c.month == m) for y, m in months))
+        db.execute(delete(mr).where(period))
+        db.execute(insert(mr).from_select(_MONTHLY_COLUMNS, _monthly_select(daily_period)))
+        logger.info(f"工时汇总已重建: {start_date} ~ {end_date}")
+
+
+def _collect_user_days(session: Session) -> Set[UserDay]:
+    """收集本次 flush 影响汇总的用户-日（含修改前的旧用户/旧日期）"""
+    user_days: Set[UserDay] = set()
+
+    def add(user_id, work_date) -> None:
+        if user_id and work_date:
+            user_days.add((user_id, work_date))
+
+    changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Timesheet)
+        and obj.id
+        and any(sa_inspect(obj).attrs[f].history.has_changes() for f in _ROLLUP_FIELDS)
+    ]
+    removed = [obj for obj in session.deleted if isinstance(obj, Timesheet) and obj.id]
+
+    # 修改前的值以库中现有行为准（对象提交后过期，属性历史不含旧值）
+    ids = [obj.id for obj in changed + removed]
+    if ids:
+        ts = Timesheet.__table__.c
+        with session.no_autoflush:
+            rows = session.execute(
+                select(ts.user_id, ts.work_date, ts.status).where(ts.id.in_(ids))
+            ).all()
+        for user_id, work_date, status in rows:
+            if status == "APPROVED":
+                add(user_id, work_date)
+
+    for obj in list(session.new) + changed:
+        if isinstance(obj, Timesheet) and obj.status == "APPROVED":
+            add(obj.user_id, obj.work_date)
+
+    return user_days
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_timesheet_changes(session, flush_context, instances) -> None:
+    """flush 前收集变更（此时属性历史仍包含旧值）"""
+    if not settings.TIMESHEET_ROLLUP_ENABLED:
+        return
+    if not any(
+        isinstance(obj, Timesheet)
+        for objs in (session.new, session.dirty, session.deleted)
+        for obj in objs
+    ):
+        return
+    try:
+        user_days = _collect_user_days(session)
+    except Exception as e:
+        logger.warning(f"收集工时汇总变更失败: {e}")
+        return
+    if user_days:
+        session.info.setdefault("_timesheet_rollup_days", set()).update(user_days)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_timesheet_rollups(session, flush_context) -> None:
+    """flush 后在同一事务内重新聚合受影响的用户-日"""
+    user_days = session.info.pop("_timesheet_rollup_days", None)
+    if not user_days or not TimesheetRollupService.is_available(session):
+        return
+    TimesheetRollupService.refresh_user_days(session.connection(), user_days)
@@ -8,6 +8,7 @@
 
 from .base import ImportBase
 from .bom_importer import BomImporter
+from .import_job import ImportJobService
 from .material_importer import MaterialImporter
 from .task_importer import TaskImporter
 from .timesheet_importer import TimesheetImporter
@@ -20,6 +21,7 @@ class UnifiedImportService(ImportBase):
 
     # 委托给统一导入器
     import_data = UnifiedImporter.import_data
+    import_stream = UnifiedImporter.import_stream
 
     # 委托给具体导入器
     import_user_data = UserImporter.import_user_data
@@ -47,6 +49,8 @@ __all__ = [
     "ImportBase",
     # 统一导入器
     "UnifiedImporter",
+    # 导入任务状态
+    "ImportJobService",
     # 具体导入器
     "UserImporter",
     "TimesheetImporter",
@@ -1,17 +1,24 @@
 # -*- coding: utf-8 -*-
 """
 统一数据导入服务 - 基础工具方法
-包含：文件验证、解析、辅助函数
+包含：文件验证、解析、辅助函数、批量导入工具
+
+批量导入流程：按列向量化解析和校验 → 每个引用实体按编码一次性（分块 IN）预取到字典
+→ 逐行只做字典查找并构建对象 → 分块 add_all + flush。
 """
 
 from datetime import date, datetime
-from typing import List
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
 from fastapi import HTTPException
 
 from app.services.import_export_engine import ImportExportEngine
 
+# IN 查询和批量写入的分块大小
+IMPORT_CHUNK_SIZE = 500
+
 
 class ImportBase:
     """导入服务基类 - 包含通用工具方法"""
@@ -75,3 +82,121 @@ class ImportBase:
         except (ValueError, TypeError):
             pass
         return None
+
+    # ==================== 批量导入工具 ====================
+
+    @staticmethod
+    def text_column(df: pd.DataFrame, name: str, default: str = "") -> pd.Series:
+        """
+        按列取去空白的文本（优先"name*"列，其值为空时取"name"列），空值返回 default
+        """
+        result = pd.Series("", index=df.index, dtype=object)
+        for col in (f"{name}*", name):
+            if col in df.columns:
+                text = df[col].astype("string").str.strip().fillna("").astype(object)
+                result = result.where(result != "", text)
+        return result.where(result != "", default)
+
+    @staticmethod
+    def raw_column(df: pd.DataFrame, *names: str) -> pd.Series:
+        """按列取原始值（依次取第一个非空的列值），缺失列视为空"""
+        result = pd.Series(None, index=df.index, dtype=object)
+        for name in names:
+            for col in (f"{name}*", name):
+                if col in df.columns:
+                    result = result.where(result.notna(), df[col].astype(object))
+        return result
+
+    @classmethod
+    def number_column(cls, df: pd.DataFrame, *names: str) -> pd.DataFrame:
+        """
+        解析数值列
+
+        Returns:
+            DataFrame，value 为数值（无法解析为 NaN，用于校验），missing 表示原值为空，
+            raw 为原始单元格值（入库的 Decimal 由 to_decimal 从原值转换，不经过浮点）
+        """
+        raw = cls.raw_column(df, *names)
+        missing = raw.isna() | (raw.astype("string").str.strip() == "")
+        return pd.DataFrame(
+            {"value": pd.to_numeric(raw, errors="coerce"), "missing": missing, "raw": raw}
+        )
+
+    @staticmethod
+    def to_decimal(raw: Any) -> Decimal:
+        """原始单元格值转 Decimal（按单元格文本转换，保留全部有效数字）"""
+        return Decimal(str(raw).strip())
+
+    @classmethod
+    def date_column(cls, df: pd.DataFrame, *names: str) -> pd.DataFrame:
+        """
+        解析日期列
+
+        Returns:
+            DataFrame，value 为 date（无法解析为 None），missing 表示原值为空
+        """
+        raw = cls.raw_column(df, *names)
+        missing = raw.isna() | (raw.astype("string").str.strip() == "")
+        parsed = pd.to_datetime(raw.where(~missing), errors="coerce", format="mixed")
+        value = pd.Series(
+            [d.date() if pd.notna(d) else None for d in parsed], index=df.index, dtype=object
+        )
+        return pd.DataFrame({"value": value, "missing": missing})
+
+    @staticmethod
+    def prefetch(db, column, values: Iterable[Any], *criteria) -> Dict[Any, Any]:
+        """
+        按列值分块批量查询实体
+
+        Args:
+            column: 模型列属性（如 Project.project_code）
+            values: 需要查找的值（自动去重、忽略空值）
+            criteria: 附加过滤条件
+
+        Returns:
+            {列值: 实体}，同值多条时取 ID 最小的一条
+        """
+        model = column.class_
+        keys = sorted({v for v in values if v is not None and v != ""}, key=str)
+        found: Dict[Any, Any] = {}
+        for i in range(0, len(keys), IMPORT_CHUNK_SIZE):
+            rows = (
+                db.query(model)
+                .filter(column.in_(keys[i : i + IMPORT_CHUNK_SIZE]), *criteria)
+                .order_by(model.id)
+                .all()
+            )
+            for obj in rows:
+                found.setdefault(getattr(obj, column.key), obj)
+        return found
+
+    @staticmethod
+    def add_in_chunks(db, objects: List[Any]) -> None:
+        """分块写入新对象（同时刷出已修改的对象）"""
+        for i in range(0, len(objects), IMPORT_CHUNK_SIZE):
+            db.add_all(objects[i : i + IMPORT_CHUNK_SIZE])
+            db.flush()
+        if not objects:
+            db.flush()
+
+    @staticmethod
+    def row_errors(errors: Dict[int, str]) -> List[Dict[str, Any]]:
+        """按行号排序的错误报告（行号为 Excel 行号，含表头）"""
+        return [{"row_index": index + 2, "error": error} for index, error in sorted(errors.items())]
+
+    @staticmethod
+    def add_error(errors: Dict[int, str], mask: pd.Series, message: str) -> None:
+        """为 mask 为真且尚无错误的行登记错误（按校验顺序，先出错先记录）"""
+        for index in mask[mask].index:
+            errors.setdefault(index, message)
+
+    @staticmethod
+    def pick(key: Any, *mappings: Dict[Any, Any]) -> Optional[Any]:
+        """依次在多个字典中按键查找，返回第一个命中值"""
+        if not key:
+            return None
+        for mapping in mappings:
+            value = mapping.get(key)
+            if value is not None:
+                return value
+        return None
@@ -3,17 +3,17 @@
 统一数据导入服务 - BOM数据导入
 """
 
-from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 from fastapi import HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.material import BomHeader, BomItem, Material
 from app.models.project import Project
 
-from .base import ImportBase
+from .base import IMPORT_CHUNK_SIZE, ImportBase
 
 
 class BomImporter(ImportBase):
@@ -25,6 +25,8 @@ class BomImporter(ImportBase):
     ) -> Tuple[int, int, List[Dict[str, Any]]]:
         """
         导入BOM数据
+
+        项目、物料、BOM头、已有明细和行号各一次批量查询，明细分块写入。
         """
         required_columns = ["BOM编码*", "项目编码*", "物料编码*", "用量*"]
         missing_columns = []
@@ -37,113 +39,111 @@ class BomImporter(ImportBase):
                 status_code=400, detail=f"Excel文件缺少必需的列：{', '.join(missing_columns)}"
             )
 
+        errors: Dict[int, str] = {}
+
+        # 向量化解析和校验
+        bom_codes = cls.text_column(df, "BOM编码")
+        project_codes = cls.text_column(df, "项目编码")
+        material_codes = cls.text_column(df, "物料编码")
+        units = cls.text_column(df, "单位", "件")
+        remarks = cls.text_column(df, "备注")
+        quantity = cls.number_column(df, "用量")
+
+        cls.add_error(errors, quantity["missing"], "用量为必填项")
+        cls.add_error(errors, quantity["value"].isna(), "用量格式错误")
+        cls.add_error(errors, quantity["value"] <= 0, "用量必须大于0")
+
+        # 预取引用实体
+        valid = ~df.index.isin(list(errors))
+        projects = cls.prefetch(db, Project.project_code, project_codes[valid])
+        materials = cls.prefetch(db, Material.material_code, material_codes[valid])
+        for index in df.index[valid]:
+            if project_codes[index] not in projects:
+                errors[index] = f"未找到项目: {project_codes[index]}"
+            elif material_codes[index] not in materials:
+                errors[index] = f"未找到物料: {material_codes[index]}"
+
+        valid = ~df.index.isin(list(errors))
+        headers = cls.prefetch(db, BomHeader.bom_no, bom_codes[valid])
+
+        # 新建 BOM 头（一次刷出取得 ID）
+        new_headers = []
+        for index in df.index[valid]:
+            bom_code = bom_codes[index]
+            if bom_code not in headers:
+                project = projects[project_codes[index]]
+                headers[bom_code] = BomHeader(
+                    bom_no=bom_code,
+                    bom_name=f"{project.project_name}-BOM",
+                    project_id=project.id,
+                    version="1.0",
+                    status="DRAFT",
+                    created_by=current_user_id,
+                )
+                new_headers.append(headers[bom_code])
+        if new_headers:
+            db.add_all(new_headers)
+            db.flush()
+
+        # 已有明细和各 BOM 当前最大行号
+        bom_ids = [h.id for h in headers.values() if h.id is not None]
+        existing_items: Dict[Tuple[int, int], BomItem] = {}
+        next_item_no: Dict[int, int] = {}
+        for i in range(0, len(bom_ids), IMPORT_CHUNK_SIZE):
+            chunk = bom_ids[i : i + IMPORT_CHUNK_SIZE]
+            for item in db.query(BomItem).filter(BomItem.bom_id.in_(chunk)).all():
+                existing_items.setdefault((item.bom_id, item.material_id), item)
+            for bom_id, max_no in (
+                db.query(BomItem.bom_id, func.max(BomItem.item_no))
+                .filter(BomItem.bom_id.in_(chunk))
+                .group_by(BomItem.bom_id)
+                .all()
+            ):
+                next_item_no[bom_id] = (max_no or 0) + 1
+
         imported_count = 0
         updated_count = 0
-        failed_rows = []
-        bom_cache = {}  # 缓存BOM头
+        new_items = []
 
-        for index, row in df.iterrows():
+        for index in df.index[valid]:
             try:
-                # 解析必需字段
-                bom_code = str(row.get("BOM编码*", "") or row.get("BOM编码", "")).strip()
-                project_code = str(row.get("项目编码*", "") or row.get("项目编码", "")).strip()
-                material_code = str(row.get("物料编码*", "") or row.get("物料编码", "")).strip()
-
-                # 解析用量
-                quantity_val = row.get("用量*") or row.get("用量")
-                if pd.isna(quantity_val):
-                    failed_rows.append({"row_index": index + 2, "error": "用量为必填项"})
-                    continue
-
-                try:
-                    quantity = Decimal(str(quantity_val))
-                    if quantity <= 0:
-                        failed_rows.append({"row_index": index + 2, "error": "用量必须大于0"})
-                        continue
-                except (ValueError, TypeError, InvalidOperation):
-                    failed_rows.append({"row_index": index + 2, "error": "用量格式错误"})
-                    continue
-
-                # 查找项目
-                project = db.query(Project).filter(Project.project_code == project_code).first()
-                if not project:
-                    failed_rows.append(
-                        {"row_index": index + 2, "error": f"未找到项目: {project_code}"}
-                    )
-                    continue
-
-                # 查找物料
-                material = (
-                    db.query(Material).filter(Material.material_code == material_code).first()
-                )
-                if not material:
-                    failed_rows.append(
-                        {"row_index": index + 2, "error": f"未找到物料: {material_code}"}
-                    )
-                    continue
-
-                # 解析可选字段
-                str(row.get("机台编号", "") or "").strip()
-                unit = str(row.get("单位", "件") or "件").strip()
-                remark = str(row.get("备注", "") or "").strip()
-
-                # 获取或创建BOM头
-                bom_key = (bom_code, project.id)
-                if bom_key not in bom_cache:
-                    bom_header = db.query(BomHeader).filter(BomHeader.bom_no == bom_code).first()
-                    if not bom_header:
-                        bom_header = BomHeader(
-                            bom_no=bom_code,
-                            bom_name=f"{project.project_name}-BOM",
-                            project_id=project.id,
-                            version="1.0",
-                            status="DRAFT",
-                            created_by=current_user_id,
-                        )
-                        db.add(bom_header)
-                        db.flush()
-                    bom_cache[bom_key] = bom_header
-                else:
-                    bom_header = bom_cache[bom_key]
-
-                # 检查BOM明细是否已存在
-                existing = (
-                    db.query(BomItem)
-                    .filter(BomItem.bom_id == bom_header.id, BomItem.material_id == material.id)
-                    .first()
-                )
+                material = materials[material_codes[index]]
+                bom_header = headers[bom_codes[index]]
+                qty = cls.to_decimal(quantity.at[index, "raw"])
+                unit = units[index]
+                remark = remarks[index]
 
+                existing = existing_items.get((bom_header.id, material.id))
                 if existing:
                     if update_existing:
-                        existing.quantity = quantity
+                        existing.quantity = qty
                         existing.unit = unit
                         existing.remark = remark
                         updated_count += 1
                     else:
-                        failed_rows.append({"row_index": index + 2, "error": "该BOM明细已存在"})
-                        continue
-                else:
-                    # 获取下一行号
-                    max_item_no = db.query(BomItem).filter(BomItem.bom_id == bom_header.id).count()
-                    item_no = max_item_no + 1
-
-                    # 创建BOM明细
-                    bom_item = BomItem(
-                        bom_id=bom_header.id,
-                        item_no=item_no,
-                        material_id=material.id,
-                        material_code=material_code,
-                        material_name=material.material_name,
-                        specification=material.specification,
-                        unit=unit,
-                        quantity=quantity,
-                        source_type=material.source_type or "PURCHASE",
-                        remark=remark,
-                    )
-                    db.add(bom_item)
-                    imported_count += 1
+                        errors[index] = "该BOM明细已存在"
+                    continue
+
+                item_no = next_item_no.get(bom_header.id, 1)
+                next_item_no[bom_header.id] = item_no + 1
+                bom_item = BomItem(
+                    bom_id=bom_header.id,
+                    item_no=item_no,
+                    material_id=material.id,
+                    material_code=material.material_code,
+                    material_name=material.material_name,
+                    specification=material.specification,
+                    unit=unit,
+                    quantity=qty,
+                    source_type=material.source_type or "PURCHASE",
+                    remark=remark,
+                )
+                existing_items[(bom_header.id, material.id)] = bom_item
+                new_items.append(bom_item)
+                imported_count += 1
 
             except Exception as e:
-                failed_rows.append({"row_index": index + 2, "error": str(e)})
+                errors[index] = str(e)
 
-        return imported_count, updated_count, failed_rows
+        cls.add_in_chunks(db, new_items)
+        return imported_count, updated_count, cls.row_errors(errors)
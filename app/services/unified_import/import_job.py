@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+统一数据导入服务 - 导入任务状态
+
+导入任务记录在 data_import_task 表中，流式导入每提交一块就更新一次计数，
+前端轮询任务状态即可获得进度。
+"""
+
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.report_center import DataImportTask
+
+logger = logging.getLogger(__name__)
+
+# 任务中保存的错误明细上限
+MAX_STORED_ERRORS = 100
+
+
+class ImportJobService:
+    """导入任务状态维护"""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    PARTIAL = "PARTIAL"
+    FAILED = "FAILED"
+
+    @staticmethod
+    def create(
+        db: Session,
+        template_type: str,
+        file_name: str,
+        imported_by: int,
+        file_size: Optional[int] = None,
+        file_path: Optional[str] = None,
+        status: str = PENDING,
+    ) -> DataImportTask:
+        """创建导入任务（仅 flush，由调用方提交）"""
+        job = DataImportTask(
+            task_no=f"IMP-{datetime.now().strftime('%y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}",
+            import_type=template_type.upper(),
+            file_name=file_name,
+            file_path=file_path,
+            file_size=file_size,
+            status=status,
+            total_rows=0,
+            success_rows=0,
+            failed_rows=0,
+            imported_by=imported_by,
+            validation_errors=[],
+        )
+        db.add(job)
+        db.flush()
+        return job
+
+    @classmethod
+    def start(cls, job: DataImportTask) -> None:
+        job.status = cls.RUNNING
+        job.started_at = datetime.now()
+
+    @staticmethod
+    def record_chunk(
+        job: DataImportTask, rows: int, succeeded: int, failed_rows: List[Dict[str, Any]]
+    ) -> None:
+        """累计一块的处理结果"""
+        job.total_rows = (job.total_rows or 0) + rows
+        job.success_rows = (job.success_rows or 0) + succeeded
+        job.failed_rows = (job.failed_rows or 0) + len(failed_rows)
+        errors = list(job.validation_errors or [])
+        if len(errors) < MAX_STORED_ERRORS:
+            # 重新赋值列表，确保 JSON 列被标记为已修改
+            job.validation_errors = errors + failed_rows[: MAX_STORED_ERRORS - len(errors)]
+
+    @classmethod
+    def finish(cls, job: DataImportTask, error: Optional[str] = None) -> None:
+        if error is not None:
+            job.status = cls.FAILED
+            job.error_message = error
+        else:
+            job.status = cls.PARTIAL if job.failed_rows else cls.COMPLETED
+        job.completed_at = datetime.now()
+
+    @staticmethod
+    def to_status(job: DataImportTask) -> Dict[str, Any]:
+        """任务状态（供轮询接口返回）"""
+        return {
+            "task_id": job.id,
+            "task_no": job.task_no,
+            "import_type": job.import_type,
+            "file_name": job.file_name,
+            "status": job.status,
+            "processed_rows": job.total_rows or 0,
+            "success_rows": job.success_rows or 0,
+            "failed_rows": job.failed_rows or 0,
+            "errors": (job.validation_errors or [])[:20],
+            "error_message": job.error_message,
+            "started_at": job.started_at,
+            "completed_at": job.completed_at,
+        }
+
+    @staticmethod
+    def run(job_id: int, update_existing: bool = False) -> None:
+        """
+        在独立会话中执行流式导入任务（后台任务入口），完成后删除暂存文件
+
+        失败原因已写入任务状态，这里只记录日志，不再向外抛出。
+        """
+        from app.models.base import get_db_session
+
+        from .unified_importer import UnifiedImporter
+
+        with get_db_session() as db:
+            job = db.get(DataImportTask, job_id)
+            if job is None:
+                return
+            try:
+                UnifiedImporter.import_stream(
+                    db,
+                    job.file_path,
+                    job.file_name,
+                    job.import_type,
+                    job.imported_by,
+                    update_existing=update_existing,
+                    job=job,
+                )
+            except Exception:
+                logger.exception("导入任务 %s 执行失败", job.task_no)
+            finally:
+                if job.file_path and os.path.exists(job.file_path):
+                    os.remove(job.file_path)
@@ -4,7 +4,7 @@
 """
 
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
@@ -26,6 +26,8 @@ class MaterialImporter(ImportBase):
     ) -> Tuple[int, int, List[Dict[str, Any]]]:
         """
         导入物料数据
+
+        供应商、已有物料各一次批量查询，物料分块写入。
         """
         required_columns = ["物料编码*", "物料名称*"]
         missing_columns = []
@@ -38,77 +40,67 @@ class MaterialImporter(ImportBase):
                 status_code=400, detail=f"Excel文件缺少必需的列：{', '.join(missing_columns)}"
             )
 
+        errors: Dict[int, str] = {}
+
+        # 向量化解析和校验
+        material_codes = cls.text_column(df, "物料编码")
+        material_names = cls.text_column(df, "物料名称")
+        specifications = cls.text_column(df, "规格型号")
+        units = cls.text_column(df, "单位", "件")
+        material_types = cls.text_column(df, "物料类型")
+        supplier_names = cls.text_column(df, "默认供应商")
+        prices = cls.number_column(df, "参考价格")
+        safety_stocks = cls.number_column(df, "安全库存")
+
+        cls.add_error(
+            errors, (material_codes == "") | (material_names == ""), "物料编码和物料名称为必填项"
+        )
+        valid = ~df.index.isin(list(errors))
+
+        # 预取供应商和已有物料
+        suppliers = cls.prefetch(
+            db, Vendor.supplier_name, supplier_names[valid], Vendor.vendor_type == "MATERIAL"
+        )
+        existing_materials = cls.prefetch(db, Material.material_code, material_codes[valid])
+
+        # 自动创建缺失的供应商（一次刷出取得 ID）
+        new_suppliers = []
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        for index in df.index[valid]:
+            supplier_name = supplier_names[index]
+            if supplier_name and supplier_name not in suppliers:
+                suppliers[supplier_name] = Vendor(
+                    supplier_code=f"SUP{timestamp}{index:03d}",
+                    supplier_name=supplier_name,
+                    vendor_type="MATERIAL",
+                    status="ACTIVE",
+                )
+                new_suppliers.append(suppliers[supplier_name])
+        if new_suppliers:
+            db.add_all(new_suppliers)
+            db.flush()
+
         imported_count = 0
         updated_count = 0
-        failed_rows = []
+        new_materials = []
 
-        for index, row in df.iterrows():
+        for index in df.index[valid]:
             try:
-                # 解析必需字段
-                material_code = str(row.get("物料编码*", "") or row.get("物料编码", "")).strip()
-                material_name = str(row.get("物料名称*", "") or row.get("物料名称", "")).strip()
-
-                if not material_code or not material_name:
-                    failed_rows.append(
-                        {"row_index": index + 2, "error": "物料编码和物料名称为必填项"}
-                    )
-                    continue
-
-                # 解析可选字段
-                specification = str(row.get("规格型号", "") or "").strip()
-                unit = str(row.get("单位", "件") or "件").strip()
-                material_type = str(row.get("物料类型", "") or "").strip()
-                supplier_name = str(row.get("默认供应商", "") or "").strip()
-
-                # 解析价格和库存
-                standard_price = Decimal("0")
-                if pd.notna(row.get("参考价格")):
-                    try:
-                        standard_price = Decimal(str(row.get("参考价格")))
-                    except (ValueError, TypeError, InvalidOperation):
-                        pass
-
-                safety_stock = Decimal("0")
-                if pd.notna(row.get("安全库存")):
-                    try:
-                        safety_stock = Decimal(str(row.get("安全库存")))
-                    except (ValueError, TypeError, InvalidOperation):
-                        pass
-
-                # 查找或创建供应商
-                default_supplier_id = None
-                if supplier_name:
-                    supplier = (
-                        db.query(Vendor)
-                        .filter(
-                            Vendor.supplier_name == supplier_name, Vendor.vendor_type == "MATERIAL"
-                        )
-                        .first()
-                    )
-                    if not supplier:
-                        # 自动创建供应商
-                        supplier_code = f"SUP{datetime.now().strftime('%Y%m%d%H%M%S')}{index:03d}"
-                        supplier = Vendor(
-                            supplier_code=supplier_code,
-                            supplier_name=supplier_name,
-                            vendor_type="MATERIAL",
-                            status="ACTIVE",
-                        )
-                        db.add(supplier)
-                        db.flush()
-                    default_supplier_id = supplier.id
-
-                # 检查是否已存在
-                existing = (
-                    db.query(Material).filter(Material.material_code == material_code).first()
-                )
-
+                material_code = material_codes[index]
+                specification = specifications[index]
+                material_type = material_types[index]
+                standard_price = cls._decimal_or_zero(prices, index)
+                safety_stock = cls._decimal_or_zero(safety_stocks, index)
+                supplier = suppliers.get(supplier_names[index])
+                default_supplier_id = supplier.id if supplier is not None else None
+
+                existing = existing_materials.get(material_code)
                 if existing:
                     if update_existing:
-                        existing.material_name = material_name
+                        existing.material_name = material_names[index]
                         if specification:
                             existing.specification = specification
-                        existing.unit = unit
+                        existing.unit = units[index]
                         if material_type:
                             existing.material_type = material_type
                         existing.standard_price = standard_price
@@ -117,28 +109,35 @@ class MaterialImporter(ImportBase):
                             existing.default_supplier_id = default_supplier_id
                         updated_count += 1
                     else:
-                        failed_rows.append(
-                            {"row_index": index + 2, "error": f"物料编码 {material_code} 已存在"}
-                        )
-                        continue
-                else:
-                    # 创建物料
-                    material = Material(
-                        material_code=material_code,
-                        material_name=material_name,
-                        specification=specification,
-                        unit=unit,
-                        material_type=material_type,
-                        standard_price=standard_price,
-                        safety_stock=safety_stock,
-                        default_supplier_id=default_supplier_id,
-                        is_active=True,
-                        created_by=current_user_id,
-                    )
-                    db.add(material)
-                    imported_count += 1
+                        errors[index] = f"物料编码 {material_code} 已存在"
+                    continue
+
+                # 创建物料
+                material = Material(
+                    material_code=material_code,
+                    material_name=material_names[index],
+                    specification=specification,
+                    unit=units[index],
+                    material_type=material_type,
+                    standard_price=standard_price,
+                    safety_stock=safety_stock,
+                    default_supplier_id=default_supplier_id,
+                    is_active=True,
+                    created_by=current_user_id,
+                )
+                existing_materials[material_code] = material
+                new_materials.append(material)
+                imported_count += 1
 
             except Exception as e:
-                failed_rows.append({"row_index": index + 2, "error": str(e)})
+                errors[index] = str(e)
+
+        cls.add_in_chunks(db, new_materials)
+        return imported_count, updated_count, cls.row_errors(errors)
 
-        return imported_count, updated_count, failed_rows
+    @classmethod
+    def _decimal_or_zero(cls, column: pd.DataFrame, index) -> Decimal:
+        """数值列单元格转 Decimal，空值或无法解析时为 0"""
+        if pd.isna(column.at[index, "value"]):
+            return Decimal("0")
+        return cls.to_decimal(column.at[index, "raw"])
@@ -3,7 +3,7 @@
 统一数据导入服务 - 任务数据导入
 """
 
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
@@ -14,7 +14,7 @@ from app.models.progress import Task
 from app.models.project import Project
 from app.models.user import User
 
-from .base import ImportBase
+from .base import IMPORT_CHUNK_SIZE, ImportBase
 
 
 class TaskImporter(ImportBase):
@@ -26,6 +26,8 @@ class TaskImporter(ImportBase):
     ) -> Tuple[int, int, List[Dict[str, Any]]]:
         """
         导入任务数据
+
+        项目、负责人、已有任务各一次批量查询，任务分块写入。
         """
         required_columns = ["任务名称*", "项目编码*"]
         missing_columns = []
@@ -38,75 +40,65 @@ class TaskImporter(ImportBase):
                 status_code=400, detail=f"Excel文件缺少必需的列：{', '.join(missing_columns)}"
             )
 
+        errors: Dict[int, str] = {}
+
+        # 向量化解析和校验
+        task_names = cls.text_column(df, "任务名称")
+        project_codes = cls.text_column(df, "项目编码")
+        stages = cls.text_column(df, "阶段", "S1").str.upper()
+        owner_names = cls.text_column(df, "负责人")
+        plan_starts = cls.date_column(df, "计划开始日期")["value"]
+        plan_ends = cls.date_column(df, "计划结束日期")["value"]
+        weights = cls.number_column(df, "权重(%)")
+
+        cls.add_error(
+            errors, (task_names == "") | (project_codes == ""), "任务名称和项目编码为必填项"
+        )
+        valid = ~df.index.isin(list(errors))
+
+        # 预取项目和负责人
+        projects = cls.prefetch(db, Project.project_code, project_codes[valid])
+        for index in df.index[valid]:
+            if project_codes[index] not in projects:
+                errors[index] = f"未找到项目: {project_codes[index]}"
+        valid = ~df.index.isin(list(errors))
+
+        names = owner_names[valid]
+        owners_by_real_name = cls.prefetch(db, User.real_name, names)
+        owners_by_username = cls.prefetch(db, User.username, names)
+
+        # 预取这些项目下的已有任务
+        project_ids = sorted({projects[code].id for code in project_codes[valid]})
+        existing_tasks: Dict[Tuple[int, str], Task] = {}
+        for i in range(0, len(project_ids), IMPORT_CHUNK_SIZE):
+            for task in (
+                db.query(Task)
+                .filter(Task.project_id.in_(project_ids[i : i + IMPORT_CHUNK_SIZE]))
+                .order_by(Task.id)
+                .all()
+            ):
+                existing_tasks.setdefault((task.project_id, task.task_name), task)
+
         imported_count = 0
         updated_count = 0
-        failed_rows = []
+        new_tasks = []
 
-        for index, row in df.iterrows():
+        for index in df.index[valid]:
             try:
-                # 解析必需字段
-                task_name = str(row.get("任务名称*", "") or row.get("任务名称", "")).strip()
-                project_code = str(row.get("项目编码*", "") or row.get("项目编码", "")).strip()
-
-                if not task_name or not project_code:
-                    failed_rows.append(
-                        {"row_index": index + 2, "error": "任务名称和项目编码为必填项"}
-                    )
-                    continue
-
-                # 查找项目
-                project = db.query(Project).filter(Project.project_code == project_code).first()
-                if not project:
-                    failed_rows.append(
-                        {"row_index": index + 2, "error": f"未找到项目: {project_code}"}
-                    )
-                    continue
-
-                # 解析可选字段
-                stage = str(row.get("阶段", "S1") or "S1").strip().upper()
-                owner_name = str(row.get("负责人*", "") or row.get("负责人", "") or "").strip()
-
-                owner_id = None
-                if owner_name:
-                    owner = (
-                        db.query(User)
-                        .filter((User.real_name == owner_name) | (User.username == owner_name))
-                        .first()
-                    )
-                    if owner:
-                        owner_id = owner.id
-
-                # 解析日期
-                plan_start = None
-                plan_end = None
-                if pd.notna(row.get("计划开始日期")):
-                    try:
-                        plan_start = pd.to_datetime(row.get("计划开始日期")).date()
-                    except (ValueError, TypeError, pd.errors.ParserError):
-                        pass
-                if pd.notna(row.get("计划结束日期")):
-                    try:
-                        plan_end = pd.to_datetime(row.get("计划结束日期")).date()
-                    except (ValueError, TypeError, pd.errors.ParserError):
-                        pass
-
-                # 解析权重
-                weight = Decimal("1.00")
-                if pd.notna(row.get("权重(%)")):
-                    try:
-                        weight = Decimal(str(row.get("权重(%)"))) / Decimal("100")
-                    except (ValueError, TypeError, InvalidOperation):
-                        pass
-
-                str(row.get("任务描述", "") or "").strip()
-
-                # 检查是否已存在
-                existing = (
-                    db.query(Task)
-                    .filter(Task.project_id == project.id, Task.task_name == task_name)
-                    .first()
+                project = projects[project_codes[index]]
+                task_name = task_names[index]
+                stage = stages[index]
+                owner = cls.pick(owner_names[index], owners_by_real_name, owners_by_username)
+                owner_id = owner.id if owner is not None else None
+                plan_start = plan_starts[index]
+                plan_end = plan_ends[index]
+                weight = (
+                    cls.to_decimal(weights.at[index, "raw"]) / Decimal("100")
+                    if pd.notna(weights.at[index, "value"])
+                    else Decimal("1.00")
                 )
 
+                existing = existing_tasks.get((project.id, task_name))
                 if existing:
                     if update_existing:
                         existing.stage = stage
@@ -119,25 +111,27 @@ class TaskImporter(ImportBase):
                         existing.weight = weight
                         updated_count += 1
                     else:
-                        failed_rows.append({"row_index": index + 2, "error": "该任务已存在"})
-                        continue
-                else:
-                    # 创建任务
-                    task = Task(
-                        project_id=project.id,
-                        task_name=task_name,
-                        stage=stage,
-                        status="TODO",
-                        owner_id=owner_id,
-                        plan_start=plan_start,
-                        plan_end=plan_end,
-                        weight=weight,
-                        progress_percent=0,
-                    )
-                    db.add(task)
-                    imported_count += 1
+                        errors[index] = "该任务已存在"
+                    continue
+
+                # 创建任务
+                task = Task(
+                    project_id=project.id,
+                    task_name=task_name,
+                    stage=stage,
+                    status="TODO",
+                    owner_id=owner_id,
+                    plan_start=plan_start,
+                    plan_end=plan_end,
+                    weight=weight,
+                    progress_percent=0,
+                )
+                existing_tasks[(project.id, task_name)] = task
+                new_tasks.append(task)
+                imported_count += 1
 
             except Exception as e:
-                failed_rows.append({"row_index": index + 2, "error": str(e)})
+                errors[index] = str(e)
 
-        return imported_count, updated_count, failed_rows
+        cls.add_in_chunks(db, new_tasks)
+        return imported_count, updated_count, cls.row_errors(errors)
@@ -15,7 +15,7 @@ from app.models.project import Project
 from app.models.timesheet import Timesheet
 from app.models.user import User
 
-from .base import ImportBase
+from .base import IMPORT_CHUNK_SIZE, ImportBase
 
 
 class TimesheetImporter(ImportBase):
@@ -77,6 +77,8 @@ class TimesheetImporter(ImportBase):
     ) -> Tuple[int, int, List[Dict[str, Any]]]:
         """
         导入工时数据
+
+        用户、项目、已有工时各一次批量查询，工时分块写入。
         """
         required_columns = ["工作日期*", "人员姓名*", "工时(小时)*"]
         missing = cls.check_required_columns(df, required_columns)
@@ -85,110 +87,124 @@ class TimesheetImporter(ImportBase):
                 status_code=400, detail=f"Excel文件缺少必需的列：{', '.join(missing)}"
             )
 
-        imported_count = 0
-        updated_count = 0
-        failed_rows = []
-
-        for index, row in df.iterrows():
-            row_idx = index + 2
-            try:
-                # 解析必需字段
-                work_date_val = row.get("工作日期*") or row.get("工作日期")
-                user_name = str(row.get("人员姓名*", "") or row.get("人员姓名", "")).strip()
-                hours_val = row.get("工时(小时)*") or row.get("工时(小时)") or row.get("工时")
-
-                if not work_date_val or not user_name or pd.isna(hours_val):
-                    failed_rows.append(
-                        {"row_index": row_idx, "error": "工作日期、人员姓名、工时为必填项"}
-                    )
-                    continue
-
-                # 解析日期和工时
-                try:
-                    work_date = cls.parse_work_date(work_date_val)
-                except (ValueError, TypeError, pd.errors.ParserError):
-                    failed_rows.append({"row_index": row_idx, "error": "工作日期格式错误"})
-                    continue
-
-                try:
-                    hours = cls.parse_hours(hours_val)
-                    if hours is None:
-                        failed_rows.append({"row_index": row_idx, "error": "工时必须在0-24之间"})
-                        continue
-                except (ValueError, TypeError):
-                    failed_rows.append({"row_index": row_idx, "error": "工时格式错误"})
-                    continue
-
-                # 查找用户
-                user = (
-                    db.query(User)
-                    .filter((User.real_name == user_name) | (User.username == user_name))
-                    .first()
-                )
-                if not user:
-                    failed_rows.append({"row_index": row_idx, "error": f"未找到用户: {user_name}"})
-                    continue
-
-                # 解析可选字段
-                project_code = str(row.get("项目编码", "") or "").strip()
-                project_id, project_name = None, None
-                if project_code:
-                    project = db.query(Project).filter(Project.project_code == project_code).first()
-                    if project:
-                        project_id, project_name = project.id, project.project_name
-
-                task_name = str(row.get("任务名称", "") or "").strip()
-                work_content = str(row.get("工作内容", "") or "").strip()
-                work_result = str(row.get("工作成果", "") or "").strip()
-                overtime_type = str(row.get("加班类型", "NORMAL") or "NORMAL").strip().upper()
-                progress_before = cls.parse_progress(row, "更新前进度(%)")
-                progress_after = cls.parse_progress(row, "更新后进度(%)")
-
-                # 检查是否已存在相同记录
-                existing = (
+        errors: Dict[int, str] = {}
+
+        # 向量化解析和校验
+        work_dates = cls.date_column(df, "工作日期")
+        user_names = cls.text_column(df, "人员姓名")
+        hours = cls.number_column(df, "工时(小时)", "工时")
+        project_codes = cls.text_column(df, "项目编码")
+        task_names = cls.text_column(df, "任务名称")
+        work_contents = cls.text_column(df, "工作内容")
+        work_results = cls.text_column(df, "工作成果")
+        overtime_types = cls.text_column(df, "加班类型", "NORMAL").str.upper()
+        progress_before = cls.number_column(df, "更新前进度(%)")["value"]
+        progress_after = cls.number_column(df, "更新后进度(%)")["value"]
+
+        cls.add_error(
+            errors,
+            work_dates["missing"] | (user_names == "") | hours["missing"],
+            "工作日期、人员姓名、工时为必填项",
+        )
+        cls.add_error(errors, work_dates["value"].isna(), "工作日期格式错误")
+        cls.add_error(errors, hours["value"].isna(), "工时格式错误")
+        cls.add_error(
+            errors, (hours["value"] <= 0) | (hours["value"] > 24), "工时必须在0-24之间"
+        )
+        valid = ~df.index.isin(list(errors))
+
+        # 预取用户和项目
+        names = user_names[valid]
+        users_by_real_name = cls.prefetch(db, User.real_name, names)
+        users_by_username = cls.prefetch(db, User.username, names)
+        users = {}
+        for index in df.index[valid]:
+            user = cls.pick(user_names[index], users_by_real_name, users_by_username)
+            if user is None:
+                errors[index] = f"未找到用户: {user_names[index]}"
+            else:
+                users[index] = user
+        valid = ~df.index.isin(list(errors))
+        projects = cls.prefetch(db, Project.project_code, project_codes[valid])
+
+        # 预取这些用户在导入日期范围内的已有工时
+        existing_timesheets: Dict[Tuple, Timesheet] = {}
+        user_ids = sorted({user.id for user in users.values()})
+        dates = work_dates["value"][valid]
+        if user_ids and len(dates):
+            for i in range(0, len(user_ids), IMPORT_CHUNK_SIZE):
+                for timesheet in (
                     db.query(Timesheet)
                     .filter(
-                        Timesheet.user_id == user.id,
-                        Timesheet.work_date == work_date,
-                        Timesheet.project_id == project_id,
-                        Timesheet.task_name == task_name,
+                        Timesheet.user_id.in_(user_ids[i : i + IMPORT_CHUNK_SIZE]),
+                        Timesheet.work_date >= min(dates),
+                        Timesheet.work_date <= max(dates),
                     )
-                    .first()
-                )
+                    .order_by(Timesheet.id)
+                    .all()
+                ):
+                    key = (
+                        timesheet.user_id,
+                        timesheet.work_date,
+                        timesheet.project_id,
+                        timesheet.task_name,
+                    )
+                    existing_timesheets.setdefault(key, timesheet)
 
+        imported_count = 0
+        updated_count = 0
+        new_timesheets = []
+
+        for index in df.index[valid]:
+            try:
+                user = users[index]
+                work_date = work_dates.at[index, "value"]
+                hours_value = float(hours.at[index, "value"])
+                project_code = project_codes[index]
+                project = projects.get(project_code)
+                project_id = project.id if project is not None else None
+                project_name = project.project_name if project is not None else None
+                task_name = task_names[index]
+                before = int(progress_before[index]) if pd.notna(progress_before[index]) else None
+                after = int(progress_after[index]) if pd.notna(progress_after[index]) else None
+
+                key = (user.id, work_date, project_id, task_name)
+                existing = existing_timesheets.get(key)
                 if existing:
                     if update_existing:
-                        existing.hours = hours
-                        existing.overtime_type = overtime_type
-                        existing.work_content = work_content
-                        existing.work_result = work_result
-                        existing.progress_before = progress_before
-                        existing.progress_after = progress_after
+                        existing.hours = hours_value
+                        existing.overtime_type = overtime_types[index]
+                        existing.work_content = work_contents[index]
+                        existing.work_result = work_results[index]
+                        existing.progress_before = before
+                        existing.progress_after = after
                         updated_count += 1
                     else:
-                        failed_rows.append({"row_index": row_idx, "error": "该工时记录已存在"})
-                        continue
-                else:
-                    timesheet = cls.create_timesheet_record(
-                        user,
-                        index,
-                        work_date,
-                        hours,
-                        project_id,
-                        project_code,
-                        project_name,
-                        task_name,
-                        overtime_type,
-                        work_content,
-                        work_result,
-                        progress_before,
-                        progress_after,
-                        current_user_id,
-                    )
-                    db.add(timesheet)
-                    imported_count += 1
+                        errors[index] = "该工时记录已存在"
+                    continue
+
+                timesheet = cls.create_timesheet_record(
+                    user,
+                    index,
+                    work_date,
+                    hours_value,
+                    project_id,
+                    project_code,
+                    project_name,
+                    task_name,
+                    overtime_types[index],
+                    work_contents[index],
+                    work_results[index],
+                    before,
+                    after,
+                    current_user_id,
+                )
+                existing_timesheets[key] = timesheet
+                new_timesheets.append(timesheet)
+                imported_count += 1
 
             except Exception as e:
-                failed_rows.append({"row_index": row_idx, "error": str(e)})
+                errors[index] = str(e)
 
-        return imported_count, updated_count, failed_rows
+        cls.add_in_chunks(db, new_timesheets)
+        return imported_count, updated_count, cls.row_errors(errors)
@@ -3,13 +3,19 @@
 统一数据导入服务 - 统一导入入口
 """
 
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
+import pandas as pd
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.models.report_center import DataImportTask
+from app.services.import_export_engine import ImportExportEngine
+
 from .base import ImportBase
 from .bom_importer import BomImporter
+from .import_job import ImportJobService
 from .material_importer import MaterialImporter
 from .task_importer import TaskImporter
 from .timesheet_importer import TimesheetImporter
@@ -19,6 +25,17 @@ from .user_importer import UserImporter
 class UnifiedImporter(ImportBase):
     """统一导入器 - 根据类型分发到具体导入器"""
 
+    SUPPORTED_TYPES = (
+        "PROJECT",
+        "USER",
+        "TIMESHEET",
+        "TASK",
+        "MATERIAL",
+        "BOM",
+        "EMPLOYEE",
+        "HR_PROFILE",
+    )
+
     @classmethod
     def import_data(
         cls,
@@ -41,11 +58,109 @@ class UnifiedImporter(ImportBase):
         # 解析文件
         df = cls.parse_file(file_content)
 
-        # 根据类型导入
+        imported_count, updated_count, failed_rows = cls.import_frame(
+            db, df, template_type, current_user_id, update_existing
+        )
+
+        return {
+            "imported_count": imported_count,
+            "updated_count": updated_count,
+            "failed_count": len(failed_rows),
+            "failed_rows": failed_rows[:20],  # 最多返回20个错误
+        }
+
+    @classmethod
+    def import_stream(
+        cls,
+        db: Session,
+        source: Union[bytes, str, BinaryIO],
+        filename: str,
+        template_type: str,
+        current_user_id: int,
+        update_existing: bool = False,
+        job: Optional[DataImportTask] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        流式导入：逐块读取、校验并提交，内存占用与文件大小无关
+
+        每块导入后立即 commit（同时更新导入任务进度），因此中途失败时已提交的块会保留，
+        任务状态记为 FAILED 并给出已处理行数。后续块依赖已提交数据做重复检查，
+        跨块的重复行会按"已存在"处理。
+
+        Returns:
+            Dict[str, Any]: 导入结果（比 import_data 多 total_rows）
+        """
+        if not filename.lower().endswith((".xlsx", ".xls", ".csv")):
+            raise HTTPException(status_code=400, detail="只支持Excel或CSV文件(.xlsx, .xls, .csv)")
+        template_type = template_type.upper()
+        if template_type not in cls.SUPPORTED_TYPES:
+            raise HTTPException(status_code=400, detail=f"不支持的模板类型: {template_type}")
+
+        chunk_size = chunk_size or settings.IMPORT_STREAM_CHUNK_SIZE
+        total_rows = imported_count = updated_count = failed_count = 0
+        failed_rows: List[Dict[str, Any]] = []
+
+        if job is not None:
+            ImportJobService.start(job)
+            db.commit()
+
+        try:
+            chunks = ImportExportEngine.iter_excel_chunks(source, chunk_size, filename=filename)
+            for chunk in chunks:
+                # 必需列由各导入器检查，首块缺列即整体失败
+                imported, updated, chunk_failed = cls.import_frame(
+                    db, chunk, template_type, current_user_id, update_existing
+                )
+                total_rows += len(chunk)
+                imported_count += imported
+                updated_count += updated
+                failed_count += len(chunk_failed)
+                failed_rows.extend(chunk_failed[: max(0, 20 - len(failed_rows))])
+                if job is not None:
+                    ImportJobService.record_chunk(job, len(chunk), imported + updated, chunk_failed)
+                db.commit()
+
+            if total_rows == 0:
+                raise HTTPException(status_code=400, detail="文件中没有数据")
+        except Exception as e:
+            db.rollback()
+            if job is not None:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                ImportJobService.finish(job, error=str(detail))
+                db.commit()
+            raise
+
+        if job is not None:
+            ImportJobService.finish(job)
+            db.commit()
+
+        return {
+            "total_rows": total_rows,
+            "imported_count": imported_count,
+            "updated_count": updated_count,
+            "failed_count": failed_count,
+            "failed_rows": failed_rows,
+        }
+
+    @classmethod
+    def import_frame(
+        cls,
+        db: Session,
+        df: pd.DataFrame,
+        template_type: str,
+        current_user_id: int,
+        update_existing: bool = False,
+    ) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """
+        按模板类型导入一个 DataFrame（整表或流式导入中的一块）
+
+        Returns:
+            Tuple[int, int, List[Dict]]: (导入数, 更新数, 失败行列表)
+        """
         template_type = template_type.upper()
-        imported_count = 0
-        updated_count = 0
-        failed_rows = []
+        if template_type not in cls.SUPPORTED_TYPES:
+            raise HTTPException(status_code=400, detail=f"不支持的模板类型: {template_type}")
 
         if template_type == "PROJECT":
             # 调用项目导入服务
@@ -88,12 +203,5 @@ class UnifiedImporter(ImportBase):
             imported_count = result.get("imported", 0)
             updated_count = result.get("updated", 0)
             failed_rows = [{"row_index": 0, "error": e} for e in result.get("errors", [])]
-        else:
-            raise HTTPException(status_code=400, detail=f"不支持的模板类型: {template_type}")
 
-        return {
-            "imported_count": imported_count,
-            "updated_count": updated_count,
-            "failed_count": len(failed_rows),
-            "failed_rows": failed_rows[:20],  # 最多返回20个错误
-        }
+        return imported_count, updated_count, failed_rows
@@ -8,20 +8,27 @@
 - app.services.notification_service: 兼容层，re-export 统一服务并提供旧接口的枚举和 AlertNotificationService
 - app.services.notification_dispatcher: 预警通知调度协调器，内部使用统一服务
 - app.services.notification_queue: Redis 通知队列（异步分发）
+- app.services.notification_worker: 通知队列消费者（按渠道限并发、批量发送、退避重试）
 - app.services.notification_utils: 通知工具函数（渠道解析、接收者解析、免打扰判断等）
 - app.services.channel_handlers/: 渠道处理器（System/Email/WeChat/SMS/Webhook）
 
 新代码推荐直接使用：
  from app.services.unified_notification_service import get_notification_service
+
+启用 NOTIFICATION_ASYNC_ENABLED 且 Redis 可用时，send_notification 只做去重（Redis 共享）
+并入队，由 notification_worker 批量投递；否则同步发送。
 """
 
 import logging
+from contextlib import contextmanager
+from dataclasses import asdict
 from datetime import datetime
 from hashlib import md5
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.alert import AlertNotification
 from app.models.notification import NotificationSettings
 from app.services.channel_handlers.base import (
@@ -35,6 +42,12 @@ from app.services.channel_handlers.sms_handler import SMSChannelHandler
 from app.services.channel_handlers.system_handler import SystemChannelHandler
 from app.services.channel_handlers.webhook_handler import WebhookChannelHandler
 from app.services.channel_handlers.wechat_handler import WeChatChannelHandler
+from app.services.notification_queue import (
+    claim_dedup,
+    enqueue_notification,
+    enqueue_notifications,
+    release_dedup,
+)
 
 if TYPE_CHECKING:
     from app.models.alert import Alert
@@ -56,21 +69,48 @@ class NotificationService:
             NotificationChannel.SMS: SMSChannelHandler(db, NotificationChannel.SMS),
             NotificationChannel.WEBHOOK: WebhookChannelHandler(db, NotificationChannel.WEBHOOK),
         }
+        # 批量发送时预取的用户通知偏好 {用户ID: 偏好}
+        self._settings_cache: Optional[Dict[int, Optional[NotificationSettings]]] = None
 
     def _get_user_settings(self, user_id: int) -> Optional[NotificationSettings]:
         """获取用户通知偏好"""
+        if self._settings_cache is not None and user_id in self._settings_cache:
+            return self._settings_cache[user_id]
         return (
             self.db.query(NotificationSettings)
             .filter(NotificationSettings.user_id == user_id)
             .first()
         )
 
+    @contextmanager
+    def prefetched_settings(self, user_ids: Iterable[int]):
+        """一次查询预取一批用户的通知偏好，上下文内 _get_user_settings 直接取缓存"""
+        user_ids = list({user_id for user_id in user_ids if user_id is not None})
+        cache: Dict[int, Optional[NotificationSettings]] = dict.fromkeys(user_ids)
+        if user_ids:
+            rows = (
+                self.db.query(NotificationSettings)
+                .filter(NotificationSettings.user_id.in_(user_ids))
+                .all()
+            )
+            cache.update((row.user_id, row) for row in rows)
+        self._settings_cache = cache
+        try:
+            yield cache
+        finally:
+            self._settings_cache = None
+
     def _check_dedup(self, request: NotificationRequest) -> bool:
-        """检查是否重复通知"""
+        """检查是否重复通知（Redis 可用时原子占用共享去重键）"""
         if request.force_send:
             return False
 
         dedup_key = self._dedup_key(request)
+        claimed = claim_dedup(dedup_key, self._dedup_window_seconds) if settings.REDIS_URL else None
+        if claimed is not None:
+            if not claimed:
+                self.logger.info(f"跳过重复通知: {dedup_key}")
+            return not claimed
         if dedup_key in self._dedup_cache:
             time_diff = (datetime.now() - self._dedup_cache[dedup_key]).total_seconds()
             if time_diff < self._dedup_window_seconds:
@@ -78,7 +118,8 @@ class NotificationService:
                 return True
         return False
 
-    def _dedup_key(self, request: NotificationRequest) -> str:
+    @staticmethod
+    def _dedup_key(request: NotificationRequest) -> str:
         """生成去重key"""
         content = f"{request.recipient_id}:{request.notification_type}:{request.source_type}:{request.source_id}"
         return md5(content.encode()).hexdigest()
@@ -89,6 +130,15 @@ class NotificationService:
             dedup_key = self._dedup_key(request)
             self._dedup_cache[dedup_key] = datetime.now()
 
+    def _release_dedup(self, request: NotificationRequest) -> None:
+        """发送失败时释放去重占用，允许窗口内重新发送"""
+        if request.force_send:
+            return
+        dedup_key = self._dedup_key(request)
+        if settings.REDIS_URL:
+            release_dedup(dedup_key)
+        self._dedup_cache.pop(dedup_key, None)
+
     def _check_quiet_hours(self, user_settings: Optional[NotificationSettings]) -> bool:
         """检查免打扰时间"""
         if (
@@ -167,6 +217,10 @@ class NotificationService:
 
         return list(set(channels))
 
+    def get_handler(self, channel: str):
+        """获取渠道处理器，未注册时返回 None"""
+        return self._handlers.get(channel)
+
     def _send_to_channels(
         self, request: NotificationRequest, channels: List[str]
     ) -> List[NotificationResult]:
@@ -187,17 +241,15 @@ class NotificationService:
                 )
         return results
 
-    def send_notification(self, request: NotificationRequest) -> Dict[str, Any]:
-        """发送通知（核心方法）"""
-        if self._check_dedup(request):
-            return {
-                "success": False,
-                "deduped": True,
-                "channels_sent": [],
-                "channels_failed": [],
-                "message": "跳过重复通知",
-            }
+    def _plan_delivery(
+        self, request: NotificationRequest
+    ) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        按用户偏好确定投递渠道
 
+        Returns:
+            (免打扰/禁用时直接返回的结果, 投递渠道)
+        """
         user_settings = self._get_user_settings(request.recipient_id)
 
         if self._check_quiet_hours(user_settings):
@@ -209,7 +261,7 @@ class NotificationService:
                 "channels_sent": [NotificationChannel.SYSTEM],
                 "channels_failed": [],
                 "message": "已进入免打扰队列",
-            }
+            }, []
 
         if not self._should_send_by_category(request, user_settings):
             self.logger.info(f"用户{request.recipient_id}禁用{request.category}通知")
@@ -220,14 +272,65 @@ class NotificationService:
                 "channels_sent": [NotificationChannel.SYSTEM],
                 "channels_failed": [],
                 "message": "用户禁用此类通知",
+            }, []
+
+        return None, self._determine_channels(request)
+
+    @staticmethod
+    def _queue_enabled() -> bool:
+        return bool(settings.NOTIFICATION_ASYNC_ENABLED and settings.REDIS_URL)
+
+    @staticmethod
+    def _queued_result() -> Dict[str, Any]:
+        return {
+            "success": True,
+            "deduped": False,
+            "queued": True,
+            "channels_sent": [],
+            "channels_failed": [],
+            "message": "已加入发送队列",
+        }
+
+    def send_notification(
+        self, request: NotificationRequest, queue_meta: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        发送通知（核心方法）：异步队列可用时只入队，否则同步发送
+
+        Args:
+            request: 通知请求
+            queue_meta: 入队时附加到载荷的字段（如预警通知ID，供消费者回写投递状态）
+        """
+        if self._check_dedup(request):
+            return {
+                "success": False,
+                "deduped": True,
+                "channels_sent": [],
+                "channels_failed": [],
+                "message": "跳过重复通知",
             }
 
-        channels = self._determine_channels(request)
+        if self._queue_enabled() and enqueue_notification(
+            {**(queue_meta or {}), "request": asdict(request)}
+        ):
+            return self._queued_result()
+        result = self.deliver(request)
+        if not result["success"]:
+            self._release_dedup(request)
+        return result
+
+    def deliver(self, request: NotificationRequest) -> Dict[str, Any]:
+        """同步投递通知（不做去重检查）"""
+        early_result, channels = self._plan_delivery(request)
+        if early_result is not None:
+            return early_result
+
         results = self._send_to_channels(request, channels)
-        self._update_dedup_cache(request)
 
         sent_channels = [r.channel for r in results if r.success]
         failed_channels = [r.channel for r in results if not r.success]
+        if sent_channels:
+            self._update_dedup_cache(request)
 
         return {
             "success": len(sent_channels) > 0,
@@ -239,7 +342,32 @@ class NotificationService:
         }
 
     def send_bulk_notification(self, requests: List[NotificationRequest]) -> List[Dict[str, Any]]:
-        """批量发送通知"""
+        """批量发送通知：异步队列可用时一次入队，否则逐条发送"""
+        if self._queue_enabled():
+            results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+            pending = []
+            for i, request in enumerate(requests):
+                if self._check_dedup(request):
+                    results[i] = {
+                        "success": False,
+                        "deduped": True,
+                        "channels_sent": [],
+                        "channels_failed": [],
+                        "message": "跳过重复通知",
+                    }
+                else:
+                    pending.append(i)
+            if enqueue_notifications([{"request": asdict(requests[i])} for i in pending]):
+                for i in pending:
+                    results[i] = self._queued_result()
+                return results
+            with self.prefetched_settings(requests[i].recipient_id for i in pending):
+                for i in pending:
+                    results[i] = self.deliver(requests[i])
+                    if not results[i]["success"]:
+                        self._release_dedup(requests[i])
+            return results
+
         return [self.send_notification(req) for req in requests]
 
     def send_task_assigned(
@@ -18,16 +18,28 @@
     # 替代：
     #   db.delete(obj); db.commit()
     delete_obj(db, obj)
+
+    # 汇总表/索引表未迁移时降级：
+    if not tables_exist(db, Model.__tablename__): ...
 """
 
-from typing import Any, Optional, Type, TypeVar
+import weakref
+from typing import Any, Iterable, Iterator, List, Optional, Type, TypeVar
 
 from fastapi import HTTPException
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 T = TypeVar("T")
 
+# IN 查询单批参数个数上限
+IN_CLAUSE_BATCH_SIZE = 500
+
+# 按引擎缓存表是否存在 {引擎: {表名: 是否存在}}
+_table_exists_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
 
 def get_or_404(
     db: Session,
@@ -126,3 +138,48 @@ def safe_commit(db: Session) -> bool:
         # 数据库提交失败，回滚事务
         db.rollback()
         return False
+
+
+def tables_exist(db: Session, *table_names: str) -> bool:
+    """
+    检查表是否都已创建（结果按引擎缓存）。
+
+    会话未绑定真实引擎（如 Mock 会话）或检查失败时返回 False，
+    调用方据此降级为不依赖这些表的逻辑。
+
+    Args:
+        db: 数据库会话
+        table_names: 表名
+    """
+    try:
+        bind = db.get_bind()
+    except Exception:
+        return False
+    if not isinstance(bind, (Engine, Connection)):
+        return False
+    engine = getattr(bind, "engine", bind)
+    known = _table_exists_cache.setdefault(engine, {})
+
+    unknown = [name for name in table_names if name not in known]
+    if unknown:
+        try:
+            # 使用会话当前连接检查，避免从连接池另取连接（StaticPool 归还时会回滚）
+            inspector = sa_inspect(db.connection())
+            found = {name: inspector.has_table(name) for name in unknown}
+        except Exception:
+            return False
+        known.update(found)
+    return all(known[name] for name in table_names)
+
+
+def in_chunks(values: Iterable[Any], size: int = IN_CLAUSE_BATCH_SIZE) -> Iterator[List[Any]]:
+    """
+    去重（忽略 None）并排序后按批切分，用于分批 IN 查询。
+
+    Args:
+        values: 查询值（ID、编码等）
+        size: 每批个数
+    """
+    values = sorted({value for value in values if value is not None})
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
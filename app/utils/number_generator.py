@@ -6,7 +6,7 @@
 """
 
 from datetime import datetime
-from typing import Optional, Type
+from typing import Callable, List, Optional, Type
 
 from sqlalchemy.orm import Session
 
@@ -17,6 +17,7 @@ from app.models.material import Material
 # 模块级导入，支持 unittest.mock.patch 在测试中替换
 from app.models.organization import Employee
 from app.models.project import Customer, Machine
+from app.services.sequence_allocator import SequenceAllocator
 from app.utils.code_config import (
     CODE_PREFIX,
     SEQ_LENGTH,
@@ -24,6 +25,76 @@ from app.utils.code_config import (
 )
 
 
+def _max_existing_seq(
+    db: Session,
+    model_class: Type,
+    no_field: str,
+    pattern_prefix: str,
+    parse_seq: Callable[[str], int],
+) -> int:
+    """业务表中该前缀下现有的最大序号（LIKE 扫描，仅用于初始化计数器或降级）"""
+    max_record_query = db.query(model_class)
+    max_record_query = apply_like_filter(
+        max_record_query,
+        model_class,
+        f"{pattern_prefix}%",
+        no_field,
+        use_ilike=False,
+    )
+    max_record = max_record_query.order_by(getattr(model_class, no_field).desc()).first()
+    if not max_record:
+        return 0
+    try:
+        return parse_seq(getattr(max_record, no_field))
+    except (ValueError, IndexError, AttributeError, TypeError):
+        return 0
+
+
+def _suffix_seq(code: str, separator: str, parts_count: int) -> int:
+    """按分隔符拆分编号，段数符合时取最后一段为序号，否则视为 0"""
+    parts = code.split(separator)
+    return int(parts[-1]) if len(parts) == parts_count else 0
+
+
+def allocate_sequence(
+    db: Session,
+    model_class: Type,
+    no_field: str,
+    pattern_prefix: str,
+    count: int = 1,
+    parse_seq: Optional[Callable[[str], int]] = None,
+) -> int:
+    """
+    分配 count 个连续序号，返回首个序号
+
+    通过 sequence_counters 计数器原子自增分配（见 SequenceAllocator），
+    计数器首次使用时以业务表中现有最大序号为起点；计数器表不存在时降级为扫描业务表。
+
+    Args:
+        db: 数据库会话
+        model_class: 模型类
+        no_field: 编号字段名
+        pattern_prefix: 序号前的固定部分（如 "ECN-250115-"）
+        count: 预分配数量（批量创建时一次分配）
+        parse_seq: 从现有编号解析序号，默认取前缀之后的部分
+
+    Returns:
+        首个序号
+    """
+    if parse_seq is None:
+
+        def parse_seq(no: str) -> int:
+            return int(no[len(pattern_prefix) :])
+
+    def seed() -> int:
+        return _max_existing_seq(db, model_class, no_field, pattern_prefix, parse_seq)
+
+    if SequenceAllocator.is_available(db):
+        name = f"{model_class.__tablename__}.{no_field}"
+        return SequenceAllocator.allocate(db, name, pattern_prefix, count, seed)
+    return seed() + 1
+
+
 def generate_sequential_no(
     db: Session,
     model_class: Type,
@@ -68,6 +139,38 @@ def generate_sequential_no(
         )
         ```
     """
+    return generate_sequential_nos(
+        db,
+        model_class,
+        no_field,
+        prefix,
+        count=1,
+        date_format=date_format,
+        seq_length=seq_length,
+        separator=separator,
+        use_date=use_date,
+    )[0]
+
+
+def generate_sequential_nos(
+    db: Session,
+    model_class: Type,
+    no_field: str,
+    prefix: str,
+    count: int,
+    date_format: str = "%y%m%d",
+    seq_length: int = 3,
+    separator: str = "-",
+    use_date: bool = True,
+) -> List[str]:
+    """
+    批量生成顺序编号（一次预分配 count 个连续序号）
+
+    格式与参数同 generate_sequential_no。
+
+    Returns:
+        编号列表
+    """
     today = datetime.now()
     date_str = today.strftime(date_format)
 
@@ -79,50 +182,16 @@ def generate_sequential_no(
     else:
         pattern_prefix = f"{prefix}{separator}" if separator else prefix
 
-    # 查询当天最大编号
-    pattern = f"{pattern_prefix}%"
-    max_record_query = db.query(model_class)
-    max_record_query = apply_like_filter(
-        max_record_query,
-        model_class,
-        pattern,
-        no_field,
-        use_ilike=False,
-    )
-    max_record = max_record_query.order_by(getattr(model_class, no_field).desc()).first()
-
-    if max_record:
-        try:
-            max_no = getattr(max_record, no_field)
-            # 提取序号部分
-            if separator:
-                # 格式：PREFIX-DATE-SEQ
-                parts = max_no.split(separator)
-                seq_str = parts[-1] if parts else "0"
-            else:
-                # 格式：PREFIXDATESEQ
-                seq_str = max_no[-seq_length:]
-
-            seq = int(seq_str) + 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
-
-    # 格式化序号
-    seq_str = str(seq).zfill(seq_length)
-
-    # 组合编号
-    if use_date:
-        if separator:
-            return f"{prefix}{separator}{date_str}{separator}{seq_str}"
-        else:
-            return f"{prefix}{date_str}{seq_str}"
-    else:
+    def parse_seq(max_no: str) -> int:
         if separator:
-            return f"{prefix}{separator}{seq_str}"
-        else:
-            return f"{prefix}{seq_str}"
+            # 格式：PREFIX-DATE-SEQ
+            parts = max_no.split(separator)
+            return int(parts[-1] if parts else "0")
+        # 格式：PREFIXDATESEQ
+        return int(max_no[-seq_length:])
+
+    first = allocate_sequence(db, model_class, no_field, pattern_prefix, count, parse_seq)
+    return [f"{pattern_prefix}{str(seq).zfill(seq_length)}" for seq in range(first, first + count)]
 
 
 def generate_monthly_no(
@@ -162,28 +231,13 @@ def generate_monthly_no(
     month_str = today.strftime("%y%m")
     pattern_prefix = f"{prefix}{month_str}{separator}"
 
-    # 查询当月最大编号
-    pattern = f"{pattern_prefix}%"
-    max_record_query = db.query(model_class)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    seq = allocate_sequence(
+        db,
         model_class,
-        pattern,
         no_field,
-        use_ilike=False,
+        pattern_prefix,
+        parse_seq=lambda max_no: int(max_no.split(separator)[-1]),
     )
-    max_record = max_record_query.order_by(getattr(model_class, no_field).desc()).first()
-
-    if max_record:
-        try:
-            max_no = getattr(max_record, no_field)
-            seq_str = max_no.split(separator)[-1]
-            seq = int(seq_str) + 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
-
     seq_str = str(seq).zfill(seq_length)
     return f"{pattern_prefix}{seq_str}"
 
@@ -206,32 +260,14 @@ def generate_employee_code(db: Session) -> str:
     seq_length = SEQ_LENGTH["EMPLOYEE"]
     separator = "-"
 
-    # 查询所有符合格式的编号
-    pattern = f"{prefix}{separator}%"
-    max_record_query = db.query(Employee)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    # 提取序号部分：EMP-00001 -> 00001
+    seq = allocate_sequence(
+        db,
         Employee,
-        pattern,
         "employee_code",
-        use_ilike=False,
+        f"{prefix}{separator}",
+        parse_seq=lambda max_code: _suffix_seq(max_code, separator, 2),
     )
-    max_record = max_record_query.order_by(Employee.employee_code.desc()).first()
-
-    if max_record:
-        try:
-            max_code = max_record.employee_code
-            # 提取序号部分：EMP-00001 -> 00001
-            parts = max_code.split(separator)
-            if len(parts) == 2:
-                seq_str = parts[1]
-                seq = int(seq_str) + 1
-            else:
-                seq = 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
 
     # 格式化序号
     seq_str = str(seq).zfill(seq_length)
@@ -256,32 +292,14 @@ def generate_customer_code(db: Session) -> str:
     seq_length = SEQ_LENGTH["CUSTOMER"]
     separator = "-"
 
-    # 查询所有符合格式的编号
-    pattern = f"{prefix}{separator}%"
-    max_record_query = db.query(Customer)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    # 提取序号部分：CUS-0000001 -> 0000001
+    seq = allocate_sequence(
+        db,
         Customer,
-        pattern,
         "customer_code",
-        use_ilike=False,
+        f"{prefix}{separator}",
+        parse_seq=lambda max_code: _suffix_seq(max_code, separator, 2),
     )
-    max_record = max_record_query.order_by(Customer.customer_code.desc()).first()
-
-    if max_record:
-        try:
-            max_code = max_record.customer_code
-            # 提取序号部分：CUS-0000001 -> 0000001
-            parts = max_code.split(separator)
-            if len(parts) == 2:
-                seq_str = parts[1]
-                seq = int(seq_str) + 1
-            else:
-                seq = 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
 
     # 格式化序号
     seq_str = str(seq).zfill(seq_length)
@@ -313,34 +331,21 @@ def generate_material_code(db: Session, category_code: Optional[str] = None) ->
     else:
         material_category_code = "OT"  # 默认其他
 
-    # 构建查询模式：MAT-{类别码}-%
-    pattern = f"{prefix}{separator}{material_category_code}{separator}%"
+    def parse_seq(max_code: str) -> int:
+        # 提取序号部分：MAT-ME-00001 -> 00001
+        parts = max_code.split(separator)
+        if len(parts) == 3 and parts[0] == prefix and parts[1] == material_category_code:
+            return int(parts[2])
+        return 0
 
-    # 查询该类别下的最大编号
-    max_record_query = db.query(Material)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    # 按类别分别计数：MAT-{类别码}-
+    seq = allocate_sequence(
+        db,
         Material,
-        pattern,
         "material_code",
-        use_ilike=False,
+        f"{prefix}{separator}{material_category_code}{separator}",
+        parse_seq=parse_seq,
     )
-    max_record = max_record_query.order_by(Material.material_code.desc()).first()
-
-    if max_record:
-        try:
-            max_code = max_record.material_code
-            # 提取序号部分：MAT-ME-00001 -> 00001
-            parts = max_code.split(separator)
-            if len(parts) == 3 and parts[0] == prefix and parts[1] == material_category_code:
-                seq_str = parts[2]
-                seq = int(seq_str) + 1
-            else:
-                seq = 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
 
     # 格式化序号
     seq_str = str(seq).zfill(seq_length)
@@ -369,32 +374,15 @@ def generate_machine_code(db: Session, project_code: str) -> str:
         ```
     """
 
-    # 查询该项目下已有的设备编码，格式：PJxxx-PNxxx
-    pattern = f"{project_code}-PN%"
-    max_record_query = db.query(Machine)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    # 按项目分别计数，格式：PJxxx-PNxxx
+    # 提取序号部分：PJ250708001-PN001 -> 001
+    seq = allocate_sequence(
+        db,
         Machine,
-        pattern,
         "machine_code",
-        use_ilike=False,
+        f"{project_code}-PN",
+        parse_seq=lambda max_code: _suffix_seq(max_code, "-PN", 2),
     )
-    max_record = max_record_query.order_by(Machine.machine_code.desc()).first()
-
-    if max_record:
-        try:
-            max_code = max_record.machine_code
-            # 提取序号部分：PJ250708001-PN001 -> 001
-            parts = max_code.split("-PN")
-            if len(parts) == 2:
-                seq_str = parts[1]
-                seq = int(seq_str) + 1
-            else:
-                seq = 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
 
     # 格式化序号为3位
     seq_str = str(seq).zfill(3)
@@ -429,32 +417,15 @@ def generate_calculation_code(db: Session) -> str:
     seq_length = 3
 
     pattern_prefix = f"{prefix}{separator}{date_str}{separator}"
-    pattern = f"{pattern_prefix}%"
 
-    max_record_query = db.query(BonusCalculation)
-    max_record_query = apply_like_filter(
-        max_record_query,
+    # 提取序号部分：BC-250716-001 -> 001
+    seq = allocate_sequence(
+        db,
         BonusCalculation,
-        pattern,
         "calculation_code",
-        use_ilike=False,
+        pattern_prefix,
+        parse_seq=lambda max_code: _suffix_seq(max_code, separator, 3),
     )
-    max_record = max_record_query.order_by(BonusCalculation.calculation_code.desc()).first()
-
-    if max_record:
-        try:
-            max_code = max_record.calculation_code
-            # 提取序号部分：BC-250716-001 -> 001
-            parts = max_code.split(separator)
-            if len(parts) == 3:
-                seq_str = parts[-1]
-                seq = int(seq_str) + 1
-            else:
-                seq = 1
-        except (ValueError, IndexError, AttributeError):
-            seq = 1
-    else:
-        seq = 1
 
     seq_str = str(seq).zfill(seq_length)
     return f"{pattern_prefix}{seq_str}"
@@ -56,6 +56,7 @@ from .kit_rate_tasks import (
     create_kit_rate_snapshot,
     create_stage_change_snapshot,
     daily_kit_rate_snapshot,
+    refresh_kit_rate_dashboard,
 )
 
 # ==================== 里程碑任务 ====================
@@ -80,6 +81,10 @@ from .project_scheduled_tasks import (
     check_project_deadline_alerts,
     daily_health_snapshot,
     daily_spec_match_check,
+    flush_progress_rollups,
+    refresh_data_scope_index,
+    refresh_permission_index,
+    refresh_text_indexes,
 )
 
 # ==================== 项目风险任务 ====================
@@ -139,6 +144,10 @@ SCHEDULED_TASKS = {
     "calculate_progress_summary": calculate_progress_summary,
     "check_project_deadline_alerts": check_project_deadline_alerts,
     "check_project_cost_overrun": check_project_cost_overrun,
+    "refresh_data_scope_index": refresh_data_scope_index,
+    "refresh_permission_index": refresh_permission_index,
+    "flush_progress_rollups": flush_progress_rollups,
+    "refresh_text_indexes": refresh_text_indexes,
     # 问题管理任务
     "check_overdue_issues": check_overdue_issues,
     "check_blocking_issues": check_blocking_issues,
@@ -179,6 +188,7 @@ SCHEDULED_TASKS = {
     "check_employee_confirmation_reminder": check_employee_confirmation_reminder,
     # 齐套率任务
     "daily_kit_rate_snapshot": daily_kit_rate_snapshot,
+    "refresh_kit_rate_dashboard": refresh_kit_rate_dashboard,
     "daily_kit_check": daily_kit_check,
     "sync_kitting_rate_hourly": sync_kitting_rate_hourly,
     # 项目风险任务
@@ -198,6 +208,10 @@ TASK_GROUPS = {
             "calculate_progress_summary",
             "check_project_deadline_alerts",
             "check_project_cost_overrun",
+            "refresh_data_scope_index",
+            "refresh_permission_index",
+            "flush_progress_rollups",
+            "refresh_text_indexes",
         ],
     },
     "issue": {
@@ -270,6 +284,7 @@ TASK_GROUPS = {
         "name": "齐套率管理",
         "tasks": [
             "daily_kit_rate_snapshot",
+            "refresh_kit_rate_dashboard",
             "daily_kit_check",
             "sync_kitting_rate_hourly",
         ],
@@ -354,6 +369,10 @@ __all__ = [
     "calculate_progress_summary",
     "check_project_deadline_alerts",
     "check_project_cost_overrun",
+    "refresh_data_scope_index",
+    "refresh_permission_index",
+    "flush_progress_rollups",
+    "refresh_text_indexes",
     # 问题管理
     "check_overdue_issues",
     "check_blocking_issues",
@@ -396,6 +415,7 @@ __all__ = [
     "daily_kit_rate_snapshot",
     "create_kit_rate_snapshot",
     "create_stage_change_snapshot",
+    "refresh_kit_rate_dashboard",
     "daily_kit_check",
     "sync_kitting_rate_hourly",
     # 项目风险
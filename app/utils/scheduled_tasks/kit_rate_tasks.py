@@ -292,6 +292,27 @@ def daily_kit_rate_snapshot():
     return result
 
 
+def refresh_kit_rate_dashboard():
+    """
+    齐套看板快照刷新定时任务
+
+    批量计算所有活跃项目的齐套率并写入缓存，看板接口直接读取该快照。
+    建议调度：每10分钟
+    """
+    from app.services.kit_rate import KitRateService
+
+    try:
+        with get_db_session() as db:
+            dashboard = KitRateService(db).refresh_dashboard_snapshot()
+    except Exception as e:
+        logger.error(f"齐套看板快照刷新失败: {e}")
+        return {"success": False, "error": str(e)}
+
+    result = {"success": True, "total_projects": dashboard["summary"]["total_projects"]}
+    logger.info(f"齐套看板快照刷新完成: {result}")
+    return result
+
+
 def create_stage_change_snapshot(
     db: Session,
     project_id: int,
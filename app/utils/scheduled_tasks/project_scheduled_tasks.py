@@ -512,6 +512,97 @@ def check_project_cost_overrun():
         return {"error": str(e)}
 
 
+def refresh_data_scope_index():
+    """
+    重建数据权限范围索引
+    每5分钟执行一次，重建被变更事件标记为过期、超龄或尚未构建的用户索引
+    """
+    try:
+        from app.services.data_scope.scope_index import ProjectScopeIndexService
+
+        with get_db_session() as db:
+            result = ProjectScopeIndexService.refresh_indexes(db)
+
+            logger.info(
+                f"数据权限索引重建完成: 重建 {result['rebuilt']} 个用户, 失败 {result['failed']} 个"
+            )
+
+            return result
+    except Exception as e:
+        logger.error(f"数据权限索引重建失败: {str(e)}")
+        return {"error": str(e)}
+
+
+def refresh_permission_index():
+    """
+    重建角色权限索引
+    每小时执行一次，全量重建角色闭包与权限位图，修复绕过 ORM 的直接 SQL 变更
+    """
+    try:
+        from app.core.permission_index import RolePermissionIndex
+
+        with get_db_session() as db:
+            rebuilt = RolePermissionIndex.rebuild_all(db)
+
+            logger.info(f"角色权限索引重建完成: 重建 {rebuilt} 个角色")
+
+            return {"rebuilt": rebuilt}
+    except Exception as e:
+        logger.error(f"角色权限索引重建失败: {str(e)}")
+        return {"error": str(e)}
+
+
+def flush_progress_rollups():
+    """
+    合并重算项目进度
+    每分钟执行一次，对合并窗口内已无新任务变更的项目统一精确重算进度并检查健康度
+    """
+    try:
+        from app.core.config import settings
+        from app.services.progress_rollup_service import ProgressRollupService
+
+        with get_db_session() as db:
+            if not settings.PROGRESS_ROLLUP_ENABLED or not ProgressRollupService.is_available(db):
+                return {"processed": 0, "failed": 0}
+
+            result = ProgressRollupService.flush_pending(db)
+
+            if result["processed"] or result["failed"]:
+                logger.info(
+                    f"项目进度合并重算完成: 重算 {result['processed']} 个项目, "
+                    f"失败 {result['failed']} 个"
+                )
+
+            return result
+    except Exception as e:
+        logger.error(f"项目进度合并重算失败: {str(e)}")
+        return {"error": str(e)}
+
+
+def refresh_text_indexes():
+    """
+    同步文本相似度索引
+    每 5 分钟执行一次，增量同步（到期时全量重建）ECN相似度索引与知识检索索引，
+    使请求中无需构建索引
+    """
+    try:
+        from app.services.ecn_knowledge_service.similarity_index import EcnSimilarityIndex
+        from app.services.knowledge.search_index import KnowledgeSearchIndex
+
+        with get_db_session() as db:
+            result = {}
+            for name, index_class in (
+                ("ecn", EcnSimilarityIndex),
+                ("knowledge", KnowledgeSearchIndex),
+            ):
+                index = index_class.refresh(db)
+                result[name] = len(index.text) if index is not None else None
+            return result
+    except Exception as e:
+        logger.error(f"文本相似度索引同步失败: {str(e)}")
+        return {"error": str(e)}
+
+
 # 导出所有任务函数
 __all__ = [
     "daily_spec_match_check",
@@ -520,4 +611,8 @@ __all__ = [
     "calculate_progress_summary",
     "check_project_deadline_alerts",
     "check_project_cost_overrun",
+    "refresh_data_scope_index",
+    "refresh_permission_index",
+    "flush_progress_rollups",
+    "refresh_text_indexes",
 ]
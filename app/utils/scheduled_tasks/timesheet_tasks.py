@@ -226,7 +226,10 @@ def monthly_timesheet_aggregation_task():
     每月工时汇总任务
     每月1号凌晨3点执行，汇总上一个月的数据
     """
+    from app.common.date_range import get_month_range_by_ym
+    from app.core.config import settings
     from app.services.timesheet_aggregation_service import TimesheetAggregationService
+    from app.services.timesheet_rollup_service import TimesheetRollupService
 
     with get_db_session() as db:
         try:
@@ -239,6 +242,11 @@ def monthly_timesheet_aggregation_task():
                 year = today.year
                 month = today.month - 1
 
+            # 整月重建工时汇总表对账（纠正绕过 ORM 的批量写入），随月度汇总一并提交
+            if settings.TIMESHEET_ROLLUP_ENABLED and TimesheetRollupService.is_available(db):
+                start_date, end_date = get_month_range_by_ym(year, month)
+                TimesheetRollupService.rebuild(db, start_date, end_date)
+
             # 执行月度汇总
             service = TimesheetAggregationService(db)
             result = service.aggregate_monthly_timesheet(year, month)
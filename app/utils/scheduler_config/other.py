@@ -123,6 +123,23 @@ OTHER_TASKS = [
             "retry_on_failure": False,
         },
     },
+    {
+        "id": "refresh_text_indexes",
+        "name": "同步文本相似度索引",
+        "module": "app.utils.scheduled_tasks",
+        "callable": "refresh_text_indexes",
+        "cron": {"minute": "*/5"},
+        "owner": "Backend Platform",
+        "category": "Knowledge",
+        "description": "每 5 分钟按更新时间增量同步 ECN 相似度索引与知识检索索引，每小时全量重建一次。",
+        "enabled": True,
+        "dependencies_tables": ["ecn", "ecn_affected_materials", "knowledge_entries"],
+        "risk_level": "LOW",
+        "sla": {
+            "max_execution_time_seconds": 240,
+            "retry_on_failure": False,
+        },
+    },
     {
         "id": "check_opportunity_stage_timeout",
         "name": "商机阶段超时提醒",
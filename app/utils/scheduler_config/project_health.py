@@ -44,4 +44,68 @@ PROJECT_HEALTH_TASKS = [
             "retry_on_failure": False,
         },
     },
+    {
+        "id": "refresh_data_scope_index",
+        "name": "重建数据权限范围索引",
+        "module": "app.utils.scheduled_tasks",
+        "callable": "refresh_data_scope_index",
+        "cron": {"minute": "*/5"},
+        "owner": "Backend Platform",
+        "category": "Data Scope",
+        "description": "每 5 分钟重建被变更事件标记为过期或尚未构建的用户可访问项目索引。",
+        "enabled": True,
+        "dependencies_tables": [
+            "user_project_scopes",
+            "user_scope_index_states",
+            "projects",
+            "project_members",
+            "users",
+        ],
+        "risk_level": "LOW",
+        "sla": {
+            "max_execution_time_seconds": 240,
+            "retry_on_failure": False,
+        },
+    },
+    {
+        "id": "refresh_permission_index",
+        "name": "重建角色权限索引",
+        "module": "app.utils.scheduled_tasks",
+        "callable": "refresh_permission_index",
+        "cron": {"minute": 15},
+        "owner": "Backend Platform",
+        "category": "Data Scope",
+        "description": "每小时全量重建角色继承闭包与权限位图，首次构建索引并修复绕过 ORM 的直接 SQL 变更。",
+        "enabled": True,
+        "dependencies_tables": [
+            "role_closures",
+            "permission_bits",
+            "role_permission_masks",
+            "roles",
+            "role_api_permissions",
+            "api_permissions",
+        ],
+        "risk_level": "LOW",
+        "sla": {
+            "max_execution_time_seconds": 120,
+            "retry_on_failure": False,
+        },
+    },
+    {
+        "id": "flush_progress_rollups",
+        "name": "合并重算项目进度",
+        "module": "app.utils.scheduled_tasks",
+        "callable": "flush_progress_rollups",
+        "cron": {"minute": "*"},
+        "owner": "Backend Platform",
+        "category": "Project Health",
+        "description": "每分钟对任务变更已平息（超过合并窗口）的项目统一精确重算进度并检查健康度。",
+        "enabled": True,
+        "dependencies_tables": ["project_progress_rollups", "task_unified", "projects"],
+        "risk_level": "LOW",
+        "sla": {
+            "max_execution_time_seconds": 50,
+            "retry_on_failure": False,
+        },
+    },
 ]
@@ -90,6 +90,30 @@ SHORTAGE_TASKS = [
             "retry_on_failure": True,
         },
     },
+    {
+        "id": "refresh_kit_rate_dashboard",
+        "name": "齐套看板快照刷新",
+        "module": "app.utils.scheduled_tasks",
+        "callable": "refresh_kit_rate_dashboard",
+        "cron": {"minute": "*/10"},  # 每10分钟执行
+        "owner": "Supply Chain",
+        "category": "Shortage",
+        "description": "每10分钟批量计算所有活跃项目齐套率，刷新齐套看板缓存快照。",
+        "enabled": True,
+        "dependencies_tables": [
+            "projects",
+            "machines",
+            "bom_headers",
+            "bom_items",
+            "materials",
+            "purchase_order_items",
+        ],
+        "risk_level": "MEDIUM",
+        "sla": {
+            "max_execution_time_seconds": 300,
+            "retry_on_failure": False,
+        },
+    },
     {
         "id": "generate_shortage_daily_report",
         "name": "缺料日报自动生成",
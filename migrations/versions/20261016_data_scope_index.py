@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""data_scope_index - 数据权限范围索引
+
+Revision ID: dsi20261016001
+Revises: ecnmi20260328001
+Create Date: 2026-10-16
+
+新增表:
+- user_project_scopes: 用户可访问项目索引表
+- user_scope_index_states: 用户权限范围索引状态表
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "dsi20261016001"
+down_revision = "ecnmi20260328001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # --- user_project_scopes 表 ---
+    op.create_table(
+        "user_project_scopes",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("tenant_id", sa.Integer(), comment="租户ID"),
+        sa.Column("user_id", sa.Integer(), nullable=False, comment="用户ID"),
+        sa.Column("project_id", sa.Integer(), nullable=False, comment="项目ID"),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        comment="用户可访问项目索引表",
+    )
+    op.create_index(
+        "idx_ups_user_project", "user_project_scopes", ["user_id", "project_id"], unique=True
+    )
+    op.create_index("idx_ups_project", "user_project_scopes", ["project_id"])
+
+    # --- user_scope_index_states 表 ---
+    op.create_table(
+        "user_scope_index_states",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("tenant_id", sa.Integer(), comment="租户ID"),
+        sa.Column("user_id", sa.Integer(), nullable=False, comment="用户ID"),
+        sa.Column("data_scope", sa.String(20), nullable=False, comment="构建时的数据权限范围"),
+        sa.Column("project_count", sa.Integer(), server_default="0", comment="可访问项目数"),
+        sa.Column(
+            "is_stale", sa.Boolean(), server_default=sa.false(), nullable=False,
+            comment="是否需要重建",
+        ),
+        sa.Column(
+            "refreshed_at", sa.DateTime(), server_default=sa.func.now(), nullable=False,
+            comment="最后构建时间",
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        comment="用户权限范围索引状态表",
+    )
+    op.create_index("idx_usis_user", "user_scope_index_states", ["user_id"], unique=True)
+    op.create_index("idx_usis_stale", "user_scope_index_states", ["is_stale"])
+    op.create_index("idx_usis_scope", "user_scope_index_states", ["data_scope"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_usis_scope", table_name="user_scope_index_states")
+    op.drop_index("idx_usis_stale", table_name="user_scope_index_states")
+    op.drop_index("idx_usis_user", table_name="user_scope_index_states")
+    op.drop_table("user_scope_index_states")
+
+    op.drop_index("idx_ups_project", table_name="user_project_scopes")
+    op.drop_index("idx_ups_user_project", table_name="user_project_scopes")
+    op.drop_table("user_project_scopes")
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""role_permission_index - 角色权限索引（闭包表 + 权限位图）
+
+Revision ID: rpi20261016001
+Revises: dsi20261016001
+Create Date: 2026-10-16
+
+新增表:
+- role_closures: 角色继承闭包表
+- permission_bits: 权限编码位序表
+- role_permission_masks: 角色有效权限位图表
+
+索引由定时任务 refresh_permission_index 首次构建，构建前权限加载自动降级为递归查询。
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "rpi20261016001"
+down_revision = "dsi20261016001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # --- role_closures 表 ---
+    op.create_table(
+        "role_closures",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("ancestor_id", sa.Integer(), nullable=False, comment="祖先角色ID"),
+        sa.Column("descendant_id", sa.Integer(), nullable=False, comment="后代角色ID"),
+        sa.Column("depth", sa.Integer(), nullable=False, server_default="0", comment="继承层数"),
+        sa.PrimaryKeyConstraint("id"),
+        comment="角色继承闭包表",
+    )
+    op.create_index(
+        "idx_rc_ancestor_descendant", "role_closures", ["ancestor_id", "descendant_id"], unique=True
+    )
+    op.create_index("idx_rc_descendant", "role_closures", ["descendant_id"])
+
+    # --- permission_bits 表 ---
+    op.create_table(
+        "permission_bits",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("perm_code", sa.String(100), nullable=False, comment="权限编码"),
+        sa.Column("bit_index", sa.Integer(), nullable=False, comment="位序"),
+        sa.PrimaryKeyConstraint("id"),
+        comment="权限编码位序表",
+    )
+    op.create_index("idx_pb_perm_code", "permission_bits", ["perm_code"], unique=True)
+    op.create_index("idx_pb_bit_index", "permission_bits", ["bit_index"], unique=True)
+
+    # --- role_permission_masks 表 ---
+    op.create_table(
+        "role_permission_masks",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("role_id", sa.Integer(), nullable=False, comment="角色ID"),
+        sa.Column("perm_tenant_id", sa.Integer(), comment="权限所属租户ID（NULL为系统级）"),
+        sa.Column("mask", sa.LargeBinary(), nullable=False, comment="权限位图（小端字节序）"),
+        sa.Column(
+            "built_at", sa.DateTime(), server_default=sa.func.now(), nullable=False,
+            comment="构建时间",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        comment="角色有效权限位图表",
+    )
+    op.create_index("idx_rpm_role_tenant", "role_permission_masks", ["role_id", "perm_tenant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_rpm_role_tenant", table_name="role_permission_masks")
+    op.drop_table("role_permission_masks")
+
+    op.drop_index("idx_pb_bit_index", table_name="permission_bits")
+    op.drop_index("idx_pb_perm_code", table_name="permission_bits")
+    op.drop_table("permission_bits")
+
+    op.drop_index("idx_rc_descendant", table_name="role_closures")
+    op.drop_index("idx_rc_ancestor_descendant", table_name="role_closures")
+    op.drop_table("role_closures")
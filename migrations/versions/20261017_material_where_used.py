@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""material_where_used - 物料反查索引表
+
+Revision ID: mwu20261017001
+Revises: ppr20261017001
+Create Date: 2026-10-17
+
+新增表:
+- material_where_used: 物料反查索引表（物料 → BOM、明细、设备、项目）
+
+创建后按现有BOM明细回填，之后由BOM保存、发布时维护。
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "mwu20261017001"
+down_revision = "ppr20261017001"
+branch_labels = None
+depends_on = None
+
+_INDEX_COLUMNS = [
+    "material_id", "material_code", "bom_item_id", "parent_item_id",
+    "bom_id", "machine_id", "project_id", "updated_at",
+]
+
+
+def _backfill() -> None:
+    """按现有BOM明细回填索引"""
+    item = sa.table(
+        "bom_items",
+        *(sa.column(name) for name in (
+            "id", "bom_id", "parent_item_id", "material_id", "material_code",
+        )),
+    )
+    header = sa.table(
+        "bom_headers", *(sa.column(name) for name in ("id", "machine_id", "project_id"))
+    )
+    where_used = sa.table("material_where_used", *(sa.column(name) for name in _INDEX_COLUMNS))
+    op.execute(
+        where_used.insert().from_select(
+            _INDEX_COLUMNS,
+            sa.select(
+                item.c.material_id,
+                item.c.material_code,
+                item.c.id,
+                item.c.parent_item_id,
+                item.c.bom_id,
+                header.c.machine_id,
+                header.c.project_id,
+                sa.func.now(),
+            ).select_from(item.join(header, header.c.id == item.c.bom_id)),
+        )
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "material_where_used",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("material_id", sa.Integer(), comment="物料ID"),
+        sa.Column("material_code", sa.String(50), nullable=False, comment="物料编码"),
+        sa.Column("bom_item_id", sa.Integer(), nullable=False, comment="BOM明细ID"),
+        sa.Column("parent_item_id", sa.Integer(), comment="父级明细ID"),
+        sa.Column("bom_id", sa.Integer(), nullable=False, comment="BOM ID"),
+        sa.Column("machine_id", sa.Integer(), comment="设备ID"),
+        sa.Column("project_id", sa.Integer(), comment="项目ID"),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(),
+                  comment="索引更新时间"),
+        sa.PrimaryKeyConstraint("id"),
+        comment="物料反查索引表",
+    )
+    op.create_index("idx_mwu_item", "material_where_used", ["bom_item_id"], unique=True)
+    op.create_index("idx_mwu_material", "material_where_used", ["material_id"])
+    op.create_index("idx_mwu_code", "material_where_used", ["material_code"])
+    op.create_index("idx_mwu_bom", "material_where_used", ["bom_id"])
+
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("idx_mwu_bom", table_name="material_where_used")
+    op.drop_index("idx_mwu_code", table_name="material_where_used")
+    op.drop_index("idx_mwu_material", table_name="material_where_used")
+    op.drop_index("idx_mwu_item", table_name="material_where_used")
+    op.drop_table("material_where_used")
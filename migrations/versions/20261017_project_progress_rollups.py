@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""project_progress_rollups - 项目进度汇总表
+
+Revision ID: ppr20261017001
+Revises: tsr20261017001
+Create Date: 2026-10-17
+
+新增表:
+- project_progress_rollups: 项目进度汇总表（任务数、进度之和的运行总计）
+
+创建后按现有任务回填，之后由任务变更事件增量维护。
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "ppr20261017001"
+down_revision = "tsr20261017001"
+branch_labels = None
+depends_on = None
+
+
+def _backfill() -> None:
+    """按活跃且未取消的任务回填各项目的运行总计"""
+    task = sa.table(
+        "task_unified",
+        *(sa.column(name) for name in ("id", "project_id", "progress", "status", "is_active")),
+    )
+    rollup = sa.table(
+        "project_progress_rollups",
+        *(sa.column(name) for name in (
+            "project_id", "task_count", "progress_sum", "pending", "changed_at",
+        )),
+    )
+    op.execute(
+        rollup.insert().from_select(
+            ["project_id", "task_count", "progress_sum", "pending", "changed_at"],
+            sa.select(
+                task.c.project_id,
+                sa.func.count(task.c.id),
+                sa.func.coalesce(sa.func.sum(task.c.progress), 0),
+                sa.false(),
+                sa.func.now(),
+            )
+            .where(
+                task.c.project_id.isnot(None),
+                task.c.is_active == sa.true(),
+                task.c.status.notin_(["CANCELLED"]),
+            )
+            .group_by(task.c.project_id),
+        )
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_progress_rollups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False, comment="项目ID"),
+        sa.Column("task_count", sa.Integer(), server_default="0", nullable=False,
+                  comment="任务数"),
+        sa.Column("progress_sum", sa.Integer(), server_default="0", nullable=False,
+                  comment="任务进度之和"),
+        sa.Column("pending", sa.Boolean(), server_default=sa.false(), nullable=False,
+                  comment="是否待重算进度与健康度"),
+        sa.Column("changed_at", sa.DateTime(), server_default=sa.func.now(),
+                  comment="最后一次任务变更时间"),
+        sa.Column("recomputed_at", sa.DateTime(), comment="最后一次精确重算时间"),
+        sa.PrimaryKeyConstraint("id"),
+        comment="项目进度汇总表",
+    )
+    op.create_index("idx_ppr_project", "project_progress_rollups", ["project_id"], unique=True)
+    op.create_index("idx_ppr_pending", "project_progress_rollups", ["pending", "changed_at"])
+
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ppr_pending", table_name="project_progress_rollups")
+    op.drop_index("idx_ppr_project", table_name="project_progress_rollups")
+    op.drop_table("project_progress_rollups")
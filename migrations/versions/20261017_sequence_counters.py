@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""sequence_counters - 编号序列计数器
+
+Revision ID: seq20261017001
+Revises: rpi20261016001
+Create Date: 2026-10-17
+
+新增表:
+- sequence_counters: 编号序列计数器表
+
+计数器按需创建，首次分配时以业务表中现有最大序号为起点，无需初始化数据。
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "seq20261017001"
+down_revision = "rpi20261016001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sequence_counters",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(100), nullable=False, comment="序列名（表名.编号字段）"),
+        sa.Column(
+            "prefix", sa.String(100), nullable=False, comment="编号前缀（含周期，如 ECN-250115-）"
+        ),
+        sa.Column(
+            "current_value", sa.Integer(), server_default="0", nullable=False,
+            comment="已分配的最大序号",
+        ),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), comment="最后分配时间"),
+        sa.PrimaryKeyConstraint("id"),
+        comment="编号序列计数器表",
+    )
+    op.create_index(
+        "idx_seq_name_prefix", "sequence_counters", ["name", "prefix"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_seq_name_prefix", table_name="sequence_counters")
+    op.drop_table("sequence_counters")
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""timesheet_rollups - 工时日/月汇总表
+
+Revision ID: tsr20261017001
+Revises: seq20261017001
+Create Date: 2026-10-17
+
+新增表:
+- timesheet_daily_rollups: 工时日汇总表
+- timesheet_monthly_rollups: 工时月汇总表
+
+创建后按现有已审批工时回填，之后由工时变更事件增量维护。
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "tsr20261017001"
+down_revision = "seq20261017001"
+branch_labels = None
+depends_on = None
+
+
+def _hour_columns(precision):
+    return [
+        sa.Column("total_hours", sa.Numeric(precision, 2), server_default="0", nullable=False,
+                  comment="总工时"),
+        sa.Column("normal_hours", sa.Numeric(precision, 2), server_default="0", nullable=False,
+                  comment="正常工时"),
+        sa.Column("overtime_hours", sa.Numeric(precision, 2), server_default="0",
+                  nullable=False, comment="加班工时"),
+        sa.Column("weekend_hours", sa.Numeric(precision, 2), server_default="0",
+                  nullable=False, comment="周末工时"),
+        sa.Column("holiday_hours", sa.Numeric(precision, 2), server_default="0",
+                  nullable=False, comment="节假日工时"),
+        sa.Column("entries_count", sa.Integer(), server_default="0", nullable=False,
+                  comment="记录条数"),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), comment="汇总时间"),
+    ]
+
+
+def _backfill() -> None:
+    """按现有已审批工时回填日汇总，再由日汇总聚合月汇总"""
+    ts = sa.table(
+        "timesheet",
+        *(sa.column(name) for name in (
+            "id", "status", "hours", "overtime_type", "work_date", "user_id", "department_id",
+            "project_id", "rd_project_id", "task_id", "user_name", "department_name",
+            "project_code", "project_name", "task_name",
+        )),
+    )
+    hour_names = (
+        "total_hours", "normal_hours", "overtime_hours", "weekend_hours", "holiday_hours",
+        "entries_count",
+    )
+    daily_names = (
+        "work_date", "year", "month", "user_id", "department_id", "project_id",
+        "rd_project_id", "task_id", "user_name", "department_name", "project_code",
+        "project_name", "task_name",
+    ) + hour_names + ("updated_at",)
+    monthly_names = (
+        "year", "month", "user_id", "department_id", "project_id", "rd_project_id",
+        "user_name", "department_name", "project_code", "project_name",
+    ) + hour_names + ("updated_at",)
+    daily = sa.table("timesheet_daily_rollups", *(sa.column(name) for name in daily_names))
+    monthly = sa.table("timesheet_monthly_rollups", *(sa.column(name) for name in monthly_names))
+
+    hours = sa.func.coalesce(ts.c.hours, 0)
+
+    def typed_hours(overtime_type):
+        return sa.func.sum(sa.case((ts.c.overtime_type == overtime_type, hours), else_=0))
+
+    daily_dimensions = (
+        ts.c.work_date, ts.c.user_id, ts.c.department_id, ts.c.project_id, ts.c.rd_project_id,
+        ts.c.task_id,
+    )
+    op.execute(
+        daily.insert().from_select(
+            daily_names,
+            sa.select(
+                ts.c.work_date,
+                sa.extract("year", ts.c.work_date),
+                sa.extract("month", ts.c.work_date),
+                *daily_dimensions[1:],
+                sa.func.max(ts.c.user_name),
+                sa.func.max(ts.c.department_name),
+                sa.func.max(ts.c.project_code),
+                sa.func.max(ts.c.project_name),
+                sa.func.max(ts.c.task_name),
+                sa.func.sum(hours),
+                typed_hours("NORMAL"),
+                typed_hours("OVERTIME"),
+                typed_hours("WEEKEND"),
+                typed_hours("HOLIDAY"),
+                sa.func.count(ts.c.id),
+                sa.func.now(),
+            )
+            .where(ts.c.status == "APPROVED")
+            .group_by(*daily_dimensions),
+        )
+    )
+
+    monthly_dimensions = tuple(daily.c[name] for name in monthly_names[:6])
+    op.execute(
+        monthly.insert().from_select(
+            monthly_names,
+            sa.select(
+                *monthly_dimensions,
+                *(sa.func.max(daily.c[name]) for name in monthly_names[6:10]),
+                *(sa.func.sum(daily.c[name]) for name in hour_names),
+                sa.func.now(),
+            ).group_by(*monthly_dimensions),
+        )
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "timesheet_daily_rollups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("work_date", sa.Date(), nullable=False, comment="工作日期"),
+        sa.Column("year", sa.Integer(), nullable=False, comment="年份"),
+        sa.Column("month", sa.Integer(), nullable=False, comment="月份"),
+        sa.Column("user_id", sa.Integer(), nullable=False, comment="用户ID"),
+        sa.Column("department_id", sa.Integer(), comment="部门ID"),
+        sa.Column("project_id", sa.Integer(), comment="项目ID（非标项目）"),
+        sa.Column("rd_project_id", sa.Integer(), comment="研发项目ID"),
+        sa.Column("task_id", sa.Integer(), comment="任务ID"),
+        sa.Column("user_name", sa.String(50), comment="用户姓名"),
+        sa.Column("department_name", sa.String(100), comment="部门名称"),
+        sa.Column("project_code", sa.String(50), comment="项目编号"),
+        sa.Column("project_name", sa.String(200), comment="项目名称"),
+        sa.Column("task_name", sa.String(200), comment="任务名称"),
+        *_hour_columns(8),
+        sa.PrimaryKeyConstraint("id"),
+        comment="工时日汇总表",
+    )
+    op.create_index("idx_tsdr_user_date", "timesheet_daily_rollups", ["user_id", "work_date"])
+    op.create_index("idx_tsdr_date", "timesheet_daily_rollups", ["work_date"])
+    op.create_index(
+        "idx_tsdr_project_date", "timesheet_daily_rollups", ["project_id", "work_date"]
+    )
+    op.create_index(
+        "idx_tsdr_rd_project_date", "timesheet_daily_rollups", ["rd_project_id", "work_date"]
+    )
+
+    op.create_table(
+        "timesheet_monthly_rollups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False, comment="年份"),
+        sa.Column("month", sa.Integer(), nullable=False, comment="月份"),
+        sa.Column("user_id", sa.Integer(), nullable=False, comment="用户ID"),
+        sa.Column("department_id", sa.Integer(), comment="部门ID"),
+        sa.Column("project_id", sa.Integer(), comment="项目ID（非标项目）"),
+        sa.Column("rd_project_id", sa.Integer(), comment="研发项目ID"),
+        sa.Column("user_name", sa.String(50), comment="用户姓名"),
+        sa.Column("department_name", sa.String(100), comment="部门名称"),
+        sa.Column("project_code", sa.String(50), comment="项目编号"),
+        sa.Column("project_name", sa.String(200), comment="项目名称"),
+        *_hour_columns(10),
+        sa.PrimaryKeyConstraint("id"),
+        comment="工时月汇总表",
+    )
+    op.create_index(
+        "idx_tsmr_period_user", "timesheet_monthly_rollups", ["year", "month", "user_id"]
+    )
+    op.create_index(
+        "idx_tsmr_period_project", "timesheet_monthly_rollups", ["year", "month", "project_id"]
+    )
+    op.create_index(
+        "idx_tsmr_period_rd_project",
+        "timesheet_monthly_rollups",
+        ["year", "month", "rd_project_id"],
+    )
+
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("idx_tsmr_period_rd_project", table_name="timesheet_monthly_rollups")
+    op.drop_index("idx_tsmr_period_project", table_name="timesheet_monthly_rollups")
+    op.drop_index("idx_tsmr_period_user", table_name="timesheet_monthly_rollups")
+    op.drop_table("timesheet_monthly_rollups")
+    op.drop_index("idx_tsdr_rd_project_date", table_name="timesheet_daily_rollups")
+    op.drop_index("idx_tsdr_project_date", table_name="timesheet_daily_rollups")
+    op.drop_index("idx_tsdr_date", table_name="timesheet_daily_rollups")
+    op.drop_index("idx_tsdr_user_date", table_name="timesheet_daily_rollups")
+    op.drop_table("timesheet_daily_rollups")
@@ -21,32 +21,31 @@ class TestGenerateAlertNo:
     def test_format_contains_rule_code_and_date(self):
         """预警编号包含规则编码前缀和日期"""
         db = MagicMock()
-        db.query.return_value.count.return_value = 0
 
         rule = MagicMock()
         rule.rule_code = "project_delay"
 
         with patch(
-            "app.services.alert_rule_engine.alert_generator.apply_like_filter",
-            return_value=db.query.return_value,
-        ):
+            "app.services.alert_rule_engine.alert_generator.allocate_sequence",
+            return_value=1,
+        ) as allocate:
             alert_no = AlertGenerator.generate_alert_no(db, rule, {})
 
         today = datetime.now().strftime("%Y%m%d")
         assert today in alert_no
         assert alert_no.startswith("PRO")  # "project_delay"[:3].upper() = "PRO"
+        assert allocate.call_args[0][2:] == ("alert_no", f"PRO{today}")
 
     def test_sequence_increments(self):
-        """当天有已有预警时序号递增"""
+        """当天已分配过序号时取计数器下一个序号"""
         db = MagicMock()
-        db.query.return_value.count.return_value = 5  # 已有5条
 
         rule = MagicMock()
         rule.rule_code = "cost_overrun"
 
         with patch(
-            "app.services.alert_rule_engine.alert_generator.apply_like_filter",
-            return_value=db.query.return_value,
+            "app.services.alert_rule_engine.alert_generator.allocate_sequence",
+            return_value=6,
         ):
             alert_no = AlertGenerator.generate_alert_no(db, rule, {})
 
@@ -56,14 +55,13 @@ class TestGenerateAlertNo:
     def test_sequence_padded_to_4_digits(self):
         """序号补零到4位"""
         db = MagicMock()
-        db.query.return_value.count.return_value = 0
 
         rule = MagicMock()
         rule.rule_code = "AL001"
 
         with patch(
-            "app.services.alert_rule_engine.alert_generator.apply_like_filter",
-            return_value=db.query.return_value,
+            "app.services.alert_rule_engine.alert_generator.allocate_sequence",
+            return_value=1,
         ):
             alert_no = AlertGenerator.generate_alert_no(db, rule, {})
 
@@ -34,13 +34,9 @@ def make_db(count=0):
 
 
 class TestGenerateAlertNo:
-    @patch("app.services.alert_rule_engine.alert_generator.apply_like_filter")
-    def test_generates_alert_no_format(self, mock_filter):
+    @patch("app.services.alert_rule_engine.alert_generator.allocate_sequence", return_value=1)
+    def test_generates_alert_no_format(self, mock_allocate):
         db = MagicMock()
-        mock_chain = MagicMock()
-        mock_chain.count.return_value = 0
-        mock_filter.return_value = mock_chain
-        db.query.return_value = mock_chain
 
         rule = make_rule(rule_code="SHORTAGE")
         result = AlertGenerator.generate_alert_no(db, rule, {"target_name": "项目A"})
@@ -48,13 +44,9 @@ class TestGenerateAlertNo:
         today = datetime.now().strftime("%Y%m%d")
         assert today in result
 
-    @patch("app.services.alert_rule_engine.alert_generator.apply_like_filter")
-    def test_alert_no_with_existing_count(self, mock_filter):
+    @patch("app.services.alert_rule_engine.alert_generator.allocate_sequence", return_value=6)
+    def test_alert_no_with_allocated_sequence(self, mock_allocate):
         db = MagicMock()
-        mock_chain = MagicMock()
-        mock_chain.count.return_value = 5
-        mock_filter.return_value = mock_chain
-        db.query.return_value = mock_chain
 
         rule = make_rule(rule_code="MAT")
         result = AlertGenerator.generate_alert_no(db, rule, {})
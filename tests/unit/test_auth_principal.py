@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+认证主体缓存测试
+
+测试目标文件:
+- app/core/auth_principal.py - 认证主体LRU缓存、用户快照、跨进程失效广播
+- app/core/auth.py - 中间件主体复用、缓存命中路径
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.auth import (
+    create_access_token,
+    get_current_user,
+    revoke_token_jti,
+    verify_token_and_get_user,
+)
+from app.core.auth_principal import (
+    AuthPrincipal,
+    PrincipalCache,
+    get_principal_cache,
+    snapshot_user,
+    user_from_snapshot,
+)
+from app.models.user import User
+
+
+def _make_user(user_id=1, tenant_id=10):
+    return User(
+        id=user_id,
+        tenant_id=tenant_id,
+        username=f"user{user_id}",
+        password_hash="x",
+        is_active=True,
+        is_superuser=False,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    get_principal_cache().clear()
+    yield
+    get_principal_cache().clear()
+
+
+class TestPrincipalCache:
+    """PrincipalCache 基础行为"""
+
+    def test_put_and_get(self):
+        cache = PrincipalCache(max_size=10, ttl=30, revocation_ttl=5)
+        cache.put(AuthPrincipal(token="t1", user_id=1), {"id": 1})
+
+        entry = cache.get("t1")
+        assert entry is not None
+        assert entry.snapshot == {"id": 1}
+        assert cache.get("missing") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = PrincipalCache(max_size=2, ttl=30, revocation_ttl=5)
+        cache.put(AuthPrincipal(token="t1", user_id=1), {})
+        cache.put(AuthPrincipal(token="t2", user_id=2), {})
+        cache.get("t1")
+        cache.put(AuthPrincipal(token="t3", user_id=3), {})
+
+        assert cache.get("t2") is None
+        assert cache.get("t1") is not None
+        assert cache.get("t3") is not None
+
+    def test_ttl_expiry(self):
+        cache = PrincipalCache(max_size=10, ttl=0, revocation_ttl=0)
+        cache.put(AuthPrincipal(token="t1", user_id=1), {})
+        with patch("app.core.auth_principal.time.monotonic", return_value=10**9):
+            assert cache.get("t1") is None
+
+    def test_token_expiry(self):
+        cache = PrincipalCache(max_size=10, ttl=30, revocation_ttl=5)
+        cache.put(AuthPrincipal(token="t1", user_id=1, expires_at=1), {})
+        assert cache.get("t1") is None
+
+    def test_invalidate_by_jti_user_tenant(self):
+        cache = PrincipalCache(max_size=10, ttl=30, revocation_ttl=5)
+        cache.put(AuthPrincipal(token="a", user_id=1, tenant_id=1, jti="j1"), {})
+        cache.put(AuthPrincipal(token="b", user_id=1, tenant_id=1, jti="j2"), {})
+        cache.put(AuthPrincipal(token="c", user_id=2, tenant_id=2, jti="j3"), {})
+
+        assert cache.invalidate_jti("j3") == 1
+        assert cache.invalidate_user(1) == 2
+        cache.put(AuthPrincipal(token="d", user_id=3, tenant_id=5), {})
+        assert cache.invalidate_tenant(5) == 1
+        assert cache.get_stats()["size"] == 0
+
+
+    def test_invalidation_broadcast_to_other_workers(self):
+        from app.services.local_cache import CacheInvalidationBus
+
+        local = PrincipalCache(max_size=10, ttl=30, revocation_ttl=5)
+        remote = PrincipalCache(max_size=10, ttl=30, revocation_ttl=5)
+        remote_bus = CacheInvalidationBus(None, "ch", lambda op, arg: remote.apply_remote(*arg))
+        client = SimpleNamespace(publish=lambda channel, data: remote_bus._dispatch(data))
+        local_bus = CacheInvalidationBus(client, "ch", None)
+        local.bind_publisher(lambda kind, value: local_bus.publish("principal", [kind, value]))
+        for cache in (local, remote):
+            cache.put(AuthPrincipal(token="a", user_id=1, tenant_id=1, jti="j1"), {})
+            cache.put(AuthPrincipal(token="b", user_id=2, tenant_id=2, jti="j2"), {})
+            cache.put(AuthPrincipal(token="c", user_id=3, tenant_id=3, jti="j3"), {})
+
+        local.invalidate_user(1)
+        local.invalidate_jti("j2")
+        # Token 不经广播传输
+        local.invalidate_token("c")
+
+        assert remote.get("a") is None and remote.get("b") is None
+        assert remote.get("c") is not None
+        local.invalidate_tenant(3)
+        assert remote.get("c") is None
+
+    def test_shared_cache_bound_to_invalidation_bus(self):
+        import app.core.auth_principal as auth_principal
+        from app.services.local_cache import LocalCacheTier
+
+        tier = SimpleNamespace(bus=MagicMock())
+        with (
+            patch.object(auth_principal, "_principal_cache", None),
+            patch("app.services.local_cache.get_local_tier", return_value=tier),
+        ):
+            cache = get_principal_cache()
+            cache.put(AuthPrincipal(token="t", user_id=7), {})
+            cache.invalidate_user(7)
+            tier.bus.publish.assert_called_once_with("principal", ["user", 7])
+
+            # 收到其他 worker 的广播时按用户失效
+            cache.put(AuthPrincipal(token="t", user_id=7), {})
+            assert LocalCacheTier.apply(None, "principal", ["user", 7]) == 1
+            assert cache.get("t") is None
+
+
+class TestUserSnapshot:
+    """用户快照"""
+
+    def test_snapshot_roundtrip(self):
+        user = _make_user(user_id=7, tenant_id=3)
+        restored = user_from_snapshot(snapshot_user(user))
+
+        assert restored is not user
+        assert restored.id == 7
+        assert restored.tenant_id == 3
+        assert restored.username == "user7"
+
+
+class TestPrincipalReuse:
+    """请求内/跨请求主体复用"""
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_reuses_request_principal(self):
+        token = create_access_token({"sub": "1"})
+        user = _make_user()
+        request = SimpleNamespace(
+            state=SimpleNamespace(
+                user=user,
+                auth_principal=AuthPrincipal(token=token, user_id=1, tenant_id=10),
+            )
+        )
+        db = MagicMock()
+        db.merge.side_effect = lambda obj, load=True: obj
+
+        with patch("app.core.auth.is_token_revoked") as mock_revoked:
+            result = await get_current_user(token=token, db=db, request=request)
+
+        assert result is user
+        db.merge.assert_called_once_with(user, load=False)
+        db.query.assert_not_called()
+        mock_revoked.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_principal_for_other_token_is_ignored(self):
+        token = create_access_token({"sub": "1"})
+        request = SimpleNamespace(
+            state=SimpleNamespace(
+                user=_make_user(),
+                auth_principal=AuthPrincipal(token="other", user_id=1),
+            )
+        )
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = _make_user()
+
+        with patch("app.core.auth.is_token_revoked", return_value=False), patch(
+            "app.core.auth._ensure_access_session_active"
+        ):
+            await get_current_user(token=token, db=db, request=request)
+
+        db.merge.assert_not_called()
+        db.query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_verify_token_cache_hit_skips_db(self):
+        token = create_access_token({"sub": "1"})
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = _make_user()
+
+        with patch("app.core.auth.is_token_revoked", return_value=False), patch(
+            "app.core.auth._ensure_access_session_active"
+        ):
+            first = await verify_token_and_get_user(token=token, db=db)
+            second = await verify_token_and_get_user(token=token, db=db)
+
+        assert db.query.call_count == 1
+        assert second is not first
+        assert second.id == first.id == 1
+
+    @pytest.mark.asyncio
+    async def test_revoked_jti_invalidates_cached_principal(self):
+        token = create_access_token({"sub": "1"}, jti="jti-revoke")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = _make_user()
+
+        with patch("app.core.auth.is_token_revoked", return_value=False), patch(
+            "app.core.auth._ensure_access_session_active"
+        ):
+            await verify_token_and_get_user(token=token, db=db)
+
+        with patch("app.core.auth.get_redis_client", return_value=None):
+            revoke_token_jti("jti-revoke")
+
+        assert get_principal_cache().get(token) is None
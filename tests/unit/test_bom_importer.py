@@ -71,8 +71,12 @@ class TestBomImporter(unittest.TestCase):
     def test_material_not_found(self):
         project = MagicMock()
         project.id = 1
-        # first call: project found, second: material not found
-        self.db.query.return_value.filter.return_value.first.side_effect = [project, None]
+        project.project_code = "P001"
+        # 批量预取：项目命中，物料未命中
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [
+            [project],
+            [],
+        ]
         df = pd.DataFrame(
             [
                 {
@@ -101,14 +105,18 @@ class TestBomImporter(unittest.TestCase):
         bom_header = MagicMock()
         bom_header.id = 100
 
-        # project, material, bom_header, existing bom_item (None)
-        self.db.query.return_value.filter.return_value.first.side_effect = [
-            project,
-            material,
-            bom_header,
-            None,
+        project.project_code = "P001"
+        material.material_code = "M001"
+        bom_header.bom_no = "BOM001"
+
+        # 批量预取：项目、物料、BOM头；已有明细为空
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [
+            [project],
+            [material],
+            [bom_header],
         ]
-        self.db.query.return_value.filter.return_value.count.return_value = 0
+        self.db.query.return_value.filter.return_value.all.return_value = []
+        self.db.query.return_value.filter.return_value.group_by.return_value.all.return_value = []
 
         df = pd.DataFrame(
             [
@@ -102,15 +102,17 @@ class TestBomImporterRowValidation:
         )
         mock_project = MagicMock()
         mock_project.id = 1
+        mock_project.project_code = "PRJ001"
         mock_project.project_name = "测试项目"
 
         def query_side(model):
             m = MagicMock()
             m.filter.return_value = m
+            m.order_by.return_value = m
             if "Project" in str(model):
-                m.first.return_value = mock_project
+                m.all.return_value = [mock_project]
             else:
-                m.first.return_value = None
+                m.all.return_value = []
             return m
 
         db.query.side_effect = query_side
@@ -139,25 +141,30 @@ class TestBomImporterUpdateExisting:
         mock_bom_header.id = 100
 
         mock_bom_item = MagicMock()
+        mock_bom_item.bom_id = 100
+        mock_bom_item.material_id = 10
 
-        def query_side(model):
+        mock_project.project_code = "PRJ001"
+        mock_bom_header.bom_no = "B001"
+
+        def query_side(model, *columns):
             from app.models.material import BomHeader, BomItem, Material
             from app.models.project import Project
 
             m = MagicMock()
             m.filter.return_value = m
+            m.order_by.return_value = m
+            m.group_by.return_value = m
             if model is Project:
-                m.first.return_value = mock_project
+                m.all.return_value = [mock_project]
             elif model is Material:
-                m.first.return_value = mock_material
+                m.all.return_value = [mock_material]
             elif model is BomHeader:
-                m.first.return_value = mock_bom_header
+                m.all.return_value = [mock_bom_header]
             elif model is BomItem:
-                m.first.return_value = mock_bom_item
-                m.count.return_value = 1
+                m.all.return_value = [mock_bom_item]
             else:
-                m.first.return_value = None
-                m.count.return_value = 0
+                m.all.return_value = []
             return m
 
         db.query.side_effect = query_side
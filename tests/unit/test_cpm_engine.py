@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+CPM 计算引擎测试
+
+测试目标文件:
+- app/services/cpm_engine.py - 依赖解析、拓扑排序、正反向计算、环检测
+- app/services/ai_planning/schedule_optimizer.py - 按真实拓扑序计算
+"""
+
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.ai_planning.schedule_optimizer import AIScheduleOptimizer
+from app.services.cpm_engine import CPMGraph, DependencyCycleError, parse_dependencies
+from app.services.schedule_generation_service import ScheduleGenerationService
+
+
+def _task(task_id, duration, deps=None, wbs_level=1, wbs_code="1"):
+    return SimpleNamespace(
+        id=task_id,
+        estimated_duration_days=duration,
+        dependencies=deps,
+        wbs_level=wbs_level,
+        wbs_code=wbs_code,
+    )
+
+
+class TestParseDependencies:
+    """依赖解析"""
+
+    def test_string_list_and_invalid_input(self):
+        raw = [{"task_id": 1, "type": "ss", "lag": -2}, {"task_id": 2, "type": "XX"}, 3, {}]
+
+        expected = [(1, "SS", -2.0), (2, "FS", 0.0), (3, "FS", 0.0)]
+
+        assert parse_dependencies(json.dumps(raw)) == expected
+        assert parse_dependencies(raw) == expected
+        assert parse_dependencies("invalid json") == []
+        assert parse_dependencies({"task_id": 1}) == []
+
+
+class TestCPMGraph:
+    """正反向计算"""
+
+    def test_diamond_network(self):
+        # A(5) → B(3), A → C(4), B/C → D(2)：关键路径 A-C-D，工期 11
+        graph = CPMGraph("ABCD", [5, 3, 4, 2])
+        for task, pred in [("B", "A"), ("C", "A"), ("D", "B"), ("D", "C")]:
+            graph.add_dependency(task, pred)
+
+        result = graph.compute()
+
+        assert result.total_duration == 11
+        assert result.es == {"A": 0, "B": 5, "C": 5, "D": 9}
+        assert result.slack == {"A": 0, "B": 1, "C": 0, "D": 0}
+        assert result.critical_ids == ["A", "C", "D"]
+
+    @pytest.mark.parametrize(
+        "dep_type, lag, es_b",
+        [
+            ("FS", 2, 6),  # A 完成 2 天后 B 开始
+            ("FS", -1, 3),  # 提前 1 天
+            ("SS", 1, 1),  # A 开始 1 天后 B 开始
+            ("FF", 0, 1),  # 同时完成
+            ("SF", 5, 2),  # A 开始 5 天后 B 完成
+        ],
+    )
+    def test_dependency_types_with_lag(self, dep_type, lag, es_b):
+        graph = CPMGraph(["A", "B"], [4, 3])
+        graph.add_dependency("B", "A", dep_type, lag)
+
+        result = graph.compute()
+
+        assert result.es["B"] == es_b
+        assert result.total_duration == max(4, es_b + 3)
+        assert result.slack == {"A": 0, "B": 0}
+
+    def test_cycle_detection(self):
+        # 2 ↔ 3 成环，4 被环阻塞
+        tasks = [
+            _task(1, 2),
+            _task(2, 3, [{"task_id": 3}]),
+            _task(3, 1, [{"task_id": 2}]),
+            _task(4, 1, [{"task_id": 3}]),
+        ]
+
+        with pytest.raises(DependencyCycleError) as exc:
+            CPMGraph.from_tasks(tasks).compute()
+        assert exc.value.task_ids == [2, 3, 4]
+
+        result = CPMGraph.from_tasks(tasks).compute(strict=False)
+        assert result.cycle_task_ids == [2, 3, 4]
+        assert sorted(result.order) == [1, 2, 3, 4]
+        assert result.es[4] >= result.ef[3]
+
+
+class TestCallers:
+    """调用方使用真实拓扑序"""
+
+    def test_optimizer_ignores_wbs_order(self):
+        # WBS 编码顺序与依赖顺序相反：旧实现按 WBS 排序会得到错误的 ES
+        tasks = [
+            _task(1, 2, [{"task_id": 2, "type": "FS"}], wbs_code="1"),
+            _task(2, 3, [{"task_id": 3, "type": "FS", "lag": 1}], wbs_code="2"),
+            _task(3, 4, None, wbs_code="3"),
+        ]
+
+        result = AIScheduleOptimizer(MagicMock())._calculate_cpm(tasks, date(2031, 1, 1))
+
+        assert result["es"] == {3: 0, 2: 5, 1: 8}
+        assert result["total_duration"] == 10
+        assert result["end_date"] == "2031-01-11"
+        assert set(result["slack"].values()) == {0}
+
+    def test_schedule_generation_keeps_phase_buffers(self):
+        tasks = [
+            {"task_name": "设计", "duration": 3, "start_day": 0, "end_day": 2, "predecessors": []},
+            # 阶段间 1 天缓冲
+            {
+                "task_name": "采购",
+                "duration": 2,
+                "start_day": 4,
+                "end_day": 5,
+                "predecessors": ["设计"],
+            },
+        ]
+
+        result = ScheduleGenerationService(MagicMock())._calculate_critical_path(tasks)
+
+        assert result == {"total_days": 6, "critical_tasks": ["设计", "采购"]}
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+报表数据源并发解析测试
+
+测试目标文件:
+- app/services/report_framework/data_resolver.py - 依赖图、并发解析、耗时记录
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.services.report_framework.data_resolver import DataResolver
+from app.services.report_framework.data_sources.base import DataSource
+from app.services.report_framework.models import DataSourceConfig, DataSourceType
+
+
+class _SlowSource(DataSource):
+    """耗时 0.2 秒的数据源，返回所用会话和参数"""
+
+    def validate_config(self) -> None:
+        pass
+
+    def fetch(self, params):
+        time.sleep(0.2)
+        return [{"db": id(self.db), "args": dict(self.config.args)}]
+
+
+def _sources(**args_by_name):
+    return {
+        name: DataSourceConfig(type=DataSourceType.QUERY, sql="SELECT 1", args=args or {})
+        for name, args in args_by_name.items()
+    }
+
+
+def _session_factory():
+    sessions = []
+    lock = threading.Lock()
+
+    def create():
+        session = MagicMock()
+        with lock:
+            sessions.append(session)
+        return session
+
+    return create, sessions
+
+
+class TestDataResolverConcurrency:
+    """依赖感知的并发解析"""
+
+    def test_dependencies_only_reference_earlier_sources(self):
+        resolver = DataResolver(MagicMock())
+        sources = _sources(
+            a={},
+            b={"count": "{{ a | length }}", "late": "{{ c }}"},
+            c={"project_id": "{{ params.project_id }}"},
+        )
+
+        assert resolver.build_dependencies(sources) == {"a": [], "b": ["a"], "c": []}
+
+    def test_independent_sources_run_concurrently(self):
+        factory, sessions = _session_factory()
+        resolver = DataResolver(MagicMock(), session_factory=factory, max_workers=4)
+        sources = _sources(a={}, b={}, c={}, total={"n": "{{ a | length + b | length }}"})
+        timings = {}
+
+        with patch.dict(DataResolver.DATA_SOURCE_TYPES, {DataSourceType.QUERY: _SlowSource}):
+            started = time.perf_counter()
+            result = resolver.resolve_all(sources, {"project_id": 1}, timings=timings)
+            elapsed = time.perf_counter() - started
+
+        # a/b/c 并发，total 等待 a、b 后执行：约两轮耗时
+        assert elapsed < 0.6
+        assert list(result) == ["a", "b", "c", "total"]
+        assert result["total"][0]["args"] == {"n": 2}
+        assert len({row[0]["db"] for row in result.values()}) == 4
+        assert all(s.close.called for s in sessions)
+        assert timings["total"]["depends_on"] == ["a", "b"]
+        assert all(t["elapsed_ms"] >= 200 for t in timings.values())
+
+    def test_single_connection_database_resolves_sequentially(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        db = Session(bind=engine)
+        resolver = DataResolver(db, max_workers=4)
+
+        with patch.dict(DataResolver.DATA_SOURCE_TYPES, {DataSourceType.QUERY: _SlowSource}):
+            result = resolver.resolve_all(_sources(a={}, b={}), {})
+
+        assert resolver._get_session_factory() is None
+        assert {row[0]["db"] for row in result.values()} == {id(db)}
+        db.close()
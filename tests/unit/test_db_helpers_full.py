@@ -11,6 +11,7 @@ from fastapi import HTTPException
 from app.utils.db_helpers import (
     delete_obj,
     get_or_404,
+    in_chunks,
     safe_commit,
     save_obj,
     update_obj,
@@ -224,3 +225,16 @@ class TestSafeCommit:
         db = _make_db()
         safe_commit(db)
         db.rollback.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# in_chunks
+# ---------------------------------------------------------------------------
+
+
+class TestInChunks:
+    def test_dedups_skips_none_and_splits(self):
+        assert list(in_chunks([3, None, 1, 2, 3, 5], size=2)) == [[1, 2], [3, 5]]
+
+    def test_empty(self):
+        assert list(in_chunks([])) == []
@@ -535,41 +535,36 @@ class TestBatchForecastForProject(unittest.TestCase):
         self.mock_db = MagicMock(spec=Session)
         self.engine = DemandForecastEngine(self.mock_db)
 
-    @patch.object(DemandForecastEngine, "forecast_material_demand")
-    def test_batch_forecast_for_project_success(self, mock_forecast):
-        """测试批量预测成功"""
+    @patch.object(DemandForecastEngine, "batch_forecast_materials")
+    def test_batch_forecast_for_project_success(self, mock_batch):
+        """测试批量预测成功（项目物料整体交给向量化批量预测）"""
         # Mock物料ID查询
         mock_query = MagicMock()
         self.mock_db.query.return_value = mock_query
         mock_query.filter.return_value = mock_query
         mock_query.all.return_value = [(1,), (2,), (3,)]
 
-        # Mock forecast_material_demand
         mock_forecast_obj = MagicMock(spec=MaterialDemandForecast)
-        mock_forecast.return_value = mock_forecast_obj
+        mock_batch.return_value = [mock_forecast_obj] * 3
 
         result = self.engine.batch_forecast_for_project(project_id=100, forecast_horizon_days=30)
 
         # 验证结果
         self.assertEqual(len(result), 3)
-        self.assertEqual(mock_forecast.call_count, 3)
+        mock_batch.assert_called_once_with([1, 2, 3], forecast_horizon_days=30, project_id=100)
 
-    @patch.object(DemandForecastEngine, "forecast_material_demand")
-    def test_batch_forecast_for_project_partial_failure(self, mock_forecast):
-        """测试部分预测失败（应跳过错误继续）"""
+    @patch.object(DemandForecastEngine, "batch_forecast_materials")
+    def test_batch_forecast_for_project_skips_empty_material(self, mock_batch):
+        """测试未关联物料的工单被跳过"""
         mock_query = MagicMock()
         self.mock_db.query.return_value = mock_query
         mock_query.filter.return_value = mock_query
-        mock_query.all.return_value = [(1,), (2,), (3,)]
+        mock_query.all.return_value = [(1,), (None,), (3,)]
+        mock_batch.return_value = []
 
-        # 第2个预测失败
-        mock_forecast_obj = MagicMock(spec=MaterialDemandForecast)
-        mock_forecast.side_effect = [mock_forecast_obj, Exception("预测失败"), mock_forecast_obj]
-
-        result = self.engine.batch_forecast_for_project(project_id=100)
+        self.engine.batch_forecast_for_project(project_id=100)
 
-        # 应该有2个成功
-        self.assertEqual(len(result), 2)
+        self.assertEqual(mock_batch.call_args[0][0], [1, 3])
 
     @patch.object(DemandForecastEngine, "forecast_material_demand")
     def test_batch_forecast_for_project_no_materials(self, mock_forecast):
@@ -700,44 +695,35 @@ class TestGenerateForecastNo(unittest.TestCase):
         self.mock_db = MagicMock(spec=Session)
         self.engine = DemandForecastEngine(self.mock_db)
 
-    def test_generate_forecast_no_first_of_day(self):
+    @patch("app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=1)
+    def test_generate_forecast_no_first_of_day(self, mock_alloc):
         """测试当天第一个预测"""
-        mock_query = MagicMock()
-        self.mock_db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.scalar.return_value = 0
-
         result = self.engine._generate_forecast_no()
 
         today = datetime.now().strftime("%Y%m%d")
         expected = f"FC{today}0001"
         self.assertEqual(result, expected)
+        mock_alloc.assert_called_once_with(
+            self.mock_db, MaterialDemandForecast, "forecast_no", f"FC{today}", 1
+        )
 
-    def test_generate_forecast_no_sequential(self):
+    @patch("app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=6)
+    def test_generate_forecast_no_sequential(self, mock_alloc):
         """测试顺序编号"""
-        mock_query = MagicMock()
-        self.mock_db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.scalar.return_value = 5
-
         result = self.engine._generate_forecast_no()
 
         today = datetime.now().strftime("%Y%m%d")
         expected = f"FC{today}0006"
         self.assertEqual(result, expected)
 
-    def test_generate_forecast_no_none_count(self):
-        """测试count为None"""
-        mock_query = MagicMock()
-        self.mock_db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.scalar.return_value = None
-
-        result = self.engine._generate_forecast_no()
+    @patch("app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=3)
+    def test_generate_forecast_nos_batch(self, mock_alloc):
+        """测试批量分配连续编号"""
+        result = self.engine._generate_forecast_nos(3)
 
         today = datetime.now().strftime("%Y%m%d")
-        expected = f"FC{today}0001"
-        self.assertEqual(result, expected)
+        self.assertEqual(result, [f"FC{today}0003", f"FC{today}0004", f"FC{today}0005"])
+        self.assertEqual(mock_alloc.call_args[0][-1], 3)
 
 
 class TestCollectHistoricalDemand(unittest.TestCase):
@@ -11,6 +11,8 @@ from decimal import Decimal
 from typing import List
 from unittest.mock import MagicMock, Mock, patch
 
+import numpy as np
+
 from app.core.exceptions import BusinessException
 from app.models.shortage.smart_alert import MaterialDemandForecast
 from app.services.shortage.demand_forecast_engine import DemandForecastEngine
@@ -430,9 +432,9 @@ class TestDemandForecastEngine(unittest.TestCase):
 
     def test_generate_forecast_no_first_of_day(self):
         """测试：生成当天第一个预测编号"""
-        self.mock_db.query.return_value.filter.return_value.scalar.return_value = 0
-
-        with patch("app.services.shortage.demand_forecast_engine.datetime") as mock_datetime:
+        with patch("app.services.shortage.demand_forecast_engine.datetime") as mock_datetime, patch(
+            "app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=1
+        ):
             mock_datetime.now.return_value.strftime.return_value = "20260221"
             mock_datetime.now.return_value.date.return_value = date(2026, 2, 21)
 
@@ -442,9 +444,9 @@ class TestDemandForecastEngine(unittest.TestCase):
 
     def test_generate_forecast_no_multiple_forecasts(self):
         """测试：生成当天多个预测编号"""
-        self.mock_db.query.return_value.filter.return_value.scalar.return_value = 5
-
-        with patch("app.services.shortage.demand_forecast_engine.datetime") as mock_datetime:
+        with patch("app.services.shortage.demand_forecast_engine.datetime") as mock_datetime, patch(
+            "app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=6
+        ):
             mock_datetime.now.return_value.strftime.return_value = "20260221"
             mock_datetime.now.return_value.date.return_value = date(2026, 2, 21)
 
@@ -454,42 +456,52 @@ class TestDemandForecastEngine(unittest.TestCase):
 
     # ========== 批量预测测试 ==========
 
-    @patch("app.services.shortage.demand_forecast_engine.save_obj")
-    def test_batch_forecast_for_project_success(self, mock_save):
-        """测试：项目批量预测成功"""
+    def test_batch_forecast_for_project_success(self):
+        """测试：项目批量预测成功（一次写入）"""
         mock_material_ids = [(1,), (2,), (3,)]
         self.mock_db.query.return_value.filter.return_value.all.return_value = mock_material_ids
 
-        historical_data = [Decimal("10"), Decimal("20"), Decimal("30")]
+        historical_matrix = np.array([[10.0, 20.0, 30.0], [0.0, 0.0, 0.0], [5.0, 5.0, 5.0]])
 
-        with patch.object(self.engine, "_collect_historical_demand", return_value=historical_data):
+        with patch.object(
+            self.engine, "_collect_historical_demand_matrix", return_value=historical_matrix
+        ):
             with patch.object(
-                self.engine, "_generate_forecast_no", side_effect=["FC001", "FC002", "FC003"]
+                self.engine, "_generate_forecast_nos", return_value=["FC001", "FC002", "FC003"]
             ):
                 forecasts = self.engine.batch_forecast_for_project(project_id=100)
 
         self.assertEqual(len(forecasts), 3)
         self.assertTrue(all(isinstance(f, MaterialDemandForecast) for f in forecasts))
+        self.assertEqual([f.forecast_no for f in forecasts], ["FC001", "FC002", "FC003"])
+        self.mock_db.add_all.assert_called_once_with(forecasts)
+        self.mock_db.commit.assert_called_once()
 
-    @patch("app.services.shortage.demand_forecast_engine.save_obj")
-    def test_batch_forecast_for_project_partial_failure(self, mock_save):
-        """测试：部分物料预测失败"""
-        mock_material_ids = [(1,), (2,)]
-        self.mock_db.query.return_value.filter.return_value.all.return_value = mock_material_ids
+    def test_batch_forecast_for_project_fallback_per_material(self):
+        """测试：批量预测失败时逐个物料预测，单个失败不影响其他物料"""
+        self.mock_db.query.return_value.filter.return_value.all.return_value = [(1,), (2,), (3,)]
+        ok = MagicMock(spec=MaterialDemandForecast)
 
-        def mock_collect_side_effect(material_id, days, project_id):
-            if material_id == 1:
-                return [Decimal("10"), Decimal("20")]
-            else:
-                return []  # Will cause BusinessException
+        def single(material_id, **kwargs):
+            if material_id == 2:
+                raise BusinessException("历史数据不足")
+            return ok
 
         with patch.object(
-            self.engine, "_collect_historical_demand", side_effect=mock_collect_side_effect
-        ):
-            with patch.object(self.engine, "_generate_forecast_no", return_value="FC001"):
-                forecasts = self.engine.batch_forecast_for_project(project_id=100)
+            self.engine, "batch_forecast_materials", side_effect=RuntimeError("boom")
+        ), patch.object(self.engine, "forecast_material_demand", side_effect=single) as mock_one:
+            forecasts = self.engine.batch_forecast_for_project(project_id=100)
+
+        self.assertEqual(forecasts, [ok, ok])
+        self.assertEqual(mock_one.call_count, 3)
+        self.mock_db.rollback.assert_called_once()
+
+    def test_batch_forecast_materials_invalid_algorithm(self):
+        """测试：批量预测不支持的算法"""
+        with self.assertRaises(BusinessException):
+            self.engine.batch_forecast_materials([1, 2], algorithm="UNKNOWN")
 
-        self.assertEqual(len(forecasts), 1)  # Only material 1 succeeded
+        self.mock_db.add_all.assert_not_called()
 
     def test_batch_forecast_for_project_no_materials(self):
         """测试：项目无物料"""
@@ -9,6 +9,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 from app.services.shortage.demand_forecast_engine import DemandForecastEngine
@@ -134,26 +135,21 @@ class TestConfidenceIntervalBranches:
 
 
 class TestBatchForecastForProject:
-    @patch("app.services.shortage.demand_forecast_engine.save_obj")
-    def test_batch_forecast_skips_failed_materials(self, mock_save, engine):
-        """失败的物料预测被跳过，不影响其他"""
-        from app.core.exceptions import BusinessException
+    def test_batch_forecast_dedupes_materials(self, engine):
+        """同一物料多张工单只预测一次"""
+        engine.db.query.return_value.filter.return_value.all.return_value = [(1,), (2,), (1,)]
 
-        engine.db.query.return_value.filter.return_value.all.return_value = [(1,), (2,), (3,)]
+        with patch.object(engine, "batch_forecast_materials", return_value=[]) as batch:
+            engine.batch_forecast_for_project(project_id=1)
+        batch.assert_called_once()
 
-        call_count = [0]
+        with patch.object(
+            engine, "_collect_historical_demand_matrix", return_value=np.zeros((2, 90))
+        ) as collect, patch.object(engine, "_generate_forecast_nos", return_value=["A", "B"]):
+            result = engine.batch_forecast_materials([1, 2, 1])
 
-        def forecast_side(material_id, **kwargs):
-            call_count[0] += 1
-            if material_id == 2:
-                raise BusinessException("历史数据不足")
-            mock = MagicMock()
-            return mock
-
-        engine.forecast_material_demand = forecast_side
-
-        result = engine.batch_forecast_for_project(project_id=1)
-        assert len(result) == 2  # 1 and 3 succeed, 2 fails
+        assert collect.call_args[0][0] == [1, 2]
+        assert [f.material_id for f in result] == [1, 2]
 
     def test_batch_forecast_empty_project(self, engine):
         """项目无物料时返回空列表"""
@@ -235,12 +231,12 @@ class TestGetForecastAccuracyReport:
 
 class TestGenerateForecastNo:
     def test_generates_formatted_no(self, engine):
-        engine.db.query.return_value.filter.return_value.scalar.return_value = 0
-        no = engine._generate_forecast_no()
+        with patch("app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=1):
+            no = engine._generate_forecast_no()
         assert no.startswith("FC")
         assert len(no) > 8
 
     def test_increments_counter(self, engine):
-        engine.db.query.return_value.filter.return_value.scalar.return_value = 3
-        no = engine._generate_forecast_no()
+        with patch("app.services.shortage.demand_forecast_engine.allocate_sequence", return_value=4):
+            no = engine._generate_forecast_no()
         assert no.endswith("0004")
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Excel 流式导出测试
+
+测试目标文件:
+- app/services/report_framework/renderers/excel_stream.py - 只写工作簿、命名样式、分块下发
+- app/services/excel_export_service.py - stream_to_excel
+- app/services/report_framework/renderers/excel_renderer.py - 只写模式渲染
+- app/api/v1/endpoints/data_import_export/export_timesheet.py - 工时流式导出
+"""
+
+import asyncio
+import io
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from openpyxl import load_workbook
+from sqlalchemy import text
+
+from app.api.v1.endpoints.data_import_export.export_timesheet import export_timesheet
+from app.models.timesheet import Timesheet
+from app.schemas.data_import_export import ExportTimesheetRequest
+from app.services.excel_export_service import ExcelExportService
+from app.services.report_framework.renderers.excel_renderer import ExcelRenderer
+from app.services.report_framework.renderers.excel_stream import iter_file_chunks
+
+
+def _load(chunks):
+    return load_workbook(io.BytesIO(b"".join(chunks))).active
+
+
+class TestStreamToExcel:
+    """只写工作表导出"""
+
+    def test_generator_rows_written_with_cached_styles(self):
+        def rows():
+            yield {"name": "张三", "day": date(2025, 1, 2), "amount": Decimal("1.50")}
+            yield {"name": None, "day": datetime(2025, 1, 3, 8, 0), "amount": 2}
+
+        columns = [
+            {"key": "name", "label": "姓名", "width": 20},
+            {"key": "day", "label": "日期"},
+            {"key": "amount", "label": "金额", "format": lambda v: v * 2},
+        ]
+
+        ws = _load(ExcelExportService().stream_to_excel(rows(), columns, "数据", title="标题"))
+
+        assert ws.title == "数据"
+        assert [list(r) for r in ws.iter_rows(values_only=True)] == [
+            ["标题", None, None],
+            ["姓名", "日期", "金额"],
+            ["张三", "2025-01-02", 3],
+            [None, "2025-01-03 08:00:00", 4],
+        ]
+        assert [str(r) for r in ws.merged_cells.ranges] == ["A1:C1"]
+        assert ws["A2"].font.b and ws["C2"].fill.fgColor.rgb == "00366092"
+        assert ws.column_dimensions["A"].width == 20
+        assert ws.column_dimensions["B"].width == 15
+
+    def test_file_chunks_removed_after_reading(self, tmp_path):
+        path = tmp_path / "x.xlsx"
+        path.write_bytes(b"a" * 10)
+
+        assert list(iter_file_chunks(str(path), chunk_size=4)) == [b"aaaa", b"aaaa", b"aa"]
+        assert not os.path.exists(path)
+
+
+class TestExcelRendererWriteOnly:
+    """报表 Excel 渲染"""
+
+    def test_layout_and_styles(self, tmp_path):
+        sections = [
+            {"type": "metrics", "title": "指标", "items": [{"label": "数量", "value": 5}]},
+            {
+                "type": "table",
+                "columns": [{"field": "a", "label": "甲"}],
+                "data": [{"a": 1}, {"a": None}],
+            },
+        ]
+
+        result = ExcelRenderer(output_dir=str(tmp_path)).render(sections, {"name": "周报"})
+        ws = load_workbook(result.file_path).active
+
+        values = [row[0] for row in ws.iter_rows(values_only=True)]
+        assert values[0] == "周报" and values[1].startswith("生成时间")
+        assert values[3:] == ["指标", "数量", "5", None, None, "甲", 1, None, None][: len(values) - 3]
+        assert {str(r) for r in ws.merged_cells.ranges} == {"A1:F1", "A2:F2", "A4:F4"}
+        assert ws["A9"].font.b and ws["A9"].fill.fgColor.rgb == "00336699"
+        assert ws["A11"].fill.fgColor.rgb == "00F5F5F5"
+        assert ws.column_dimensions["F"].width == 8
+
+
+class TestTimesheetExport:
+    """工时流式导出接口"""
+
+    def test_export_streams_selected_rows(self, db_session):
+        db_session.execute(text("PRAGMA foreign_keys=OFF"))
+        db_session.add_all(
+            [
+                Timesheet(
+                    user_id=1,
+                    user_name=f"用户{i}",
+                    work_date=date(2025, 1, 1 + i),
+                    hours=Decimal("7.5"),
+                    status="APPROVED",
+                )
+                for i in range(3)
+            ]
+        )
+        db_session.commit()
+
+        response = export_timesheet(
+            db=db_session,
+            export_in=ExportTimesheetRequest(
+                start_date=date(2025, 1, 2), end_date=date(2025, 1, 31)
+            ),
+            current_user=None,
+        )
+        async def collect():
+            return [chunk async for chunk in response.body_iterator]
+
+        ws = _load(asyncio.run(collect()))
+
+        assert "filename*=UTF-8''" in response.headers["content-disposition"]
+        rows = list(ws.iter_rows(values_only=True))
+        assert rows[0][:3] == ("工作日期", "人员姓名", "部门")
+        assert [(r[0], r[1], r[6], r[14]) for r in rows[1:]] == [
+            ("2025-01-02", "用户1", 7.5, "已通过"),
+            ("2025-01-03", "用户2", 7.5, "已通过"),
+        ]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+条件表达式编译缓存测试
+
+测试目标文件:
+- app/common/expression_cache.py - LRU 编译缓存
+- app/services/approval_engine/condition_parser.py - 编译一次、批量评估
+- app/services/alert_rule_engine/condition_evaluator.py - 自定义表达式 AST 缓存与批量匹配
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from simpleeval import SimpleEval
+
+from app.common.expression_cache import CompiledExpressionCache, compiled_expressions
+from app.services.alert_rule_engine.condition_evaluator import (
+    ConditionEvaluator as AlertConditionEvaluator,
+)
+from app.services.approval_engine.condition_parser import ConditionEvaluator, ConditionParseError
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    compiled_expressions.clear()
+    yield
+    compiled_expressions.clear()
+
+
+class TestCompiledExpressionCache:
+    """LRU 缓存"""
+
+    def test_compile_once_and_evict_oldest(self):
+        cache = CompiledExpressionCache(max_size=2)
+        compile_a = MagicMock(return_value="A")
+
+        assert cache.get_or_compile("a", compile_a) == "A"
+        assert cache.get_or_compile("a", compile_a) == "A"
+        cache.get_or_compile("b", lambda: "B")
+        cache.get_or_compile("c", lambda: "C")
+
+        assert compile_a.call_count == 1
+        assert len(cache) == 2
+        assert cache.get_or_compile("a", lambda: "A2") == "A2"
+        assert cache.stats()["hits"] == 1
+
+    def test_failed_compile_not_cached(self):
+        cache = CompiledExpressionCache()
+
+        with pytest.raises(ValueError):
+            cache.get_or_compile("x", MagicMock(side_effect=ValueError("bad")))
+
+        assert len(cache) == 0
+
+
+class TestApprovalConditionCompile:
+    """审批条件表达式"""
+
+    def test_each_syntax_compiled_once_across_instances(self):
+        expressions = [
+            "{{ items | length }}",
+            '{"operator": "AND", "items": [{"field": "form.days", "op": "<=", "value": 3}]}',
+            "form.days <= 3 AND form.type IN (A, B)",
+        ]
+        context = {"items": [1, 2], "form": {"days": 2, "type": "A"}}
+
+        first = [ConditionEvaluator().evaluate(e, context) for e in expressions]
+        second = [ConditionEvaluator().evaluate(e, context) for e in expressions]
+
+        assert first == second == [2, True, True]
+        assert compiled_expressions.stats() == {"size": 3, "hits": 3, "misses": 3}
+
+    def test_evaluate_many_matches_evaluate(self):
+        evaluator = ConditionEvaluator()
+        contexts = [{"amount": v} for v in (50, 100, 150, None)]
+
+        results = evaluator.evaluate_many("amount >= 100", contexts)
+
+        assert results == [evaluator.evaluate("amount >= 100", c) for c in contexts]
+        assert results == [False, True, True, False]
+        assert evaluator.evaluate_many("", contexts) == [None] * 4
+
+    def test_errors_still_raised(self):
+        evaluator = ConditionEvaluator()
+
+        with pytest.raises(ConditionParseError):
+            evaluator.evaluate("{{ broken ", {})
+        with pytest.raises(ConditionParseError):
+            evaluator.evaluate("{{ missing }}", {})
+        assert len(compiled_expressions) == 1
+
+
+class TestAlertCustomExpression:
+    """预警自定义表达式"""
+
+    def test_batch_parses_once(self):
+        evaluator = AlertConditionEvaluator()
+        rule = MagicMock(rule_type="CUSTOM", condition_expr="progress < 50 and days_delay > limit")
+        targets = [
+            {"progress": 30, "days_delay": 5},
+            {"progress": 60, "days_delay": 5},
+            {"progress": 10},
+        ]
+
+        with patch(
+            "app.services.alert_rule_engine.condition_evaluator.SimpleEval.parse",
+            wraps=SimpleEval.parse,
+        ) as parse:
+            results = evaluator.check_condition_many(rule, targets, {"limit": 3})
+            single = evaluator.match_custom_expr(rule, targets[0], {"limit": 3})
+
+        assert results == [True, False, False]
+        assert single is True
+        assert parse.call_count == 1
+
+    def test_invalid_expression_returns_false(self):
+        evaluator = AlertConditionEvaluator()
+        rule = MagicMock(rule_type="CUSTOM", condition_expr="invalid syntax $$$")
+
+        assert evaluator.check_condition_many(rule, [{}, {}]) == [False, False]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+项目健康度批量计算（集合运算）测试
+
+测试目标文件:
+- app/services/health_calculator.py - batch_calculate 分组聚合、批量落库
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models.enums import ProjectHealthEnum
+from app.models.issue import Issue, IssueTypeEnum
+from app.models.progress import Task
+from app.models.project import Project, ProjectMilestone, ProjectStatusLog
+from app.models.user import User
+from app.services.health_calculator import HealthCalculator
+
+
+@pytest.fixture
+def projects(db_session):
+    db_session.add(User(id=1, username="reporter", password_hash="x"))
+    items = [
+        Project(id=1, project_code="PJ-B-001", project_name="正常", status="ST01", health="H1"),
+        Project(id=2, project_code="PJ-B-002", project_name="结项", status="ST30", health="H1"),
+        Project(id=3, project_code="PJ-B-003", project_name="阻塞任务", status="ST01", health="H1"),
+        Project(id=4, project_code="PJ-B-004", project_name="阻塞问题", status="ST01", health="H1"),
+        Project(id=5, project_code="PJ-B-005", project_name="逾期里程碑", status="ST01", health="H1"),
+        Project(id=6, project_code="PJ-B-006", project_name="高优问题", status="ST01", health="H2"),
+        Project(id=7, project_code="PJ-B-007", project_name="整改", status="ST22", health="H2"),
+    ]
+    db_session.add_all(items)
+    db_session.flush()
+    db_session.add_all(
+        [
+            Task(project_id=3, task_name="阻塞任务", status="BLOCKED"),
+            Task(project_id=1, task_name="正常任务", status="IN_PROGRESS"),
+            Issue(
+                project_id=4,
+                issue_type=IssueTypeEnum.BLOCKER.value,
+                priority="LOW",
+                status="OPEN",
+                title="阻塞",
+                description="阻塞",
+                reporter_id=1,
+                report_date=datetime.now(),
+            ),
+            Issue(
+                project_id=6,
+                issue_type=IssueTypeEnum.DEFECT.value,
+                priority="HIGH",
+                status="IN_PROGRESS",
+                title="高优",
+                description="高优",
+                reporter_id=1,
+                report_date=datetime.now(),
+            ),
+            ProjectMilestone(
+                project_id=5,
+                milestone_name="关键节点",
+                planned_date=date.today() - timedelta(days=3),
+                status="IN_PROGRESS",
+                is_key=True,
+            ),
+        ]
+    )
+    db_session.commit()
+    return items
+
+
+class TestBatchCalculate:
+    """批量模式与逐项目计算结果一致"""
+
+    def test_matches_per_project_calculation(self, db_session, projects):
+        calculator = HealthCalculator(db_session)
+        expected = {p.id: calculator.calculate_health(p) for p in projects}
+
+        result = calculator.batch_calculate(auto_save=False, batch_size=3)
+
+        assert result["total"] == len(projects)
+        assert {d["project_id"]: d["new_health"] for d in result["details"]} == expected
+        assert expected == {
+            1: ProjectHealthEnum.H1.value,
+            2: ProjectHealthEnum.H4.value,
+            3: ProjectHealthEnum.H3.value,
+            4: ProjectHealthEnum.H3.value,
+            5: ProjectHealthEnum.H2.value,
+            6: ProjectHealthEnum.H2.value,
+            7: ProjectHealthEnum.H2.value,
+        }
+
+    def test_saves_only_changed_rows(self, db_session, projects):
+        result = HealthCalculator(db_session).batch_calculate(batch_size=2)
+
+        assert result["updated"] == 4
+        assert result["unchanged"] == 3
+        healths = dict(db_session.query(Project.id, Project.health).all())
+        assert healths[3] == ProjectHealthEnum.H3.value
+        assert healths[5] == ProjectHealthEnum.H2.value
+        logs = db_session.query(ProjectStatusLog).all()
+        assert sorted(log.project_id for log in logs) == [2, 3, 4, 5]
+        assert all(log.change_type == "HEALTH_AUTO_CALCULATED" for log in logs)
+
+    def test_query_count_independent_of_project_count(self, db_session, projects):
+        statements = []
+
+        def _count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            HealthCalculator(db_session).batch_calculate(auto_save=False, batch_size=100)
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+        # 1 次项目分页 + 4 次分组聚合
+        assert len(statements) == 5
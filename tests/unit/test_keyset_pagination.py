@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+游标分页与计数模式测试
+
+测试目标文件:
+- app/common/pagination.py - 游标编解码、keyset 条件、计数模式
+- app/common/crud/sync_filters.py - 通用列表查询的游标分页
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from math import ceil
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.common.pagination import (
+    apply_keyset_pagination,
+    decode_cursor,
+    encode_cursor,
+    get_pagination_params,
+    get_pagination_query,
+)
+from app.models.material import Material
+from app.models.timesheet import Timesheet
+from app.services.material_service import MaterialService
+from app.services.timesheet_records.service import TIMESHEET_LIST_ORDER_BY
+
+USER_ID = 9501
+
+
+def _walk(query, order_by, page_size):
+    """按游标逐页取数，返回每页 id 列表"""
+    pages, cursor = [], ""
+    while cursor is not None:
+        pagination = get_pagination_params(page_size=page_size, cursor=cursor)
+        rows = apply_keyset_pagination(query, order_by, pagination.cursor, pagination.limit).all()
+        response = pagination.to_response(rows, None, order_by)
+        pages.append([r.id for r in response["items"]])
+        cursor = response["next_cursor"]
+        assert response["has_more"] is (cursor is not None)
+    return pages
+
+
+class TestCursorEncoding:
+    """游标编解码"""
+
+    def test_round_trip_typed_values(self):
+        values = [date(2031, 1, 2), datetime(2031, 1, 2, 3, 4, 5, 6), Decimal("1.50"), None, 7]
+
+        keys, decoded = decode_cursor(encode_cursor(["a", "b", "c", "d", "id"], values))
+
+        assert keys == ["a", "b", "c", "d", "id"]
+        assert decoded == values
+        assert decode_cursor("") is None
+
+    @pytest.mark.parametrize("cursor", ["%%%", "bm90IGpzb24", encode_cursor(["id"], [])[:-2]])
+    def test_invalid_cursor_rejected(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+        with pytest.raises(HTTPException) as exc:
+            get_pagination_query(page=1, page_size=10, cursor=cursor, count_mode="exact")
+        assert exc.value.status_code == 400
+
+    def test_cursor_mode_ignores_page(self):
+        pagination = get_pagination_params(page=5, page_size=10, cursor="")
+
+        assert (pagination.is_keyset, pagination.page, pagination.offset) == (True, 1, 0)
+        assert not get_pagination_params(page=5, page_size=10).is_keyset
+
+
+class TestKeysetPagination:
+    """游标分页结果与 OFFSET 排序一致"""
+
+    @pytest.fixture
+    def timesheets(self, db_session):
+        # 同日多条、created_at 含 NULL，覆盖并列与空值排序
+        rows = [
+            Timesheet(
+                user_id=USER_ID,
+                work_date=date(2031, 5, day),
+                hours=Decimal("1"),
+                created_at=created_at,
+            )
+            for day, created_at in [
+                (1, datetime(2031, 5, 1, 9)),
+                (1, datetime(2031, 5, 1, 9)),
+                (1, None),
+                (2, None),
+                (2, datetime(2031, 5, 2, 8)),
+                (3, datetime(2031, 5, 3, 8)),
+                (3, datetime(2031, 5, 3, 10)),
+            ]
+        ]
+        db_session.add_all(rows)
+        db_session.flush()
+        return rows
+
+    @pytest.mark.parametrize("page_size", [1, 2, 3, 7, 8])
+    def test_walk_matches_offset_order(self, db_session, timesheets, page_size):
+        query = db_session.query(Timesheet).filter(Timesheet.user_id == USER_ID)
+        expected = [t.id for t in query.order_by(*TIMESHEET_LIST_ORDER_BY).all()]
+
+        pages = _walk(query, TIMESHEET_LIST_ORDER_BY, page_size)
+
+        assert [i for page in pages for i in page] == expected
+        assert all(len(page) <= page_size for page in pages)
+        # 最后一页恰好 page_size 条时不再返回空的下一页
+        assert len(pages) == ceil(len(expected) / page_size)
+
+    def test_cursor_for_other_sort_rejected(self, db_session, timesheets):
+        query = db_session.query(Timesheet).filter(Timesheet.user_id == USER_ID)
+        cursor = encode_cursor(["id"], [timesheets[0].id])
+
+        with pytest.raises(HTTPException) as exc:
+            apply_keyset_pagination(query, TIMESHEET_LIST_ORDER_BY, cursor, 2)
+        assert exc.value.status_code == 400
+
+    def test_count_modes(self, db_session, timesheets):
+        query = db_session.query(Timesheet).filter(Timesheet.user_id == USER_ID)
+
+        assert get_pagination_params(count_mode="exact").count(query) == 7
+        assert get_pagination_params(count_mode="none").count(query) is None
+        with patch("app.core.config.settings.PAGINATION_COUNT_ESTIMATE_CAP", 5):
+            estimate = get_pagination_params(count_mode="estimate")
+            total = estimate.count(query)
+            assert (total, estimate.total_estimated(total)) == (5, True)
+            response = estimate.to_response([], total)
+        assert (response["pages"], response["total_estimated"]) == (1, True)
+
+
+class TestCrudServiceCursor:
+    """通用 CRUD 服务的游标分页"""
+
+    def test_material_list_walks_all_pages(self, db_session):
+        db_session.add_all(
+            [Material(material_code=f"KS-CUR-{i:02d}", material_name="游标物料") for i in range(5)]
+        )
+        db_session.flush()
+        service = MaterialService(db_session)
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            result = service.list_materials(
+                page_size=2, keyword="KS-CUR-", cursor=cursor, count_mode="none"
+            )
+            assert result["total"] is None and result["pages"] is None
+            seen.extend(item.material_code for item in result["items"])
+            cursor = result["next_cursor"]
+            assert result["has_more"] is (cursor is not None)
+
+        assert sorted(seen) == [f"KS-CUR-{i:02d}" for i in range(5)]
+        assert len(seen) == 5
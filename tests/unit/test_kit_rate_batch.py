@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+齐套率批量计算测试
+
+测试目标文件:
+- app/services/kit_rate/kit_rate_batch.py - 批量加载机台/BOM/明细/在途数量
+- app/services/kit_rate/kit_rate_service.py - 看板批量计算与快照
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event, text
+
+from app.models.material import BomHeader, BomItem, Material
+from app.models.project import Machine, Project
+from app.models.purchase import PurchaseOrderItem
+from app.services.kit_rate import KitRateService
+from app.services.kit_rate.kit_rate_service import DASHBOARD_SNAPSHOT_KEY
+
+
+def _seed_project(db, pid, stock):
+    """每个项目 2 台机台，每台 BOM 2 行明细"""
+    db.add(Project(id=pid, project_code=f"P{pid:03d}", project_name=f"项目{pid}"))
+    for m in range(2):
+        machine_id = pid * 10 + m
+        bom_id = machine_id
+        material_id = machine_id
+        db.add(
+            Machine(id=machine_id, project_id=pid, machine_code=f"M{machine_id}", machine_name="机台")
+        )
+        db.add(
+            BomHeader(
+                id=bom_id,
+                bom_no=f"B{bom_id}",
+                bom_name="BOM",
+                project_id=pid,
+                machine_id=machine_id,
+            )
+        )
+        db.add(
+            Material(
+                id=material_id,
+                material_code=f"MAT{material_id}",
+                material_name="物料",
+                current_stock=stock,
+            )
+        )
+        for item_no in range(2):
+            db.add(
+                BomItem(
+                    bom_id=bom_id,
+                    item_no=item_no,
+                    material_id=material_id,
+                    material_code=f"MAT{material_id}",
+                    material_name="物料",
+                    quantity=10,
+                )
+            )
+        db.add(
+            PurchaseOrderItem(
+                order_id=1,
+                item_no=machine_id,
+                material_id=material_id,
+                material_code=f"MAT{material_id}",
+                material_name="物料",
+                quantity=8,
+                received_qty=2,
+                status="ORDERED",
+            )
+        )
+
+
+@pytest.fixture
+def seeded(db_session):
+    db_session.execute(text("PRAGMA foreign_keys=OFF"))
+    for pid, stock in [(1, 20), (2, 5), (3, 0)]:
+        _seed_project(db_session, pid, stock)
+    db_session.commit()
+    return db_session
+
+
+def _count_selects(db):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_execute)
+    return statements
+
+
+class TestKitRateBatch:
+    """批量计算与单项目计算结果一致"""
+
+    def test_dashboard_matches_per_project_results(self, seeded):
+        service = KitRateService(seeded)
+        expected = {pid: service.get_project_kit_rate(pid, "quantity") for pid in (1, 2, 3)}
+
+        dashboard = service.get_dashboard(project_ids=[1, 2, 3])
+
+        by_id = {row["project_id"]: row for row in dashboard["projects"]}
+        for pid, data in expected.items():
+            assert by_id[pid]["kit_rate"] == data["kit_rate"]
+            assert by_id[pid]["kit_status"] == data["kit_status"]
+        # 在途 = 订购 8 - 已收 2；库存 5 + 在途 6 >= 10 视为齐套，库存 0 仅在途
+        assert expected[2]["fulfilled_items"] == 4
+        assert expected[3]["in_transit_items"] == 4
+        assert dashboard["summary"]["total_projects"] == 3
+
+    def test_query_count_independent_of_project_count(self, seeded):
+        service = KitRateService(seeded)
+        selects = _count_selects(seeded)
+
+        service.get_dashboard(project_ids=[1])
+        single = len(selects)
+        selects.clear()
+        seeded.expire_all()
+        service.get_dashboard(project_ids=[1, 2, 3])
+
+        assert len(selects) == single
+
+
+class TestDashboardSnapshot:
+    """看板快照"""
+
+    def test_snapshot_served_from_cache(self, seeded):
+        cache = MagicMock()
+        cache.get.return_value = None
+        service = KitRateService(seeded)
+
+        with patch(
+            "app.services.kit_rate.kit_rate_service.get_cache_service", return_value=cache
+        ):
+            built = service.get_dashboard(use_snapshot=True)
+            cache.get.return_value = {"cached": True}
+            served = service.get_dashboard(use_snapshot=True)
+
+        assert "snapshot_at" in built
+        assert cache.set.call_args[0][0] == DASHBOARD_SNAPSHOT_KEY
+        assert served == {"cached": True}
@@ -331,7 +331,7 @@ class TestGetMachineKitRate:
         # Setup mock queries
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             if call_count[0] == 0:  # Machine query
@@ -359,7 +359,7 @@ class TestGetMachineKitRate:
 
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             if call_count[0] == 0:  # Machine query
@@ -393,7 +393,7 @@ class TestGetProjectKitRate:
 
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
 
@@ -476,7 +476,7 @@ class TestListBomItems:
 
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             if call_count[0] == 0:
@@ -499,7 +499,7 @@ class TestListBomItems:
 
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             if call_count[0] == 0:
@@ -538,7 +538,7 @@ class TestGetMachineMaterialStatus:
 
         call_count = [0]
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             if call_count[0] == 0:
@@ -575,7 +575,7 @@ class TestGetDashboard:
         mock_db = MagicMock()
         mock_project = MockProject()
 
-        def mock_query_side_effect(model):
+        def mock_query_side_effect(model, *columns):
             mock_q = MagicMock()
             mock_q.filter.return_value = mock_q
             mock_q.all.return_value = [mock_project]
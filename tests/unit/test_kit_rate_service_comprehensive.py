@@ -218,26 +218,27 @@ class TestListBomItemsForProject:
         mock_item1 = MagicMock()
         mock_item2 = MagicMock()
 
-        mock_bom1 = MagicMock()
-        mock_bom1.items.all.return_value = [mock_item1]
-        mock_bom2 = MagicMock()
-        mock_bom2.items.all.return_value = [mock_item2]
+        mock_bom1 = MagicMock(id=11)
+        mock_bom2 = MagicMock(id=12)
 
-        # 设置查询返回
+        # 机台、BOM、明细由 KitRateBatch 批量加载
+        from app.services.kit_rate import KitRateBatch
+
+        batch = KitRateBatch(
+            machines={1: [mock_machine1, mock_machine2]},
+            boms={1: mock_bom1, 2: mock_bom2},
+            items={11: [mock_item1], 12: [mock_item2]},
+            in_transit={},
+        )
         mock_db.query.return_value.filter.return_value.first.return_value = mock_project
-        mock_db.query.return_value.filter.return_value.all.return_value = [
-            mock_machine1,
-            mock_machine2,
-        ]
-        mock_db.query.return_value.filter.return_value.filter.return_value.first.side_effect = [
-            mock_bom1,
-            mock_bom2,
-        ]
 
         service = KitRateService(mock_db)
 
-        result = service.list_bom_items_for_project(1)
+        with patch.object(KitRateBatch, "load", return_value=batch) as load:
+            result = service.list_bom_items_for_project(1)
 
+        load.assert_called_once_with(mock_db, [1])
+        assert result == [mock_item1, mock_item2]
         assert len(result) == 2
 
     def test_returns_empty_for_no_machines(self):
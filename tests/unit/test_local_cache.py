@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+进程内一级缓存测试
+
+测试目标文件:
+- app/services/local_cache.py - LRU/TTL、标签清除、命名空间统计、失效广播
+- app/services/cache_service.py - 两级读取、标签版本失效、跨 worker 失效
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from unittest.mock import patch
+
+import pytest
+
+from app.services.cache_service import TAG_VERSION_TTL, CacheService
+from app.services.local_cache import (
+    CacheInvalidationBus,
+    LocalCache,
+    NamespaceStats,
+    key_namespace,
+)
+
+
+class _Broker:
+    """模拟 Redis 服务端：共享键值和 pub/sub 频道"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+
+class _PubSub:
+    def __init__(self, broker):
+        self._broker = broker
+        self._queue = deque()
+
+    def subscribe(self, channel):
+        with self._broker.lock:
+            self._broker.subscribers.append(self._queue)
+
+    def get_message(self, timeout=1.0):
+        if self._queue:
+            return {"type": "message", "data": self._queue.popleft()}
+        time.sleep(0.005)
+        return None
+
+    def close(self):
+        with self._broker.lock:
+            if self._queue in self._broker.subscribers:
+                self._broker.subscribers.remove(self._queue)
+
+
+class _Pipeline:
+    """排队命令，execute 时一次执行（计为一次往返）"""
+
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self._calls.append((name, args))
+
+    def execute(self):
+        trips = self._client.round_trips
+        results = [getattr(self._client, name)(*args) for name, args in self._calls]
+        self._client.round_trips = trips + 1
+        return results
+
+
+class _FakeRedis:
+    """每个 worker 一个客户端，共享同一个 _Broker"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.get_calls = 0
+        self.round_trips = 0
+
+    def get(self, key):
+        self.get_calls += 1
+        self.round_trips += 1
+        return self.broker.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.broker.data[key] = value
+
+    def delete(self, key):
+        self.broker.data.pop(key, None)
+
+    def incr(self, key):
+        self.broker.data[key] = int(self.broker.data.get(key, 0)) + 1
+        return self.broker.data[key]
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.broker.data.get(k) for k in keys]
+
+    def expire(self, key, ttl):
+        if key in self.broker.data:
+            self.broker.ttls[key] = ttl
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def publish(self, channel, message):
+        with self.broker.lock:
+            for queue in self.broker.subscribers:
+                queue.append(message.encode("utf-8"))
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return _PubSub(self.broker)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestLocalCache:
+    """有界 LRU + TTL"""
+
+    def test_lru_eviction_and_ttl(self):
+        cache = LocalCache(max_size=2, default_ttl=30)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+
+        cache.set("d", "4", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("d") is None
+
+    def test_delete_tag_and_generation_guard(self):
+        cache = LocalCache()
+        cache.set("project:detail:1@0", "1", tags=("project",))
+        cache.set("project:list:x", "2")
+        cache.set("user:1", "3")
+
+        generation = cache.generation
+        assert cache.delete_tag("project") == 2
+        assert cache.get("user:1") == "3"
+
+        # 读取期间发生失效，回填被丢弃
+        cache.set("project:detail:1@0", "stale", generation=generation)
+        assert cache.get("project:detail:1@0") is None
+
+    def test_namespace_stats(self):
+        stats = NamespaceStats()
+        stats.record_read("project:detail:1", "l1_hits", 0.001)
+        stats.record_read("project:detail:2", "misses", 0.003)
+        stats.record("perm:t1:user:5", "sets")
+
+        snapshot = stats.snapshot()
+        assert key_namespace("perm:t1:user:5") == "perm"
+        assert snapshot["project:detail"]["hit_rate"] == 50.0
+        assert snapshot["project:detail"]["avg_ms"] == 2.0
+        assert snapshot["perm"]["sets"] == 1
+
+    def test_bus_ignores_own_messages(self):
+        received = []
+        bus = CacheInvalidationBus(None, "ch", lambda op, arg: received.append((op, arg)))
+
+        bus._dispatch(json.dumps({"node": bus.node_id, "op": "key", "arg": "a"}))
+        bus._dispatch(json.dumps({"node": "other", "op": "key", "arg": "b"}).encode())
+        bus._dispatch("not json")
+
+        assert received == [("key", "b")]
+
+
+@pytest.fixture
+def workers():
+    """两个 worker 各自的 CacheService（共享同一 Redis）"""
+    broker = _Broker()
+    clients = [_FakeRedis(broker), _FakeRedis(broker)]
+    services = []
+    for client in clients:
+        with patch("app.utils.redis_client.get_redis_client", return_value=client):
+            services.append(CacheService())
+    assert _wait_until(lambda: all(s._local.active for s in services))
+    yield services
+    for service in services:
+        service._local.bus.stop()
+
+
+class TestTwoTierCacheService:
+    """两级缓存"""
+
+    def test_l1_serves_repeat_reads(self, workers):
+        service, _ = workers
+        service.set_project_detail(1, {"id": 1})
+        client = service.redis_client
+        before = client.get_calls
+
+        assert service.get_project_detail(1) == {"id": 1}
+        assert service.get_project_detail(1) == {"id": 1}
+
+        assert client.get_calls == before
+        stats = service.get_stats()
+        assert stats["local_cache"]["active"] is True
+        assert stats["namespaces"]["project:detail"]["l1_hits"] == 2
+
+    def test_write_invalidates_other_worker(self, workers):
+        first, second = workers
+        first.set("config:site", {"v": 1})
+        assert second.get("config:site") == {"v": 1}
+
+        first.set("config:site", {"v": 2})
+
+        assert _wait_until(lambda: second.get("config:site") == {"v": 2})
+
+    def test_tag_invalidation_across_workers(self, workers):
+        first, second = workers
+        second.set_project_list({"items": [1]}, page=1)
+        assert second.get_project_list(page=1) == {"items": [1]}
+
+        first.invalidate_project_list()
+
+        assert _wait_until(lambda: second.get_project_list(page=1) is None)
+
+    def test_tag_version_keys_expire(self, workers):
+        service, _ = workers
+        service.invalidate_project_list()
+        service.set_project_list({"items": [1]}, page=1)
+
+        ttls = service.redis_client.broker.ttls
+        assert ttls["cache:tag:project:list"] == TAG_VERSION_TTL
+        assert all(ttl >= TAG_VERSION_TTL for ttl in ttls.values())
+
+
+class TestInjectedClientCacheService:
+    """注入客户端（无一级缓存）"""
+
+    @pytest.fixture
+    def services(self):
+        broker = _Broker()
+        with patch("app.services.cache_service.REDIS_AVAILABLE", True):
+            return CacheService(redis_client=_FakeRedis(broker)), CacheService(
+                redis_client=_FakeRedis(broker)
+            )
+
+    def test_tagged_read_is_one_round_trip(self, services):
+        service, other = services
+        service.set_project_detail(1, {"id": 1})
+        client = service.redis_client
+        client.round_trips = 0
+
+        assert service.get_project_detail(1) == {"id": 1}
+        assert client.round_trips == 1
+
+        other.invalidate_all_project_cache()
+
+        assert service.get_project_detail(1) is None
+        assert service.get_stats()["namespaces"]["project:detail"]["l2_hits"] == 1
+
+    def test_memory_fallback_hits_counted_separately(self):
+        with patch("app.utils.redis_client.get_redis_client", return_value=None):
+            service = CacheService()
+        service.set("project:detail:1", {"id": 1})
+
+        assert service.get("project:detail:1") == {"id": 1}
+
+        namespace = service.get_stats()["namespaces"]["project:detail"]
+        assert namespace["memory_hits"] == 1
+        assert namespace["l1_hits"] == 0
+        assert namespace["hit_rate"] == 100.0
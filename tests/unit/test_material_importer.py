@@ -49,7 +49,10 @@ class TestMaterialImporter(unittest.TestCase):
 
     def test_existing_material_no_update(self):
         existing = MagicMock()
-        self.db.query.return_value.filter.return_value.first.return_value = existing
+        existing.material_code = "M001"
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            existing
+        ]
         df = pd.DataFrame(
             [
                 {
@@ -66,7 +69,10 @@ class TestMaterialImporter(unittest.TestCase):
 
     def test_existing_material_with_update(self):
         existing = MagicMock()
-        self.db.query.return_value.filter.return_value.first.return_value = existing
+        existing.material_code = "M001"
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            existing
+        ]
         df = pd.DataFrame(
             [
                 {
@@ -55,7 +55,10 @@ class TestMaterialImporterImport:
     def test_fails_duplicate_without_update_flag(self):
         db = _make_db()
         existing = MagicMock()
-        db.query.return_value.filter.return_value.first.return_value = existing
+        existing.material_code = "M001"
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            existing
+        ]
 
         df = self._make_df([{"物料编码*": "M001", "物料名称*": "螺丝"}])
         imported, updated, failed = MaterialImporter.import_material_data(
@@ -67,7 +70,10 @@ class TestMaterialImporterImport:
     def test_updates_existing_when_flag_set(self):
         db = _make_db()
         existing = MagicMock()
-        db.query.return_value.filter.return_value.first.return_value = existing
+        existing.material_code = "M001"
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            existing
+        ]
 
         df = self._make_df([{"物料编码*": "M001", "物料名称*": "螺丝-新"}])
         imported, updated, failed = MaterialImporter.import_material_data(
@@ -81,8 +87,8 @@ class TestMaterialImporterImport:
         df = self._make_df([{"物料编码*": "M002", "物料名称*": "垫片", "参考价格": "12.5"}])
         imported, updated, failed = MaterialImporter.import_material_data(db, df, 1)
         assert imported == 1
-        # check db.add was called with a Material-like object
-        db.add.assert_called()
+        # check db.add_all was called with a Material-like object
+        db.add_all.assert_called()
 
     def test_handles_invalid_price_gracefully(self):
         db = _make_db()
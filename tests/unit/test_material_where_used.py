@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+物料反查索引测试
+
+测试目标文件:
+- app/services/material_where_used_service.py - flush 事件维护索引、批量查询
+- app/services/ecn_bom_analysis_service/analysis.py - 按索引只分析受影响的BOM明细
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from app.models.ecn import Ecn, EcnAffectedMaterial
+from app.models.material import BomHeader, BomItem, Material
+from app.models.material_where_used import MaterialWhereUsed
+from app.models.project import Machine, Project
+from app.services.ecn_bom_analysis_service import EcnBomAnalysisService
+from app.services.ecn_bom_analysis_service.analysis import analyze_bom_impact, analyze_single_bom
+from app.services.material_where_used_service import MaterialWhereUsedService
+
+PROJECT_ID, MACHINE_ID, ECN_ID = 9701, 9701, 9701
+BOM_IDS = (9701, 9702, 9703)
+
+
+def _item(item_id, bom_id, code, parent=None, material_id=None, amount=100):
+    return BomItem(
+        id=item_id,
+        bom_id=bom_id,
+        item_no=item_id,
+        parent_item_id=parent,
+        material_id=material_id,
+        material_code=code,
+        material_name=f"物料{code}",
+        quantity=1,
+        amount=amount,
+    )
+
+
+@pytest.fixture
+def boms(db_session):
+    db_session.add_all(
+        [
+            Project(id=PROJECT_ID, project_code="PJ-MWU-1", project_name="反查项目"),
+            Machine(id=MACHINE_ID, project_id=PROJECT_ID, machine_code="M-MWU", machine_name="设备"),
+            Material(id=9701, material_code="MWU-A", material_name="物料A", lead_time_days=12),
+            Material(id=9702, material_code="MWU-B", material_name="物料B", lead_time_days=5),
+        ]
+    )
+    db_session.add_all(
+        BomHeader(
+            id=bom_id,
+            bom_no=f"BOM-MWU-{bom_id}",
+            bom_name=f"BOM{bom_id}",
+            project_id=PROJECT_ID,
+            machine_id=MACHINE_ID,
+            status="RELEASED",
+            is_latest=True,
+        )
+        for bom_id in BOM_IDS
+    )
+    db_session.flush()
+    # 97011 ─ 97012 ─ 97013(A)，97011 ─ 97014，97012 ─ 97015；9702 引用 B，9703 不受影响
+    db_session.add_all(
+        [
+            _item(97011, 9701, "MWU-ASM"),
+            _item(97012, 9701, "MWU-SUB", parent=97011),
+            _item(97013, 9701, "MWU-A", parent=97012, material_id=9701),
+            _item(97014, 9701, "MWU-X", parent=97011),
+            _item(97015, 9701, "MWU-Y", parent=97012),
+            _item(97021, 9702, "MWU-B", material_id=9702, amount=30),
+            _item(97031, 9703, "MWU-Z"),
+        ]
+    )
+    db_session.flush()
+    yield
+    db_session.rollback()
+
+
+def _index_rows(db_session):
+    table = MaterialWhereUsed.__table__
+    rows = db_session.execute(
+        select(table.c.bom_item_id, table.c.material_code, table.c.parent_item_id, table.c.bom_id)
+        .where(table.c.bom_id.in_(BOM_IDS))
+        .order_by(table.c.bom_item_id)
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+class TestIndexMaintenance:
+    """flush 事件维护索引"""
+
+    def test_insert_update_delete(self, db_session, boms):
+        assert len(_index_rows(db_session)) == 7
+
+        item = db_session.get(BomItem, 97031)
+        item.material_code = "MWU-B"
+        item.parent_item_id = 97021
+        item.bom_id = 9702
+        db_session.delete(db_session.get(BomItem, 97014))
+        db_session.flush()
+
+        rows = _index_rows(db_session)
+        assert (97031, "MWU-B", 97021, 9702) in rows
+        assert 97014 not in [row[0] for row in rows]
+
+        # 绕过 ORM 的写入由按BOM重建纠正
+        db_session.execute(BomItem.__table__.delete().where(BomItem.__table__.c.id == 97021))
+        MaterialWhereUsedService.sync_boms(db_session, [9702])
+        assert [row[0] for row in _index_rows(db_session) if row[3] == 9702] == [97031]
+
+    def test_find_usages_and_batch_loads(self, db_session, boms):
+        usages = MaterialWhereUsedService.find_usages(
+            db_session, material_ids=[9701], material_codes=["MWU-B"], released_only=True
+        )
+        assert [(u.bom_item_id, u.machine_id) for u in usages] == [
+            (97013, MACHINE_ID),
+            (97021, MACHINE_ID),
+        ]
+
+        db_session.get(BomHeader, 9702).status = "DRAFT"
+        db_session.flush()
+        usages = MaterialWhereUsedService.find_usages(
+            db_session, material_codes=["MWU-B"], released_only=True
+        )
+        assert usages == []
+
+        assert set(MaterialWhereUsedService.load_materials(db_session, [9701, 9702])) == {
+            9701,
+            9702,
+        }
+
+
+class TestIndexedAnalysis:
+    """索引分析结果与逐BOM全量分析一致"""
+
+    def test_matches_full_scan(self, db_session, boms):
+        db_session.add_all(
+            [
+                Ecn(id=ECN_ID, ecn_no="ECN-MWU-1", ecn_title="反查", project_id=PROJECT_ID),
+                EcnAffectedMaterial(
+                    ecn_id=ECN_ID,
+                    material_id=9701,
+                    material_code="MWU-A",
+                    material_name="物料A",
+                    change_type="UPDATE",
+                ),
+                EcnAffectedMaterial(
+                    ecn_id=ECN_ID,
+                    material_code="MWU-B",
+                    material_name="物料B",
+                    change_type="DELETE",
+                    cost_impact=Decimal(5),
+                ),
+            ]
+        )
+        db_session.flush()
+        service = EcnBomAnalysisService(db_session)
+
+        loaded = []
+
+        def record(*args, **kwargs):
+            loaded.append(kwargs["bom_header"].id)
+            return analyze_single_bom(*args, **kwargs)
+
+        with (
+            patch("app.services.ecn_bom_analysis_service.analysis.save_bom_impact"),
+            patch(
+                "app.services.ecn_bom_analysis_service.analysis.analyze_single_bom",
+                side_effect=record,
+            ),
+        ):
+            indexed = analyze_bom_impact(service, ECN_ID, MACHINE_ID)
+            with patch.object(MaterialWhereUsedService, "is_available", return_value=False):
+                full = analyze_bom_impact(service, ECN_ID, MACHINE_ID)
+
+        # 索引路径跳过未引用受影响物料的BOM
+        assert loaded == [9701, 9702, 9701, 9702, 9703]
+        indexed.pop("analyzed_at")
+        full.pop("analyzed_at")
+        assert indexed == full
+        bom = indexed["bom_impacts"][0]
+        assert [c["bom_item_id"] for c in bom["cascade_impact"]] == [97012, 97011, 97015, 97014]
+        assert (bom["schedule_impact_days"], indexed["max_schedule_impact_days"]) == (12, 12)
+        assert indexed["total_cost_impact"] == 10 - 30
@@ -303,7 +303,7 @@ class TestGetMachineMaterialStatus:
         db = MagicMock()
         call_seq = [0]
 
-        def side_effect(model):
+        def side_effect(model, *columns):
             q = MagicMock()
             q.filter.return_value = q
             idx = call_seq[0]
@@ -369,7 +369,7 @@ class TestGetMachineMaterialStatus:
         db = MagicMock()
         call_seq = [0]
 
-        def side_effect(model):
+        def side_effect(model, *columns):
             q = MagicMock()
             q.filter.return_value = q
             idx = call_seq[0]
@@ -616,13 +616,13 @@ class TestGetDashboard:
         ]
         call_idx = [0]
 
-        def mock_project_kit_rate(project_id, calculate_by):
+        def mock_project_kit_rate(project, batch, calculate_by):
             idx = call_idx[0]
             call_idx[0] += 1
             return kit_rates[idx]
 
         svc = KitRateService(db)
-        with patch.object(svc, "get_project_kit_rate", side_effect=mock_project_kit_rate):
+        with patch.object(svc, "_project_kit_rate", side_effect=mock_project_kit_rate):
             result = svc.get_dashboard(project_ids=[1, 2, 3])
 
         assert result["summary"]["total_projects"] == 3
@@ -569,7 +569,10 @@ class TestNotificationDispatcherCore(unittest.TestCase):
         result = dispatcher.dispatch(notification, alert, user, request=request)
 
         self.assertTrue(result)
-        mock_service.send_notification.assert_called_once_with(request)
+        mock_service.send_notification.assert_called_once_with(
+            request,
+            queue_meta={"notification_id": None, "alert_id": None, "notify_channel": "EMAIL"},
+        )
 
     # ========== dispatch_alert_notifications() 测试 ==========
 
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+异步通知投递测试
+
+测试目标文件:
+- app/services/notification_queue.py - 批量入队、处理中确认与回收、延迟重试、死信、去重
+- app/services/unified_notification_service.py - 只入队的发送路径、失败释放去重
+- app/services/notification_dispatcher.py - 入队的预警通知标记为 QUEUED
+- app/services/notification_worker.py - 按渠道批量投递、并发上限、退避重试
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import notification_queue
+from app.services.channel_handlers.base import NotificationRequest, NotificationResult
+from app.services.notification_worker import NotificationWorker
+from app.services.unified_notification_service import NotificationService
+
+
+class FakeRedis:
+    """测试用内存 Redis（仅实现通知队列用到的命令）"""
+
+    def __init__(self):
+        self.lists, self.zsets, self.keys, self.sets = {}, {}, {}, {}
+        self.expire_at = {}
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        values = self.lists.get(source)
+        if not values:
+            return None
+        value = values.pop(0 if src == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        return self.lmove(source, destination, src, dest)
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        return values[start : None if end == -1 else end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lrange(key, start, end)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        due = sorted((s, m) for m, s in self.zsets.get(key, {}).items() if s <= high)
+        return [m for _, m in due][start : None if num is None else start + num]
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and self.exists(key):
+            return None
+        self.keys[key] = value
+        self.expire_at[key] = time.monotonic() + ex if ex else None
+        return True
+
+    def exists(self, key):
+        if key in self.keys and (self.expire_at.get(key) or float("inf")) <= time.monotonic():
+            del self.keys[key]
+        return int(key in self.keys)
+
+    def delete(self, *keys):
+        return sum(
+            (self.keys.pop(k, None) is not None) + (self.lists.pop(k, None) is not None)
+            for k in keys
+        )
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    def pipeline(self):
+        redis, calls = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+        return Pipeline()
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(notification_queue, "get_redis_client", return_value=fake), patch.object(
+        settings, "REDIS_URL", "redis://fake"
+    ), patch.object(settings, "NOTIFICATION_ASYNC_ENABLED", True):
+        yield fake
+
+
+def _request(recipient_id, channel, source_id=1, title="设备停机预警"):
+    return NotificationRequest(
+        recipient_id=recipient_id,
+        notification_type="ALERT",
+        category="alert",
+        title=title,
+        content="3号线停机",
+        channels=[channel],
+        source_type="alert",
+        source_id=source_id,
+    )
+
+
+class RecordingHandler:
+    """记录每次批量调用的渠道处理器"""
+
+    def __init__(self, channel, fail=False, delay=0.0):
+        self.channel, self.fail, self.delay = channel, fail, delay
+        self.batches, self.active, self.max_active = [], 0, 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, requests):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.batches.append([r.recipient_id for r in requests])
+        return [
+            NotificationResult(channel=self.channel, success=not self.fail, error_message="超时")
+            for _ in requests
+        ]
+
+
+@contextmanager
+def _worker_env(handlers):
+    @contextmanager
+    def fake_session():
+        yield MagicMock()
+
+    with patch("app.services.notification_worker.get_db_session", fake_session), patch.object(
+        NotificationService, "get_handler", lambda self, channel: handlers.get(channel)
+    ):
+        yield
+
+
+class TestEnqueue:
+    """发送路径只入队，去重跨服务实例共享"""
+
+    def test_send_enqueues_and_dedups(self, redis):
+        first = NotificationService(MagicMock()).send_notification(_request(1, "wechat"))
+        second = NotificationService(MagicMock()).send_notification(_request(1, "wechat"))
+
+        assert first["queued"] is True
+        assert second["deduped"] is True
+        assert len(redis.lists[notification_queue.QUEUE_KEY]) == 1
+
+    def test_bulk_enqueue(self, redis):
+        service = NotificationService(MagicMock())
+        requests = [_request(uid, "email", source_id=7) for uid in (1, 2, 2)]
+
+        results = service.send_bulk_notification(requests)
+
+        assert [r.get("queued", False) for r in results] == [True, True, False]
+        assert len(redis.lists[notification_queue.QUEUE_KEY]) == 2
+        service.db.query.assert_not_called()
+
+
+class TestNotificationWorker:
+    """队列消费者"""
+
+    def test_batches_retries_and_dead_letter(self, redis):
+        wechat, email = RecordingHandler("wechat"), RecordingHandler("email", fail=True)
+        service = NotificationService(MagicMock())
+        service.send_bulk_notification(
+            [_request(uid, "wechat") for uid in range(1, 6)] + [_request(9, "email")]
+        )
+
+        worker = NotificationWorker(threads=2, batch_size=50)
+        with _worker_env({"wechat": wechat, "email": email}), patch.object(
+            settings, "NOTIFICATION_RETRY_BACKOFF_SECONDS", [0]
+        ), patch.object(settings, "NOTIFICATION_MAX_ATTEMPTS", 2):
+            stats = worker.run_once(timeout=1)
+            assert stats["delivered"] == 5 and stats["retried"] == 1
+            assert wechat.batches == [[1, 2, 3, 4, 5]]
+
+            stats = worker.run_once(timeout=1)
+            assert stats["dead"] == 1
+            assert email.batches == [[9], [9]]
+        worker.stop()
+
+        dead = json.loads(redis.lists[notification_queue.DEAD_LETTER_KEY][0])
+        assert dead["attempts"] == 2
+        assert dead["request"]["channels"] == ["email"]
+
+    def test_channel_concurrency_limit(self, redis):
+        webhook = RecordingHandler("webhook", delay=0.05)
+        system = RecordingHandler("system", delay=0.05)
+        payloads = [
+            {"request": vars(_request(uid, channel))}
+            for uid in range(8)
+            for channel in ("webhook", "system")
+        ]
+
+        worker = NotificationWorker(threads=6, channel_concurrency={"webhook": 1, "system": 3})
+        with _worker_env({"webhook": webhook, "system": system}), patch.object(
+            settings, "NOTIFICATION_CHANNEL_BATCH_SIZE", 2
+        ):
+            stats = worker.process(payloads)
+        worker.stop()
+
+        assert stats["delivered"] == 16
+        assert len(webhook.batches) == len(system.batches) == 4
+        assert webhook.max_active == 1
+        assert 1 < system.max_active <= 3
+
+
+class TestReliableDelivery:
+    """处理中确认、失败释放去重、预警通知状态"""
+
+    def test_unacked_batch_recovered_after_consumer_loss(self, redis):
+        NotificationService(MagicMock()).send_notification(_request(1, "wechat"))
+        lost = NotificationWorker(threads=1)
+        assert len(notification_queue.dequeue_notifications(lost.consumer_id, 10, timeout=1)) == 1
+        assert not redis.lists[notification_queue.QUEUE_KEY]
+
+        # 消费者未确认即崩溃，心跳过期
+        redis.keys.pop(notification_queue.CONSUMER_HEARTBEAT_PREFIX + lost.consumer_id)
+        wechat = RecordingHandler("wechat")
+        worker = NotificationWorker(threads=1)
+        with _worker_env({"wechat": wechat}):
+            stats = worker.run_once(timeout=1)
+        worker.stop()
+        lost.stop()
+
+        assert stats["delivered"] == 1
+        assert wechat.batches == [[1]]
+        assert notification_queue.PROCESSING_KEY_PREFIX + worker.consumer_id not in redis.lists
+
+    def test_long_batch_keeps_heartbeat(self, redis):
+        NotificationService(MagicMock()).send_notification(_request(1, "webhook"))
+        webhook = RecordingHandler("webhook", delay=1.0)
+        worker = NotificationWorker(threads=1)
+
+        with _worker_env({"webhook": webhook}), patch.object(
+            notification_queue, "CONSUMER_TIMEOUT_SECONDS", 0.3
+        ), patch("app.services.notification_worker.HEARTBEAT_INTERVAL_SECONDS", 0.1):
+            consumer = threading.Thread(target=worker.run_once, kwargs={"timeout": 1})
+            consumer.start()
+            time.sleep(0.7)
+            # 批次耗时超过心跳超时，其他消费者不应回收
+            recovered = notification_queue.recover_notifications("other-consumer")
+            consumer.join()
+        worker.stop()
+
+        assert recovered == 0
+        assert webhook.batches == [[1]]
+        assert not redis.lists.get(notification_queue.QUEUE_KEY)
+
+    def test_dead_letter_releases_dedup(self, redis):
+        service = NotificationService(MagicMock())
+        service.send_notification(_request(9, "email"))
+
+        worker = NotificationWorker(threads=1)
+        with _worker_env({"email": RecordingHandler("email", fail=True)}), patch.object(
+            settings, "NOTIFICATION_MAX_ATTEMPTS", 1
+        ):
+            assert worker.run_once(timeout=1)["dead"] == 1
+        worker.stop()
+
+        assert service.send_notification(_request(9, "email"))["queued"] is True
+
+    def test_sync_failure_releases_dedup(self, redis):
+        service = NotificationService(MagicMock())
+        failed = {"success": False, "deduped": False, "message": "发送到0个渠道"}
+
+        with patch.object(settings, "NOTIFICATION_ASYNC_ENABLED", False), patch.object(
+            service, "deliver", return_value=failed
+        ) as deliver:
+            service.send_notification(_request(3, "email"))
+            service.send_notification(_request(3, "email"))
+
+        assert deliver.call_count == 2
+
+    def test_queued_and_skipped_alert_status(self, redis):
+        from app.services.notification_dispatcher import NotificationDispatcher
+
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        notification = MagicMock(id=42, alert_id=7, notify_channel="SYSTEM", retry_count=0)
+
+        sent = NotificationDispatcher(db).dispatch(
+            notification, MagicMock(id=7), None, request=_request(1, "system", source_id=7)
+        )
+
+        # 入队不等于已送达，最终状态由消费者回写
+        assert sent is True
+        assert notification.status == "QUEUED"
+        payload = json.loads(redis.lists[notification_queue.QUEUE_KEY][0])
+        assert payload["notification_id"] == 42
+
+        disabled = ({"success": True, "disabled": True}, [])
+        worker = NotificationWorker(threads=1)
+        with _worker_env({}), patch.object(
+            NotificationService, "_plan_delivery", return_value=disabled
+        ), patch.object(NotificationWorker, "_update_alert_notifications") as update:
+            stats = worker.run_once(timeout=1)
+        worker.stop()
+
+        assert stats["skipped"] == 1
+        update.assert_called_once_with({42: ("SKIPPED", "用户禁用此类通知", 0)})
+
+
+class TestChannelBatch:
+    """渠道批量发送"""
+
+    def test_wechat_merges_same_message(self):
+        from app.services.channel_handlers.wechat_handler import WeChatChannelHandler
+
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = [
+            MagicMock(id=1, wechat_userid="u1"),
+            MagicMock(id=2, wechat_userid="u2"),
+            MagicMock(id=3, wechat_userid=None),
+        ]
+        handler = WeChatChannelHandler(db, "wechat")
+        requests = [_request(1, "wechat"), _request(2, "wechat"), _request(3, "wechat")]
+
+        with patch.object(settings, "WECHAT_ENABLED", True), patch(
+            "app.services.channel_handlers.wechat_handler.WeChatClient"
+        ) as client_cls:
+            client_cls.return_value.send_message.return_value = True
+            results = handler.send_batch(requests)
+
+        client_cls.return_value.send_message.assert_called_once()
+        assert client_cls.return_value.send_message.call_args[0][0] == ["u1", "u2"]
+        assert [r.success for r in results] == [True, True, False]
+        db.query.assert_called_once()
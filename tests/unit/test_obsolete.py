@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """obsolete material risk 单元测试"""
 from decimal import Decimal
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -9,6 +9,7 @@ from app.services.ecn_bom_analysis_service.obsolete import (
     calculate_obsolete_risk_level,
     check_obsolete_material_risk,
 )
+from app.services.material_where_used_service import MaterialWhereUsedService
 
 
 class TestCalculateObsoleteRiskLevel:
@@ -56,15 +57,21 @@ class TestCheckObsoleteMaterialRisk:
         material.last_price = 500
         material.standard_price = 500
 
-        # Setup query chain
-        service.db.query.return_value.filter.return_value.first.side_effect = [ecn, material]
-        service.db.query.return_value.filter.return_value.all.side_effect = [
-            [mat_affected],
-            [],
-        ]  # affected_materials, po_items
+        service.db.query.return_value.filter.return_value.first.return_value = ecn
+        service.db.query.return_value.filter.return_value.all.return_value = [mat_affected]
 
-        # Need to handle the join query for PO items
-        service.db.query.return_value.join.return_value.filter.return_value.all.return_value = []
+        # 物料与在途数量批量加载
+        with patch.object(
+            MaterialWhereUsedService, "load_materials", return_value={10: material}
+        ), patch(
+            "app.services.ecn_bom_analysis_service.obsolete.load_in_transit",
+            return_value={10: Decimal(20)},
+        ):
+            result = check_obsolete_material_risk(service, 1)
 
-        result = check_obsolete_material_risk(service, 1)
         assert result["ecn_id"] == 1
+        assert result["has_obsolete_risk"] is True
+        risk = result["obsolete_risks"][0]
+        assert (risk["in_transit_qty"], risk["obsolete_quantity"]) == (20.0, 120.0)
+        assert risk["risk_level"] == "HIGH"
+        assert mat_affected.is_obsolete_risk is True
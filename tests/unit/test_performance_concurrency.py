@@ -480,18 +480,49 @@ class TestPermissionCacheOptimization:
 
         cache_svc = PermissionCacheService()
         mock_inner_cache = MagicMock()
-        mock_inner_cache.get.return_value = None
-        cache_svc._cache = mock_inner_cache
+        mock_inner_cache.get_tagged.return_value = None
 
-        # 分别获取两个用户的权限
-        cache_svc.get_user_permissions(user_id=1, tenant_id=10)
-        cache_svc.get_user_permissions(user_id=2, tenant_id=10)
+        with patch.object(cache_svc, "_cache", mock_inner_cache):
+            # 分别获取两个用户的权限
+            cache_svc.get_user_permissions(user_id=1, tenant_id=10)
+            cache_svc.get_user_permissions(user_id=2, tenant_id=10)
 
-        # 两次调用的缓存键应不同
-        calls = [call[0][0] for call in mock_inner_cache.get.call_args_list]
+        # 两次调用的缓存键应不同，且都带租户维度
+        calls = [call[0][0] for call in mock_inner_cache.get_tagged.call_args_list]
         assert len(calls) == 2
         assert calls[0] != calls[1], "不同用户的缓存键应不同"
-        assert "1" in calls[0] and "2" in calls[1]
+        assert calls == ["perm:t10:user:1", "perm:t10:user:2"]
+
+    def test_permission_cache_tagged_read_tenant_isolation(self):
+        """
+        同一用户在不同租户下按租户标签读取，失效一个租户不影响另一个租户。
+        """
+        from app.services.cache_service import CacheService
+        from app.services.permission_cache_service import PermissionCacheService
+
+        cache_svc = PermissionCacheService()
+        with patch("app.utils.redis_client.get_redis_client", return_value=None):
+            inner = CacheService()
+
+        with patch.object(cache_svc, "_cache", inner), patch.object(
+            inner, "get_tagged", wraps=inner.get_tagged
+        ) as get_tagged:
+            cache_svc.set_user_permissions(1, {"read_project"}, tenant_id=10)
+            cache_svc.set_user_permissions(1, {"write_project"}, tenant_id=20)
+
+            assert cache_svc.get_user_permissions(1, tenant_id=10) == {"read_project"}
+            assert cache_svc.get_user_permissions(1, tenant_id=20) == {"write_project"}
+
+            cache_svc.invalidate_tenant_user_permissions(10)
+
+            assert cache_svc.get_user_permissions(1, tenant_id=10) is None
+            assert cache_svc.get_user_permissions(1, tenant_id=20) == {"write_project"}
+
+        keys_and_tags = [(c.args[0], c.args[1][1]) for c in get_tagged.call_args_list]
+        assert keys_and_tags[:2] == [
+            ("perm:t10:user:1", "perm:t10"),
+            ("perm:t20:user:1", "perm:t20"),
+        ]
 
 
 # =========================================================
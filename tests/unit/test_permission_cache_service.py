@@ -58,12 +58,12 @@ class TestPermissionCacheService:
     # ── 用户权限缓存 ──────────────────────────────
 
     def test_get_user_permissions_miss(self, svc, mock_cache):
-        mock_cache.get.return_value = None
+        mock_cache.get_tagged.return_value = None
         result = svc.get_user_permissions(tenant_id=1, user_id=10)
         assert result is None
 
     def test_get_user_permissions_hit(self, svc, mock_cache):
-        mock_cache.get.return_value = {"view", "edit"}
+        mock_cache.get_tagged.return_value = {"view", "edit"}
         result = svc.get_user_permissions(tenant_id=1, user_id=10)
         assert result == {"view", "edit"}
 
@@ -78,20 +78,20 @@ class TestPermissionCacheService:
         mock_cache.delete.assert_called_once()
 
     def test_invalidate_tenant_user_permissions(self, svc, mock_cache):
-        mock_cache.delete_pattern.return_value = 5
+        mock_cache.invalidate_tags.return_value = 5
         result = svc.invalidate_tenant_user_permissions(tenant_id=1)
-        mock_cache.delete_pattern.assert_called()
+        mock_cache.invalidate_tags.assert_called()
         assert isinstance(result, int)
 
     def test_invalidate_all_user_permissions(self, svc, mock_cache):
-        mock_cache.delete_pattern.return_value = 10
+        mock_cache.invalidate_tags.return_value = 10
         result = svc.invalidate_all_user_permissions()
         assert isinstance(result, int)
 
     # ── 角色权限缓存 ──────────────────────────────
 
     def test_get_role_permissions_miss(self, svc, mock_cache):
-        mock_cache.get.return_value = None
+        mock_cache.get_tagged.return_value = None
         result = svc.get_role_permissions(tenant_id=1, role_id=5)
         assert result is None
 
@@ -105,19 +105,19 @@ class TestPermissionCacheService:
         mock_cache.delete.assert_called_once()
 
     def test_invalidate_tenant_role_permissions(self, svc, mock_cache):
-        mock_cache.delete_pattern.return_value = 3
+        mock_cache.invalidate_tags.return_value = 3
         result = svc.invalidate_tenant_role_permissions(tenant_id=1)
         assert isinstance(result, int)
 
     def test_invalidate_all_role_permissions(self, svc, mock_cache):
-        mock_cache.delete_pattern.return_value = 7
+        mock_cache.invalidate_tags.return_value = 7
         result = svc.invalidate_all_role_permissions()
         assert isinstance(result, int)
 
     # ── 用户角色缓存 ──────────────────────────────
 
     def test_get_user_role_ids_miss(self, svc, mock_cache):
-        mock_cache.get.return_value = None
+        mock_cache.get_tagged.return_value = None
         result = svc.get_user_role_ids(tenant_id=1, user_id=10)
         assert result is None
 
@@ -126,7 +126,7 @@ class TestPermissionCacheService:
         mock_cache.set.assert_called_once()
 
     def test_get_role_user_ids_miss(self, svc, mock_cache):
-        mock_cache.get.return_value = None
+        mock_cache.get_tagged.return_value = None
         result = svc.get_role_user_ids(tenant_id=1, role_id=5)
         assert result is None
 
@@ -138,20 +138,20 @@ class TestPermissionCacheService:
 
     def test_invalidate_role_and_users(self, svc, mock_cache):
         mock_cache.delete.return_value = True
-        mock_cache.get.return_value = [10, 20]
-        mock_cache.delete_pattern.return_value = 2
+        mock_cache.get_tagged.return_value = [10, 20]
+        mock_cache.invalidate_tags.return_value = 2
         result = svc.invalidate_role_and_users(tenant_id=1, role_id=5)
         assert isinstance(result, int)
 
     def test_invalidate_user_role_change(self, svc, mock_cache):
         mock_cache.delete.return_value = True
-        mock_cache.delete_pattern.return_value = 1
+        mock_cache.invalidate_tags.return_value = 1
         result = svc.invalidate_user_role_change(
             user_id=10, old_role_ids=[1, 2], new_role_ids=[3, 4], tenant_id=1
         )
         assert isinstance(result, int)
 
     def test_invalidate_tenant(self, svc, mock_cache):
-        mock_cache.delete_pattern.return_value = 20
+        mock_cache.invalidate_tags.return_value = 20
         result = svc.invalidate_tenant(tenant_id=1)
         assert isinstance(result, int)
@@ -67,7 +67,7 @@ class TestBuildKey:
 class TestUserPermissionsCache:
     def test_get_user_permissions_returns_set_when_cached(self, service):
         svc, mock_cache = service
-        mock_cache.get.return_value = ["perm:read", "perm:write"]
+        mock_cache.get_tagged.return_value = ["perm:read", "perm:write"]
 
         result = svc.get_user_permissions(user_id=1, tenant_id=1)
         assert isinstance(result, set)
@@ -75,7 +75,7 @@ class TestUserPermissionsCache:
 
     def test_get_user_permissions_returns_none_when_not_cached(self, service):
         svc, mock_cache = service
-        mock_cache.get.return_value = None
+        mock_cache.get_tagged.return_value = None
 
         result = svc.get_user_permissions(user_id=1)
         assert result is None
@@ -98,18 +98,18 @@ class TestUserPermissionsCache:
 
     def test_invalidate_tenant_user_permissions(self, service):
         svc, mock_cache = service
-        mock_cache.delete_pattern.return_value = 5
+        mock_cache.invalidate_tags.return_value = 5
 
         result = svc.invalidate_tenant_user_permissions(tenant_id=2)
-        mock_cache.delete_pattern.assert_called_once_with("perm:t2:user:*")
+        mock_cache.invalidate_tags.assert_called_once_with("perm:t2:user")
         assert result == 5
 
     def test_invalidate_all_user_permissions(self, service):
         svc, mock_cache = service
-        mock_cache.delete_pattern.return_value = 20
+        mock_cache.invalidate_tags.return_value = 20
 
         result = svc.invalidate_all_user_permissions()
-        mock_cache.delete_pattern.assert_called_once_with("perm:t*:user:*")
+        mock_cache.invalidate_tags.assert_called_once_with("perm:user")
         assert result == 20
 
 
@@ -122,7 +122,7 @@ class TestRolePermissionsCache:
     def test_get_role_permissions_returns_cached_data(self, service):
         svc, mock_cache = service
         cached = {"permissions": ["admin:read"]}
-        mock_cache.get.return_value = cached
+        mock_cache.get_tagged.return_value = cached
 
         result = svc.get_role_permissions(role_id=10, tenant_id=1)
         assert result == cached
@@ -144,10 +144,10 @@ class TestRolePermissionsCache:
 
     def test_invalidate_all_role_permissions(self, service):
         svc, mock_cache = service
-        mock_cache.delete_pattern.return_value = 8
+        mock_cache.invalidate_tags.return_value = 8
 
         result = svc.invalidate_all_role_permissions()
-        mock_cache.delete_pattern.assert_called_once_with("perm:t*:role:*")
+        mock_cache.invalidate_tags.assert_called_once_with("perm:role")
 
 
 # ---------------------------------------------------------------------------
@@ -158,7 +158,7 @@ class TestRolePermissionsCache:
 class TestUserRoleCache:
     def test_get_user_role_ids(self, service):
         svc, mock_cache = service
-        mock_cache.get.return_value = [1, 2, 3]
+        mock_cache.get_tagged.return_value = [1, 2, 3]
 
         result = svc.get_user_role_ids(user_id=1, tenant_id=1)
         assert result == [1, 2, 3]
@@ -172,7 +172,7 @@ class TestUserRoleCache:
 
     def test_get_role_user_ids(self, service):
         svc, mock_cache = service
-        mock_cache.get.return_value = [10, 20]
+        mock_cache.get_tagged.return_value = [10, 20]
 
         result = svc.get_role_user_ids(role_id=5, tenant_id=1)
         assert result == [10, 20]
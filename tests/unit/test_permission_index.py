@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+角色权限索引测试
+
+测试目标文件:
+- app/core/permission_index.py - 闭包/位图构建、子树重算、批量变更收集
+- app/core/permission_engine.py - 索引命中与递归 CTE 降级
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.permission_engine import _load_permissions_from_db
+from app.core.permission_index import RolePermissionIndex
+from app.models.permission_index import RoleClosure, RolePermissionMask
+from app.models.user import ApiPermission, Role, RoleApiPermission, User, UserRole
+
+
+def _perm(perm_id, code, tenant_id=None, is_active=True):
+    return ApiPermission(
+        id=perm_id, perm_code=code, perm_name=code, tenant_id=tenant_id, is_active=is_active
+    )
+
+
+def _role(role_id, parent_id=None, inherit=False):
+    return Role(
+        id=role_id,
+        role_code=f"R{role_id}",
+        role_name=f"角色{role_id}",
+        parent_id=parent_id,
+        inherit_permissions=inherit,
+    )
+
+
+@pytest.fixture
+def roles(db_session):
+    db_session.execute(text("PRAGMA foreign_keys=OFF"))
+    # 1 ← 2(继承) ← 3(继承)；4 以 1 为父但不继承
+    db_session.add_all(
+        [
+            _role(1),
+            _role(2, parent_id=1, inherit=True),
+            _role(3, parent_id=2, inherit=True),
+            _role(4, parent_id=1, inherit=False),
+            _perm(1, "project:read"),
+            _perm(2, "project:edit"),
+            _perm(3, "sales:read", tenant_id=7),
+            _perm(4, "admin:all", is_active=False),
+            User(id=1, username="u1", password_hash="x"),
+            User(id=2, username="u2", password_hash="x"),
+        ]
+    )
+    db_session.flush()
+    db_session.add_all(
+        [
+            RoleApiPermission(role_id=1, permission_id=1),
+            RoleApiPermission(role_id=1, permission_id=4),
+            RoleApiPermission(role_id=2, permission_id=3),
+            RoleApiPermission(role_id=3, permission_id=2),
+            RoleApiPermission(role_id=4, permission_id=2),
+            UserRole(user_id=1, role_id=3),
+            UserRole(user_id=2, role_id=4),
+        ]
+    )
+    db_session.commit()
+    RolePermissionIndex.rebuild_all(db_session)
+    db_session.commit()
+    return db_session
+
+
+def _cte(db_session, user_id, tenant_id, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(settings, "PERMISSION_INDEX_ENABLED", False)
+        return _load_permissions_from_db(user_id, db_session, tenant_id)
+
+
+class TestRolePermissionIndex:
+    """索引读写"""
+
+    @pytest.mark.parametrize("user_id,tenant_id", [(1, None), (1, 7), (1, 8), (2, 7)])
+    def test_index_matches_recursive_cte(self, roles, monkeypatch, user_id, tenant_id):
+        indexed = RolePermissionIndex.load_user_permissions(roles, user_id, tenant_id)
+
+        assert indexed is not None
+        assert indexed == _cte(roles, user_id, tenant_id, monkeypatch)
+
+    def test_closure_follows_inherit_chain(self, roles):
+        rows = roles.query(RoleClosure.ancestor_id, RoleClosure.depth).filter(
+            RoleClosure.descendant_id == 3
+        )
+
+        assert sorted(rows.all()) == [(1, 2), (2, 1), (3, 0)]
+
+    def test_grant_rebuilds_only_subtree(self, roles, monkeypatch):
+        built_at = dict(roles.query(RolePermissionMask.role_id, RolePermissionMask.built_at).all())
+
+        roles.add(_perm(5, "report:export"))
+        roles.flush()
+        roles.add(RoleApiPermission(role_id=2, permission_id=5))
+        roles.commit()
+
+        assert "report:export" in _load_permissions_from_db(1, roles, None)
+        assert "report:export" not in _load_permissions_from_db(2, roles, None)
+        rebuilt = {
+            role_id
+            for role_id, at in roles.query(RolePermissionMask.role_id, RolePermissionMask.built_at)
+            if at != built_at[role_id]
+        }
+        assert rebuilt <= {2, 3}
+        assert _load_permissions_from_db(1, roles, 7) == _cte(roles, 1, 7, monkeypatch)
+
+    def test_bulk_delete_and_reparent(self, roles, monkeypatch):
+        roles.query(RoleApiPermission).filter(RoleApiPermission.role_id == 1).delete()
+        roles.commit()
+        assert "project:read" not in _load_permissions_from_db(1, roles, None)
+
+        role = roles.get(Role, 4)
+        role.inherit_permissions = True
+        role.parent_id = 2
+        roles.commit()
+        assert _load_permissions_from_db(2, roles, 7) == _cte(roles, 2, 7, monkeypatch)
+        assert "sales:read" in _load_permissions_from_db(2, roles, 7)
+
+    def test_unindexed_role_falls_back(self, roles):
+        roles.execute(text("DELETE FROM role_permission_masks WHERE role_id = 3"))
+
+        assert RolePermissionIndex.load_user_permissions(roles, 1, None) is None
+        assert _load_permissions_from_db(1, roles, None) == {"project:read", "project:edit"}
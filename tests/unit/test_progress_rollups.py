@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+项目进度汇总测试
+
+测试目标文件:
+- app/services/progress_rollup_service.py - flush 事件增量维护、合并重算
+- app/services/progress_service.py - 进度聚合读取运行总计
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from app.models.progress_rollup import ProjectProgressRollup
+from app.models.project import Project
+from app.models.task_center import TaskUnified
+from app.services.progress_rollup_service import ProgressRollupService, _exact_totals_select
+from app.services.progress_service import aggregate_task_progress
+
+PROJECT_ID, OTHER_PROJECT_ID = 9601, 9602
+
+
+def _task(code, progress, project_id=PROJECT_ID, **kwargs):
+    return TaskUnified(
+        task_code=f"PR-ROLLUP-{code}",
+        title=f"汇总任务{code}",
+        task_type="PROJECT_WBS",
+        project_id=project_id,
+        assignee_id=1,
+        status=kwargs.pop("status", "IN_PROGRESS"),
+        progress=progress,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def tasks(db_session):
+    db_session.add_all(
+        [
+            Project(id=PROJECT_ID, project_code="PJ-ROLLUP-1", project_name="汇总项目"),
+            Project(id=OTHER_PROJECT_ID, project_code="PJ-ROLLUP-2", project_name="汇总项目2"),
+        ]
+    )
+    rows = [
+        _task(1, 20),
+        _task(2, 60),
+        _task(3, 100, status="COMPLETED"),
+        _task(4, 50, status="CANCELLED"),
+        _task(5, 40, is_active=False),
+    ]
+    db_session.add_all(rows)
+    db_session.flush()
+    yield rows
+
+    # 合并重算会提交事务，清理已提交的数据
+    db_session.rollback()
+    project_ids = [PROJECT_ID, OTHER_PROJECT_ID]
+    db_session.query(TaskUnified).filter(TaskUnified.project_id.in_(project_ids)).delete()
+    db_session.query(ProjectProgressRollup).filter(
+        ProjectProgressRollup.project_id.in_(project_ids)
+    ).delete()
+    db_session.query(Project).filter(Project.id.in_(project_ids)).delete()
+    db_session.commit()
+
+
+def _rollup(db_session, project_id=PROJECT_ID):
+    return db_session.query(ProjectProgressRollup).filter_by(project_id=project_id).one()
+
+
+def _assert_matches_exact(db_session, project_id=PROJECT_ID):
+    rollup = _rollup(db_session, project_id)
+    db_session.refresh(rollup)
+    exact = tuple(db_session.execute(_exact_totals_select(project_id)).one())
+    assert (rollup.task_count, rollup.progress_sum) == exact
+    return rollup
+
+
+class TestRollupMaintenance:
+    """flush 事件增量维护"""
+
+    def test_insert_update_move_and_delete(self, db_session, tasks):
+        rollup = _assert_matches_exact(db_session)
+        assert (rollup.task_count, rollup.progress_sum, rollup.pending) == (3, 180, True)
+
+        tasks[0].progress = 70
+        tasks[1].status = "CANCELLED"
+        tasks[4].is_active = True
+        db_session.flush()
+        rollup = _assert_matches_exact(db_session)
+        assert (rollup.task_count, rollup.progress_sum) == (3, 210)
+
+        # 改挂到其他项目：旧项目扣减，新项目初始化
+        tasks[2].project_id = OTHER_PROJECT_ID
+        db_session.flush()
+        assert _assert_matches_exact(db_session).task_count == 2
+        assert _assert_matches_exact(db_session, OTHER_PROJECT_ID).task_count == 1
+
+        db_session.delete(tasks[0])
+        db_session.flush()
+        assert _assert_matches_exact(db_session).progress_sum == 40
+
+
+class TestAggregateFromRollup:
+    """进度聚合读取运行总计，健康度合并检查"""
+
+    def test_no_full_scan_and_health_deferred(self, db_session, tasks):
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db_session.get_bind(), "before_cursor_execute", before_execute)
+        try:
+            with patch("app.services.progress_service._check_and_update_health") as health:
+                result = aggregate_task_progress(db_session, tasks[0].id)
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", before_execute)
+
+        assert result["new_project_progress"] == 60.0
+        assert not any("count(task_unified.id)" in s for s in statements)
+        health.assert_not_called()
+
+        with (
+            patch("app.core.config.settings.PROGRESS_ROLLUP_DEBOUNCE_SECONDS", 0),
+            patch("app.services.progress_service._check_and_update_health") as health,
+        ):
+            aggregate_task_progress(db_session, tasks[0].id)
+        health.assert_called_once_with(db_session, PROJECT_ID)
+
+
+class TestFlushPending:
+    """合并窗口结束后统一重算"""
+
+    def test_burst_recomputed_once(self, db_session, tasks):
+        for progress in (30, 40, 50):
+            tasks[0].progress = progress
+            db_session.flush()
+        # 绕过 ORM 的写入造成的偏差由精确重算纠正
+        _rollup(db_session).task_count = 99
+        db_session.commit()
+
+        # 其他测试提交的项目也可能待重算，只检查本项目
+        with patch("app.services.progress_service._check_and_update_health") as health:
+            ProgressRollupService.flush_pending(db_session, debounce_seconds=3600)
+            assert _rollup(db_session).pending is True
+            ProgressRollupService.flush_pending(db_session, debounce_seconds=0)
+            ProgressRollupService.flush_pending(db_session, debounce_seconds=0)
+        assert [c.args for c in health.call_args_list].count((db_session, PROJECT_ID)) == 1
+
+        rollup = _assert_matches_exact(db_session)
+        assert (rollup.pending, rollup.recomputed_at is not None) == (False, True)
+        project = db_session.get(Project, PROJECT_ID)
+        db_session.refresh(project)
+        assert float(project.progress_pct) == pytest.approx((50 + 60 + 100) / 3, abs=0.01)
+        assert rollup.recomputed_at >= datetime.now() - timedelta(minutes=1)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+生产排程多策略搜索测试
+
+测试目标文件:
+- app/services/production/schedule_search.py - 候选运行、帕累托筛选、进程池预算
+- app/services/production_schedule_service.py - algorithm=SEARCH 落地首选方案
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.schemas.production_schedule import ScheduleGenerateRequest
+from app.services.production import schedule_search
+from app.services.production.schedule_search import (
+    CandidatePlan,
+    CandidateTimeout,
+    ScheduleSearchEngine,
+    pareto_front,
+    run_candidate,
+)
+from app.services.production_schedule_service import ProductionScheduleService
+
+
+def _order(order_id, priority="NORMAL", hours=4, due=None):
+    return SimpleNamespace(
+        id=order_id,
+        work_order_no=f"WO{order_id:03d}",
+        priority=priority,
+        plan_end_date=due,
+        standard_hours=hours,
+        workshop_id=1,
+        process_id=None,
+        machine_id=None,
+        assigned_to=None,
+    )
+
+
+def _snapshot(orders, optimize_target="BALANCED"):
+    request = ScheduleGenerateRequest(
+        work_orders=[o.id for o in orders],
+        start_date=datetime(2024, 1, 1, 8),
+        end_date=datetime(2024, 1, 31, 18),
+        optimize_target=optimize_target,
+    )
+    return ScheduleSearchEngine.build_snapshot(
+        orders,
+        [SimpleNamespace(id=1, workshop_id=1), SimpleNamespace(id=2, workshop_id=1)],
+        [SimpleNamespace(id=11, workshop_id=1), SimpleNamespace(id=12, workshop_id=1)],
+        {},
+        request,
+    )
+
+
+ORDERS = [
+    _order(1, "LOW", hours=8, due=date(2024, 1, 10)),
+    _order(2, "URGENT", hours=2, due=date(2024, 1, 2)),
+    _order(3, "HIGH", hours=6, due=date(2024, 1, 3)),
+    _order(4, "NORMAL", hours=3, due=date(2024, 1, 1)),
+]
+
+
+class TestParetoFront:
+    """帕累托筛选"""
+
+    def test_dominated_plans_removed(self):
+        best = CandidatePlan("A", "GREEDY", score=40, late_count=0, makespan_hours=10)
+        worse = CandidatePlan("B", "GREEDY", score=30, late_count=1, makespan_hours=12)
+        tradeoff = CandidatePlan("C", "GREEDY", score=35, late_count=0, makespan_hours=8)
+
+        front = pareto_front([worse, tradeoff, best])
+
+        assert front == [best, tradeoff]
+        assert pareto_front([worse, tradeoff, best], "TIME")[0] is tradeoff
+
+    def test_conflicts_dominate_first(self):
+        clean = CandidatePlan("A", "GREEDY", score=20, makespan_hours=20)
+        conflicting = CandidatePlan("B", "HEURISTIC", score=50, conflict_count=2, makespan_hours=5)
+
+        assert pareto_front([conflicting, clean])[0] is clean
+
+
+class TestScheduleSearchEngine:
+    """候选运行与搜索"""
+
+    def test_run_candidate_scores_every_order(self):
+        plan = run_candidate(_snapshot(ORDERS), "DUE_DATE", "GREEDY")
+
+        assert {a.work_order_id for a in plan.assignments} == {1, 2, 3, 4}
+        assert plan.conflict_count == 0
+        assert plan.score > 0
+        # 交期最早的工单先排
+        first = min(plan.assignments, key=lambda a: (a.start, a.sequence_no))
+        assert first.work_order_id == 4
+
+    def test_sequential_search_returns_front(self):
+        engine = ScheduleSearchEngine(budget_seconds=5, max_workers=1, random_restarts=2)
+
+        plans = engine.search(_snapshot(ORDERS))
+
+        assert plans
+        assert not any(o.dominates(p) for p in plans for o in plans)
+
+    def test_process_pool_search(self):
+        engine = ScheduleSearchEngine(budget_seconds=30, max_workers=2, random_restarts=0)
+
+        try:
+            plans = engine.search(_snapshot(ORDERS))
+            pool = schedule_search._pool
+            assert engine.search(_snapshot(ORDERS))
+            # 进程池跨搜索复用，且不以 fork 方式启动
+            assert schedule_search._pool is pool
+            assert schedule_search._start_method() != "fork"
+        finally:
+            schedule_search.shutdown_search_pool()
+
+        assert plans
+        assert {a.work_order_id for a in plans[0].assignments} == {1, 2, 3, 4}
+
+    def test_candidate_stops_at_deadline(self, monkeypatch):
+        with pytest.raises(CandidateTimeout):
+            run_candidate(_snapshot(ORDERS), "DUE_DATE", "GREEDY", deadline=time.time() - 1)
+
+        # 开始时未超时，排到第二个工单时超时
+        clock = iter([0, 0, 100, 100, 100])
+        monkeypatch.setattr(schedule_search.time, "time", lambda: next(clock))
+        with pytest.raises(CandidateTimeout):
+            run_candidate(_snapshot(ORDERS), "DUE_DATE", "HEURISTIC", deadline=50)
+
+    def test_pool_candidates_receive_deadlines(self, monkeypatch):
+        executor = ThreadPoolExecutor(max_workers=2)
+        deadlines = []
+        submit = executor.submit
+
+        def recording_submit(fn, *args):
+            deadlines.append(args[-1])
+            return submit(fn, *args)
+
+        monkeypatch.setattr(executor, "submit", recording_submit)
+        monkeypatch.setattr(schedule_search, "_get_pool", lambda max_workers: executor)
+        engine = ScheduleSearchEngine(budget_seconds=10, max_workers=2, random_restarts=0)
+
+        began = time.time()
+        try:
+            plans = engine.search(_snapshot(ORDERS))
+        finally:
+            executor.shutdown()
+
+        assert plans
+        # 首个候选两个预算，其余一个预算
+        assert began + 20 <= deadlines[0] <= time.time() + 20
+        assert all(began + 10 <= d <= time.time() + 10 for d in deadlines[1:])
+
+    def test_pool_recreated_when_size_changes(self):
+        try:
+            pool = schedule_search._get_pool(2)
+            assert schedule_search._get_pool(2) is pool
+            resized = schedule_search._get_pool(3)
+            assert resized is not pool
+            assert schedule_search._pool_workers == 3
+        finally:
+            schedule_search.shutdown_search_pool()
+
+
+class TestSearchScheduling:
+    """algorithm=SEARCH 集成"""
+
+    def test_best_plan_materialized(self, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "SCHEDULE_SEARCH_MAX_WORKERS", 1)
+        service = ProductionScheduleService(MagicMock())
+        request = _snapshot(ORDERS).request
+
+        schedules = service._search_scheduling(
+            ORDERS,
+            [SimpleNamespace(id=1, workshop_id=1)],
+            [SimpleNamespace(id=11, workshop_id=1)],
+            request.model_copy(update={"consider_worker_skills": False}),
+            plan_id=99,
+            user_id=7,
+        )
+
+        assert len(schedules) == 4
+        assert all(s.schedule_plan_id == 99 and s.created_by == 7 for s in schedules)
+        assert service.last_search_plans
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+生产排程资源时间线测试
+
+测试目标文件:
+- app/services/production/schedule_timeline.py - 区间合并、冲突查询、最早可用时间、扫描线冲突检测
+- app/services/production_schedule_service.py - 贪心排程使用时间线
+"""
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.schemas.production_schedule import ScheduleGenerateRequest
+from app.services.production.schedule_timeline import (
+    ResourceTimeline,
+    ScheduleIndex,
+    find_earliest_fit,
+    find_overlapping_pairs,
+)
+from app.services.production_schedule_service import ProductionScheduleService
+
+
+def _dt(day, hour):
+    return datetime(2024, 1, day, hour, 0)
+
+
+class TestResourceTimeline:
+    """时间线区间维护"""
+
+    def test_add_merges_overlapping(self):
+        timeline = ResourceTimeline([(_dt(1, 8), _dt(1, 10)), (_dt(1, 14), _dt(1, 16))])
+        timeline.add(_dt(1, 9), _dt(1, 15))
+
+        assert list(timeline) == [(_dt(1, 8), _dt(1, 16))]
+        assert len(timeline) == 3
+
+    def test_touching_intervals_do_not_conflict(self):
+        timeline = ResourceTimeline([(_dt(1, 8), _dt(1, 10))])
+
+        assert timeline.is_free(_dt(1, 10), _dt(1, 12))
+        assert timeline.first_overlap(_dt(1, 9), _dt(1, 11)) == (_dt(1, 8), _dt(1, 10))
+
+    def test_earliest_fit_across_timelines(self):
+        equipment = ResourceTimeline([(_dt(1, 8), _dt(1, 10))])
+        worker = ResourceTimeline([(_dt(1, 10), _dt(1, 12))])
+
+        start = find_earliest_fit(
+            [equipment, worker],
+            _dt(1, 8),
+            align=lambda dt: dt,
+            end_of=lambda dt: dt + timedelta(hours=2),
+        )
+
+        assert start == _dt(1, 12)
+
+
+class TestGreedySchedulingTimeline:
+    """贪心排程在繁忙资源上不再放弃"""
+
+    def test_busy_resource_beyond_previous_attempt_cap(self):
+        service = ProductionScheduleService(MagicMock())
+        request = ScheduleGenerateRequest(
+            work_orders=[], start_date=_dt(1, 8), end_date=_dt(31, 18)
+        )
+        # 每个工作日 5 段 1 小时占用，空档都不足 2 小时，共 150 段
+        starts = [_dt(1, 8) + timedelta(days=d, hours=2 * k) for d in range(30) for k in range(5)]
+        slots = [(s, s + timedelta(hours=1)) for s in starts]
+
+        start = service._find_earliest_available_slot(slots, [], _dt(1, 8), 2, request)
+
+        assert start == _dt(30, 17)
+        end = service._calculate_end_time(start, 2, request)
+        assert ResourceTimeline(slots).is_free(start, end)
+
+
+def _random_schedules(count, seed=7):
+    rng = random.Random(seed)
+    schedules = []
+    for i in range(count):
+        start = _dt(1, 8) + timedelta(hours=rng.randint(0, 72))
+        schedules.append(
+            SimpleNamespace(
+                id=i + 1,
+                equipment_id=rng.choice([None, 1, 2, 3]),
+                worker_id=rng.choice([None, 11, 12]),
+                scheduled_start_time=start,
+                scheduled_end_time=start + timedelta(hours=rng.randint(1, 10)),
+            )
+        )
+    return schedules
+
+
+def _brute_force_pairs(schedules):
+    pairs = []
+    for i, a in enumerate(schedules):
+        for j in range(i + 1, len(schedules)):
+            b = schedules[j]
+            overlap = (
+                a.scheduled_start_time < b.scheduled_end_time
+                and a.scheduled_end_time > b.scheduled_start_time
+            )
+            if a.equipment_id and a.equipment_id == b.equipment_id and overlap:
+                pairs.append((i, j, "equipment"))
+            if a.worker_id and a.worker_id == b.worker_id and overlap:
+                pairs.append((i, j, "worker"))
+    return pairs
+
+
+class TestConflictDetection:
+    """扫描线冲突检测"""
+
+    def test_sweep_line_matches_pairwise(self):
+        schedules = _random_schedules(200)
+
+        assert find_overlapping_pairs(schedules) == _brute_force_pairs(schedules)
+
+    def test_detect_conflicts_builds_records(self):
+        service = ProductionScheduleService(MagicMock())
+        schedules = _random_schedules(60)
+
+        conflicts = service._detect_conflicts(schedules)
+
+        expected = _brute_force_pairs(schedules)
+        assert [(c.schedule_id, c.conflicting_schedule_id, c.resource_type) for c in conflicts] == [
+            (schedules[i].id, schedules[j].id, kind) for i, j, kind in expected
+        ]
+        assert {c.conflict_type for c in conflicts} <= {"EQUIPMENT", "WORKER"}
+
+    def test_schedule_index_streaming_check(self):
+        schedules = _random_schedules(100, seed=3)
+        index = ScheduleIndex(schedules[:-1])
+        new = schedules[-1]
+
+        found = {(kind, other.id) for kind, other in index.conflicts_with(new)}
+
+        expected = {
+            (kind, schedules[i].id)
+            for i, j, kind in _brute_force_pairs(schedules)
+            if j == len(schedules) - 1
+        }
+        assert found == expected
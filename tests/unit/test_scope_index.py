@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+数据权限范围索引测试
+
+测试目标文件:
+- app/services/data_scope/scope_index.py - 索引重建、变更标记过期
+- app/services/data_scope/project_filter.py - 索引命中时的半连接过滤、项目列表过滤
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.models.data_scope_index import UserScopeIndexState
+from app.models.enums import DataScopeEnum
+from app.models.project import Project, ProjectMember
+from app.models.user import User
+from app.services.data_scope.project_filter import ProjectFilterService
+from app.services.data_scope.scope_index import ProjectScopeIndexService
+from app.services.data_scope.user_scope import UserScopeService
+
+
+@pytest.fixture
+def scope_data(db_session):
+    user = User(id=1, username="member", password_hash="x", is_active=True, is_superuser=False)
+    db_session.add(user)
+    projects = [
+        Project(id=i, project_code=f"P{i:03d}", project_name=f"项目{i}", is_active=True)
+        for i in (1, 2, 3)
+    ]
+    db_session.add_all(projects)
+    db_session.flush()
+    db_session.add_all(
+        [
+            ProjectMember(project_id=1, user_id=1, role_code="MEMBER", is_active=True),
+            ProjectMember(project_id=2, user_id=1, role_code="MEMBER", is_active=True),
+        ]
+    )
+    db_session.commit()
+    return user
+
+
+def _state(db_session, user_id):
+    return db_session.query(UserScopeIndexState).filter_by(user_id=user_id).first()
+
+
+class TestProjectScopeIndex:
+    """索引重建与过期标记"""
+
+    def test_rebuild_and_read(self, db_session, scope_data):
+        count = ProjectScopeIndexService.rebuild_user_index(db_session, scope_data)
+        db_session.commit()
+
+        assert count == 2
+        assert ProjectScopeIndexService.get_indexed_project_ids(db_session, 1) == {1, 2}
+        assert ProjectScopeIndexService.get_fresh_state(db_session, scope_data) is not None
+        assert ProjectFilterService.get_accessible_project_ids(db_session, scope_data) == {1, 2}
+
+    def test_member_change_marks_stale(self, db_session, scope_data):
+        ProjectScopeIndexService.rebuild_user_index(db_session, scope_data)
+        db_session.commit()
+
+        db_session.add(ProjectMember(project_id=3, user_id=1, role_code="MEMBER", is_active=True))
+        db_session.commit()
+
+        state = _state(db_session, 1)
+        db_session.refresh(state)
+        assert state.is_stale is True
+        assert ProjectScopeIndexService.get_fresh_state(db_session, scope_data) is None
+        # 过期时降级实时计算
+        assert ProjectFilterService.get_accessible_project_ids(db_session, scope_data) == {
+            1,
+            2,
+            3,
+        }
+
+    def test_refresh_indexes_rebuilds_stale(self, db_session, scope_data):
+        result = ProjectScopeIndexService.refresh_indexes(db_session)
+        db_session.commit()
+
+        assert result == {"rebuilt": 1, "failed": 0}
+        assert _state(db_session, 1).project_count == 2
+        assert ProjectScopeIndexService.refresh_indexes(db_session) == {"rebuilt": 0, "failed": 0}
+
+    def test_filter_uses_semi_join(self, db_session, scope_data):
+        ProjectScopeIndexService.rebuild_user_index(db_session, scope_data)
+        db_session.commit()
+
+        query = ProjectFilterService.filter_related_by_project(
+            db_session,
+            db_session.query(ProjectMember),
+            scope_data,
+            ProjectMember.project_id,
+        )
+        assert "user_project_scopes" in str(query.statement)
+        assert {m.project_id for m in query.all()} == {1, 2}
+
+    def test_project_listing_uses_semi_join(self, db_session, scope_data):
+        with patch.object(
+            UserScopeService, "get_user_data_scope", return_value=DataScopeEnum.PROJECT.value
+        ):
+            # 索引未建立：半连接项目成员表
+            query = ProjectFilterService.filter_projects_by_scope(
+                db_session, db_session.query(Project), scope_data
+            )
+            assert "project_members" in str(query.statement)
+            assert {p.id for p in query.all()} == {1, 2}
+
+            ProjectScopeIndexService.rebuild_user_index(db_session, scope_data)
+            db_session.commit()
+
+            query = ProjectFilterService.filter_projects_by_scope(
+                db_session, db_session.query(Project), scope_data, project_ids=[2, 3]
+            )
+            assert "user_project_scopes" in str(query.statement)
+            assert {p.id for p in query.all()} == {2}
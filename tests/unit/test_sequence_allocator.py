@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+编号序列分配器测试
+
+测试目标文件:
+- app/services/sequence_allocator.py - 计数器原子自增、首次初始化、批量预分配
+- app/utils/number_generator.py - 编号生成走计数器
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.material import Material
+from app.models.sequence_counter import SequenceCounter
+from app.services.sequence_allocator import SequenceAllocator
+from app.utils.number_generator import generate_sequential_no, generate_sequential_nos
+
+
+def _material(code):
+    return Material(material_code=code, material_name=code)
+
+
+def _count_material_selects(db):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM materials" in statement:
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_execute)
+    return statements
+
+
+class TestSequenceAllocator:
+    """计数器分配"""
+
+    def test_seeds_from_existing_numbers_once(self, db_session):
+        date_str = datetime.now().strftime("%y%m%d")
+        db_session.add(_material(f"MT-{date_str}-007"))
+        db_session.commit()
+        selects = _count_material_selects(db_session)
+
+        first = generate_sequential_no(db_session, Material, "material_code", "MT")
+        second = generate_sequential_no(db_session, Material, "material_code", "MT")
+
+        assert (first, second) == (f"MT-{date_str}-008", f"MT-{date_str}-009")
+        # 只在计数器首次建立时扫描业务表
+        assert len(selects) == 1
+        counter = db_session.query(SequenceCounter).one()
+        assert (counter.name, counter.prefix, counter.current_value) == (
+            "materials.material_code",
+            f"MT-{date_str}-",
+            9,
+        )
+
+    def test_block_allocation_is_contiguous(self, db_session):
+        nos = generate_sequential_nos(
+            db_session, Material, "material_code", "BK", count=3, use_date=False, separator=""
+        )
+        after = SequenceAllocator.allocate(db_session, "materials.material_code", "BK")
+
+        assert nos == ["BK001", "BK002", "BK003"]
+        assert after == 4
+
+    def test_rollback_releases_numbers(self, db_session):
+        SequenceAllocator.allocate(db_session, "x.no", "RB-", count=2)
+        db_session.commit()
+        SequenceAllocator.allocate(db_session, "x.no", "RB-", count=5)
+        db_session.rollback()
+
+        assert SequenceAllocator.allocate(db_session, "x.no", "RB-") == 3
+
+    def test_invalid_count(self, db_session):
+        with pytest.raises(ValueError):
+            SequenceAllocator.allocate(db_session, "x.no", "RB-", count=0)
+
+
+class TestConcurrentAllocation:
+    """并发分配不产生重复编号"""
+
+    def test_concurrent_sessions_get_unique_numbers(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'seq.db'}", connect_args={"timeout": 30}
+        )
+        Material.__table__.create(engine)
+        SequenceCounter.__table__.create(engine)
+        Session = sessionmaker(bind=engine)
+        results, errors = [], []
+
+        def worker():
+            db = Session()
+            try:
+                for _ in range(5):
+                    no = generate_sequential_no(db, Material, "material_code", "CC")
+                    db.add(_material(no))
+                    db.commit()
+                    results.append(no)
+            except Exception as e:  # pragma: no cover - 失败时输出原因
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+        assert errors == []
+        assert len(results) == 20
+        assert len(set(results)) == 20
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+员工特征矩阵测试
+
+测试目标文件:
+- app/services/staff_matching/feature_matrix.py - 评估矩阵构建、增量刷新、向量化打分
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.models.organization import Employee
+from app.models.staff_matching import (
+    HrEmployeeProfile,
+    HrEmployeeTagEvaluation,
+    HrProjectPerformance,
+    HrTagDict,
+    MesProjectStaffingNeed,
+)
+from app.services.staff_matching.feature_matrix import EmployeeFeatureMatrix, workload_scores
+from app.services.staff_matching.matching import MatchingEngine
+
+EMPLOYEE_IDS = [97301, 97302, 97303, 97304]
+SKILL_PLC, SKILL_CAD, DOMAIN_AUTO, ATTITUDE, SPECIAL = 97311, 97312, 97313, 97314, 97315
+
+
+def _evaluation(employee_id, tag_id, score, is_valid=True):
+    return HrEmployeeTagEvaluation(
+        employee_id=employee_id,
+        tag_id=tag_id,
+        score=score,
+        evaluator_id=1,
+        evaluate_date=date(2026, 10, 1),
+        is_valid=is_valid,
+    )
+
+
+@pytest.fixture
+def staff_data(db_session):
+    tags = [
+        (SKILL_PLC, "SKILL", "PLC编程"),
+        (SKILL_CAD, "SKILL", "机械设计"),
+        (DOMAIN_AUTO, "DOMAIN", "汽车行业"),
+        (ATTITUDE, "ATTITUDE", "责任心"),
+        (SPECIAL, "SPECIAL", "现场调试"),
+    ]
+    db_session.add_all(
+        HrTagDict(id=tag_id, tag_code=f"FM-{tag_id}", tag_type=tag_type, tag_name=name)
+        for tag_id, tag_type, name in tags
+    )
+    db_session.add_all(
+        Employee(id=employee_id, employee_code=f"FM{employee_id}", name=f"员工{employee_id}")
+        for employee_id in EMPLOYEE_IDS
+    )
+    db_session.add_all(
+        [
+            _evaluation(97301, SKILL_PLC, 5),
+            _evaluation(97301, SKILL_CAD, 2),
+            _evaluation(97301, DOMAIN_AUTO, 4),
+            _evaluation(97301, ATTITUDE, 4),
+            _evaluation(97301, SPECIAL, 5),
+            _evaluation(97302, SKILL_PLC, 3),
+            _evaluation(97302, SKILL_CAD, 4),
+            _evaluation(97302, DOMAIN_AUTO, 2),
+            _evaluation(97302, SPECIAL, 3),
+            _evaluation(97302, SPECIAL, 4),
+            _evaluation(97303, SKILL_PLC, 5, is_valid=False),
+            _evaluation(97303, ATTITUDE, 2),
+        ]
+    )
+    db_session.add_all(
+        [
+            HrProjectPerformance(
+                employee_id=97301,
+                project_id=1,
+                role_code="ME",
+                performance_score=Decimal("90"),
+                quality_score=Decimal("80"),
+                contribution_level="CORE",
+            ),
+            HrProjectPerformance(
+                employee_id=97301,
+                project_id=2,
+                role_code="ME",
+                performance_score=Decimal("70"),
+                collaboration_score=Decimal("60"),
+                contribution_level="MINOR",
+            ),
+            HrProjectPerformance(
+                employee_id=97303, project_id=1, role_code="ME", performance_score=Decimal("0")
+            ),
+        ]
+    )
+    profiles = {
+        97301: HrEmployeeProfile(employee_id=97301, current_workload_pct=Decimal("30")),
+        97302: HrEmployeeProfile(
+            employee_id=97302, current_workload_pct=Decimal("70"), attitude_score=Decimal("88")
+        ),
+        97303: HrEmployeeProfile(employee_id=97303, current_workload_pct=Decimal("95")),
+    }
+    db_session.add_all(profiles.values())
+    db_session.flush()
+    return [(db_session.get(Employee, e), profiles.get(e)) for e in EMPLOYEE_IDS]
+
+
+def _need(**kwargs):
+    values = {
+        "project_id": 1,
+        "role_code": "ME",
+        "required_skills": [
+            {"tag_id": SKILL_PLC, "min_score": 4, "tag_name": "PLC编程"},
+            {"tag_id": SKILL_CAD, "min_score": 3, "tag_name": "机械设计"},
+        ],
+        "preferred_skills": [{"tag_id": SKILL_CAD}, {"tag_id": SKILL_PLC}],
+        "required_domains": [{"tag_id": DOMAIN_AUTO, "min_score": 3}],
+        "required_attitudes": [{"tag_id": ATTITUDE, "min_score": 3}],
+        "allocation_pct": Decimal("50"),
+    }
+    values.update(kwargs)
+    return MesProjectStaffingNeed(**values)
+
+
+def _legacy_scores(db_session, candidates, need):
+    return [
+        MatchingEngine._calculate_candidate_scores(db_session, employee, profile, need)
+        for employee, profile in candidates
+    ]
+
+
+class TestEmployeeFeatureMatrix:
+    """特征矩阵与逐条计算口径一致"""
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {},
+            {"required_skills": [], "required_domains": [], "required_attitudes": []},
+            {"preferred_skills": None, "allocation_pct": Decimal("100")},
+        ],
+    )
+    def test_scores_match_calculators(self, db_session, staff_data, overrides):
+        need = _need(**overrides)
+        matrix = EmployeeFeatureMatrix.get(db_session)
+        assert matrix is not None
+
+        scores = matrix.score_candidates(
+            [employee.id for employee, _ in staff_data],
+            [profile for _, profile in staff_data],
+            need,
+            MatchingEngine.DIMENSION_WEIGHTS,
+        )
+
+        for i, expected in enumerate(_legacy_scores(db_session, staff_data, need)):
+            for dimension in ("skill", "domain", "attitude", "quality", "workload", "special"):
+                assert scores[dimension][i] == pytest.approx(expected[dimension]), dimension
+            assert scores["total"][i] == pytest.approx(expected["total"])
+            matched, missing = matrix.skill_details(
+                staff_data[i][0].id, need.required_skills or []
+            )
+            assert (matched, missing) == (expected["matched_skills"], expected["missing_skills"])
+
+    def test_ranked_candidates(self, db_session, staff_data):
+        need = _need()
+        matrix = EmployeeFeatureMatrix.get(db_session)
+
+        ranked = MatchingEngine._score_candidates_by_matrix(matrix, staff_data, need, top_n=2)
+
+        legacy = sorted(
+            zip(staff_data, _legacy_scores(db_session, staff_data, need)),
+            key=lambda item: item[1]["total"],
+            reverse=True,
+        )
+        assert [c["employee"].id for c in ranked] == [e.id for (e, _), _ in legacy]
+        assert ranked[0]["scores"]["missing_skills"] == legacy[0][1]["missing_skills"]
+        # 技能匹配说明只为前 top_n 名生成
+        assert ranked[-1]["scores"]["missing_skills"] == []
+
+    def test_incremental_refresh(self, db_session, staff_data):
+        need = _need()
+        matrix = EmployeeFeatureMatrix.get(db_session)
+        ids, profiles = [e.id for e, _ in staff_data], [p for _, p in staff_data]
+        before = matrix.score_candidates(ids, profiles, need, MatchingEngine.DIMENSION_WEIGHTS)
+
+        db_session.add(_evaluation(97304, SKILL_PLC, 4))
+        removed = (
+            db_session.query(HrEmployeeTagEvaluation)
+            .filter_by(employee_id=97302, tag_id=SKILL_CAD)
+            .one()
+        )
+        db_session.delete(removed)
+        db_session.flush()
+
+        assert EmployeeFeatureMatrix.get(db_session) is matrix
+        after = matrix.score_candidates(ids, profiles, need, MatchingEngine.DIMENSION_WEIGHTS)
+        expected = _legacy_scores(db_session, staff_data, need)
+        assert after["skill"] == pytest.approx([s["skill"] for s in expected])
+        assert after["skill"][3] > before["skill"][3]
+        assert after["skill"][1] < before["skill"][1]
+
+
+def test_workload_scores():
+    workloads = np.array([np.nan, 20, 55, 65, 80, 100])
+    assert workload_scores(workloads, 50).tolist() == [80.0, 100.0, 80.0, 50.0, 40.0, 0.0]
@@ -52,11 +52,13 @@ class TestTaskImporter(unittest.TestCase):
     def test_happy_path_new_task(self):
         project = MagicMock()
         project.id = 1
+        project.project_code = "P001"
 
-        # query(Project).filter().first() -> project
-        # query(User).filter().first() -> None (no owner)
-        # query(Task).filter().first() -> None (no existing)
-        self.db.query.return_value.filter.return_value.first.side_effect = [project, None, None]
+        # 批量预取：项目命中；无负责人不查询用户；已有任务为空
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [
+            [project],
+            [],
+        ]
 
         df = pd.DataFrame(
             [
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+文本相似度索引测试
+
+测试目标文件:
+- app/services/text_index.py - 分词、TF-IDF 增量索引、MinHash
+- app/services/ecn_knowledge_service/similarity.py - 按索引查找相似ECN
+- app/services/knowledge/search_service.py - 关键词检索走文本索引
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.models.ecn import Ecn, EcnAffectedMaterial
+from app.models.knowledge_base import (
+    KnowledgeEntry,
+    KnowledgeSourceEnum,
+    KnowledgeStatusEnum,
+    KnowledgeTypeEnum,
+)
+from app.models.project import Project
+from app.services.ecn_knowledge_service import EcnKnowledgeService
+from app.services.ecn_knowledge_service.similarity import _calculate_similarity
+from app.services.knowledge.search_index import KnowledgeSearchIndex
+from app.services.knowledge.search_service import KnowledgeSearchService
+from app.services.text_index import MinHasher, TfidfIndex, tokenize
+
+PROJECT_ID = 9801
+
+DOCS = [
+    (1, "伺服电机过热导致停机"),
+    (2, "气缸漏气，更换密封圈"),
+    (3, "电机选型功率不足，更换伺服电机"),
+    (4, "PLC 程序 bug 导致 motor-x1 停机"),
+]
+
+
+class TestTfidfIndex:
+    """分词与增量索引"""
+
+    def test_tokenize(self):
+        assert tokenize("更换伺服电机 Motor-X1，电") == [
+            "更换",
+            "换伺",
+            "伺服",
+            "服电",
+            "电机",
+            "motor-x1",
+            "电",
+        ]
+        assert tokenize(None) == []
+
+    def test_query_and_incremental_update(self):
+        index = TfidfIndex.build(DOCS)
+
+        assert sorted(key for key, _ in index.query("伺服电机")) == [1, 3]
+        assert [key for key, _ in index.query("电机 停机", require_all=True)] == [1]
+        assert index.query("motor-x1 停机", top_k=1)[0][0] == 4
+
+        index.upsert(2, "伺服电机编码器故障")
+        index.remove(1)
+        incremental = dict(index.query("伺服电机"))
+        assert set(incremental) == {2, 3}
+
+        # 重新编译后与全量构建一致
+        index.compile()
+        rebuilt = TfidfIndex.build([(3, DOCS[2][1]), (4, DOCS[3][1]), (2, "伺服电机编码器故障")])
+        assert dict(index.query("伺服电机")) == pytest.approx(dict(rebuilt.query("伺服电机")))
+
+    def test_matching_keys_substring_recall(self):
+        index = TfidfIndex.build(DOCS + [(5, "servo motors overheat")])
+        index.upsert(6, "Motor-X2 更换")
+
+        assert sorted(index.matching_keys("motor")) == [4, 5, 6]
+        assert sorted(index.matching_keys("otor 停机")) == [4]
+        assert index.matching_keys("伺服电机 motor") == []
+        assert sorted(index.matching_keys("伺服电机")) == [1, 3]
+
+
+class TestMinHasher:
+    """MinHash 估计 Jaccard 相似度"""
+
+    def test_jaccard_estimate(self):
+        hasher = MinHasher(num_perm=256)
+        base = hasher.signature(f"M{i}" for i in range(100))
+        others = np.vstack(
+            [
+                hasher.signature(f"M{i}" for i in range(50, 150)),  # 真实值 1/3
+                hasher.signature(f"M{i}" for i in range(100)),
+                hasher.signature([]),
+            ]
+        )
+
+        estimates = hasher.jaccard(base, others)
+
+        assert estimates[0] == pytest.approx(1 / 3, abs=0.1)
+        assert estimates[1:].tolist() == [1.0, 0.0]
+
+
+def _ecn(ecn_id, description, materials=(), **kwargs):
+    ecn = Ecn(
+        id=ecn_id,
+        ecn_no=f"ECN-TXT-{ecn_id}",
+        ecn_title=f"相似{ecn_id}",
+        project_id=PROJECT_ID,
+        ecn_type=kwargs.pop("ecn_type", "DESIGN"),
+        status=kwargs.pop("status", "COMPLETED"),
+        solution=kwargs.pop("solution", "更换部件"),
+        change_description=description,
+        cost_impact=Decimal(kwargs.pop("cost", 1000)),
+        **kwargs,
+    )
+    affected = [
+        EcnAffectedMaterial(
+            ecn_id=ecn_id, material_code=code, material_name=code, change_type="UPDATE"
+        )
+        for code in materials
+    ]
+    return [ecn] + affected
+
+
+class TestSimilarEcnsByIndex:
+    """相似ECN按索引一次打分"""
+
+    def test_rank_and_incremental_sync(self, db_session):
+        db_session.add(Project(id=PROJECT_ID, project_code="PJ-TXT-1", project_name="相似项目"))
+        db_session.add_all(
+            _ecn(9801, "伺服电机过热，更换伺服电机", ["MAT-1", "MAT-2"])
+            + _ecn(9802, "伺服电机过热停机", ["MAT-1", "MAT-2"], root_cause_category="DESIGN")
+            + _ecn(9803, "气缸漏气更换密封圈", ["MAT-9"], ecn_type="PROCESS", cost=50)
+            + _ecn(9804, "伺服电机过热", ["MAT-1"], status="DRAFT")
+        )
+        db_session.flush()
+        service = EcnKnowledgeService(db_session)
+
+        results = service.find_similar_ecns(9801, top_n=5, min_similarity=0.3)
+
+        assert [r["ecn_id"] for r in results] == [9802]
+        current, similar = db_session.get(Ecn, 9801), db_session.get(Ecn, 9802)
+        # 除文本相似度口径（TF-IDF 余弦）外与逐条计算一致
+        assert results[0]["similarity_score"] == pytest.approx(
+            _calculate_similarity(service, current, similar), abs=0.15
+        )
+        assert results[0]["match_reasons"][0] == "相同ECN类型：DESIGN"
+
+        # 新完成的ECN增量同步进索引
+        db_session.get(Ecn, 9804).status = "COMPLETED"
+        db_session.flush()
+        results = service.find_similar_ecns(9801, top_n=5, min_similarity=0.3)
+        assert [r["ecn_id"] for r in results] == [9802, 9804]
+
+
+class TestKnowledgeSearchByIndex:
+    """知识关键词检索"""
+
+    def test_keyword_search(self, db_session):
+        entries = [
+            ("KE-TXT-1", "伺服电机过热处理", "电机温升过高", KnowledgeStatusEnum.PUBLISHED),
+            ("KE-TXT-2", "气缸漏气", "更换密封圈后解决", KnowledgeStatusEnum.PUBLISHED),
+            ("KE-TXT-3", "电机选型经验", "伺服电机功率校核", KnowledgeStatusEnum.DRAFT),
+        ]
+        db_session.add_all(
+            KnowledgeEntry(
+                entry_code=code,
+                knowledge_type=KnowledgeTypeEnum.ISSUE_SOLUTION,
+                source_type=KnowledgeSourceEnum.MANUAL,
+                title=title,
+                summary=summary,
+                status=status,
+            )
+            for code, title, summary, status in entries
+        )
+        db_session.flush()
+        service = KnowledgeSearchService(db_session)
+        assert service._match_keyword("伺服电机") is not None
+
+        def codes(**kwargs):
+            return sorted(e.entry_code for e in service.search(**kwargs)["items"])
+
+        assert codes(keyword="伺服电机") == ["KE-TXT-1"]
+        assert codes(keyword="伺服电机", status="DRAFT") == ["KE-TXT-3"]
+        assert codes(keyword="密封圈") == ["KE-TXT-2"]
+        # 单个汉字降级为 ILIKE
+        assert codes(keyword="缸") == ["KE-TXT-2"]
+
+    def test_candidate_cap_falls_back_to_sql(self, db_session, monkeypatch):
+        from app.core.config import settings
+
+        db_session.add_all(
+            KnowledgeEntry(
+                entry_code=f"KE-CAP-{i}",
+                knowledge_type=KnowledgeTypeEnum.ISSUE_SOLUTION,
+                source_type=KnowledgeSourceEnum.MANUAL,
+                title=f"Gearmotors 减速电机 {i}",
+                summary="齿轮减速电机选型",
+                status=KnowledgeStatusEnum.PUBLISHED if i < 2 else KnowledgeStatusEnum.DRAFT,
+            )
+            for i in range(4)
+        )
+        db_session.flush()
+        service = KnowledgeSearchService(db_session)
+        assert service._match_keyword("gearmotor") is not None
+
+        monkeypatch.setattr(settings, "KNOWLEDGE_SEARCH_MAX_CANDIDATES", 2)
+        assert service._match_keyword("gearmotor") is None
+        result = service.search(keyword="gearmotor")
+        assert result["total"] == 2
+        assert {e.entry_code for e in result["items"]} == {"KE-CAP-0", "KE-CAP-1"}
+
+    def test_keyword_rechecked_as_phrase(self, db_session):
+        entries = [
+            ("KE-PHR-1", "Motor fault 报警", "伺服电机", None),
+            ("KE-PHR-2", "Motor 更换", "电机正常", "fault 灯"),
+            ("KE-PHR-3", "Fault of motor", "服电机与伺服", None),
+        ]
+        db_session.add_all(
+            KnowledgeEntry(
+                entry_code=code,
+                knowledge_type=KnowledgeTypeEnum.ISSUE_SOLUTION,
+                source_type=KnowledgeSourceEnum.MANUAL,
+                title=title,
+                summary=summary,
+                solution=solution,
+                status=KnowledgeStatusEnum.PUBLISHED,
+            )
+            for code, title, summary, solution in entries
+        )
+        db_session.flush()
+        service = KnowledgeSearchService(db_session)
+        index = KnowledgeSearchIndex.get(db_session)
+
+        # 索引候选包含词项分散出现的条目，SQL 按各列短语复核后剔除
+        assert len(index.match("motor fault")) == 3
+        result = service.search(keyword="motor fault")
+        assert result["total"] == 1
+        assert [e.entry_code for e in result["items"]] == ["KE-PHR-1"]
+        # 二元组齐全但不相邻（"服电机与伺服"）不算命中
+        assert len(index.match("伺服电机")) == 2
+        assert [e.entry_code for e in service.search(keyword="伺服电机")["items"]] == ["KE-PHR-1"]
+
+    def test_due_rebuild_replaces_index(self, db_session):
+        index = KnowledgeSearchIndex.get(db_session)
+        index.built_at = index.built_at.replace(year=2000)
+
+        refreshed = KnowledgeSearchIndex.refresh(db_session)
+
+        assert refreshed is not index
+        assert KnowledgeSearchIndex.get(db_session) is refreshed
@@ -87,10 +87,10 @@ class TestTimesheetImporterImport(unittest.TestCase):
         user.department_id = 10
         user.department = "技术部"
 
-        self.db.query.return_value.filter.return_value.first.side_effect = [
-            user,  # User query
-            None,  # Project query (no project)
-            None,  # existing timesheet check
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [
+            [user],  # 按姓名预取用户
+            [],  # 按用户名预取用户
+            [],  # 已有工时
         ]
 
         df = pd.DataFrame(
@@ -121,17 +121,20 @@ def test_import_update_existing():
     user.real_name = "李四"
 
     existing_ts = MagicMock()
+    existing_ts.user_id = 1
+    existing_ts.work_date = date(2025, 1, 1)
+    existing_ts.project_id = None
+    existing_ts.task_name = ""
 
     def query_side(model):
         q = MagicMock()
+        rows = q.filter.return_value.order_by.return_value.all
         if model.__name__ == "User":
-            q.filter.return_value.first.return_value = user
+            rows.return_value = [user]
         elif model.__name__ == "Timesheet":
-            q.filter.return_value.first.return_value = existing_ts
-        elif model.__name__ == "Project":
-            q.filter.return_value.first.return_value = None
+            rows.return_value = [existing_ts]
         else:
-            q.filter.return_value.first.return_value = None
+            rows.return_value = []
         return q
 
     db.query.side_effect = lambda m: query_side(m)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+工时汇总表测试
+
+测试目标文件:
+- app/services/timesheet_rollup_service.py - flush 事件增量维护、整体重建
+- app/services/timesheet_aggregation_service.py - 报表从汇总表读取
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models.project import Project
+from app.models.timesheet import Timesheet
+from app.models.timesheet_rollup import TimesheetDailyRollup, TimesheetMonthlyRollup
+from app.services.timesheet_aggregation_helpers import (
+    build_daily_breakdown,
+    build_project_breakdown,
+    build_task_breakdown,
+    calculate_hours_summary,
+)
+from app.services.timesheet_aggregation_service import TimesheetAggregationService
+from app.services.timesheet_rollup_service import TimesheetRollupService
+
+# 使用远期月份，避免与其他测试数据混淆
+YEAR, MONTH = 2031, 3
+
+
+def _ts(user_id, day, hours, overtime_type="NORMAL", status="APPROVED", **kwargs):
+    return Timesheet(
+        user_id=user_id,
+        user_name=f"user{user_id}",
+        department_id=kwargs.pop("department_id", 10),
+        work_date=date(YEAR, MONTH, day),
+        hours=Decimal(str(hours)),
+        overtime_type=overtime_type,
+        status=status,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def timesheets(db_session):
+    rows = [
+        _ts(9101, 3, 8, project_id=9201, project_code="P1", task_id=1, task_name="设计"),
+        _ts(9101, 3, 2, "OVERTIME", project_id=9201, project_code="P1", task_id=1),
+        _ts(9101, 4, 4, "WEEKEND", project_id=9202, project_code="P2", task_id=2),
+        _ts(9102, 3, 6, project_id=9201, project_code="P1", department_id=20),
+        _ts(9102, 5, 3, "HOLIDAY", rd_project_id=9301, department_id=20),
+        _ts(9102, 5, 5, status="SUBMITTED", project_id=9201, department_id=20),
+    ]
+    db_session.add_all(rows)
+    db_session.flush()
+    return rows
+
+
+def _monthly(db_session, user_id, month=MONTH):
+    return {
+        (r.project_id, r.rd_project_id): (float(r.total_hours), r.entries_count)
+        for r in db_session.query(TimesheetMonthlyRollup).filter_by(
+            user_id=user_id, year=YEAR, month=month
+        )
+    }
+
+
+class TestRollupMaintenance:
+    """flush 事件增量维护"""
+
+    def test_flush_builds_daily_and_monthly_rollups(self, db_session, timesheets):
+        day = (
+            db_session.query(TimesheetDailyRollup)
+            .filter_by(user_id=9101, work_date=date(YEAR, MONTH, 3))
+            .one()
+        )
+
+        assert (float(day.total_hours), float(day.normal_hours), float(day.overtime_hours)) == (
+            10,
+            8,
+            2,
+        )
+        assert (day.entries_count, day.project_code, day.task_name) == (2, "P1", "设计")
+        # 未审批记录不计入
+        assert _monthly(db_session, 9102) == {(9201, None): (6, 1), (None, 9301): (3, 1)}
+
+    def test_approve_edit_and_delete_refresh_affected_days(self, db_session, timesheets):
+        submitted = timesheets[-1]
+        submitted.status = "APPROVED"
+        db_session.flush()
+        assert _monthly(db_session, 9102)[(9201, None)] == (11, 2)
+
+        # 改到下个月：旧月份扣减、新月份新增
+        submitted.work_date = date(YEAR, MONTH + 1, 1)
+        db_session.flush()
+        assert _monthly(db_session, 9102)[(9201, None)] == (6, 1)
+        assert _monthly(db_session, 9102, MONTH + 1) == {(9201, None): (5, 1)}
+
+        db_session.delete(timesheets[3])
+        db_session.flush()
+        assert (9201, None) not in _monthly(db_session, 9102)
+
+    def test_rebuild_matches_incremental(self, db_session, timesheets):
+        before = _monthly(db_session, 9101)
+        db_session.query(TimesheetDailyRollup).filter_by(user_id=9101).delete()
+
+        TimesheetRollupService.rebuild(db_session, date(YEAR, MONTH, 1), date(YEAR, MONTH, 31))
+
+        assert _monthly(db_session, 9101) == before
+
+
+class TestReportsFromRollups:
+    """报表从汇总表读取，结果与逐条汇总一致"""
+
+    def test_monthly_aggregation_matches_row_by_row(self, db_session, timesheets):
+        approved = [t for t in timesheets if t.status == "APPROVED" and t.department_id == 10]
+        assert len(approved) == 3
+        service = TimesheetAggregationService(db_session)
+
+        with patch.object(db_session, "commit", db_session.flush):
+            result = service.aggregate_monthly_timesheet(YEAR, MONTH, department_id=10)
+
+        assert result["entries_count"] == len(approved)
+        assert {k: result[k] for k in calculate_hours_summary(approved)} == (
+            calculate_hours_summary(approved)
+        )
+        assert result["project_breakdown"] == build_project_breakdown(approved)
+        assert result["daily_breakdown"] == build_daily_breakdown(approved)
+        assert result["task_breakdown"] == build_task_breakdown(approved)
+
+    def test_finance_report_looks_up_rate_once_per_user_day(self, db_session, timesheets):
+        service = TimesheetAggregationService(db_session)
+
+        with patch(
+            "app.services.timesheet_aggregation_service.HourlyRateService.get_user_hourly_rate",
+            side_effect=lambda db, user_id, work_date: Decimal(user_id - 9000),
+        ) as get_rate:
+            report = service.generate_finance_report(YEAR, MONTH)
+
+        by_project = {r["project_id"]: r for r in report}
+        assert by_project[9201]["total_hours"] == 16
+        assert by_project[9201]["total_cost"] == 10 * 101 + 6 * 102
+        assert len(by_project[9201]["personnel_records"]) == 3
+        assert get_rate.call_count == 3
+
+        summary_only = service.generate_finance_report(YEAR, MONTH, include_records=False)
+        assert all(r["personnel_records"] == [] for r in summary_only)
+
+    def test_hr_and_project_reports(self, db_session, timesheets):
+        db_session.add(Project(id=9201, project_code="P1", project_name="项目一"))
+        db_session.flush()
+        service = TimesheetAggregationService(db_session)
+
+        hr = {r["user_id"]: r for r in service.generate_hr_report(YEAR, MONTH)}
+        project = service.generate_project_report(9201)
+
+        assert (hr[9101]["normal_hours"], hr[9101]["weekend_hours"]) == (8, 4)
+        assert len(hr[9101]["daily_records"]) == 3
+        assert project["total_hours"] == 16
+        assert [p["total_hours"] for p in project["personnel_stats"]] == [10, 6]
+        assert project["daily_stats"][0]["personnel_count"] == 2
+        assert project["task_stats"] == [{"task_id": 1, "task_name": "设计", "total_hours": 10}]
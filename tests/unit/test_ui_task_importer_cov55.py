@@ -43,7 +43,7 @@ def test_import_empty_task_name(mock_db):
 def test_import_project_not_found(mock_db):
     """项目不存在时记录失败"""
     df = _make_df({"任务名称*": ["Task1"], "项目编码*": ["NONEXISTENT"]})
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
     imported, updated, failed = TaskImporter.import_task_data(mock_db, df, current_user_id=1)
     assert imported == 0
     assert len(failed) == 1
@@ -55,9 +55,10 @@ def test_import_task_success(mock_db):
     df = _make_df({"任务名称*": ["Task1"], "项目编码*": ["P001"]})
     project = MagicMock()
     project.id = 1
+    project.project_code = "P001"
 
-    # First query (Project) returns project, second (Task) returns None (no existing)
-    mock_db.query.return_value.filter.return_value.first.side_effect = [project, None]
+    # 批量预取：项目命中，已有任务为空
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [[project], []]
     imported, updated, failed = TaskImporter.import_task_data(mock_db, df, current_user_id=1)
     assert imported == 1
     assert updated == 0
@@ -69,8 +70,11 @@ def test_import_existing_task_no_update(mock_db):
     df = _make_df({"任务名称*": ["ExistingTask"], "项目编码*": ["P001"]})
     project = MagicMock()
     project.id = 1
+    project.project_code = "P001"
     existing_task = MagicMock()
-    mock_db.query.return_value.filter.return_value.first.side_effect = [project, existing_task]
+    existing_task.project_id = 1
+    existing_task.task_name = "ExistingTask"
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [[project], [existing_task]]
     imported, updated, failed = TaskImporter.import_task_data(
         mock_db, df, current_user_id=1, update_existing=False
     )
@@ -84,8 +88,11 @@ def test_import_existing_task_with_update(mock_db):
     df = _make_df({"任务名称*": ["ExistingTask"], "项目编码*": ["P001"]})
     project = MagicMock()
     project.id = 1
+    project.project_code = "P001"
     existing_task = MagicMock()
-    mock_db.query.return_value.filter.return_value.first.side_effect = [project, existing_task]
+    existing_task.project_id = 1
+    existing_task.task_name = "ExistingTask"
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.side_effect = [[project], [existing_task]]
     imported, updated, failed = TaskImporter.import_task_data(
         mock_db, df, current_user_id=1, update_existing=True
     )
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+统一导入批量管道测试
+
+测试目标文件:
+- app/services/unified_import/base.py - 向量化列解析、批量预取、错误报告
+- app/services/unified_import/bom_importer.py - BOM 明细批量导入、行号与用量精度
+- app/services/unified_import/timesheet_importer.py - 工时批量导入与去重
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+
+from app.models.material import BomHeader, BomItem, Material
+from app.models.project import Project
+from app.models.user import User
+from app.services.unified_import import BomImporter, TimesheetImporter
+from app.services.unified_import.base import ImportBase
+
+
+@pytest.fixture
+def seeded(db_session):
+    db_session.execute(text("PRAGMA foreign_keys=OFF"))
+    db_session.add_all(
+        [
+            Project(id=1, project_code="P001", project_name="项目A"),
+            User(id=5, username="zhangsan", real_name="张三", password_hash="x"),
+        ]
+        + [
+            Material(id=100 + i, material_code=f"M{i:03d}", material_name=f"物料{i}")
+            for i in range(300)
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+def _count_selects(db):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_execute)
+    return statements
+
+
+class TestBomBulkImport:
+    """BOM 批量导入"""
+
+    def test_item_numbers_and_in_file_duplicates(self, seeded):
+        seeded.add(BomHeader(id=7, bom_no="B1", bom_name="B1", project_id=1, created_by=1))
+        seeded.add(
+            BomItem(
+                bom_id=7,
+                item_no=4,
+                material_id=100,
+                material_code="M000",
+                material_name="x",
+                quantity=1,
+            )
+        )
+        seeded.commit()
+        df = pd.DataFrame(
+            [
+                {"BOM编码*": "B1", "项目编码*": "P001", "物料编码*": "M001", "用量*": 2},
+                {"BOM编码*": "B1", "项目编码*": "P001", "物料编码*": "M002", "用量*": "3.5"},
+                {"BOM编码*": "B1", "项目编码*": "P001", "物料编码*": "M001", "用量*": 1},
+                {"BOM编码*": "B1", "项目编码*": "P404", "物料编码*": "M001", "用量*": 1},
+                {"BOM编码*": "B1", "项目编码*": "P001", "物料编码*": "M000", "用量*": "abc"},
+            ]
+        )
+
+        imported, updated, failed = BomImporter.import_bom_data(seeded, df, 1)
+
+        assert (imported, updated) == (2, 0)
+        assert failed == [
+            {"row_index": 4, "error": "该BOM明细已存在"},
+            {"row_index": 5, "error": "未找到项目: P404"},
+            {"row_index": 6, "error": "用量格式错误"},
+        ]
+        items = seeded.query(BomItem).filter(BomItem.bom_id == 7).order_by(BomItem.item_no).all()
+        assert [(i.item_no, i.material_code) for i in items] == [
+            (4, "M000"),
+            (5, "M001"),
+            (6, "M002"),
+        ]
+
+    def test_quantity_decimal_from_cell_text(self, seeded):
+        df = pd.DataFrame(
+            [
+                {
+                    "BOM编码*": "B3",
+                    "项目编码*": "P001",
+                    "物料编码*": "M001",
+                    "用量*": "0.12345678901234567",
+                },
+                {"BOM编码*": "B3", "项目编码*": "P001", "物料编码*": "M002", "用量*": 0.1},
+            ]
+        )
+        added = []
+        add_in_chunks = BomImporter.add_in_chunks
+
+        def capture(db, objects):
+            added.extend(objects)
+            return add_in_chunks(db, objects)
+
+        with patch.object(BomImporter, "add_in_chunks", side_effect=capture):
+            imported, _, failed = BomImporter.import_bom_data(seeded, df, 1)
+
+        assert imported == 2 and failed == []
+        # 数值校验走向量化浮点，入库用量按单元格文本转换，不丢有效数字
+        assert {i.material_code: i.quantity for i in added} == {
+            "M001": Decimal("0.12345678901234567"),
+            "M002": Decimal("0.1"),
+        }
+        assert ImportBase.to_decimal(" 2.50 ") == Decimal("2.50")
+
+    def test_query_count_independent_of_row_count(self, seeded):
+        df = pd.DataFrame(
+            [
+                {"BOM编码*": "B2", "项目编码*": "P001", "物料编码*": f"M{i:03d}", "用量*": 1}
+                for i in range(300)
+            ]
+        )
+        selects = _count_selects(seeded)
+
+        imported, _, failed = BomImporter.import_bom_data(seeded, df, 1)
+
+        assert imported == 300 and failed == []
+        assert len(selects) <= 6
+
+
+class TestTimesheetBulkImport:
+    """工时批量导入"""
+
+    def test_validation_and_existing_records(self, seeded):
+        df = pd.DataFrame(
+            [
+                {
+                    "工作日期*": "2025-01-02",
+                    "人员姓名*": "张三",
+                    "工时(小时)*": 8,
+                    "项目编码": "P001",
+                },
+                {"工作日期*": "2025-01-02", "人员姓名*": "zhangsan", "工时(小时)*": 30},
+                {"工作日期*": "bad", "人员姓名*": "张三", "工时(小时)*": 3},
+                {"工作日期*": "2025-01-03", "人员姓名*": "李四", "工时(小时)*": 3},
+            ]
+        )
+
+        imported, _, failed = TimesheetImporter.import_timesheet_data(seeded, df, 1)
+        again = TimesheetImporter.import_timesheet_data(seeded, df.iloc[:1], 1)
+
+        assert imported == 1
+        assert [r["error"] for r in failed] == [
+            "工时必须在0-24之间",
+            "工作日期格式错误",
+            "未找到用户: 李四",
+        ]
+        assert again == (0, 0, [{"row_index": 2, "error": "该工时记录已存在"}])
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+流式分块导入测试
+
+测试目标文件:
+- app/services/import_export_engine.py - xlsx/CSV 分块读取
+- app/services/unified_import/unified_importer.py - 逐块导入与提交
+- app/services/unified_import/import_job.py - 导入任务进度
+- app/api/v1/endpoints/data_import_export/import_jobs.py - 任务状态仅导入人可见
+"""
+
+import io
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from openpyxl import Workbook
+from sqlalchemy import text
+
+from app.api.v1.endpoints.data_import_export.import_jobs import get_import_job
+from app.models.material import Material
+from app.models.user import User
+from app.services.import_export_engine import ImportExportEngine
+from app.services.unified_import import ImportJobService, UnifiedImporter
+
+
+def _xlsx(rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def db(db_session):
+    db_session.execute(text("PRAGMA foreign_keys=OFF"))
+    db_session.add(User(id=1, username="admin", real_name="管理员", password_hash="x"))
+    db_session.commit()
+    return db_session
+
+
+class TestIterExcelChunks:
+    """分块读取"""
+
+    def test_xlsx_chunks_keep_row_positions(self):
+        content = _xlsx(
+            [
+                ["物料编码*", "物料名称*"],
+                ["M1", "一"],
+                [None, None],
+                ["M2", "二"],
+                ["M3", "三", "多余列"],
+                ["M4"],
+            ]
+        )
+
+        chunks = list(ImportExportEngine.iter_excel_chunks(content, 2, filename="a.xlsx"))
+
+        assert [len(c) for c in chunks] == [2, 2]
+        # 与整表读取结果一致：Excel 行号 = 索引 + 2，空行被跳过但不影响后续行号
+        assert [list(c.index) for c in chunks] == [[0, 2], [3, 4]]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks), ImportExportEngine.parse_excel(content), check_dtype=False
+        )
+
+    def test_csv_chunks(self):
+        content = "物料编码*,物料名称*\nM1,一\n,\nM2,二\nM3,三\n".encode("utf-8-sig")
+
+        chunks = list(ImportExportEngine.iter_excel_chunks(content, 2, filename="a.csv"))
+
+        assert [list(c["物料编码*"]) for c in chunks] == [["M1"], ["M2", "M3"]]
+
+
+class TestImportStream:
+    """逐块导入与任务进度"""
+
+    def test_chunks_committed_and_progress_recorded(self, db):
+        content = _xlsx(
+            [["物料编码*", "物料名称*", "默认供应商"]]
+            + [[f"M{i}", f"物料{i}", "供应商A"] for i in range(5)]
+            + [["M1", "重复"], ["", "缺编码"]]
+        )
+        job = ImportJobService.create(db, "material", "m.xlsx", 1)
+        db.commit()
+
+        result = UnifiedImporter.import_stream(
+            db, content, "m.xlsx", "MATERIAL", 1, job=job, chunk_size=3
+        )
+
+        assert result["total_rows"] == 7
+        assert (result["imported_count"], result["failed_count"]) == (5, 2)
+        assert result["failed_rows"] == [
+            {"row_index": 7, "error": "物料编码 M1 已存在"},
+            {"row_index": 8, "error": "物料编码和物料名称为必填项"},
+        ]
+        assert db.query(Material).count() == 5
+
+        status = ImportJobService.to_status(db.get(type(job), job.id))
+        assert status["status"] == ImportJobService.PARTIAL
+        assert (status["processed_rows"], status["success_rows"], status["failed_rows"]) == (
+            7,
+            5,
+            2,
+        )
+        assert status["started_at"] and status["completed_at"]
+
+    def test_failure_marks_job_failed(self, db):
+        content = _xlsx([["名称"], ["x"]])
+        job = ImportJobService.create(db, "MATERIAL", "m.xlsx", 1)
+        db.commit()
+
+        with pytest.raises(HTTPException):
+            UnifiedImporter.import_stream(db, content, "m.xlsx", "MATERIAL", 1, job=job)
+
+        db.refresh(job)
+        assert job.status == ImportJobService.FAILED
+        assert "物料编码" in job.error_message
+
+    def test_job_status_visible_to_owner_only(self, db):
+        job = ImportJobService.create(db, "MATERIAL", "m.xlsx", 1)
+        db.commit()
+
+        owner = SimpleNamespace(id=1, is_superuser=False)
+        admin = SimpleNamespace(id=2, is_superuser=True)
+        other = SimpleNamespace(id=3, is_superuser=False)
+        assert get_import_job(job.id, db=db, current_user=owner)["task_id"] == job.id
+        assert get_import_job(job.id, db=db, current_user=admin)["task_id"] == job.id
+        with pytest.raises(HTTPException) as exc:
+            get_import_job(job.id, db=db, current_user=other)
+        assert exc.value.status_code == 404
@@ -14,6 +14,8 @@ from app.services.unified_import.task_importer import TaskImporter
 
 
 def _make_db(project=None):
+    if project is not None:
+        project.project_code = "P001"
     db = MagicMock()
     call_count = [0]
 
@@ -22,11 +24,11 @@ def _make_db(project=None):
         q = MagicMock()
         name = getattr(model, "__name__", str(model))
         if "Project" in name:
-            q.filter.return_value.first.return_value = project
+            q.filter.return_value.order_by.return_value.all.return_value = [project] if project else []
         elif "User" in name:
-            q.filter.return_value.first.return_value = None
+            q.filter.return_value.order_by.return_value.all.return_value = []
         elif "Task" in name:
-            q.filter.return_value.first.return_value = None
+            q.filter.return_value.order_by.return_value.all.return_value = []
         return q
 
     db.query.side_effect = query_side
@@ -63,7 +65,7 @@ class TestImportTaskData:
         assert imported == 1
         assert updated == 0
         assert failed == []
-        db.add.assert_called_once()
+        assert len(db.add_all.call_args[0][0]) == 1
 
     def test_empty_task_name_goes_to_failed(self):
         project = MagicMock()
@@ -79,7 +81,10 @@ class TestImportTaskData:
         project.id = 10
         db = MagicMock()
 
+        project.project_code = "P001"
         existing_task = MagicMock()
+        existing_task.project_id = 10
+        existing_task.task_name = "任务A"
         call_count = [0]
 
         def query_side(model):
@@ -87,11 +92,11 @@ class TestImportTaskData:
             q = MagicMock()
             name = getattr(model, "__name__", str(model))
             if "Project" in name:
-                q.filter.return_value.first.return_value = project
+                q.filter.return_value.order_by.return_value.all.return_value = [project] if project else []
             elif "User" in name:
-                q.filter.return_value.first.return_value = None
+                q.filter.return_value.order_by.return_value.all.return_value = []
             elif "Task" in name:
-                q.filter.return_value.first.return_value = existing_task
+                q.filter.return_value.order_by.return_value.all.return_value = [existing_task]
             return q
 
         db.query.side_effect = query_side
@@ -107,7 +112,10 @@ class TestImportTaskData:
         project.id = 10
         db = MagicMock()
 
+        project.project_code = "P001"
         existing_task = MagicMock()
+        existing_task.project_id = 10
+        existing_task.task_name = "任务A"
         call_count = [0]
 
         def query_side(model):
@@ -115,11 +123,11 @@ class TestImportTaskData:
             q = MagicMock()
             name = getattr(model, "__name__", str(model))
             if "Project" in name:
-                q.filter.return_value.first.return_value = project
+                q.filter.return_value.order_by.return_value.all.return_value = [project] if project else []
             elif "User" in name:
-                q.filter.return_value.first.return_value = None
+                q.filter.return_value.order_by.return_value.all.return_value = []
             elif "Task" in name:
-                q.filter.return_value.first.return_value = existing_task
+                q.filter.return_value.order_by.return_value.all.return_value = [existing_task]
             return q
 
         db.query.side_effect = query_side
@@ -137,5 +145,5 @@ class TestImportTaskData:
         db = _make_db(project=project)
         df = _make_valid_df()
         TaskImporter.import_task_data(db, df, current_user_id=1)
-        added = db.add.call_args[0][0]
+        added = db.add_all.call_args[0][0][0]
         assert added.weight == Decimal("1.00")
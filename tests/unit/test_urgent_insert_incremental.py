@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+紧急插单增量顺延测试
+
+测试目标文件:
+- app/services/production_schedule_service.py - _ripple_downstream 下游链顺延、插单响应
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import text
+
+from app.models.production import ProductionSchedule
+from app.services.production_schedule_service import ProductionScheduleService
+
+
+def _at(hour, day=2):
+    return datetime(2024, 1, day, hour, 0)
+
+
+def _schedule(schedule_id, equipment_id, worker_id, start, end):
+    return ProductionSchedule(
+        id=schedule_id,
+        work_order_id=schedule_id,
+        equipment_id=equipment_id,
+        worker_id=worker_id,
+        scheduled_start_time=start,
+        scheduled_end_time=end,
+        duration_hours=(end - start).total_seconds() / 3600,
+        status="PENDING",
+    )
+
+
+@pytest.fixture
+def plan(db_session):
+    db_session.execute(text("PRAGMA foreign_keys=OFF"))
+    db_session.add_all(
+        [
+            _schedule(1, 1, 12, _at(8), _at(10)),  # A: 插单设备，被顺延
+            _schedule(2, 1, 13, _at(10), _at(12)),  # B: 插单设备，被 A 顺延
+            _schedule(3, 2, 12, _at(10), _at(12)),  # X: 与 A 共用工人，连锁顺延
+            _schedule(4, 3, 14, _at(8), _at(10)),  # Y: 无关资源
+            _schedule(5, 1, 15, _at(16), _at(18)),  # C: 插单设备，空档足够不移动
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+class TestRippleDownstream:
+    """只顺延受影响的下游链"""
+
+    def test_moves_only_affected_chain(self, plan):
+        service = ProductionScheduleService(plan)
+        urgent = _schedule(None, 1, 11, _at(8), _at(10))
+
+        adjusted, conflicts, diff = service._ripple_downstream(urgent, max_delay_hours=8)
+
+        assert conflicts == []
+        assert {s.id for s in adjusted} == {1, 2, 3}
+        moved = {item["schedule_id"]: (item["new_start"], item["new_end"]) for item in diff}
+        assert moved == {
+            1: (_at(10), _at(12)),
+            2: (_at(12), _at(14)),
+            3: (_at(12), _at(14)),
+        }
+
+    def test_delay_over_limit_reports_conflict(self, plan):
+        service = ProductionScheduleService(plan)
+        urgent = _schedule(None, 1, 11, _at(8), _at(10))
+
+        adjusted, conflicts, _ = service._ripple_downstream(urgent, max_delay_hours=1)
+
+        assert adjusted == []
+        assert [c.schedule_id for c in conflicts] == [1]
+        assert all(c.resource_type == "equipment" for c in conflicts)
+
+    def test_response_moved_matches_diff(self, plan):
+        service = ProductionScheduleService(plan)
+        urgent = _schedule(None, 1, 11, _at(8), _at(10))
+        adjusted, conflicts, diff = service._ripple_downstream(urgent, max_delay_hours=8)
+        service.db = MagicMock()
+
+        def fake_insert(**kwargs):
+            service.last_insert_diff = diff
+            return None, adjusted, conflicts
+
+        with (
+            patch.object(service, "urgent_insert", side_effect=fake_insert),
+            patch("app.services.production_schedule_service.ScheduleResponse.model_validate"),
+        ):
+            result = service.execute_urgent_insert_with_logging(99, _at(8), 8, True, user_id=1)
+
+        assert result["moved"] == diff
+        assert {item["schedule_id"]: item["old_end"] for item in result["moved"]} == {
+            1: _at(10),
+            2: _at(12),
+            3: _at(12),
+        }